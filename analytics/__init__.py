@@ -0,0 +1,3 @@
+from .engine import SalesAnalytics
+
+__all__ = ["SalesAnalytics"]
@@ -0,0 +1,251 @@
+"""
+Columnar in-memory sales analytics for the owner.
+
+Order lines are loaded once into compact typed arrays (stdlib `array`), with
+products and categories dictionary-encoded as small integer codes. Grouped
+aggregations then run as a single pass over those columns, vectorized with
+NumPy when it is installed. `refresh` only pulls orders newer than the last
+one seen, so repeated reports never reload the full history. Cancelled orders
+are left out; since a loaded order can be cancelled later, the columns are
+rebuilt when the number of cancelled orders changes (which is rare).
+"""
+
+import logging
+import threading
+from array import array
+from typing import Any, Iterable, Optional
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; fall back to pure-Python passes
+    np = None
+
+logger = logging.getLogger(__name__)
+
+UNCATEGORIZED = "Uncategorized"
+HOURS_PER_DAY = 24
+
+# Columns that can be grouped by, and the values that can be summed
+GROUP_KEYS = ("hour", "product", "category")
+VALUE_KEYS = ("revenue_cents", "units")
+
+
+class SalesAnalytics:
+    """
+    Columnar store of order lines with incremental refresh.
+
+    Line-level columns (one entry per order line):
+        hour, product, category, units, revenue_cents
+    Order-level columns (one entry per order):
+        order_units, order_revenue_cents
+
+    Attributes:
+        last_seq (int): Highest order sequence number loaded so far.
+        cancelled (int): Cancelled orders when the columns were loaded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self) -> None:
+        self.last_seq = 0
+        self.cancelled = 0
+
+        self._columns: dict[str, array] = {
+            "hour": array("b"),
+            "product": array("i"),
+            "category": array("i"),
+            "units": array("i"),
+            "revenue_cents": array("q"),
+        }
+        self._order_units = array("i")
+        self._order_revenue_cents = array("q")
+
+        # Dictionary encoding: value -> code, and code -> value
+        self._product_codes: dict[str, int] = {}
+        self._product_ids: list[str] = []
+        self._category_codes: dict[str, int] = {}
+        self._category_names: list[str] = []
+
+    # --- Loading ---
+
+    def _encode(self, codes: dict[str, int], values: list[str], value: str) -> int:
+        code = codes.get(value)
+        if code is None:
+            code = len(values)
+            codes[value] = code
+            values.append(value)
+        return code
+
+    def ingest(self, rows: Iterable[dict[str, Any]]) -> int:
+        """
+        Appends order lines to the columns.
+
+        Rows must arrive ordered by `order_seq`, as produced by
+        `AbstractPantryPersistence.iter_order_lines`.
+
+        Args:
+            rows (Iterable[dict[str, Any]]): Order line rows.
+
+        Returns:
+            int: The number of new orders ingested.
+        """
+        columns = self._columns
+        new_orders = 0
+        current_seq = None
+        with self._lock:
+            for row in rows:
+                seq = row["order_seq"]
+                if seq != current_seq:
+                    if seq <= self.last_seq:
+                        continue  # Already loaded on a previous refresh
+                    current_seq = self.last_seq = seq
+                    self._order_units.append(0)
+                    self._order_revenue_cents.append(0)
+                    new_orders += 1
+
+                units = row["quantity"]
+                revenue_cents = units * int(round(row["unit_price"] * 100))
+
+                columns["hour"].append(int(row["created_at"][11:13]))
+                columns["product"].append(
+                    self._encode(
+                        self._product_codes, self._product_ids, row["product_id"]
+                    )
+                )
+                columns["category"].append(
+                    self._encode(
+                        self._category_codes,
+                        self._category_names,
+                        row["category"] or UNCATEGORIZED,
+                    )
+                )
+                columns["units"].append(units)
+                columns["revenue_cents"].append(revenue_cents)
+                self._order_units[-1] += units
+                self._order_revenue_cents[-1] += revenue_cents
+        return new_orders
+
+    def refresh(
+        self, persistence: AbstractPantryPersistence, cancelled: int = 0
+    ) -> int:
+        """
+        Loads orders placed since the last refresh. Blocking; run off the event loop.
+
+        Args:
+            persistence (AbstractPantryPersistence): Source of order lines.
+            cancelled (int): The current number of cancelled orders. When it
+                             differs from the last refresh, everything is
+                             reloaded so newly cancelled orders drop out.
+
+        Returns:
+            int: The number of new orders loaded.
+        """
+        if cancelled != self.cancelled:
+            logger.info(
+                f"Cancelled orders went from {self.cancelled} to {cancelled}; "
+                f"reloading analytics."
+            )
+            with self._lock:
+                self._clear()
+                self.cancelled = cancelled
+        new_orders = self.ingest(persistence.iter_order_lines(after_seq=self.last_seq))
+        if new_orders:
+            logger.info(
+                f"Analytics loaded {new_orders} new orders (last seq {self.last_seq})."
+            )
+        return new_orders
+
+    # --- Aggregation ---
+
+    @property
+    def order_count(self) -> int:
+        return len(self._order_units)
+
+    def _group_size(self, key: str) -> int:
+        if key == "hour":
+            return HOURS_PER_DAY
+        if key == "product":
+            return len(self._product_ids)
+        return len(self._category_names)
+
+    def group_sum(self, key: str, value: str = "revenue_cents") -> list[int]:
+        """
+        Sums a value column grouped by a key column in a single pass.
+
+        Args:
+            key (str): One of GROUP_KEYS.
+            value (str): One of VALUE_KEYS.
+
+        Returns:
+            list[int]: Totals indexed by group code (hour 0-23, product or
+                       category code).
+
+        Raises:
+            ValueError: If `key` or `value` is not a known column.
+        """
+        if key not in GROUP_KEYS or value not in VALUE_KEYS:
+            raise ValueError(f"Cannot group {value!r} by {key!r}")
+
+        with self._lock:
+            size = self._group_size(key)
+            keys = self._columns[key]
+            values = self._columns[value]
+            if np is not None:
+                sums = np.bincount(
+                    np.frombuffer(keys, dtype=np.int8 if key == "hour" else np.int32),
+                    weights=np.frombuffer(
+                        values,
+                        dtype=np.int64 if value == "revenue_cents" else np.int32,
+                    ),
+                    minlength=size,
+                )
+                return [int(total) for total in sums]
+
+            totals = [0] * size
+            for code, amount in zip(keys, values):
+                totals[code] += amount
+            return totals
+
+    def revenue_by_hour(self) -> list[int]:
+        """Revenue in cents for each hour of the day (UTC), index 0-23."""
+        return self.group_sum("hour", "revenue_cents")
+
+    def category_mix(self) -> dict[str, int]:
+        """Revenue in cents per category."""
+        totals = self.group_sum("category", "revenue_cents")
+        with self._lock:
+            names = list(self._category_names)
+        return dict(zip(names, totals))
+
+    def product_revenue(self) -> dict[str, int]:
+        """Revenue in cents per product ID."""
+        totals = self.group_sum("product", "revenue_cents")
+        with self._lock:
+            product_ids = list(self._product_ids)
+        return dict(zip(product_ids, totals))
+
+    def average_basket(self) -> Optional[dict[str, float]]:
+        """
+        Average units and revenue per order.
+
+        Returns:
+            Optional[dict[str, float]]: Keys 'units' and 'revenue_cents', or
+                                        None if no orders are loaded.
+        """
+        with self._lock:
+            count = len(self._order_units)
+            if not count:
+                return None
+            if np is not None:
+                units = float(np.frombuffer(self._order_units, dtype=np.int32).mean())
+                revenue = float(
+                    np.frombuffer(self._order_revenue_cents, dtype=np.int64).mean()
+                )
+            else:
+                units = sum(self._order_units) / count
+                revenue = sum(self._order_revenue_cents) / count
+        return {"units": units, "revenue_cents": revenue}
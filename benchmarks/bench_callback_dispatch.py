@@ -0,0 +1,108 @@
+"""
+Benchmark: regex handler chain vs. compact-codec router for callback dispatch.
+
+Measures the cost of finding the handler for a callback update, as
+python-telegram-bot does it: `check_update` on each registered
+CallbackQueryHandler in order until one matches. The legacy setup is the
+chain of regex patterns the customer module used to register; the new one is
+a single handler whose pattern is `CallbackRouter.matches`, followed by
+decoding and the dict lookup done in `dispatch`.
+
+Usage:
+    python -m benchmarks.bench_callback_dispatch [N]
+"""
+
+import sys
+import timeit
+import uuid
+
+from telegram import CallbackQuery, Update, User
+from telegram.ext import CallbackQueryHandler
+
+from handlers import callbacks
+from handlers.customer import build_router
+
+LEGACY_PATTERNS = [
+    "^shop_start$",
+    "^category_(.+)",
+    "^product_(.+)",
+    "^add_to_cart_(.+)",
+    "^close_shop$",
+    "^navigate_to_categories$",
+    "^navigate_to_products_(.+)",
+    "^view_cart$",
+    "^clear_cart$",
+    "^cart_checkout$",
+]
+
+
+async def _noop(update, context):
+    pass
+
+
+def _update(data: str) -> Update:
+    query = CallbackQuery(
+        id="1",
+        from_user=User(id=1, first_name="Bench", is_bot=False),
+        chat_instance="bench",
+        data=data,
+    )
+    return Update(update_id=1, callback_query=query)
+
+
+def _dispatch_legacy(handlers, update):
+    for handler in handlers:
+        match = handler.check_update(update)
+        if match:
+            return handler, match
+    return None
+
+
+def _dispatch_router(router, handler, update):
+    if handler.check_update(update):
+        action, fields = callbacks.decode(update.callback_query.data)
+        return router._routes[action], fields
+    return None
+
+
+def main(n: int) -> None:
+    product_id = str(uuid.uuid4())
+    category = "Bakery"
+    cases = {
+        "first route": ("shop_start", callbacks.encode(callbacks.CATEGORIES)),
+        "product": (
+            f"product_{product_id}",
+            callbacks.encode(callbacks.PRODUCT, callbacks.uuid_to_int(product_id)),
+        ),
+        "back to category": (
+            f"navigate_to_products_{category}",
+            callbacks.encode(callbacks.CATEGORY, callbacks.category_code(category)),
+        ),
+        "last route": ("cart_checkout", callbacks.encode(callbacks.CHECKOUT)),
+    }
+
+    legacy = [CallbackQueryHandler(_noop, pattern=p) for p in LEGACY_PATTERNS]
+    router = build_router()
+    router_handler = router.handler()
+
+    print(f"{'case':<18} {'regex chain':>14} {'router':>14}")
+    for label, (legacy_data, compact_data) in cases.items():
+        legacy_update = _update(legacy_data)
+        compact_update = _update(compact_data)
+        assert _dispatch_legacy(legacy, legacy_update)
+        assert _dispatch_router(router, router_handler, compact_update)
+
+        legacy_time = timeit.timeit(
+            lambda: _dispatch_legacy(legacy, legacy_update), number=n
+        )
+        router_time = timeit.timeit(
+            lambda: _dispatch_router(router, router_handler, compact_update), number=n
+        )
+        print(
+            f"{label:<18} {1e6 * legacy_time / n:11.2f} us "
+            f"{1e6 * router_time / n:11.2f} us"
+        )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
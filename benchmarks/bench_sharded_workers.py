@@ -0,0 +1,130 @@
+"""
+Benchmark: /start throughput with updates sharded across worker processes.
+
+Starts the multi-process mode's front side (`ShardedDispatcher`) with 1..N
+worker processes running the real handler stack against a temporary SQLite
+database, and a local fake Bot API. A burst of /start updates from distinct
+chats is dispatched at once and timed until every worker has drained its
+inbox, with each handler's Bot API calls relayed through the front.
+
+Rate limiting (the relay's and the workers') is disabled so the numbers show processing
+capacity. Extra workers only help on a machine with spare cores; on a
+single core they add relay and process overhead.
+
+Usage:
+    python -m benchmarks.bench_sharded_workers [N] [MAX_WORKERS]
+"""
+
+import asyncio
+import functools
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Workers import config too, so these also reach the spawned processes
+os.environ.setdefault("BOT_TOKEN", "1:bench")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+from tornado.httpserver import HTTPServer
+from tornado.web import Application as WebApplication, RequestHandler
+
+from telegram import Update
+from telegram.request import HTTPXRequest
+
+from benchmarks.bench_update_transport import _free_port
+from bot_main import worker_main
+from persistence.sqlite_persistence import SQLitePersistence
+from services.sharding import ShardedDispatcher
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+def _start_update(update_id: int) -> dict:
+    user = {"id": update_id, "is_bot": False, "first_name": "Bench"}
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(datetime.now(timezone.utc).timestamp()),
+            "chat": {"id": update_id, "type": "private"},
+            "from": user,
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+        },
+    }
+
+
+class _ApiHandler(RequestHandler):
+    """Answers sends and edits with a message, everything else with True."""
+
+    def post(self, _token: str, method: str) -> None:
+        result: object = True
+        if method == "getMe":
+            result = BOT_USER
+        elif method.startswith(("send", "edit")):
+            chat_id = int(self.get_body_argument("chat_id", "1"))
+            result = {
+                "message_id": 1,
+                "date": int(time.time()),
+                "chat": {"id": chat_id, "type": "private"},
+                "from": BOT_USER,
+                "text": "ok",
+            }
+        self.set_header("Content-Type", "application/json")
+        self.write(json.dumps({"ok": True, "result": result}))
+
+
+async def _run(workers: int, n: int, db_path: str, base_url: str) -> float:
+    dispatcher = ShardedDispatcher(
+        functools.partial(
+            worker_main, db_path=db_path, base_url=base_url, rate_limited=False
+        ),
+        workers,
+        request=HTTPXRequest(connection_pool_size=64),
+        rate=None,
+    )
+    await dispatcher.start()
+    # Warm up: every worker has started its application before timing
+    for update_id in range(1, workers + 1):
+        dispatcher.dispatch(Update.de_json(_start_update(update_id), None))
+    while dispatcher.relay.relayed < workers:
+        await asyncio.sleep(0.05)
+
+    burst = [
+        Update.de_json(_start_update(update_id), None)
+        for update_id in range(workers + 1, workers + 1 + n)
+    ]
+    started = time.perf_counter()
+    for update in burst:
+        dispatcher.dispatch(update)
+    await dispatcher.stop()
+    return n / (time.perf_counter() - started)
+
+
+async def main(n: int, max_workers: int) -> None:
+    port = _free_port()
+    server = HTTPServer(WebApplication([(r"/bot([^/]+)/(\w+)", _ApiHandler)]))
+    server.listen(port, "127.0.0.1")
+    base_url = f"http://127.0.0.1:{port}/bot"
+
+    print(f"{n} /start updates, {os.cpu_count()} CPU core(s)")
+    print(f"{'workers':>7} {'throughput':>16}")
+    for workers in range(1, max_workers + 1):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.db")
+            SQLitePersistence(db_path)  # Creates the schema once, up front
+            throughput = await _run(workers, n, db_path, base_url)
+        print(f"{workers:>7} {throughput:10.0f} upd/s")
+    server.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(
+        main(
+            int(sys.argv[1]) if len(sys.argv) > 1 else 2000,
+            int(sys.argv[2]) if len(sys.argv) > 2 else 2,
+        )
+    )
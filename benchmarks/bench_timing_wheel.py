@@ -0,0 +1,67 @@
+"""
+Benchmark: TimingWheel vs JobQueue.run_once for short auto-delete delays.
+
+Schedules N no-op timers with 3-5 second delays, then cancels them all, and
+reports wall time and traced memory for each scheduler.
+
+Usage:
+    python -m benchmarks.bench_timing_wheel [N]
+"""
+
+import asyncio
+import sys
+import time
+import tracemalloc
+
+from telegram.ext import ApplicationBuilder
+
+from services.timing_wheel import TimingWheel
+
+
+async def _noop(*_args):
+    pass
+
+
+def _measure(label: str, schedule, cancel, n: int) -> None:
+    tracemalloc.start()
+    started = time.perf_counter()
+    handles = [schedule(3.0 + (i % 3)) for i in range(n)]
+    scheduled = time.perf_counter()
+    _, peak = tracemalloc.get_traced_memory()
+    for handle in handles:
+        cancel(handle)
+    cancelled = time.perf_counter()
+    tracemalloc.stop()
+
+    print(
+        f"{label:<22} schedule {1e6 * (scheduled - started) / n:7.2f} us/op   "
+        f"cancel {1e6 * (cancelled - scheduled) / n:7.2f} us/op   "
+        f"peak {peak / n:7.0f} B/timer"
+    )
+
+
+async def main(n: int) -> None:
+    wheel = TimingWheel()
+    _measure(
+        "TimingWheel",
+        lambda delay: wheel.schedule_soon(_noop, delay),
+        lambda handle: handle.cancel(),
+        n,
+    )
+
+    application = ApplicationBuilder().token("0:benchmark").build()
+    job_queue = application.job_queue
+    await job_queue.start()
+    try:
+        _measure(
+            "JobQueue.run_once",
+            lambda delay: job_queue.run_once(_noop, delay),
+            lambda job: job.schedule_removal(),
+            n,
+        )
+    finally:
+        await job_queue.stop(wait=False)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 20_000))
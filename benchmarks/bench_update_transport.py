@@ -0,0 +1,251 @@
+"""
+Benchmark: long polling vs. webhook for receiving updates.
+
+Runs the real python-telegram-bot Updater against a local fake Bot API and
+measures, per transport, the time from an update "arriving at Telegram" to
+the application's handler running:
+
+* latency: updates sent one at a time (p50 / p95)
+* throughput: a burst of N updates delivered at once
+
+Network distance to Telegram is simulated with a round-trip time (RTT). In
+polling mode every getUpdates request and response crosses half an RTT, and
+updates that arrive while a response is in flight wait for the next request.
+In webhook mode Telegram POSTs each update (half an RTT to arrive, half for
+the acknowledgement) over up to `max_connections` parallel connections.
+
+Usage:
+    python -m benchmarks.bench_update_transport [N] [RTT_MS]
+"""
+
+import asyncio
+import json
+import socket
+import statistics
+import sys
+import time
+
+from tornado.httpserver import HTTPServer
+from tornado.web import Application as WebApplication, RequestHandler
+
+from telegram import Update
+from telegram.ext import Application, ApplicationBuilder, TypeHandler
+
+TOKEN = "1:bench"
+MAX_CONNECTIONS = 40
+LATENCY_SAMPLES = 200
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _update(update_id: int) -> dict:
+    return {
+        "update_id": update_id,
+        "callback_query": {
+            "id": str(update_id),
+            "chat_instance": "bench",
+            "from": {"id": 1, "is_bot": False, "first_name": "Bench"},
+            "data": "c",
+        },
+    }
+
+
+class FakeBotApi:
+    """The parts of the Bot API the Updater talks to, with a simulated RTT."""
+
+    def __init__(self, rtt: float):
+        self.rtt = rtt
+        self.pending: list[dict] = []
+        self.arrived = asyncio.Event()
+
+    def push(self, update: dict) -> None:
+        self.pending.append(update)
+        self.arrived.set()
+
+    async def get_updates(self, offset: int, timeout: float) -> list[dict]:
+        await asyncio.sleep(self.rtt / 2)  # Request travels to Telegram
+        self.pending = [u for u in self.pending if u["update_id"] >= offset]
+        if not self.pending:
+            self.arrived.clear()
+            try:
+                await asyncio.wait_for(self.arrived.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        batch = self.pending[:100]
+        await asyncio.sleep(self.rtt / 2)  # Response travels back
+        return batch
+
+    def web_app(self) -> WebApplication:
+        api = self
+
+        class ApiHandler(RequestHandler):
+            async def post(self, _token: str, method: str) -> None:
+                result: object = True
+                if method == "getMe":
+                    result = {"id": 1, "is_bot": True, "first_name": "Bench"}
+                    result["username"] = "bench_bot"
+                elif method == "getUpdates":
+                    offset = int(self.get_body_argument("offset", "0"))
+                    timeout = float(self.get_body_argument("timeout", "0"))
+                    result = await api.get_updates(offset, timeout)
+                self.set_header("Content-Type", "application/json")
+                self.write(json.dumps({"ok": True, "result": result}))
+
+        return WebApplication([(r"/bot([^/]+)/(\w+)", ApiHandler)])
+
+
+class Transport:
+    """Delivers updates to one running Application and times their handling."""
+
+    def __init__(self, api: FakeBotApi):
+        self.api = api
+        self.handled: dict[int, asyncio.Future] = {}
+
+    async def on_update(self, update: Update, _context) -> None:
+        self.handled[update.update_id].set_result(time.perf_counter())
+
+    def expect(self, update_id: int) -> asyncio.Future:
+        future = asyncio.get_running_loop().create_future()
+        self.handled[update_id] = future
+        return future
+
+    async def start(self, application: Application) -> None:
+        raise NotImplementedError
+
+    async def deliver(self, updates: list[dict]) -> None:
+        raise NotImplementedError
+
+    async def stop(self) -> None:
+        pass
+
+
+class Polling(Transport):
+    name = "polling"
+
+    async def start(self, application: Application) -> None:
+        await application.updater.start_polling(poll_interval=0, timeout=10)
+
+    async def deliver(self, updates: list[dict]) -> None:
+        for update in updates:
+            self.api.push(update)
+
+
+class Webhook(Transport):
+    """
+    Plays Telegram's side of a webhook: `MAX_CONNECTIONS` keep-alive
+    connections, each POSTing one update at a time and waiting for the ack.
+    A minimal HTTP/1.1 client keeps the sender's own overhead out of the way.
+    """
+
+    name = "webhook"
+
+    async def start(self, application: Application) -> None:
+        self.port = _free_port()
+        await application.updater.start_webhook(
+            listen="127.0.0.1",
+            port=self.port,
+            url_path="hook",
+            webhook_url=f"http://127.0.0.1:{self.port}/hook",
+            max_connections=MAX_CONNECTIONS,
+        )
+        self.outbox: asyncio.Queue = asyncio.Queue()
+        self.connections = [
+            asyncio.ensure_future(self._connection()) for _ in range(MAX_CONNECTIONS)
+        ]
+
+    async def _connection(self) -> None:
+        reader, writer = await asyncio.open_connection("127.0.0.1", self.port)
+        try:
+            while True:
+                body = json.dumps(await self.outbox.get()).encode()
+                await asyncio.sleep(self.api.rtt / 2)  # Delivery to the bot
+                writer.write(
+                    b"POST /hook HTTP/1.1\r\nHost: 127.0.0.1\r\n"
+                    b"Content-Type: application/json\r\n"
+                    b"Content-Length: %d\r\n\r\n%s" % (len(body), body)
+                )
+                headers = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in headers.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":")[1])
+                await reader.readexactly(length)
+                await asyncio.sleep(self.api.rtt / 2)  # Acknowledgement back
+        finally:
+            writer.close()
+
+    async def deliver(self, updates: list[dict]) -> None:
+        for update in updates:
+            self.outbox.put_nowait(update)
+
+    async def stop(self) -> None:
+        for connection in self.connections:
+            connection.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+
+
+async def _run(transport_cls, n: int, rtt: float) -> tuple[list[float], float]:
+    api = FakeBotApi(rtt)
+    api_port = _free_port()
+    server = HTTPServer(api.web_app())
+    server.listen(api_port, "127.0.0.1")
+
+    transport = transport_cls(api)
+    application = (
+        ApplicationBuilder()
+        .token(TOKEN)
+        .base_url(f"http://127.0.0.1:{api_port}/bot")
+        .build()
+    )
+    application.add_handler(TypeHandler(Update, transport.on_update))
+    await application.initialize()
+    await application.start()
+    await transport.start(application)
+
+    update_id = 1
+    latencies = []
+    for _ in range(LATENCY_SAMPLES):
+        done = transport.expect(update_id)
+        sent = time.perf_counter()
+        await transport.deliver([_update(update_id)])
+        latencies.append(await done - sent)
+        update_id += 1
+
+    burst = [_update(i) for i in range(update_id, update_id + n)]
+    done = [transport.expect(update["update_id"]) for update in burst]
+    sent = time.perf_counter()
+    await transport.deliver(burst)
+    finished = max(await asyncio.gather(*done))
+    throughput = n / (finished - sent)
+
+    await application.updater.stop()
+    await application.stop()
+    await application.shutdown()
+    await transport.stop()
+    server.stop()
+    return latencies, throughput
+
+
+def main(n: int, rtt_ms: float) -> None:
+    rtt = rtt_ms / 1000
+    print(f"RTT {rtt_ms:g} ms, burst of {n} updates")
+    print(f"{'transport':<10} {'p50':>10} {'p95':>10} {'throughput':>16}")
+    for transport_cls in (Polling, Webhook):
+        latencies, throughput = asyncio.run(_run(transport_cls, n, rtt))
+        p50 = statistics.median(latencies)
+        p95 = statistics.quantiles(latencies, n=20)[-1]
+        print(
+            f"{transport_cls.name:<10} {1e3 * p50:7.1f} ms {1e3 * p95:7.1f} ms "
+            f"{throughput:10.0f} upd/s"
+        )
+
+
+if __name__ == "__main__":
+    main(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 1000,
+        float(sys.argv[2]) if len(sys.argv) > 2 else 50.0,
+    )
@@ -1,39 +1,288 @@
+import asyncio
 import logging
+from typing import Optional
 
-from telegram.ext import ApplicationBuilder
+from telegram import Update
+from telegram.ext import Application, ApplicationBuilder, TypeHandler
+from telegram.request import HTTPXRequest
 
 import config
-from handlers import general, customer, owner, product
+from handlers import general, customer, middleware, owner, product
+from handlers.middleware import answer_stats
 from persistence.sqlite_persistence import SQLitePersistence
+from services import (
+    BroadcastService,
+    ChatOrderedUpdateProcessor,
+    DeletionService,
+    OutboundScheduler,
+    OwnerNotifier,
+    TimingWheel,
+    UserActivityTracker,
+)
+from services.sharding import (
+    RelayRequest,
+    ShardedDispatcher,
+    WorkerChannel,
+    feed_worker,
+)
 
 logger = logging.getLogger(__name__)
 
 
+async def post_init(application: Application) -> None:
+    """Starts the runtime services once the event loop is running."""
+    application.bot_data["wheel"].start()
+    application.bot_data["user_activity"].start()
+    # Pick up message cleanup that was still pending when the bot last stopped
+    await application.bot_data["deletions"].restore()
+    application.bot_data["notifier"].start()
+    await application.bot_data["broadcasts"].resume()
+
+
+async def post_shutdown(application: Application) -> None:
+    """Stops the runtime services."""
+    cart_edits = application.bot_data.get("cart_edits")
+    if cart_edits is not None:
+        await cart_edits.settle_all()
+        logger.info(
+            f"Cart editor: {cart_edits.presses} edits in {cart_edits.writes} writes."
+        )
+    cart_taps = application.bot_data.get("cart_taps")
+    if cart_taps is not None:
+        # Write taps whose debounce window had not closed yet
+        await cart_taps.settle_all()
+        logger.info(
+            f"Add-to-cart: {cart_taps.taps} taps in {cart_taps.writes} cart writes."
+        )
+    await application.bot_data["wheel"].stop()
+    user_activity = application.bot_data["user_activity"]
+    await user_activity.stop()
+    logger.info(
+        f"Users: {user_activity.stats.seen} updates seen, "
+        f"{user_activity.stats.rows} rows written in "
+        f"{user_activity.stats.flushes} flushes ({user_activity.stats.failed} failed)."
+    )
+    notifier = application.bot_data["notifier"]
+    await notifier.stop()
+    logger.info(
+        f"Owner notifications: {notifier.stats.delivered} delivered in "
+        f"{notifier.stats.batches} batches, {notifier.stats.failed} failed attempts; "
+        f"{notifier.stats.digested} digested into {notifier.stats.digest_messages} "
+        f"messages and {notifier.stats.digest_edits} edits."
+    )
+    broadcasts = application.bot_data["broadcasts"]
+    await broadcasts.stop()
+    logger.info(
+        f"Broadcasts: {broadcasts.stats.sent} sent, {broadcasts.stats.failed} "
+        f"failed, {broadcasts.stats.blocked} blocked in {broadcasts.stats.pages} "
+        f"pages; {broadcasts.stats.finished} finished."
+    )
+    flood = application.bot_data["flood_guard"].stats
+    logger.info(
+        f"Flood guard: {flood.total} updates dropped {flood.dropped}, "
+        f"{flood.warned} warnings."
+    )
+    stats = application.bot_data["deletions"].stats
+    logger.info(
+        f"Deletion service: {stats.deleted} messages deleted in {stats.api_calls} "
+        f"calls ({stats.api_calls_avoided} calls, {stats.jobs_avoided} jobs avoided)."
+    )
+    outbound = application.bot.rate_limiter
+    if isinstance(outbound, OutboundScheduler):
+        stats = outbound.stats
+        logger.info(
+            f"Outbound: {stats.calls} calls, {stats.delayed} delayed, "
+            f"{stats.retries} flood retries; peak queue depth {stats.peak}."
+        )
+    for kind, count in answer_stats.counts.items():
+        logger.info(
+            f"Callback answers ({kind}): {count}, "
+            f"p50 {answer_stats.percentile(kind, 0.5):.3f}s, "
+            f"p95 {answer_stats.percentile(kind, 0.95):.3f}s."
+        )
+
+
+def setup_application(
+    application: Application, persistence_instance: SQLitePersistence
+) -> None:
+    """Puts persistence and the runtime services in bot_data, registers handlers."""
+    application.bot_data["persistence"] = persistence_instance
+
+    # Short delayed tasks run on a timing wheel instead of one scheduler job
+    # each; message cleanup is coalesced into bulk deletes on top of it
+    wheel = TimingWheel()
+    application.bot_data["wheel"] = wheel
+    application.bot_data["deletions"] = DeletionService(
+        application.bot, wheel, persistence=persistence_instance
+    )
+    # Owner notifications are queued with the order and delivered from here
+    application.bot_data["notifier"] = OwnerNotifier(
+        application.bot,
+        persistence_instance,
+        digest_threshold=config.OWNER_DIGEST_THRESHOLD,
+        digest_window=config.OWNER_DIGEST_WINDOW,
+    )
+    application.bot_data["broadcasts"] = BroadcastService(
+        application.bot, persistence_instance
+    )
+    application.bot_data["flood_guard"] = middleware.FloodGuard(persistence_instance)
+    # Who uses the bot, written in batches rather than once per update
+    application.bot_data["user_activity"] = UserActivityTracker(persistence_instance)
+
+    # Register Handlers
+    middleware.register_middleware(application)
+    owner.register_handlers(application)
+    product.register_handlers(application)
+    general.register_handlers(application)
+    customer.register_handlers(application)
+
+
 def main() -> None:
     """
     Start the bot.
 
-    Initializes the SQLite persistence layer and registers all handlers.
+    Initializes the SQLite persistence layer and registers all handlers. With
+    WORKERS > 1 the handlers run in worker processes instead (see
+    `main_sharded`).
     """
     logger.info("Starting bot...")
+    if config.WORKERS > 1:
+        main_sharded(config.WORKERS)
+        return
 
     # Initialize Persistence (creates pals_pantry.db if missing)
     persistence_instance = SQLitePersistence()
 
-    application = ApplicationBuilder().token(config.BOT_TOKEN).build()
-    application.bot_data["persistence"] = persistence_instance
+    application = (
+        ApplicationBuilder()
+        .token(config.BOT_TOKEN)
+        # Different chats are served in parallel; one chat's updates stay ordered
+        .concurrent_updates(ChatOrderedUpdateProcessor(config.CONCURRENT_UPDATES))
+        # Paces Bot API calls per chat and overall, most urgent first
+        .rate_limiter(OutboundScheduler())
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
+    setup_application(application, persistence_instance)
+
+    run(application)
+
+
+def main_sharded(workers: int) -> None:
+    """
+    Runs the front process of the multi-process mode: it receives updates and
+    shards them by chat across `workers` processes running `worker_main`.
+    """
+    # Create the schema once, before the workers open the database together
+    SQLitePersistence()
+    front = (
+        ApplicationBuilder()
+        .token(config.BOT_TOKEN)
+        .post_init(_start_workers)
+        .post_shutdown(_stop_workers)
+        .build()
+    )
+    dispatcher = ShardedDispatcher(
+        worker_main, workers, request=HTTPXRequest(connection_pool_size=64)
+    )
+    front.bot_data["dispatcher"] = dispatcher
+    front.add_handler(TypeHandler(Update, dispatcher.forward))
+
+    run(front)
+
+
+async def _start_workers(application: Application) -> None:
+    await application.bot_data["dispatcher"].start()
+
+
+async def _stop_workers(application: Application) -> None:
+    await application.bot_data["dispatcher"].stop()
+
+
+def worker_main(
+    channel: WorkerChannel,
+    db_path: str = "pals_pantry.db",
+    base_url: Optional[str] = None,
+    rate_limited: bool = True,
+) -> None:
+    """
+    Entry point of a worker process in multi-process mode.
+
+    `base_url` and `rate_limited=False` let benchmarks point workers at a fake
+    Bot API and measure them unthrottled.
+    """
+    asyncio.run(_run_worker(channel, db_path, base_url, rate_limited))
+
+
+async def _run_worker(
+    channel: WorkerChannel,
+    db_path: str,
+    base_url: Optional[str],
+    rate_limited: bool,
+) -> None:
+    builder = (
+        ApplicationBuilder()
+        .token(config.BOT_TOKEN)
+        # Bot API calls go back through the front process
+        .request(RelayRequest(channel))
+        .updater(None)
+        .concurrent_updates(ChatOrderedUpdateProcessor(config.CONCURRENT_UPDATES))
+    )
+    if rate_limited:
+        # Chats are sharded, so a worker's per-chat buckets see all of a
+        # chat's calls. The global limit is the front's relay alone.
+        builder = builder.rate_limiter(OutboundScheduler(global_rate=None))
+    if base_url:
+        builder = builder.base_url(base_url)
+    application = builder.build()
+    # Workers share one database, so a catalog change made through one of
+    # them has to invalidate the render caches of all of them
+    setup_application(
+        application, SQLitePersistence(db_path, shared_catalog_version=True)
+    )
+
+    async with application:
+        application.bot_data["wheel"].start()
+        application.bot_data["user_activity"].start()
+        if channel.index == 0:
+            # One worker replays the pending-deletion ledger, delivers the
+            # notification outbox and resumes broadcasts for everyone
+            await application.bot_data["deletions"].restore()
+            application.bot_data["notifier"].start()
+            await application.bot_data["broadcasts"].resume()
+        await application.start()
+        await feed_worker(application, channel)
+        await application.stop()
+        await post_shutdown(application)
 
-    # Register Handlers
-    owner.register_handlers(application)
-    product.register_handlers(application)
-    general.register_handlers(application)
-    customer.register_handlers(application)
 
-    logger.info("Bot application built and handlers added. Starting polling...")
+def webhook_options() -> dict:
+    """`run_webhook` arguments from the webhook settings in `config`."""
+    return {
+        "listen": config.WEBHOOK_LISTEN,
+        "port": config.WEBHOOK_PORT,
+        "url_path": config.WEBHOOK_PATH,
+        "webhook_url": config.WEBHOOK_URL,
+        "secret_token": config.WEBHOOK_SECRET_TOKEN,
+        "max_connections": config.WEBHOOK_MAX_CONNECTIONS,
+    }
 
-    application.run_polling()
 
-    logger.info("Bot polling stopped.")
+def run(application: Application) -> None:
+    """Receives updates by long polling or, if configured, by webhook."""
+    if config.UPDATE_MODE == config.WEBHOOK:
+        options = webhook_options()
+        logger.info(
+            f"Bot application built and handlers added. Listening for webhooks on "
+            f"{options['listen']}:{options['port']}/{options['url_path']}..."
+        )
+        application.run_webhook(**options)
+        logger.info("Bot webhook server stopped.")
+    else:
+        logger.info("Bot application built and handlers added. Starting polling...")
+        application.run_polling()
+        logger.info("Bot polling stopped.")
 
 
 if __name__ == "__main__":
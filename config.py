@@ -15,6 +15,47 @@ if not BOT_TOKEN:
     )
 
 
+# How updates are received: "polling" (getUpdates loop) or "webhook"
+POLLING = "polling"
+WEBHOOK = "webhook"
+UPDATE_MODE = os.getenv("UPDATE_MODE", POLLING).lower()
+
+# Webhook mode: Telegram POSTs updates to WEBHOOK_URL (public HTTPS, usually a
+# reverse proxy) which forwards them to WEBHOOK_LISTEN:WEBHOOK_PORT/WEBHOOK_PATH
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_LISTEN = os.getenv("WEBHOOK_LISTEN", "0.0.0.0")
+WEBHOOK_PORT = int(os.getenv("WEBHOOK_PORT", "8443"))
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "telegram")
+# Sent by Telegram in X-Telegram-Bot-Api-Secret-Token; other requests get 403
+WEBHOOK_SECRET_TOKEN = os.getenv("WEBHOOK_SECRET_TOKEN")
+# Simultaneous HTTPS connections Telegram may open to the webhook (1-100)
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+
+if UPDATE_MODE not in (POLLING, WEBHOOK):
+    raise ValueError(f"UPDATE_MODE must be '{POLLING}' or '{WEBHOOK}'.")
+if UPDATE_MODE == WEBHOOK and not WEBHOOK_URL:
+    raise ValueError("UPDATE_MODE=webhook requires WEBHOOK_URL.")
+
+# Updates processed at the same time (each chat's and user's stay in order)
+CONCURRENT_UPDATES = int(os.getenv("CONCURRENT_UPDATES", "16"))
+if CONCURRENT_UPDATES < 1:
+    raise ValueError("CONCURRENT_UPDATES must be at least 1.")
+
+# Worker processes running the handlers (1 = everything in this process).
+# With more, this process only receives updates and shards them by chat.
+WORKERS = int(os.getenv("WORKERS", "1"))
+if WORKERS < 1:
+    raise ValueError("WORKERS must be at least 1.")
+
+# Owner notifications: once this many orders were notified within the window
+# (seconds), further orders in the window go into one digest message that is
+# edited as they arrive
+OWNER_DIGEST_THRESHOLD = int(os.getenv("OWNER_DIGEST_THRESHOLD", "5"))
+OWNER_DIGEST_WINDOW = float(os.getenv("OWNER_DIGEST_WINDOW", "120"))
+if OWNER_DIGEST_THRESHOLD < 1 or OWNER_DIGEST_WINDOW <= 0:
+    raise ValueError("OWNER_DIGEST_THRESHOLD and OWNER_DIGEST_WINDOW must be positive.")
+
+
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -0,0 +1,167 @@
+"""
+Compact callback data and a dict-dispatch router for customer navigation.
+
+Callback data is limited to 64 bytes, and free-text payloads such as
+`category_{name}` overflow it with long category names. Every button this
+module encodes has the form
+
+    <action>[|<field>|<field>...]
+
+where `action` is a one-character code and every field is a non-negative
+integer in base 62. Product UUIDs are carried as their 128-bit integer (22
+characters at most). Categories are carried as a 32-bit hash of their name,
+and handlers resolve it back against the current category list.
+
+All encoded buttons go through a single `CallbackQueryHandler`. Its pattern
+is one dict membership test and the handler is chosen by dict lookup on the
+action code, instead of trying a chain of regexes until one matches. Decoded
+fields are exposed to handlers as `context.args`.
+"""
+
+import hashlib
+import logging
+import string
+import uuid
+from typing import Awaitable, Callable, Iterable, Optional
+
+from telegram import Update
+from telegram.ext import CallbackQueryHandler, ContextTypes
+
+from handlers.middleware import answer_query
+
+logger = logging.getLogger(__name__)
+
+SEP = "|"
+ALPHABET = string.digits + string.ascii_letters
+BASE = len(ALPHABET)
+_DIGITS = {char: value for value, char in enumerate(ALPHABET)}
+
+# --- Action codes (one character each; never reuse a retired code) ---
+CATEGORIES = "c"
+CATEGORY = "g"
+PRODUCT = "p"
+ADD_TO_CART = "a"
+CLOSE_SHOP = "x"
+VIEW_CART = "v"
+CLEAR_CART = "k"
+CHECKOUT = "o"
+CART_INC = "i"
+CART_DEC = "d"
+CART_REMOVE = "r"
+REORDER = "e"
+
+Callback = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[None]]
+
+
+def encode_int(value: int) -> str:
+    """Encodes a non-negative integer in base 62."""
+    if value < 0:
+        raise ValueError(f"Cannot encode negative value {value}")
+    digits = []
+    while True:
+        value, remainder = divmod(value, BASE)
+        digits.append(ALPHABET[remainder])
+        if not value:
+            return "".join(reversed(digits))
+
+
+def decode_int(text: str) -> int:
+    """
+    Decodes a base 62 integer.
+
+    Raises:
+        ValueError: If `text` is empty or contains characters outside the alphabet.
+    """
+    if not text:
+        raise ValueError("Empty field")
+    value = 0
+    for char in text:
+        digit = _DIGITS.get(char)
+        if digit is None:
+            raise ValueError(f"Invalid character {char!r} in {text!r}")
+        value = value * BASE + digit
+    return value
+
+
+def encode(action: str, *fields: int) -> str:
+    """Builds callback data for `action` with integer `fields`."""
+    return SEP.join([action, *(encode_int(field) for field in fields)])
+
+
+def decode(data: str) -> tuple[str, tuple[int, ...]]:
+    """
+    Splits callback data into its action code and integer fields.
+
+    Raises:
+        ValueError: If `data` is not in the compact format.
+    """
+    action, *fields = data.split(SEP)
+    if len(action) != 1:
+        raise ValueError(f"Not compact callback data: {data!r}")
+    return action, tuple(decode_int(field) for field in fields)
+
+
+def uuid_to_int(value: str) -> int:
+    return uuid.UUID(value).int
+
+
+def int_to_uuid(value: int) -> str:
+    return str(uuid.UUID(int=value))
+
+
+def category_code(name: str) -> int:
+    """Stable 32-bit code for a category name."""
+    return int.from_bytes(
+        hashlib.blake2b(name.encode("utf-8"), digest_size=4).digest(), "big"
+    )
+
+
+def find_category(categories: Iterable[str], code: int) -> Optional[str]:
+    """Returns the category whose `category_code` is `code`, if any."""
+    return next((name for name in categories if category_code(name) == code), None)
+
+
+class CallbackRouter:
+    """Maps action codes to handler callbacks behind one CallbackQueryHandler."""
+
+    def __init__(self):
+        self._routes: dict[str, Callback] = {}
+
+    def add(self, action: str, callback: Callback) -> None:
+        if action in self._routes:
+            raise ValueError(f"Action {action!r} is already routed")
+        self._routes[action] = callback
+
+    def matches(self, data: object) -> bool:
+        """Cheap pattern check: known action code, bare or followed by SEP."""
+        return (
+            isinstance(data, str)
+            and data[:1] in self._routes
+            and (len(data) == 1 or data[1] == SEP)
+        )
+
+    async def dispatch(
+        self, update: Update, context: ContextTypes.DEFAULT_TYPE
+    ) -> None:
+        query = update.callback_query
+        try:
+            action, fields = decode(query.data)
+        except ValueError as e:
+            logger.warning(f"Malformed callback data {query.data!r}: {e}")
+            await answer_query(update, context)
+            return
+        context.args = list(fields)
+        await self._routes[action](update, context)
+
+    def answers_query(self, data: str) -> bool:
+        """Whether the route for `data` answers its query itself."""
+        callback = self._routes.get(data[:1])
+        return getattr(callback, "answers_query", False) is True
+
+    def handler(self) -> CallbackQueryHandler:
+        async def dispatch(update: Update, context: ContextTypes.DEFAULT_TYPE):
+            await self.dispatch(update, context)
+
+        # Lets the fast-ack middleware look up the flag of the routed callback
+        dispatch.answers_query = self.answers_query
+        return CallbackQueryHandler(dispatch, pattern=self.matches)
@@ -0,0 +1,308 @@
+"""
+Debounced cart writes: add-to-cart taps and cart quantity edits.
+
+Customers who want five of something tap "Add to Cart" five times. Instead of
+a product lookup and a cart write per tap, taps on the same (user, product)
+are counted in memory for `ADD_TO_CART_WINDOW` seconds and committed as a
+single `add_to_cart(quantity=n)` when the window closes. Every tap is still
+answered instantly with the running total, so a write that fails is kept and
+retried once, one window later, before the taps are given up on.
+
+The cart view's +/−/remove buttons work the same way. `CartEditor` keeps
+the lines of the cart a user is looking at (name, price, quantity), so each
+press re-renders the cart from memory, and the lines changed during the
+window are written with one `set_cart_quantity` each when it closes.
+
+Anything that reads the cart must call `settle_cart` first, so pending taps
+and edits are written before the cart is shown, checked out or cleared.
+"""
+
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from telegram.ext import ContextTypes
+
+from handlers.utils import schedule_soon
+from persistence.abstract_persistence import AbstractPantryPersistence
+
+logger = logging.getLogger(__name__)
+
+# Seconds a tap burst may last before it is written
+ADD_TO_CART_WINDOW = 1.5
+# Seconds of quiet after the last cart edit before the changed lines are written
+CART_EDIT_WINDOW = 2.0
+# Upper bound on users whose cart lines are cached (least recent evicted)
+MAX_CART_SESSIONS = 10_000
+
+
+@dataclass
+class PendingTaps:
+    """Taps on one product not yet written to the cart."""
+
+    name: str
+    base_quantity: int
+    count: int = 0
+    # Whether a failed write of these taps is already being retried
+    retried: bool = False
+
+    @property
+    def total(self) -> int:
+        return self.base_quantity + self.count
+
+
+class CartTapBuffer:
+    """
+    Per-(user, product) tap counters with a single write per window.
+
+    Attributes:
+        taps (int): Taps received.
+        writes (int): Cart writes issued for them.
+    """
+
+    def __init__(self, persistence: AbstractPantryPersistence):
+        self.persistence = persistence
+        self.taps = 0
+        self.writes = 0
+        self._pending: dict[tuple[int, str], PendingTaps] = {}
+
+    async def tap(
+        self, context: ContextTypes.DEFAULT_TYPE, user_id: int, product_id: str
+    ) -> Optional[PendingTaps]:
+        """
+        Counts one tap, opening a debounce window on the first one.
+
+        Only the first tap of a window reads from the database.
+
+        Returns:
+            Optional[PendingTaps]: The pending entry (name and running total),
+                                   or None if the product is unavailable.
+        """
+        key = (user_id, product_id)
+        entry = self._pending.get(key)
+        if entry is None:
+            product = await self.persistence.get_product(product_id)
+            if not product:
+                return None
+            cart = await self.persistence.get_cart_items(user_id)
+            entry = PendingTaps(product["name"], cart.get(product_id, 0))
+            self._pending[key] = entry
+            if (
+                schedule_soon(
+                    context, self._flush_entry, ADD_TO_CART_WINDOW, key, entry, context
+                )
+                is None
+            ):
+                # No scheduler available: write through after this tap
+                entry.count += 1
+                self.taps += 1
+                await self._flush_entry(key, entry)
+                return entry
+        entry.count += 1
+        self.taps += 1
+        return entry
+
+    async def _flush_entry(
+        self,
+        key: tuple[int, str],
+        entry: PendingTaps,
+        context: Optional[ContextTypes.DEFAULT_TYPE] = None,
+    ) -> None:
+        # The window timer may fire after the entry was already settled
+        if self._pending.get(key) is not entry:
+            return
+        del self._pending[key]
+        user_id, product_id = key
+        self.writes += 1
+        new_quantity = await self.persistence.add_to_cart(
+            user_id=user_id, product_id=product_id, quantity=entry.count
+        )
+        if new_quantity is not None:
+            return
+        if entry.retried:
+            logger.error(
+                f"Could not add {entry.count} x {product_id} to user {user_id}'s "
+                f"cart; dropping the taps."
+            )
+            return
+
+        # The customer was already told the taps were added: retry once
+        logger.warning(
+            f"Could not add {entry.count} x {product_id} to user {user_id}'s "
+            f"cart; retrying."
+        )
+        current = self._pending.get(key)
+        if current is not None:
+            # Taps made during the write opened a new window; join it
+            current.count += entry.count
+            current.retried = True
+            return
+        entry.retried = True
+        self._pending[key] = entry
+        if context is not None:
+            schedule_soon(
+                context, self._flush_entry, ADD_TO_CART_WINDOW, key, entry, context
+            )
+        # Without a timer the retry happens on the next settle
+
+    async def settle(self, user_id: int) -> None:
+        """Writes every pending tap of `user_id` now."""
+        for key, entry in list(self._pending.items()):
+            if key[0] == user_id:
+                await self._flush_entry(key, entry)
+
+    async def settle_all(self) -> None:
+        """Writes every pending tap (e.g. on shutdown)."""
+        for key, entry in list(self._pending.items()):
+            await self._flush_entry(key, entry)
+
+
+@dataclass
+class CartLine:
+    """One cart line as shown in the cart view."""
+
+    name: str
+    price: float
+    quantity: int
+
+
+class CartEditor:
+    """
+    Cached cart lines per user, edited in memory and written per settled line.
+
+    Attributes:
+        presses (int): Quantity edits received.
+        writes (int): `set_cart_quantity` calls issued for them.
+    """
+
+    def __init__(
+        self,
+        persistence: AbstractPantryPersistence,
+        max_sessions: int = MAX_CART_SESSIONS,
+    ):
+        self.persistence = persistence
+        self.max_sessions = max_sessions
+        self.presses = 0
+        self.writes = 0
+        self._sessions: OrderedDict[int, dict[str, CartLine]] = OrderedDict()
+        self._dirty: dict[int, set[str]] = {}
+
+    def lines(self, user_id: int) -> Optional[dict[str, CartLine]]:
+        """The cached lines of `user_id`'s cart (quantity > 0), if any."""
+        lines = self._sessions.get(user_id)
+        if lines is None:
+            return None
+        self._sessions.move_to_end(user_id)
+        return {pid: line for pid, line in lines.items() if line.quantity > 0}
+
+    async def open(self, user_id: int, lines: dict[str, CartLine]) -> None:
+        """Caches freshly loaded lines, replacing (after settling) older ones."""
+        await self.close(user_id)
+        self._sessions[user_id] = lines
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(iter(self._sessions))
+            await self.close(oldest)
+
+    async def close(self, user_id: int) -> None:
+        """Writes `user_id`'s edited lines and forgets the cached cart."""
+        await self.settle(user_id)
+        self._sessions.pop(user_id, None)
+
+    async def adjust(
+        self,
+        context: ContextTypes.DEFAULT_TYPE,
+        user_id: int,
+        product_id: str,
+        delta: Optional[int],
+    ) -> bool:
+        """
+        Changes a cached line by `delta` (None removes it) and schedules the
+        write.
+
+        Returns:
+            bool: False if the user's cart or the line is not cached.
+        """
+        line = (self._sessions.get(user_id) or {}).get(product_id)
+        if line is None or line.quantity <= 0:
+            return False
+        line.quantity = 0 if delta is None else max(0, line.quantity + delta)
+        self.presses += 1
+
+        dirty = self._dirty.get(user_id)
+        if dirty is None:
+            dirty = self._dirty[user_id] = set()
+            if (
+                schedule_soon(
+                    context, self._settle_window, CART_EDIT_WINDOW, user_id, dirty
+                )
+                is None
+            ):
+                # No scheduler available: write through
+                dirty.add(product_id)
+                await self.settle(user_id)
+                return True
+        dirty.add(product_id)
+        return True
+
+    async def _settle_window(self, user_id: int, dirty: set[str]) -> None:
+        # The window timer may fire after the lines were already settled
+        if self._dirty.get(user_id) is dirty:
+            await self.settle(user_id)
+
+    async def settle(self, user_id: int) -> None:
+        """Writes every edited line of `user_id`'s cart now."""
+        dirty = self._dirty.pop(user_id, None)
+        if not dirty:
+            return
+        lines = self._sessions.get(user_id, {})
+        for product_id in dirty:
+            quantity = lines[product_id].quantity
+            self.writes += 1
+            if not await self.persistence.set_cart_quantity(
+                user_id, product_id, quantity
+            ):
+                logger.error(
+                    f"Could not set {product_id} to {quantity} "
+                    f"in user {user_id}'s cart."
+                )
+            if quantity <= 0:
+                del lines[product_id]
+
+    async def settle_all(self) -> None:
+        """Writes every edited line (e.g. on shutdown)."""
+        for user_id in list(self._dirty):
+            await self.settle(user_id)
+
+
+def get_cart_taps(context: ContextTypes.DEFAULT_TYPE) -> CartTapBuffer:
+    """Returns the application-wide tap buffer, creating it on first use."""
+    buffer = context.bot_data.get("cart_taps")
+    if buffer is None:
+        buffer = context.bot_data["cart_taps"] = CartTapBuffer(
+            context.bot_data["persistence"]
+        )
+    return buffer
+
+
+def get_cart_editor(context: ContextTypes.DEFAULT_TYPE) -> CartEditor:
+    """Returns the application-wide cart editor, creating it on first use."""
+    editor = context.bot_data.get("cart_edits")
+    if editor is None:
+        editor = context.bot_data["cart_edits"] = CartEditor(
+            context.bot_data["persistence"]
+        )
+    return editor
+
+
+async def settle_cart(context: ContextTypes.DEFAULT_TYPE, user_id: int) -> None:
+    """
+    Writes `user_id`'s pending cart edits and add-to-cart taps before their
+    cart is read, and drops the cached cart lines.
+    """
+    editor = context.bot_data.get("cart_edits")
+    if editor is not None:
+        await editor.close(user_id)
+    buffer = context.bot_data.get("cart_taps")
+    if buffer is not None:
+        await buffer.settle(user_id)
@@ -1,37 +1,27 @@
 from telegram.ext import Application
 
-from .shop import (
-    shop_start_handler,
-    category_selection_handler,
-    product_selection_handler,
-    add_to_cart_handler,
-    close_shop_handler,
-    back_to_categories_handler,
-    back_to_products_handler,
-    shop_home_callback_handler,
-)
-from .cart import (
-    cart_command_handler,
-    view_cart_handler,
-    clear_cart_handler,
-    checkout_handler,
-)
+from handlers.callbacks import CallbackRouter
+from .shop import shop_start_handler, shop_routes
+from .cart import cart_command_handler, cart_routes
+from .orders import orders_command_handler, orders_page_handler
+
+
+def build_router() -> CallbackRouter:
+    """Routes every compact customer callback (shop and cart buttons)."""
+    router = CallbackRouter()
+    for routes in (shop_routes, cart_routes):
+        for action, callback in routes.items():
+            router.add(action, callback)
+    return router
 
 
 def register_handlers(application: Application):
     """Registers all customer-related handlers (Shop & Cart)."""
-    # Shop Handlers
+    # Shop & Cart Handlers
     application.add_handler(shop_start_handler)
-    application.add_handler(shop_home_callback_handler)
-    application.add_handler(category_selection_handler)
-    application.add_handler(product_selection_handler)
-    application.add_handler(add_to_cart_handler)
-    application.add_handler(close_shop_handler)
-    application.add_handler(back_to_categories_handler)
-    application.add_handler(back_to_products_handler)
-
-    # Cart Handlers
     application.add_handler(cart_command_handler)
-    application.add_handler(view_cart_handler)
-    application.add_handler(clear_cart_handler)
-    application.add_handler(checkout_handler)
+    application.add_handler(build_router().handler())
+
+    # Order History Handlers
+    application.add_handler(orders_command_handler)
+    application.add_handler(orders_page_handler)
@@ -1,106 +1,187 @@
 import logging
+from typing import Optional
 
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.constants import ParseMode
-from telegram.ext import CommandHandler, CallbackQueryHandler, ContextTypes
+from telegram.ext import CommandHandler, ContextTypes
 
+from handlers import callbacks
+from handlers.cart_buffer import CartLine, get_cart_editor, settle_cart
 from handlers.utils import schedule_deletion
+from handlers.views import View, keep_screen, show_view
+from handlers.middleware import answer_query, answers_query
 from persistence.abstract_persistence import AbstractPantryPersistence
 from resources.strings import Strings
+from services.outbound import Priority, priority
 
 logger = logging.getLogger(__name__)
 
 
 async def handle_cart_command(
-    update: Update, context: ContextTypes.DEFAULT_TYPE
+    update: Update, context: ContextTypes.DEFAULT_TYPE, edit_untracked: bool = True
 ) -> None:
-    """Handles the /cart command to display the user's cart."""
+    """
+    Handles the /cart command to display the user's cart.
+
+    `edit_untracked` is passed to `show_view`; Reorder turns it off so the
+    receipt it was pressed on is not edited into the cart.
+    """
     user_id = update.effective_user.id
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
 
+    await settle_cart(context, user_id)
+    lines = await _load_cart_lines(persistence, user_id)
+    if lines:
+        # Quantity edits re-render from these lines instead of the database
+        await get_cart_editor(context).open(user_id, lines)
+
+    if update.callback_query:
+        await answer_query(update, context)
+    await show_view(update, context, _render_cart(lines), edit_untracked)
+    if update.message:
+        schedule_deletion(context, update.effective_chat.id, update.message.message_id)
+
+
+async def _load_cart_lines(
+    persistence: AbstractPantryPersistence, user_id: int
+) -> dict[str, CartLine]:
+    """Reads the user's cart with the name and price of every product."""
     cart_items = await persistence.get_cart_items(user_id=user_id)
+    lines = {}
+    for product_id, quantity in cart_items.items():
+        product = await persistence.get_product(product_id)
+        if product:
+            lines[product_id] = CartLine(product["name"], product["price"], quantity)
+        # Products that no longer exist are left out of the view
+    return lines
+
 
-    if not cart_items:
+def _render_cart(lines: dict[str, CartLine]) -> View:
+    """Builds the cart screen: one line and one +/−/remove row per product."""
+    if not lines:
         # Empty cart
-        text = Strings.Cart.EMPTY
         keyboard = [
             [
                 InlineKeyboardButton(
                     Strings.General.CONTINUE_SHOPPING_BTN,
-                    callback_data="navigate_to_categories",
+                    callback_data=callbacks.encode(callbacks.CATEGORIES),
                 )
             ]
         ]
-    else:
-        # Cart has items
-        total = 0.0
-        message_lines = []
-        for product_id, quantity in cart_items.items():
-            product = await persistence.get_product(product_id)
-            if product:
-                name = product["name"]
-                price = product["price"]
-                item_total = quantity * price
-                total += item_total
-                message_lines.append(
-                    Strings.Cart.item_line(name, quantity, price, item_total)
-                )
-            else:
-                # Product not found, perhaps skip or handle
-                pass
+        return View(Strings.Cart.EMPTY, InlineKeyboardMarkup(keyboard))
 
-        message_lines.append(Strings.Cart.total_line(total))
-        text = "\n".join(message_lines)
-
-        keyboard = [
+    total = 0.0
+    message_lines = []
+    keyboard = []
+    for product_id, line in lines.items():
+        item_total = line.quantity * line.price
+        total += item_total
+        message_lines.append(
+            Strings.Cart.item_line(line.name, line.quantity, line.price, item_total)
+        )
+        code = callbacks.uuid_to_int(product_id)
+        keyboard.append(
             [
                 InlineKeyboardButton(
-                    Strings.General.CHECKOUT_BTN, callback_data="cart_checkout"
+                    Strings.Cart.DEC_BTN,
+                    callback_data=callbacks.encode(callbacks.CART_DEC, code),
                 ),
                 InlineKeyboardButton(
-                    Strings.Cart.CLEAR_BTN, callback_data="clear_cart"
+                    Strings.Cart.INC_BTN,
+                    callback_data=callbacks.encode(callbacks.CART_INC, code),
                 ),
                 InlineKeyboardButton(
-                    Strings.General.CONTINUE_SHOPPING_BTN,
-                    callback_data="navigate_to_categories",
+                    Strings.Cart.remove_btn(line.name),
+                    callback_data=callbacks.encode(callbacks.CART_REMOVE, code),
                 ),
             ]
+        )
+    message_lines.append(Strings.Cart.total_line(total))
+
+    keyboard.append(
+        [
+            InlineKeyboardButton(
+                Strings.General.CHECKOUT_BTN,
+                callback_data=callbacks.encode(callbacks.CHECKOUT),
+            ),
+            InlineKeyboardButton(
+                Strings.Cart.CLEAR_BTN,
+                callback_data=callbacks.encode(callbacks.CLEAR_CART),
+            ),
+            InlineKeyboardButton(
+                Strings.General.CONTINUE_SHOPPING_BTN,
+                callback_data=callbacks.encode(callbacks.CATEGORIES),
+            ),
         ]
+    )
+    return View("\n".join(message_lines), InlineKeyboardMarkup(keyboard))
 
-    reply_markup = InlineKeyboardMarkup(keyboard)
 
-    if update.callback_query:
-        await update.callback_query.answer()
-        await update.callback_query.edit_message_text(
-            text=text, reply_markup=reply_markup
-        )
-    else:
-        await update.message.reply_text(text=text, reply_markup=reply_markup)
-        schedule_deletion(context, update.effective_chat.id, update.message.message_id)
+async def _edit_cart_line(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, delta: Optional[int]
+) -> None:
+    """Applies a +/−/remove press to the cached cart and redraws it in place."""
+    await answer_query(update, context)
+
+    user_id = update.effective_user.id
+    product_id = callbacks.int_to_uuid(context.args[0])
+    editor = get_cart_editor(context)
+    if editor.lines(user_id) is None:
+        # Cart not cached (e.g. after a restart): load it once
+        persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+        await settle_cart(context, user_id)
+        await editor.open(user_id, await _load_cart_lines(persistence, user_id))
+
+    # The write happens once the user stops pressing; the view updates now
+    await editor.adjust(context, user_id, product_id, delta)
+    await show_view(update, context, _render_cart(editor.lines(user_id)))
+
+
+async def handle_cart_increase(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    await _edit_cart_line(update, context, 1)
+
+
+async def handle_cart_decrease(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    await _edit_cart_line(update, context, -1)
+
+
+async def handle_cart_remove(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    await _edit_cart_line(update, context, None)
 
 
 async def handle_clear_cart(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handles clearing the user's cart."""
-    query = update.callback_query
-    await query.answer()
+    await answer_query(update, context)
 
     user_id = update.effective_user.id
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    await settle_cart(context, user_id)
     await persistence.clear_cart(user_id=user_id)
 
-    await query.edit_message_text(text=Strings.Cart.CLEARED)
+    await show_view(update, context, View(Strings.Cart.CLEARED))
 
 
+@answers_query
 async def handle_checkout(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Handles the checkout process."""
-    query = update.callback_query
     user_id = update.effective_user.id
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
 
+    await settle_cart(context, user_id)
     order_id = await persistence.create_order(user_id=user_id)
     if order_id is None:
-        await query.answer(text=Strings.Cart.CHECKOUT_ERROR_EMPTY, show_alert=True)
+        await answer_query(
+            update, context, text=Strings.Cart.CHECKOUT_ERROR_EMPTY, show_alert=True
+        )
         return
+    # Only the empty-cart case needs an alert; stop the spinner before rendering
+    await answer_query(update, context)
 
     order = await persistence.get_order(order_id=order_id)
     items = order["items"]
@@ -117,23 +198,69 @@ async def handle_checkout(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     receipt_lines.append(Strings.Cart.RECEIPT_FOOTER)
     receipt = "\n".join(receipt_lines)
 
-    await query.edit_message_text(text=receipt, parse_mode=ParseMode.HTML)
-
-    # Notify owner
-    owner_id = await persistence.get_bot_owner()
-    if owner_id:
-        item_lines = ["Items:"]
-        for item in items:
-            item_lines.append(f"- {item['name']} x {item['quantity']}")
-        items_summary = "\n".join(item_lines)
-        notification = Strings.Order.notification_new(
-            user_id, order_id, items_summary, total
+    keyboard = [
+        [
+            InlineKeyboardButton(
+                Strings.Order.reorder_btn(order_id),
+                callback_data=callbacks.encode(
+                    callbacks.REORDER, callbacks.uuid_to_int(order_id)
+                ),
+            )
+        ]
+    ]
+    with priority(Priority.RECEIPT):
+        await show_view(
+            update,
+            context,
+            View(receipt, InlineKeyboardMarkup(keyboard), parse_mode=ParseMode.HTML),
+        )
+    # The receipt stays in the chat; the next screen is sent below it
+    keep_screen(context, update.effective_chat.id)
+
+    # The owner's notification was queued with the order; deliver it now
+    notifier = context.bot_data.get("notifier")
+    if notifier is not None:
+        notifier.wake()
+
+
+@answers_query
+async def handle_reorder(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Copies a past order into the cart and shows the cart."""
+    user_id = update.effective_user.id
+    order_id = callbacks.int_to_uuid(context.args[0])
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+
+    await settle_cart(context, user_id)
+    result = await persistence.reorder(user_id=user_id, order_id=order_id)
+    if result is None:
+        await answer_query(
+            update, context, Strings.Order.REORDER_ERROR, show_alert=True
+        )
+        return
+    if not result["added"]:
+        await answer_query(
+            update, context, Strings.Order.REORDER_NOTHING, show_alert=True
         )
-        await context.bot.send_message(chat_id=owner_id, text=notification)
+        return
+
+    # Skipped products deserve an alert the user has to dismiss
+    await answer_query(
+        update,
+        context,
+        Strings.Order.reorder_done(result["added"], result["skipped"]),
+        show_alert=bool(result["skipped"]),
+    )
+    await handle_cart_command(update, context, edit_untracked=False)
 
 
 # Handler registration
 cart_command_handler = CommandHandler("cart", handle_cart_command)
-view_cart_handler = CallbackQueryHandler(handle_cart_command, pattern="^view_cart$")
-clear_cart_handler = CallbackQueryHandler(handle_clear_cart, pattern="^clear_cart$")
-checkout_handler = CallbackQueryHandler(handle_checkout, pattern="^cart_checkout$")
+cart_routes = {
+    callbacks.VIEW_CART: handle_cart_command,
+    callbacks.CLEAR_CART: handle_clear_cart,
+    callbacks.CHECKOUT: handle_checkout,
+    callbacks.CART_INC: handle_cart_increase,
+    callbacks.CART_DEC: handle_cart_decrease,
+    callbacks.CART_REMOVE: handle_cart_remove,
+    callbacks.REORDER: handle_reorder,
+}
@@ -0,0 +1,92 @@
+"""
+Customer order history (/orders), one keyset-paginated page at a time.
+
+The owner gets the all-orders view from the same command.
+"""
+
+import logging
+from typing import Optional
+
+from telegram import InlineKeyboardButton, Update
+from telegram.ext import CallbackQueryHandler, CommandHandler, ContextTypes
+
+from handlers import callbacks
+from handlers.owner.orders import show_owner_orders
+from handlers.utils import schedule_deletion, show_orders_page
+from handlers.middleware import answer_query
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+logger = logging.getLogger(__name__)
+
+ORDERS_PAGE_SIZE = 5
+
+
+async def show_user_orders(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    before_seq: Optional[int] = None,
+) -> None:
+    """Renders one page of the current user's orders."""
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    orders = await persistence.get_user_orders(
+        user_id=update.effective_user.id,
+        limit=ORDERS_PAGE_SIZE + 1,
+        before_seq=before_seq,
+    )
+
+    await show_orders_page(
+        update,
+        context,
+        orders,
+        ORDERS_PAGE_SIZE,
+        header=Strings.Order.HISTORY_HEADER,
+        empty_text=Strings.Order.NO_ORDERS,
+        callback_prefix="my_orders",
+        before_seq=before_seq,
+        extra_rows=_build_reorder_rows(orders[:ORDERS_PAGE_SIZE]),
+    )
+
+
+def _build_reorder_rows(orders: list[dict]) -> list[list[InlineKeyboardButton]]:
+    """One 'Reorder' button per order shown."""
+    return [
+        [
+            InlineKeyboardButton(
+                Strings.Order.reorder_btn(order["id"]),
+                callback_data=callbacks.encode(
+                    callbacks.REORDER, callbacks.uuid_to_int(order["id"])
+                ),
+            )
+        ]
+        for order in orders
+    ]
+
+
+async def orders_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles /orders: order history for customers, all orders for the owner."""
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    owner_id = await persistence.get_bot_owner()
+
+    if owner_id and update.effective_user.id == owner_id:
+        await show_owner_orders(update, context)
+    else:
+        await show_user_orders(update, context)
+
+    schedule_deletion(context, update.effective_chat.id, update.message.message_id)
+
+
+async def handle_orders_page(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Handles the customer's order history paging buttons."""
+    await answer_query(update, context)
+
+    cursor = context.matches[0].group(1)
+    await show_user_orders(update, context, before_seq=int(cursor) if cursor else None)
+
+
+orders_command_handler = CommandHandler("orders", orders_command)
+orders_page_handler = CallbackQueryHandler(
+    handle_orders_page, pattern=r"^my_orders(?:_(\d+))?$"
+)
@@ -1,33 +1,28 @@
 import logging
+from typing import Optional
 
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, InputMediaPhoto
-from telegram.ext import CommandHandler, ContextTypes, CallbackQueryHandler
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.ext import CommandHandler, ContextTypes
 from telegram.constants import ParseMode
 
 from persistence.abstract_persistence import AbstractPantryPersistence
+from handlers import callbacks
+from handlers.cart_buffer import get_cart_taps, settle_cart
+from handlers.render_cache import get_render_cache
 from handlers.utils import schedule_deletion
+from handlers.views import View, show_view
 from handlers.general.start import get_home_menu
+from handlers.middleware import answer_query, answers_query
 from resources.strings import Strings
 
 logger = logging.getLogger(__name__)
 
 
 async def shop_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Entry point: /shop or /menu."""
-    # If this is called from a callback (Back button), we use edit_message_text
-    # If called from a command (/shop), we use reply_text
-    is_callback = bool(update.callback_query)
-
-    if is_callback:
-        # If we are coming 'back' from a photo view, we must delete the photo and send new text
-        # Checks if the message we are replacing was a photo
-        if update.callback_query.message.photo:
-            await update.callback_query.message.delete()
-            # Send new text message
-            await _send_category_menu(update, context, send_new=True)
-            return
-
-    await _send_category_menu(update, context, send_new=not is_callback)
+    """Entry point: /shop, or the 'Shop' and 'Back to Categories' buttons."""
+    # Commands get a new message; callbacks edit the current screen in place
+    # (or swap it out if we are coming back from a photo view).
+    await show_view(update, context, await _build_category_menu(context))
 
     if update.message:
         schedule_deletion(
@@ -35,83 +30,80 @@ async def shop_start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None
         )
 
 
-async def _send_category_menu(
-    update: Update, context: ContextTypes.DEFAULT_TYPE, send_new: bool = False
-):
-    """Helper to render the category list."""
+async def _build_category_menu(context: ContextTypes.DEFAULT_TYPE) -> View:
+    """Helper to render the category list (cached per catalog version)."""
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    return await get_render_cache(context).get(
+        ("categories",),
+        persistence.get_catalog_version(),
+        lambda: _render_category_menu(persistence),
+    )
+
+
+async def _render_category_menu(persistence: AbstractPantryPersistence) -> View:
     categories = await persistence.get_all_categories()
 
     if not categories:
-        text = Strings.Shop.EMPTY
-        if send_new:
-            # Check if there is a message to reply to (command vs callback)
-            if update.message:
-                await update.message.reply_text(text)
-            else:
-                await update.effective_chat.send_message(text)
-        else:
-            await update.callback_query.edit_message_text(text)
-        return
+        return View(Strings.Shop.EMPTY)
 
     keyboard = []
     for category in categories:
         keyboard.append(
-            [InlineKeyboardButton(category, callback_data=f"category_{category}")]
-        )
-    keyboard.append(
-        [InlineKeyboardButton(Strings.Shop.CLOSE_BTN, callback_data="close_shop")]
-    )
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    text = Strings.Shop.CATEGORY_HEADER
-
-    if send_new:
-        chat_id = update.effective_chat.id
-        await context.bot.send_message(
-            chat_id=chat_id, text=text, reply_markup=reply_markup
-        )
-    else:
-        await update.callback_query.edit_message_text(
-            text=text, reply_markup=reply_markup
+            [
+                InlineKeyboardButton(
+                    category,
+                    callback_data=callbacks.encode(
+                        callbacks.CATEGORY, callbacks.category_code(category)
+                    ),
+                )
+            ]
         )
+    keyboard.append([_close_button()])
+    return View(Strings.Shop.CATEGORY_HEADER, InlineKeyboardMarkup(keyboard))
 
 
 async def handle_category_selection(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> None:
-    query = update.callback_query
-    await query.answer()
+    await answer_query(update, context)
 
-    # If we are coming back from a Product Detail (Photo), we need to delete the photo and send text
-    if query.message.photo:
-        await query.message.delete()
-        category_name = context.matches[0].group(1)
+    (code,) = context.args
+    view = await _build_product_list(context, code)
+    await show_view(update, context, view or View(Strings.Shop.NO_PRODUCTS))
 
-        await _send_product_list(update, context, category_name, send_new=True)
-        return
 
-    # Normal text-to-text navigation
-    category_name = context.matches[0].group(1)
-    await _send_product_list(update, context, category_name, send_new=False)
+def _close_button() -> InlineKeyboardButton:
+    return InlineKeyboardButton(
+        Strings.Shop.CLOSE_BTN, callback_data=callbacks.encode(callbacks.CLOSE_SHOP)
+    )
 
 
-async def _send_product_list(
-    update: Update,
-    context: ContextTypes.DEFAULT_TYPE,
-    category_name: str,
-    send_new: bool,
-):
+async def _build_product_list(
+    context: ContextTypes.DEFAULT_TYPE, code: int
+) -> Optional[View]:
+    """Helper to render a category's products (cached per catalog version)."""
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    return await get_render_cache(context).get(
+        ("category", code),
+        persistence.get_catalog_version(),
+        lambda: _render_product_list(persistence, code),
+    )
+
+
+async def _render_product_list(
+    persistence: AbstractPantryPersistence, code: int
+) -> Optional[View]:
+    """Renders a category's product list, or None if the category is unknown."""
+    category_name = callbacks.find_category(
+        await persistence.get_all_categories(), code
+    )
+    if category_name is None:
+        # Not cached: a stale or forged code must not fill the cache
+        return None
     products = await persistence.get_products_by_category(category_name)
 
     if not products:
-        text = Strings.Shop.NO_PRODUCTS
-        if send_new:
-            await update.effective_chat.send_message(text)
-        else:
-            await update.callback_query.edit_message_text(text)
-        return
+        return View(Strings.Shop.NO_PRODUCTS)
 
     keyboard = []
     for product in products:
@@ -119,7 +111,10 @@ async def _send_product_list(
         keyboard.append(
             [
                 InlineKeyboardButton(
-                    button_text, callback_data=f"product_{product['id']}"
+                    button_text,
+                    callback_data=callbacks.encode(
+                        callbacks.PRODUCT, callbacks.uuid_to_int(product["id"])
+                    ),
                 )
             ]
         )
@@ -129,39 +124,44 @@ async def _send_product_list(
         [
             InlineKeyboardButton(
                 Strings.Shop.BACK_TO_CATEGORIES_BTN,
-                callback_data="navigate_to_categories",
+                callback_data=callbacks.encode(callbacks.CATEGORIES),
             ),
-            InlineKeyboardButton(Strings.Shop.CLOSE_BTN, callback_data="close_shop"),
+            _close_button(),
         ]
     )
-    reply_markup = InlineKeyboardMarkup(keyboard)
-
-    text = Strings.Shop.category_title(category_name)
-
-    if send_new:
-        await update.effective_chat.send_message(
-            text, reply_markup=reply_markup, parse_mode=ParseMode.HTML
-        )
-    else:
-        await update.callback_query.edit_message_text(
-            text=text, reply_markup=reply_markup, parse_mode=ParseMode.HTML
-        )
+    return View(
+        Strings.Shop.category_title(category_name),
+        InlineKeyboardMarkup(keyboard),
+        parse_mode=ParseMode.HTML,
+    )
 
 
 async def handle_product_selection(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> None:
-    """Displays product details. Switches to Photo message if image exists."""
-    query = update.callback_query
-    await query.answer()
-    product_id = context.matches[0].group(1)
+    """Displays product details. Switches to a photo view if an image exists."""
+    await answer_query(update, context)
+    product_id = callbacks.int_to_uuid(context.args[0])
 
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
-    product = await persistence.get_product(product_id)
+    view = await get_render_cache(context).get(
+        ("product", product_id),
+        persistence.get_catalog_version(),
+        lambda: _render_product(persistence, product_id),
+    )
+
+    # List -> product (text -> photo) and product -> product are in-place
+    # media edits inside show_view.
+    await show_view(update, context, view or View(Strings.Shop.PRODUCT_NOT_FOUND))
 
+
+async def _render_product(
+    persistence: AbstractPantryPersistence, product_id: str
+) -> Optional[View]:
+    """Renders a product's detail screen, or None if it does not exist."""
+    product = await persistence.get_product(product_id)
     if not product:
-        await query.edit_message_text(Strings.Shop.PRODUCT_NOT_FOUND)
-        return
+        return None
 
     # Prepare Content
     caption = Strings.Shop.product_caption(
@@ -176,114 +176,84 @@ async def handle_product_selection(
     keyboard = [
         [
             InlineKeyboardButton(
-                Strings.Shop.ADD_TO_CART_BTN, callback_data=f"add_to_cart_{product_id}"
+                Strings.Shop.ADD_TO_CART_BTN,
+                callback_data=callbacks.encode(
+                    callbacks.ADD_TO_CART, callbacks.uuid_to_int(product_id)
+                ),
             )
         ],
         [
             InlineKeyboardButton(
                 Strings.Shop.back_to_category_btn(category),
-                callback_data=f"navigate_to_products_{category}",
+                callback_data=callbacks.encode(
+                    callbacks.CATEGORY, callbacks.category_code(category)
+                ),
             ),
-            InlineKeyboardButton(Strings.Shop.CLOSE_BTN, callback_data="close_shop"),
+            _close_button(),
         ],
     ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    image_id = product.get("image_file_id")
-
-    # LOGIC:
-    # 1. We are currently viewing a Text Message (Product List).
-    # 2. We want to show details.
-    # 3. If Image exists -> Delete Text, Send Photo.
-    # 4. If No Image -> Edit Text.
-
-    if image_id:
-        await query.message.delete()
-        await context.bot.send_photo(
-            chat_id=update.effective_chat.id,
-            photo=image_id,
-            caption=caption,
-            parse_mode=ParseMode.HTML,
-            reply_markup=reply_markup,
-        )
-    else:
-        # Fallback for products with no image
-        await query.edit_message_text(
-            text=caption, reply_markup=reply_markup, parse_mode=ParseMode.HTML
-        )
 
+    return View(
+        caption,
+        InlineKeyboardMarkup(keyboard),
+        photo=product.get("image_file_id"),
+        parse_mode=ParseMode.HTML,
+    )
 
+
+@answers_query
 async def handle_add_to_cart(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> None:
-    query = update.callback_query
-    # We don't need to edit the message, just pop up a notification
-    product_id = context.matches[0].group(1)
-
-    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
-    product = await persistence.get_product(product_id)
+    # We don't need to edit the message, just pop up a notification.
+    # Taps are debounced: the first one of a burst reads the product and the
+    # cart, the rest are counted in memory and written together.
+    product_id = callbacks.int_to_uuid(context.args[0])
+    user_id = update.effective_user.id
 
-    if not product:
-        await query.answer(Strings.Shop.PRODUCT_UNAVAILABLE, show_alert=True)
+    editor = context.bot_data.get("cart_edits")
+    if editor is not None:
+        await editor.close(user_id)  # Its cached cart lines are going stale
+    pending = await get_cart_taps(context).tap(context, user_id, product_id)
+    if pending is None:
+        await answer_query(
+            update, context, Strings.Shop.PRODUCT_UNAVAILABLE, show_alert=True
+        )
         return
 
-    user_id = update.effective_user.id
-    new_quantity = await persistence.add_to_cart(
-        user_id=user_id, product_id=product_id, quantity=1
+    await answer_query(
+        update, context, Strings.Shop.added_to_cart(pending.name, pending.total)
     )
 
-    if new_quantity:
-        await query.answer(Strings.Shop.added_to_cart(product["name"], new_quantity))
-    else:
-        await query.answer(Strings.Shop.ADD_ERROR, show_alert=True)
-
 
 async def handle_close_shop(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    query = update.callback_query
-    await query.answer()
+    await answer_query(update, context)
 
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
     user_id = update.effective_user.id
     first_name = update.effective_user.first_name
 
+    await settle_cart(context, user_id)
     text, reply_markup = await get_home_menu(persistence, user_id, first_name)
-
-    if query.message.photo:
-        await query.message.delete()
-        await context.bot.send_message(
-            chat_id=update.effective_chat.id, text=text, reply_markup=reply_markup
-        )
-    else:
-        await query.edit_message_text(text=text, reply_markup=reply_markup)
+    await show_view(update, context, View(text, reply_markup))
 
 
 async def handle_back_to_categories(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> None:
     """Handles 'Back to Categories'. Compatible with both Photo and Text origins."""
-    query = update.callback_query
-    await query.answer()
+    await answer_query(update, context)
     await shop_start(update, context)
 
 
 # --- Handler Registration ---
-# Note: We need to register these in bot_main.py, but using the variables exported here.
+# Callback buttons are dispatched by action code through the customer router.
 
 shop_start_handler = CommandHandler("shop", shop_start)
-category_selection_handler = CallbackQueryHandler(
-    handle_category_selection, pattern="^category_(.+)"
-)
-product_selection_handler = CallbackQueryHandler(
-    handle_product_selection, pattern="^product_(.+)"
-)
-add_to_cart_handler = CallbackQueryHandler(
-    handle_add_to_cart, pattern="^add_to_cart_(.+)"
-)
-close_shop_handler = CallbackQueryHandler(handle_close_shop, pattern="^close_shop$")
-back_to_categories_handler = CallbackQueryHandler(
-    handle_back_to_categories, pattern="^navigate_to_categories$"
-)
-# Regex Updated to capture the category name for the Back button logic
-back_to_products_handler = CallbackQueryHandler(
-    handle_category_selection, pattern="^navigate_to_products_(.+)"
-)
-shop_home_callback_handler = CallbackQueryHandler(shop_start, pattern="^shop_start$")
+shop_routes = {
+    callbacks.CATEGORIES: handle_back_to_categories,
+    callbacks.CATEGORY: handle_category_selection,
+    callbacks.PRODUCT: handle_product_selection,
+    callbacks.ADD_TO_CART: handle_add_to_cart,
+    callbacks.CLOSE_SHOP: handle_close_shop,
+}
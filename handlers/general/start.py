@@ -3,7 +3,10 @@ import logging
 from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes
 
+from handlers import callbacks
+from handlers.cart_buffer import settle_cart
 from handlers.utils import schedule_deletion
+from handlers.views import View, show_view
 from persistence.abstract_persistence import AbstractPantryPersistence
 from resources.strings import Strings
 
@@ -17,9 +20,10 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
     logger.info(f"User {user_id} started the bot.")
 
     persistence = context.bot_data["persistence"]
+    await settle_cart(context, user_id)
     text, reply_markup = await get_home_menu(persistence, user_id, first_name)
 
-    await update.message.reply_text(text, reply_markup=reply_markup)
+    await show_view(update, context, View(text, reply_markup))
 
     if update.message:
         schedule_deletion(
@@ -38,12 +42,14 @@ async def get_home_menu(
         keyboard = [
             [
                 InlineKeyboardButton(
-                    Strings.General.CONTINUE_SHOPPING_BTN, callback_data="shop_start"
+                    Strings.General.CONTINUE_SHOPPING_BTN,
+                    callback_data=callbacks.encode(callbacks.CATEGORIES),
                 )
             ],
             [
                 InlineKeyboardButton(
-                    Strings.General.CHECKOUT_BTN, callback_data="view_cart"
+                    Strings.General.CHECKOUT_BTN,
+                    callback_data=callbacks.encode(callbacks.VIEW_CART),
                 )
             ],
         ]
@@ -52,7 +58,8 @@ async def get_home_menu(
         keyboard = [
             [
                 InlineKeyboardButton(
-                    Strings.General.SHOP_NOW_BTN, callback_data="shop_start"
+                    Strings.General.SHOP_NOW_BTN,
+                    callback_data=callbacks.encode(callbacks.CATEGORIES),
                 )
             ]
         ]
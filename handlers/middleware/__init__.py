@@ -0,0 +1,37 @@
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from .anti_flood import FloodGuard, anti_flood_middleware
+from .fast_ack import answer_query, answer_stats, answers_query, fast_ack_middleware
+from .user_activity import user_activity_middleware
+
+# Middleware runs in negative groups, before any feature handler
+ANTI_FLOOD_GROUP = -30
+USER_ACTIVITY_GROUP = -20
+FAST_ACK_GROUP = -10
+
+
+def register_middleware(application: Application):
+    """Registers the pre-dispatch middleware handlers."""
+    # First, so dropped updates reach neither the other middleware nor handlers
+    application.add_handler(
+        TypeHandler(Update, anti_flood_middleware), group=ANTI_FLOOD_GROUP
+    )
+    application.add_handler(
+        TypeHandler(Update, user_activity_middleware), group=USER_ACTIVITY_GROUP
+    )
+    application.add_handler(
+        TypeHandler(Update, fast_ack_middleware), group=FAST_ACK_GROUP
+    )
+
+
+__all__ = [
+    "FloodGuard",
+    "anti_flood_middleware",
+    "answer_query",
+    "answer_stats",
+    "answers_query",
+    "fast_ack_middleware",
+    "register_middleware",
+    "user_activity_middleware",
+]
@@ -0,0 +1,163 @@
+"""
+Per-user flood guard.
+
+A user mashing buttons, or a scripted client, can send hundreds of updates a
+second, and most handlers read or write SQLite. This middleware runs before
+every other handler and gives each user a token bucket: `rate` updates per
+second with bursts of `burst`. Updates over the limit stop there
+(`ApplicationHandlerStop`), before any handler or the database sees them.
+
+The first callback query dropped in a flood is answered with a "slow down"
+toast; the rest of the flood is dropped silently, so the guard does not
+spend the bot's rate limit on the flooder. Buckets are kept for the
+`max_users` most recently active users; an evicted user just starts with a
+full bucket again. The bot owner is never limited; until an owner is set,
+the lookup is repeated at most every `no_owner_ttl` seconds.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import ApplicationHandlerStop, ContextTypes
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+from services.rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+USER_RATE = 2.0
+USER_BURST = 8
+MAX_TRACKED_USERS = 10_000
+# Seconds a "no owner yet" lookup is trusted before asking again
+NO_OWNER_TTL = 60.0
+
+# The owner has not been looked up yet (None means there is no owner)
+_NOT_LOOKED_UP = object()
+
+
+@dataclass
+class FloodStats:
+    """Dropped updates per kind (callback_query, message, ...)."""
+
+    dropped: dict[str, int] = field(default_factory=dict)
+    warned: int = 0
+
+    def record(self, kind: str) -> None:
+        self.dropped[kind] = self.dropped.get(kind, 0) + 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.dropped.values())
+
+
+@dataclass
+class _UserState:
+    bucket: TokenBucket
+    # Whether this flood was already answered with a toast
+    warned: bool = False
+
+
+class FloodGuard:
+    """
+    Token buckets per user, for the most recently active users.
+
+    Attributes:
+        stats (FloodStats): Dropped update counters.
+    """
+
+    def __init__(
+        self,
+        persistence: AbstractPantryPersistence,
+        rate: float = USER_RATE,
+        burst: int = USER_BURST,
+        max_users: int = MAX_TRACKED_USERS,
+        no_owner_ttl: float = NO_OWNER_TTL,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.persistence = persistence
+        self.rate = rate
+        self.burst = burst
+        self.max_users = max_users
+        self.no_owner_ttl = no_owner_ttl
+        self.stats = FloodStats()
+        self._clock = clock
+        self._users: OrderedDict[int, _UserState] = OrderedDict()
+        # Ownership is set once, so a known owner never changes
+        self._owner_id: object = _NOT_LOOKED_UP
+        self._owner_looked_up_at = 0.0
+
+    @property
+    def tracked(self) -> int:
+        """Users with a bucket."""
+        return len(self._users)
+
+    def _state(self, user_id: int) -> _UserState:
+        state = self._users.get(user_id)
+        if state is None:
+            state = _UserState(TokenBucket(self.rate, self.burst, clock=self._clock))
+            self._users[user_id] = state
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return state
+
+    async def _is_owner(self, user_id: int) -> bool:
+        now = self._clock()
+        if self._owner_id is _NOT_LOOKED_UP or (
+            self._owner_id is None
+            and now - self._owner_looked_up_at >= self.no_owner_ttl
+        ):
+            self._owner_id = await self.persistence.get_bot_owner()
+            self._owner_looked_up_at = now
+        return user_id == self._owner_id
+
+    async def allow(self, user_id: int) -> bool:
+        """Takes a token for the user; False if they are over the limit."""
+        state = self._state(user_id)
+        # The wait until the next token; 0 means one was taken
+        wait = state.bucket.try_acquire()
+        if wait == 0:
+            state.warned = False
+            return True
+        # Only users over the limit cost an owner lookup
+        return await self._is_owner(user_id)
+
+    def warn_once(self, user_id: int) -> bool:
+        """Whether to warn the user: only on the first dropped update of a flood."""
+        state = self._users.get(user_id)
+        if state is None or state.warned:
+            return False
+        state.warned = True
+        self.stats.warned += 1
+        return True
+
+
+async def anti_flood_middleware(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Stops updates from users over their rate before any handler runs."""
+    user = update.effective_user
+    guard: Optional[FloodGuard] = context.bot_data.get("flood_guard")
+    if user is None or guard is None:
+        return
+    if await guard.allow(user.id):
+        return
+
+    query = update.callback_query
+    if query is not None:
+        guard.stats.record("callback_query")
+    else:
+        guard.stats.record("message" if update.message is not None else "other")
+    if query is not None and guard.warn_once(user.id):
+        try:
+            await query.answer(Strings.Flood.SLOW_DOWN)
+        except TelegramError as e:
+            logger.debug(f"Flood warning failed: {e}")
+    raise ApplicationHandlerStop
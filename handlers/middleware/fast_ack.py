@@ -0,0 +1,133 @@
+"""
+Fast acknowledgement of callback queries.
+
+Telegram keeps the button's loading spinner up until the bot answers the
+callback query, and gives up after about 15 seconds. Many handlers query the
+database before they get around to answering. This middleware runs before
+every handler (a `TypeHandler` in a negative group) and answers the query
+straight away, in the background, so the handler's slow work overlaps the
+answer round trip.
+
+Handlers that answer with a toast or an alert themselves are marked with
+`@answers_query` and are left alone. Every other handler answers through
+`answer_query`, which becomes a no-op once the middleware has already
+answered. `answer_stats` tracks how long answers take, separately from how
+long the handlers run.
+"""
+
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, TypeVar
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import Application, CallbackQueryHandler, ContextTypes
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+HANDLER = "handler"
+
+# Recent samples kept per kind for percentiles
+LATENCY_WINDOW = 1024
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def answers_query(callback: F) -> F:
+    """Marks a callback handler that answers its query itself (toast or alert)."""
+    callback.answers_query = True
+    return callback
+
+
+@dataclass
+class AnswerLatencyStats:
+    """Time from the start of processing to the callback answer, per kind."""
+
+    samples: dict[str, deque] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+
+    def record(self, kind: str, seconds: float) -> None:
+        self.samples.setdefault(kind, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+        self.counts[kind] = self.counts.get(kind, 0) + 1
+
+    def percentile(self, kind: str, fraction: float) -> Optional[float]:
+        """Latency at `fraction` (0-1) over the recent samples, in seconds."""
+        samples = sorted(self.samples.get(kind, ()))
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))]
+
+    def reset(self) -> None:
+        self.samples.clear()
+        self.counts.clear()
+
+
+answer_stats = AnswerLatencyStats()
+
+
+def _started_at(context: ContextTypes.DEFAULT_TYPE) -> Optional[float]:
+    started = getattr(context, "callback_started_at", None)
+    return started if isinstance(started, float) else None
+
+
+async def answer_query(
+    update: Update, context: ContextTypes.DEFAULT_TYPE, *args, **kwargs
+) -> None:
+    """
+    Answers the update's callback query unless the middleware already did.
+
+    Arguments are passed through to `CallbackQuery.answer`.
+    """
+    if getattr(context, "query_answered", False) is True:
+        return
+    await update.callback_query.answer(*args, **kwargs)
+    context.query_answered = True
+    started = _started_at(context)
+    if started is not None:
+        answer_stats.record(HANDLER, time.perf_counter() - started)
+
+
+def _answers_itself(application: Application, update: Update) -> bool:
+    """Whether the handler that will process `update` answers it itself."""
+    for group in sorted(application.handlers):
+        if group < 0:
+            continue
+        for handler in application.handlers[group]:
+            if not isinstance(handler, CallbackQueryHandler):
+                continue
+            if not handler.check_update(update):
+                continue
+            flag = getattr(handler.callback, "answers_query", False)
+            if callable(flag):
+                flag = flag(update.callback_query.data)
+            if flag is True:
+                return True
+            break  # Only the first match in a group runs
+    return False
+
+
+async def _answer_now(update: Update, started: float) -> None:
+    try:
+        await update.callback_query.answer()
+    except TelegramError as e:
+        logger.debug(f"Fast answer failed: {e}")
+        return
+    answer_stats.record(FAST, time.perf_counter() - started)
+
+
+async def fast_ack_middleware(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Answers callback queries before the handlers run, unless they opt out."""
+    if update.callback_query is None:
+        return
+    context.callback_started_at = time.perf_counter()
+    if _answers_itself(context.application, update):
+        return
+    context.query_answered = True
+    context.application.create_task(
+        _answer_now(update, context.callback_started_at), update=update
+    )
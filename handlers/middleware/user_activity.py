@@ -0,0 +1,29 @@
+"""
+Records the sender of every update for the users table.
+
+Runs before the handlers, like the other middleware, and only touches memory:
+the `UserActivityTracker` in bot_data batches the writes. Recording a user
+marks them active again, so the `my_chat_member` update Telegram sends when
+a user blocks the bot is not recorded.
+"""
+
+from telegram import Update
+from telegram.constants import ChatMemberStatus
+from telegram.ext import ContextTypes
+
+# The bot's own membership after the user blocked it or left the chat
+_GONE_STATUSES = (ChatMemberStatus.BANNED, ChatMemberStatus.LEFT)
+
+
+async def user_activity_middleware(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Notes the update's user (id, username, first name, now) for the next flush."""
+    user = update.effective_user
+    tracker = context.bot_data.get("user_activity")
+    if user is None or user.is_bot or tracker is None:
+        return
+    member = update.my_chat_member
+    if member is not None and member.new_chat_member.status in _GONE_STATUSES:
+        return
+    tracker.seen(user.id, user.username, user.first_name)
@@ -1,7 +1,18 @@
 from telegram.ext import Application
 from .set_owner import set_owner_handler
+from .export_orders import export_orders_handler
+from .sales import sales_handler
+from .report import report_handler
+from .broadcast import broadcast_handler
+from .orders import owner_orders_page_handler, order_status_handler
 
 
 def register_handlers(application: Application):
     """Registers all owner-related handlers."""
     application.add_handler(set_owner_handler)
+    application.add_handler(export_orders_handler)
+    application.add_handler(sales_handler)
+    application.add_handler(report_handler)
+    application.add_handler(broadcast_handler)
+    application.add_handler(owner_orders_page_handler)
+    application.add_handler(order_status_handler)
@@ -0,0 +1,42 @@
+"""
+Owner-only /broadcast command.
+
+Starts sending an announcement to every active customer. The sending runs in
+the background (see `services.broadcast`); the owner gets a report when it
+is done.
+"""
+
+import logging
+
+from telegram import Update
+from telegram.ext import CommandHandler, ContextTypes
+
+from handlers.utils import owner_only_command
+from resources.strings import Strings
+from services import BroadcastService
+
+logger = logging.getLogger(__name__)
+
+
+async def broadcast_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles /broadcast <text> for the owner."""
+    if not await owner_only_command(update, context):
+        return
+
+    # Everything after the command, line breaks included
+    parts = update.message.text.split(None, 1)
+    text = parts[1].strip() if len(parts) > 1 else ""
+    if not text:
+        await update.message.reply_text(Strings.Broadcast.USAGE)
+        return
+
+    broadcasts: BroadcastService = context.bot_data["broadcasts"]
+    broadcast_id = await broadcasts.start(text, report_chat_id=update.effective_chat.id)
+    if broadcast_id is None:
+        await update.message.reply_text(Strings.Broadcast.FAILED)
+        return
+    logger.info(f"Owner started broadcast {broadcast_id}.")
+    await update.message.reply_text(Strings.Broadcast.started(broadcast_id))
+
+
+broadcast_handler = CommandHandler("broadcast", broadcast_command)
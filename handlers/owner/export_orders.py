@@ -0,0 +1,149 @@
+"""
+Owner-only /exportorders command.
+
+Streams orders joined with their line items into a gzip-compressed CSV held in
+a spooled temp file, then sends it to the owner as a document.
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import logging
+import sqlite3
+import tempfile
+from datetime import date, timedelta
+from typing import IO, Any, Iterable, Optional
+
+from telegram import Update
+from telegram.error import TelegramError
+from telegram.ext import CommandHandler, ContextTypes
+
+from handlers.utils import owner_only_command
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = (
+    "order_id",
+    "created_at",
+    "user_id",
+    "status",
+    "total_amount",
+    "product_id",
+    "product_name",
+    "quantity",
+    "unit_price",
+)
+
+# Exports stay in RAM up to this size, then spill over to disk
+SPOOL_MAX_BYTES = 4 * 1024 * 1024
+
+
+def parse_date_range(args: list[str]) -> tuple[Optional[str], Optional[str]]:
+    """
+    Parses the optional `[from] [to]` arguments into `created_at` bounds.
+
+    Args:
+        args (list[str]): Command arguments, each an ISO date (YYYY-MM-DD).
+
+    Returns:
+        tuple[Optional[str], Optional[str]]: Inclusive start and exclusive end.
+
+    Raises:
+        ValueError: If there are too many arguments, a date is malformed,
+                    or the range is reversed.
+    """
+    if len(args) > 2:
+        raise ValueError("Too many arguments")
+
+    start_date = date.fromisoformat(args[0]) if args else None
+    end_date = date.fromisoformat(args[1]) if len(args) > 1 else None
+    if start_date and end_date and start_date > end_date:
+        raise ValueError("Start date is after end date")
+
+    start = start_date.isoformat() if start_date else None
+    # 'to' is inclusive for the owner, so bound on the following midnight
+    end = (end_date + timedelta(days=1)).isoformat() if end_date else None
+    return start, end
+
+
+def write_orders_csv(rows: Iterable[dict[str, Any]], fileobj: IO[bytes]) -> int:
+    """
+    Writes rows as gzip-compressed CSV into `fileobj`, one row at a time.
+
+    Args:
+        rows (Iterable[dict[str, Any]]): Export rows, typically a generator.
+        fileobj (IO[bytes]): Binary file object to receive the compressed data.
+
+    Returns:
+        int: The number of data rows written.
+    """
+    row_count = 0
+    # Closing GzipFile writes the trailer but leaves `fileobj` open for the caller
+    with gzip.GzipFile(fileobj=fileobj, mode="wb") as gz:
+        text = io.TextIOWrapper(gz, encoding="utf-8", newline="")
+        writer = csv.DictWriter(text, fieldnames=EXPORT_COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            row_count += 1
+        text.flush()
+        text.detach()
+    return row_count
+
+
+def _build_export(
+    persistence: AbstractPantryPersistence,
+    start: Optional[str],
+    end: Optional[str],
+    fileobj: IO[bytes],
+) -> int:
+    """Runs the blocking export in a worker thread."""
+    return write_orders_csv(persistence.iter_order_export_rows(start, end), fileobj)
+
+
+async def export_orders(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles /exportorders [from] [to] for the owner."""
+    if not await owner_only_command(update, context):
+        return
+
+    try:
+        start, end = parse_date_range(context.args or [])
+    except ValueError:
+        await update.message.reply_text(Strings.Export.INVALID_DATES)
+        return
+
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES) as spool:
+        try:
+            row_count = await asyncio.to_thread(
+                _build_export, persistence, start, end, spool
+            )
+        except (sqlite3.Error, OSError) as e:
+            # Database errors, or the spool file could not be written
+            logger.error(f"Order export failed: {e}")
+            await update.message.reply_text(Strings.Export.FAILED)
+            return
+
+        if row_count == 0:
+            await update.message.reply_text(Strings.Export.NO_ORDERS)
+            return
+
+        logger.info(f"Exported {row_count} order rows ({start} -> {end}).")
+        spool.seek(0)
+        try:
+            await update.message.reply_document(
+                document=spool,
+                filename=f"orders_{'_'.join(context.args or []) or 'all'}.csv.gz",
+                caption=Strings.Export.caption(row_count),
+            )
+        except TelegramError as e:
+            # E.g. the file is over the Bot API's upload limit
+            logger.error(f"Sending the order export failed: {e}")
+            await update.message.reply_text(Strings.Export.FAILED)
+
+
+export_orders_handler = CommandHandler("exportorders", export_orders)
@@ -0,0 +1,153 @@
+"""
+Owner order queue: status tabs with live counts, one keyset-paginated page of
+orders per tab, and inline buttons that advance orders through the
+fulfilment workflow.
+"""
+
+import logging
+from typing import Optional
+
+from telegram import Update, InlineKeyboardButton
+from telegram.ext import CallbackQueryHandler, ContextTypes
+
+from handlers.utils import owner_only_command, show_orders_page
+from handlers.middleware import answer_query, answers_query
+from persistence.abstract_persistence import AbstractPantryPersistence
+from persistence.order_status import (
+    ALL_STATUSES,
+    CANCELLED,
+    ORDER_STATUS_TRANSITIONS,
+    PENDING,
+    next_status,
+)
+from resources.strings import Strings
+
+logger = logging.getLogger(__name__)
+
+OWNER_ORDERS_PAGE_SIZE = 10
+ALL_ORDERS = "all"
+TABS_PER_ROW = 3
+
+
+def _build_queue_rows(
+    orders: list[dict], status_counts: dict[str, int]
+) -> list[list[InlineKeyboardButton]]:
+    """Builds the action rows for each order, followed by the status tabs."""
+    rows = []
+    for order in orders:
+        current = order["status"]
+        if current not in ORDER_STATUS_TRANSITIONS:
+            continue  # Terminal (or legacy) status, nothing to do
+        forward = next_status(current)
+        rows.append(
+            [
+                InlineKeyboardButton(
+                    Strings.Order.advance_btn(order["id"], forward),
+                    callback_data=f"ord_{order['id']}_{current}_{forward}",
+                ),
+                InlineKeyboardButton(
+                    Strings.Order.CANCEL_ORDER_BTN,
+                    callback_data=f"ord_{order['id']}_{current}_{CANCELLED}",
+                ),
+            ]
+        )
+
+    tabs = [
+        InlineKeyboardButton(
+            Strings.Order.status_tab(status, status_counts.get(status, 0)),
+            callback_data=f"owner_orders_{status}",
+        )
+        for status in ALL_STATUSES
+    ]
+    # Every order, including legacy 'completed' ones that have no tab of their own
+    tabs.append(
+        InlineKeyboardButton(
+            Strings.Order.status_tab(ALL_ORDERS, sum(status_counts.values())),
+            callback_data=f"owner_orders_{ALL_ORDERS}",
+        )
+    )
+    rows += [tabs[i : i + TABS_PER_ROW] for i in range(0, len(tabs), TABS_PER_ROW)]
+    return rows
+
+
+async def show_owner_orders(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    status: Optional[str] = PENDING,
+    before_seq: Optional[int] = None,
+) -> None:
+    """Renders one page of the owner's queue for `status` (None for all orders)."""
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    orders = await persistence.get_all_orders_for_owner(
+        status=status, limit=OWNER_ORDERS_PAGE_SIZE + 1, before_seq=before_seq
+    )
+    status_counts = await persistence.get_order_status_counts()
+
+    header = (
+        Strings.Order.owner_status_header(status)
+        if status
+        else Strings.Order.OWNER_HEADER
+    )
+    await show_orders_page(
+        update,
+        context,
+        orders,
+        OWNER_ORDERS_PAGE_SIZE,
+        header=header,
+        empty_text=Strings.Order.OWNER_NO_ORDERS,
+        callback_prefix=f"owner_orders_{status or ALL_ORDERS}",
+        before_seq=before_seq,
+        extra_rows=_build_queue_rows(orders[:OWNER_ORDERS_PAGE_SIZE], status_counts),
+    )
+
+
+async def handle_owner_orders_page(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Handles the owner's status tabs and paging buttons."""
+    await answer_query(update, context)
+    if not await owner_only_command(update, context):
+        return
+
+    status = context.matches[0].group(1)
+    cursor = context.matches[0].group(2)
+    await show_owner_orders(
+        update,
+        context,
+        status=None if status == ALL_ORDERS else status,
+        before_seq=int(cursor) if cursor else None,
+    )
+
+
+@answers_query
+async def handle_order_status_change(
+    update: Update, context: ContextTypes.DEFAULT_TYPE
+) -> None:
+    """Advances (or cancels) an order with a single conditional update."""
+    if not await owner_only_command(update, context):
+        await answer_query(update, context)
+        return
+
+    order_id, current, new_status = context.matches[0].groups()
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    updated = await persistence.update_order_status(
+        order_id, new_status, expected_status=current
+    )
+
+    if updated:
+        logger.info(f"Order {order_id} moved from {current} to {new_status}.")
+        await answer_query(
+            update, context, Strings.Order.status_updated(order_id, new_status)
+        )
+    else:
+        await answer_query(update, context, Strings.Order.STATUS_UPDATE_FAILED)
+
+    await show_owner_orders(update, context, status=current)
+
+
+owner_orders_page_handler = CallbackQueryHandler(
+    handle_owner_orders_page, pattern=r"^owner_orders_([a-z]+)(?:_(\d+))?$"
+)
+order_status_handler = CallbackQueryHandler(
+    handle_order_status_change, pattern=r"^ord_([0-9a-f-]+)_([a-z]+)_([a-z]+)$"
+)
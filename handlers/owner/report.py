@@ -0,0 +1,84 @@
+"""
+Owner-only /report command backed by the columnar analytics engine.
+"""
+
+import asyncio
+import logging
+
+from telegram import Update
+from telegram.constants import ParseMode
+from telegram.ext import CommandHandler, ContextTypes
+
+from analytics import SalesAnalytics
+from handlers.utils import owner_only_command
+from persistence.abstract_persistence import AbstractPantryPersistence
+from persistence.order_status import CANCELLED
+from resources.strings import Strings
+
+logger = logging.getLogger(__name__)
+
+
+def build_report(analytics: SalesAnalytics) -> str:
+    """
+    Formats the report from the analytics engine's aggregations.
+
+    Args:
+        analytics (SalesAnalytics): A loaded analytics engine.
+
+    Returns:
+        str: HTML-formatted report text.
+    """
+    basket = analytics.average_basket()
+    if basket is None:
+        return Strings.Report.NO_DATA
+
+    lines = [
+        Strings.Report.HEADER,
+        "",
+        Strings.Report.basket_line(
+            analytics.order_count, basket["units"], basket["revenue_cents"] / 100.0
+        ),
+        "",
+        Strings.Report.HOURS_HEADER,
+    ]
+    for hour, cents in enumerate(analytics.revenue_by_hour()):
+        if cents:
+            lines.append(Strings.Report.hour_line(hour, cents / 100.0))
+
+    mix = analytics.category_mix()
+    total_cents = sum(mix.values())
+    lines += ["", Strings.Report.CATEGORIES_HEADER]
+    for name, cents in sorted(mix.items(), key=lambda item: item[1], reverse=True):
+        share = cents / total_cents if total_cents else 0.0
+        lines.append(Strings.Report.category_line(name, cents / 100.0, share))
+    return "\n".join(lines)
+
+
+def _refresh_and_build(
+    analytics: SalesAnalytics, persistence: AbstractPantryPersistence, cancelled: int
+) -> str:
+    """Blocking refresh + aggregation, run in a worker thread."""
+    analytics.refresh(persistence, cancelled)
+    return build_report(analytics)
+
+
+async def report_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles /report for the owner."""
+    if not await owner_only_command(update, context):
+        return
+
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    # The engine lives for the whole process so refreshes stay incremental
+    analytics: SalesAnalytics = context.bot_data.setdefault(
+        "analytics", SalesAnalytics()
+    )
+
+    # A change in cancellations makes the engine reload without them
+    status_counts = await persistence.get_order_status_counts()
+    text = await asyncio.to_thread(
+        _refresh_and_build, analytics, persistence, status_counts.get(CANCELLED, 0)
+    )
+    await update.message.reply_text(text, parse_mode=ParseMode.HTML)
+
+
+report_handler = CommandHandler("report", report_command)
@@ -0,0 +1,89 @@
+"""
+Owner-only /sales command.
+
+Renders today's totals, the last 7 days and the top sellers straight from the
+materialized sales summary tables maintained by `create_order`.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+from telegram import Update
+from telegram.constants import ParseMode
+from telegram.ext import CommandHandler, ContextTypes
+
+from handlers.utils import owner_only_command
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_DAYS = 7
+TOP_SELLERS_LIMIT = 5
+
+
+def format_sales_summary(daily: list[dict], top_products: list[dict]) -> str:
+    """
+    Builds the /sales message from summary rows.
+
+    Args:
+        daily (list[dict]): Per-day rows for the summary window, newest first.
+        top_products (list[dict]): Top sellers for the same window.
+
+    Returns:
+        str: HTML-formatted summary text.
+    """
+    # Summary days are stored as UTC dates, matching SQLite's CURRENT_TIMESTAMP
+    today = datetime.now(timezone.utc).date().isoformat()
+    today_row = next((row for row in daily if row["day"] == today), None)
+
+    lines = [Strings.Sales.HEADER, ""]
+    lines.append(
+        Strings.Sales.period_line(
+            "Today",
+            today_row["order_count"] if today_row else 0,
+            today_row["units"] if today_row else 0,
+            today_row["revenue"] if today_row else 0.0,
+        )
+    )
+    lines.append(
+        Strings.Sales.period_line(
+            f"Last {SUMMARY_DAYS} days",
+            sum(row["order_count"] for row in daily),
+            sum(row["units"] for row in daily),
+            sum(row["revenue"] for row in daily),
+        )
+    )
+
+    lines += ["", Strings.Sales.TOP_HEADER]
+    if not top_products:
+        lines.append(Strings.Sales.NO_TOP_SELLERS)
+    for rank, product in enumerate(top_products, start=1):
+        lines.append(
+            Strings.Sales.top_seller_line(
+                rank,
+                product["name"] or Strings.Sales.UNKNOWN_PRODUCT,
+                product["units"],
+                product["revenue"],
+            )
+        )
+    return "\n".join(lines)
+
+
+async def sales_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handles /sales for the owner."""
+    if not await owner_only_command(update, context):
+        return
+
+    persistence: AbstractPantryPersistence = context.bot_data["persistence"]
+    daily = await persistence.get_daily_sales(days=SUMMARY_DAYS)
+    top_products = await persistence.get_top_products(
+        days=SUMMARY_DAYS, limit=TOP_SELLERS_LIMIT
+    )
+
+    await update.message.reply_text(
+        format_sales_summary(daily, top_products), parse_mode=ParseMode.HTML
+    )
+
+
+sales_handler = CommandHandler("sales", sales_command)
@@ -20,6 +20,7 @@ from telegram.ext import (
 )
 from persistence.abstract_persistence import AbstractPantryPersistence
 from handlers.utils import owner_only_command, schedule_deletion, _delete_user_message
+from handlers.middleware import answer_query
 from resources.strings import Strings
 
 logger = logging.getLogger(__name__)
@@ -268,7 +269,7 @@ async def handle_product_save_confirmed(
     update: Update, context: ContextTypes.DEFAULT_TYPE
 ) -> int:
     query = update.callback_query
-    await query.answer()
+    await answer_query(update, context)
 
     persistence: AbstractPantryPersistence = context.bot_data["persistence"]
     product_data = context.user_data.get("new_product")
@@ -302,7 +303,7 @@ async def cancel_add_product(update: Update, context: ContextTypes.DEFAULT_TYPE)
 
     # Check if this came from a button click (CallbackQuery)
     if update.callback_query:
-        await update.callback_query.answer()
+        await answer_query(update, context)
         await update.callback_query.edit_message_text(Strings.Product.CANCELLED)
         schedule_deletion(
             context,
@@ -0,0 +1,90 @@
+"""
+Versioned cache of rendered catalog screens.
+
+The catalog changes rarely compared to how often customers browse it, so the
+category menu, each category's product list and each product screen are
+rendered once and reused as ready-made `View`s. Every entry is tied to the
+persistence layer's catalog version: when a product or its stock changes the
+version moves and the whole cache is dropped on the next lookup. Hot
+navigation is then a dict lookup, with no formatting and no DB queries.
+"""
+
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Hashable, Optional
+
+from telegram.ext import ContextTypes
+
+from handlers.views import View
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on cached screens (least recently used evicted)
+MAX_CACHED_RENDERS = 2048
+
+
+class RenderCache:
+    """
+    LRU map of render key -> `View`, valid for a single catalog version.
+
+    Attributes:
+        hits (int): Lookups served from the cache.
+        misses (int): Lookups that had to render.
+    """
+
+    def __init__(self, max_size: int = MAX_CACHED_RENDERS):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._version: Optional[int] = None
+        self._views: OrderedDict[Hashable, View] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    async def get(
+        self,
+        key: Hashable,
+        version: int,
+        render: Callable[[], Awaitable[Optional[View]]],
+    ) -> Optional[View]:
+        """
+        Returns the cached view for `key`, rendering it on a miss.
+
+        Args:
+            key (Hashable): Identifies the screen, e.g. ("category", name).
+            version (int): The current catalog version.
+            render: Coroutine function producing the view. A None result
+                    (e.g. product not found) is returned but not cached.
+
+        Returns:
+            Optional[View]: The rendered view.
+        """
+        if version != self._version:
+            if self._views:
+                logger.debug(
+                    f"Catalog version {self._version} -> {version}; "
+                    f"dropping {len(self._views)} cached renders."
+                )
+            self._views.clear()
+            self._version = version
+
+        view = self._views.get(key)
+        if view is not None:
+            self._views.move_to_end(key)
+            self.hits += 1
+            return view
+
+        self.misses += 1
+        view = await render()
+        # Another lookup may have moved to a newer version while this rendered
+        if view is not None and version == self._version:
+            self._views[key] = view
+            while len(self._views) > self.max_size:
+                self._views.popitem(last=False)
+        return view
+
+
+def get_render_cache(context: ContextTypes.DEFAULT_TYPE) -> RenderCache:
+    """Returns the application-wide render cache, creating it on first use."""
+    return context.bot_data.setdefault("render_cache", RenderCache())
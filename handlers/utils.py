@@ -1,6 +1,11 @@
+import inspect
 import logging
-from telegram import Update
+from typing import Any, Callable, Optional
+
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
+from handlers.views import View, show_view
 from persistence.abstract_persistence import AbstractPantryPersistence
 from resources.strings import Strings
 
@@ -26,12 +31,50 @@ def schedule_deletion(
 ):
     """
     Schedules a message to be deleted after `delay` seconds.
+
+    Goes through the application's `DeletionService` (bulk, coalesced) when
+    one is registered, otherwise falls back to a one-off JobQueue job.
     Safe to call even if job_queue is None (no-op).
     """
-    if context.job_queue:
+    deletions = context.bot_data.get("deletions")
+    if deletions is not None:
+        deletions.schedule(chat_id, message_id, delay)
+    elif context.job_queue:
         context.job_queue.run_once(_delete_msg_job, delay, data=(chat_id, message_id))
 
 
+async def _run_soon_job(context: ContextTypes.DEFAULT_TYPE):
+    """Job callback for `schedule_soon` when no timing wheel is running."""
+    callback, args = context.job.data
+    result = callback(*args)
+    if inspect.isawaitable(result):
+        await result
+
+
+def schedule_soon(
+    context: ContextTypes.DEFAULT_TYPE,
+    callback: Callable[..., Any],
+    delay: float,
+    *args: Any,
+):
+    """
+    Runs `callback(*args)` (sync or async) after about `delay` seconds.
+
+    Short delays go on the application's `TimingWheel` when one is running,
+    which avoids creating a scheduler job; otherwise a one-off JobQueue job
+    is used. Safe to call even if job_queue is None (no-op).
+
+    Returns:
+        The wheel's TimerHandle or the Job (both have a way to cancel), or None.
+    """
+    wheel = context.bot_data.get("wheel")
+    if wheel is not None:
+        return wheel.schedule_soon(callback, delay, *args)
+    if context.job_queue:
+        return context.job_queue.run_once(_run_soon_job, delay, data=(callback, args))
+    return None
+
+
 async def _delete_user_message(update: Update):
     """Deletes the user's message that triggered the update, if it exists."""
     if update.message:
@@ -57,3 +100,92 @@ async def owner_only_command(
         )
         return False
     return True
+
+
+# --- Helper for Paginated Order Lists ---
+def build_orders_page(
+    orders: list[dict[str, Any]],
+    page_size: int,
+    header: str,
+    empty_text: str,
+    callback_prefix: str,
+    is_first_page: bool,
+    extra_rows: Optional[list[list[InlineKeyboardButton]]] = None,
+) -> tuple[str, InlineKeyboardMarkup]:
+    """
+    Renders one page of order summaries with keyset navigation buttons.
+
+    `orders` should hold up to `page_size + 1` rows; the extra row only signals
+    that an older page exists. The "Older" button carries the `order_seq` of the
+    last order shown as its cursor (`{callback_prefix}_{order_seq}`), and
+    "Newest" returns to `callback_prefix` with no cursor.
+    """
+    page = orders[:page_size]
+    has_more = len(orders) > page_size
+
+    if page:
+        lines = [header, ""]
+        for order in page:
+            lines.append(
+                Strings.Order.order_line(
+                    order["id"],
+                    order["created_at"],
+                    order["item_count"],
+                    order["total_amount"],
+                    order["status"],
+                )
+            )
+        text = "\n".join(lines)
+    else:
+        text = f"{header}\n\n{empty_text}"
+
+    nav_row = []
+    if not is_first_page:
+        nav_row.append(
+            InlineKeyboardButton(
+                Strings.Order.FIRST_PAGE_BTN, callback_data=callback_prefix
+            )
+        )
+    if has_more:
+        nav_row.append(
+            InlineKeyboardButton(
+                Strings.Order.NEXT_PAGE_BTN,
+                callback_data=f"{callback_prefix}_{page[-1]['order_seq']}",
+            )
+        )
+
+    keyboard = list(extra_rows or [])
+    if nav_row:
+        keyboard.append(nav_row)
+    return text, InlineKeyboardMarkup(keyboard)
+
+
+async def show_orders_page(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    orders: list[dict[str, Any]],
+    page_size: int,
+    header: str,
+    empty_text: str,
+    callback_prefix: str,
+    before_seq: Optional[int],
+    extra_rows: Optional[list[list[InlineKeyboardButton]]] = None,
+) -> None:
+    """
+    Shows a page built by `build_orders_page` as the chat's screen.
+
+    `before_seq` is the cursor the page was loaded with (None for the newest
+    page). Paging buttons edit the screen in place; /orders replaces it.
+    """
+    text, reply_markup = build_orders_page(
+        orders,
+        page_size,
+        header=header,
+        empty_text=empty_text,
+        callback_prefix=callback_prefix,
+        is_first_page=before_seq is None,
+        extra_rows=extra_rows,
+    )
+    await show_view(
+        update, context, View(text, reply_markup, parse_mode=ParseMode.HTML)
+    )
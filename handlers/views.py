@@ -0,0 +1,296 @@
+"""
+Screen rendering for inline-keyboard navigation.
+
+Each chat has a single persistent "screen" message. Handlers describe *what*
+to show as a `View`; `show_view` compares it with what the chat's screen
+currently shows and issues the cheapest Bot API call that gets there:
+
+* nothing changed                  : no call at all
+* only the keyboard changed        : edit_message_reply_markup
+* text changed (text message)      : edit_message_text
+* caption changed (same photo)     : edit_message_caption
+* photo changed, or text -> photo  : edit_message_media
+* photo -> text                    : send the new message, delete the old one
+
+`edit_message_media` can add a photo to a text message, but a media message
+cannot lose its media, so only the last case needs two calls; sending before
+deleting keeps the chat from flashing empty in between. Commands always send
+a fresh screen at the bottom of the chat and delete the previous one, so
+stray menus do not pile up.
+
+What a screen shows is remembered as a digest of its text, keyboard and
+photo in a bounded per-chat `ScreenRegistry` kept in `bot_data`. Messages
+the registry does not know about (e.g. after a restart) are fully re-rendered.
+A screen that must stay in the chat (an order receipt) is released with
+`keep_screen`: it is no longer edited or deleted, and the next screen is
+sent below it.
+`view_stats` counts API calls per transition so navigation cost is visible.
+"""
+
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from telegram import InlineKeyboardMarkup, InputMediaPhoto, Message, Update
+from telegram.error import BadRequest, TelegramError
+from telegram.ext import ContextTypes
+
+from services.outbound import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+SEND = "send"
+NOOP = "noop"
+EDIT_TEXT = "edit_text"
+EDIT_CAPTION = "edit_caption"
+EDIT_MARKUP = "edit_markup"
+EDIT_MEDIA = "edit_media"
+REPLACE = "replace"
+
+# Upper bound on chats whose screen state is remembered (least recent evicted)
+MAX_TRACKED_SCREENS = 10_000
+
+
+@dataclass(frozen=True)
+class View:
+    """A renderable screen: text (or caption), keyboard and optional photo."""
+
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup] = None
+    photo: Optional[str] = None
+    parse_mode: Optional[str] = None
+
+    def kwargs(self) -> dict[str, Any]:
+        """Optional send/edit arguments, omitting the ones that are unset."""
+        options = {}
+        if self.reply_markup is not None:
+            options["reply_markup"] = self.reply_markup
+        if self.parse_mode is not None:
+            options["parse_mode"] = self.parse_mode
+        return options
+
+    def text_digest(self) -> bytes:
+        return _digest(f"{self.parse_mode}\x00{self.text}")
+
+    def markup_digest(self) -> bytes:
+        if self.reply_markup is None:
+            return b""
+        return _digest(json.dumps(self.reply_markup.to_dict(), sort_keys=True))
+
+
+def _digest(value: str) -> bytes:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest()
+
+
+@dataclass(frozen=True)
+class Screen:
+    """What a chat's screen message currently shows."""
+
+    message_id: int
+    photo: Optional[str]
+    text_digest: bytes
+    markup_digest: bytes
+
+    @classmethod
+    def of(cls, message_id: int, view: View) -> "Screen":
+        return cls(message_id, view.photo, view.text_digest(), view.markup_digest())
+
+
+class ScreenRegistry:
+    """Bounded LRU map of chat ID -> current `Screen`."""
+
+    def __init__(self, max_size: int = MAX_TRACKED_SCREENS):
+        self.max_size = max_size
+        self._screens: OrderedDict[int, Screen] = OrderedDict()
+
+    def get(self, chat_id: int) -> Optional[Screen]:
+        screen = self._screens.get(chat_id)
+        if screen is not None:
+            self._screens.move_to_end(chat_id)
+        return screen
+
+    def set(self, chat_id: int, screen: Screen) -> None:
+        self._screens[chat_id] = screen
+        self._screens.move_to_end(chat_id)
+        while len(self._screens) > self.max_size:
+            self._screens.popitem(last=False)
+
+    def discard(self, chat_id: int) -> None:
+        self._screens.pop(chat_id, None)
+
+    def __len__(self) -> int:
+        return len(self._screens)
+
+
+def get_screens(context: ContextTypes.DEFAULT_TYPE) -> ScreenRegistry:
+    """Returns the application-wide screen registry, creating it on first use."""
+    return context.bot_data.setdefault("screens", ScreenRegistry())
+
+
+def keep_screen(context: ContextTypes.DEFAULT_TYPE, chat_id: int) -> None:
+    """Leaves the chat's current screen in place as a regular message."""
+    get_screens(context).discard(chat_id)
+
+
+@dataclass
+class ViewStats:
+    """Counters for view transitions and the Bot API calls they cost."""
+
+    transitions: dict[str, int] = field(default_factory=dict)
+    api_calls: int = 0
+
+    def record(self, kind: str, calls: int) -> None:
+        self.transitions[kind] = self.transitions.get(kind, 0) + 1
+        self.api_calls += calls
+        logger.debug(f"View transition '{kind}' cost {calls} API call(s).")
+
+    @property
+    def navigations(self) -> int:
+        return sum(self.transitions.values())
+
+    @property
+    def calls_per_navigation(self) -> float:
+        return self.api_calls / self.navigations if self.navigations else 0.0
+
+    def reset(self) -> None:
+        self.transitions.clear()
+        self.api_calls = 0
+
+
+view_stats = ViewStats()
+
+
+async def send_view(
+    context: ContextTypes.DEFAULT_TYPE, chat_id: int, view: View
+) -> Message:
+    """Sends `view` as a new message."""
+    if view.photo:
+        return await context.bot.send_photo(
+            chat_id=chat_id, photo=view.photo, caption=view.text, **view.kwargs()
+        )
+    return await context.bot.send_message(
+        chat_id=chat_id, text=view.text, **view.kwargs()
+    )
+
+
+async def _delete_quietly(
+    context: ContextTypes.DEFAULT_TYPE, chat_id: int, message_id: int
+) -> None:
+    try:
+        # The new screen is already up; the old one can go when there is time
+        with priority(Priority.BACKGROUND):
+            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
+    except TelegramError as e:
+        # Already deleted by the user, or older than 48 hours
+        logger.debug(f"Could not delete old screen {message_id}: {e}")
+
+
+async def _send_screen(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    view: View,
+    old_message_id: Optional[int],
+) -> Message:
+    """Sends `view` as the chat's new screen and removes the old one."""
+    chat_id = update.effective_chat.id
+    message = await send_view(context, chat_id, view)
+    get_screens(context).set(chat_id, Screen.of(message.message_id, view))
+
+    if old_message_id is None:
+        view_stats.record(SEND, 1)
+    else:
+        await _delete_quietly(context, chat_id, old_message_id)
+        view_stats.record(REPLACE, 2)
+    return message
+
+
+async def _edit_screen(query, view: View, current: Optional[Screen]) -> str:
+    """
+    Edits the callback's message into `view` with the minimal call.
+
+    Args:
+        query: The callback query whose message is being edited.
+        view (View): What to show.
+        current (Optional[Screen]): What the message shows, if known.
+
+    Returns:
+        str: The transition kind that was performed.
+    """
+    text_same = current is not None and current.text_digest == view.text_digest()
+    markup_same = current is not None and current.markup_digest == view.markup_digest()
+
+    if view.photo:
+        if current is None or current.photo != view.photo:
+            await query.edit_message_media(
+                media=InputMediaPhoto(
+                    media=view.photo, caption=view.text, parse_mode=view.parse_mode
+                ),
+                reply_markup=view.reply_markup,
+            )
+            return EDIT_MEDIA
+        if not text_same:
+            await query.edit_message_caption(caption=view.text, **view.kwargs())
+            return EDIT_CAPTION
+    elif not text_same:
+        await query.edit_message_text(text=view.text, **view.kwargs())
+        return EDIT_TEXT
+
+    if markup_same:
+        return NOOP
+    await query.edit_message_reply_markup(reply_markup=view.reply_markup)
+    return EDIT_MARKUP
+
+
+async def show_view(
+    update: Update,
+    context: ContextTypes.DEFAULT_TYPE,
+    view: View,
+    edit_untracked: bool = True,
+):
+    """
+    Makes the chat's screen show `view`, with as few API calls as possible.
+
+    Args:
+        edit_untracked (bool): Whether a button on a message that is not the
+            chat's screen edits that message. False sends a new screen
+            instead, for buttons on messages that must be kept (receipts).
+
+    Returns:
+        The new Message when one was sent, otherwise None.
+    """
+    screens = get_screens(context)
+    chat_id = update.effective_chat.id
+    current = screens.get(chat_id)
+    query = update.callback_query
+
+    if query is None or query.message is None:
+        return await _send_screen(
+            update, context, view, current.message_id if current else None
+        )
+
+    message = query.message
+    if current is None or current.message_id != message.message_id:
+        if not edit_untracked:
+            return await _send_screen(
+                update, context, view, current.message_id if current else None
+            )
+        current = None  # A button on an older, untracked message
+
+    if message.photo and not view.photo:
+        # Photo -> text: a media message cannot be edited into a text message
+        return await _send_screen(update, context, view, message.message_id)
+
+    try:
+        kind = await _edit_screen(query, view, current)
+        calls = 0 if kind == NOOP else 1
+    except BadRequest as e:
+        # An untracked message already showed this view; the call was wasted
+        if "not modified" not in str(e).lower():
+            raise
+        kind, calls = NOOP, 1
+    screens.set(chat_id, Screen.of(message.message_id, view))
+    view_stats.record(kind, calls)
+    return None
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Optional  # For type hinting list[dict[str, Any]]
+from typing import Any, Iterator, Optional  # For type hinting list[dict[str, Any]]
 
 
 class AbstractPantryPersistence(ABC):
@@ -32,6 +32,22 @@ class AbstractPantryPersistence(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def upsert_users(
+        self, users: list[tuple[int, Optional[str], Optional[str], float]]
+    ) -> bool:
+        """
+        Inserts or updates users in one batch, marking them active.
+
+        Args:
+            users (list[tuple]): (user_id, username, first_name, last_seen) rows,
+                                 last_seen as a Unix timestamp.
+
+        Returns:
+            bool: True if the batch was written.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def is_owner_set(self) -> bool:
         """
@@ -59,6 +75,19 @@ class AbstractPantryPersistence(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    def get_catalog_version(self) -> int:
+        """
+        Returns a counter that changes on every product or stock mutation.
+
+        Cheap and non-blocking, so handlers can check it on every tap to
+        decide whether cached catalog renders are still valid.
+
+        Returns:
+            int: The current catalog version.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def get_product(self, product_id: str) -> dict[str, Any] | None:
         """
@@ -184,6 +213,24 @@ class AbstractPantryPersistence(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def set_cart_quantity(
+        self, user_id: int, product_id: str, quantity: int
+    ) -> bool:
+        """
+        Sets the quantity of a product in the user's cart, removing the line
+        when `quantity` is zero or less.
+
+        Args:
+            user_id (int): The ID of the user.
+            product_id (str): The ID of the product.
+            quantity (int): The new quantity.
+
+        Returns:
+            bool: True if the cart was updated, False otherwise.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def clear_cart(self, user_id: int) -> bool:
         """
@@ -197,6 +244,24 @@ class AbstractPantryPersistence(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def reorder(self, user_id: int, order_id: str) -> Optional[dict[str, Any]]:
+        """
+        Copies the items of one of the user's past orders into their cart,
+        capped at the current stock. Inactive or out-of-stock products are
+        skipped.
+
+        Args:
+            user_id (int): The ID of the user (must own the order).
+            order_id (str): The ID of the order to repeat.
+
+        Returns:
+            Optional[dict[str, Any]]: {"added": number of cart lines added or
+                                       topped up, "skipped": names of the
+                                       products left out}, or None on failure.
+        """
+        raise NotImplementedError
+
     # --- Order Management Methods ---
     @abstractmethod
     async def create_order(self, user_id: int) -> Optional[str]:
@@ -219,14 +284,321 @@ class AbstractPantryPersistence(ABC):
         """
         raise NotImplementedError
 
-    # @abstractmethod
-    # async def update_order_status(self, order_id: str, new_status: str) -> bool:
-    #     pass
-    #
-    # @abstractmethod
-    # async def get_user_orders(self, user_id: int) -> list[dict[str, Any]]:
-    #     pass
-    #
-    # @abstractmethod
-    # async def get_all_orders_for_owner(self) -> list[dict[str, Any]]: # Assuming single owner model
-    #     pass
+    @abstractmethod
+    async def update_order_status(
+        self,
+        order_id: str,
+        new_status: str,
+        expected_status: Optional[str] = None,
+    ) -> bool:
+        """
+        Moves an order to a new status, enforcing the fulfilment workflow
+        (see `persistence.order_status.ORDER_STATUS_TRANSITIONS`).
+
+        Args:
+            order_id (str): The ID of the order.
+            new_status (str): The status to move to.
+            expected_status (Optional[str]): If given, only update when the order
+                                             is currently in this status.
+
+        Returns:
+            bool: True if the order was updated, False otherwise.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_order_status_counts(self) -> dict[str, int]:
+        """
+        Retrieves the number of orders in each status.
+
+        Returns:
+            dict[str, int]: Mapping of status to order count.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_user_orders(
+        self, user_id: int, limit: int = 10, before_seq: Optional[int] = None
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieves one page of a user's orders, newest first.
+
+        Pagination is keyset-based: pass the `order_seq` of the last order on
+        the previous page as `before_seq` to get the next page.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int): Maximum number of orders to return.
+            before_seq (Optional[int]): Only return orders older than this one.
+
+        Returns:
+            list[dict[str, Any]]: Order summaries (order_seq, id, user_id,
+                                  total_amount, status, created_at, item_count).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_all_orders_for_owner(
+        self,
+        status: Optional[str] = None,
+        limit: int = 10,
+        before_seq: Optional[int] = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieves one page of all orders (single owner model), newest first.
+
+        Args:
+            status (Optional[str]): Only return orders with this status.
+            limit (int): Maximum number of orders to return.
+            before_seq (Optional[int]): Only return orders older than this one.
+
+        Returns:
+            list[dict[str, Any]]: Order summaries, as in `get_user_orders`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_order_export_rows(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Streams order line items for export, oldest first.
+
+        This is a blocking generator intended to be consumed from a worker
+        thread; implementations must keep memory bounded by `batch_size`.
+
+        Args:
+            start (Optional[str]): Inclusive lower bound on the order timestamp.
+            end (Optional[str]): Exclusive upper bound on the order timestamp.
+            batch_size (int): Number of rows fetched from storage at a time.
+
+        Yields:
+            dict[str, Any]: One row per order line item.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def iter_order_lines(
+        self, after_seq: int = 0, batch_size: int = 1000
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Streams order line items in insertion order, for incremental analytics.
+        Cancelled orders are left out.
+
+        This is a blocking generator intended to be consumed from a worker thread.
+
+        Args:
+            after_seq (int): Only return lines for orders after this sequence number.
+            batch_size (int): Number of rows fetched from storage at a time.
+
+        Yields:
+            dict[str, Any]: Rows with order_seq, order_id, created_at, product_id,
+                            category, quantity and unit_price.
+        """
+        raise NotImplementedError
+
+    # --- Sales Summary Methods ---
+    @abstractmethod
+    async def get_daily_sales(self, days: int) -> list[dict[str, Any]]:
+        """
+        Retrieves per-day sales totals for the last `days` days (including today).
+
+        Args:
+            days (int): Number of days to include.
+
+        Returns:
+            list[dict[str, Any]]: One row per day with sales (day, order_count,
+                                  units, revenue), newest first.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_top_products(self, days: int, limit: int) -> list[dict[str, Any]]:
+        """
+        Retrieves the best-selling products over the last `days` days.
+
+        Args:
+            days (int): Number of days to include.
+            limit (int): Maximum number of products to return.
+
+        Returns:
+            list[dict[str, Any]]: Rows with product_id, name, units, order_count
+                                  and revenue, ordered by units sold.
+        """
+        raise NotImplementedError
+
+    # --- Pending Deletion Ledger ---
+    @abstractmethod
+    async def add_pending_deletions(
+        self, entries: list[tuple[int, int, float]]
+    ) -> bool:
+        """
+        Records messages scheduled for deletion.
+
+        Args:
+            entries (list[tuple[int, int, float]]): (chat_id, message_id, due_at)
+                                                    tuples; due_at is a Unix time.
+
+        Returns:
+            bool: True if the entries were written.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_pending_deletions(self, since: float) -> list[tuple[int, int, float]]:
+        """
+        Retrieves recorded deletions due at or after `since`, soonest first.
+
+        Args:
+            since (float): Unix time; older entries are ignored.
+
+        Returns:
+            list[tuple[int, int, float]]: (chat_id, message_id, due_at) tuples.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def remove_pending_deletions(self, entries: list[tuple[int, int]]) -> bool:
+        """
+        Removes executed deletions from the ledger.
+
+        Args:
+            entries (list[tuple[int, int]]): (chat_id, message_id) tuples.
+
+        Returns:
+            bool: True if the entries were removed.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def purge_pending_deletions(self, before: float) -> bool:
+        """
+        Drops ledger entries due before `before`.
+
+        Args:
+            before (float): Unix time.
+
+        Returns:
+            bool: True if the purge succeeded.
+        """
+        raise NotImplementedError
+
+    # --- Notification Outbox ---
+    @abstractmethod
+    async def get_due_notifications(
+        self, now: float, limit: int
+    ) -> list[dict[str, Any]]:
+        """
+        Retrieves owner notifications due by `now`, oldest first.
+
+        `create_order` queues one notification per order (when an owner is
+        set) in the same transaction as the order.
+
+        Args:
+            now (float): Unix time.
+            limit (int): Maximum number of entries.
+
+        Returns:
+            list[dict[str, Any]]: Entries with id, attempts and order (as
+                                  returned by `get_order`).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reschedule_notifications(self, entries: list[tuple[int, float]]) -> bool:
+        """
+        Records a failed delivery attempt for outbox entries.
+
+        Args:
+            entries (list[tuple[int, float]]): (id, next_attempt_at) tuples.
+
+        Returns:
+            bool: True if the entries were updated.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def remove_notifications(self, ids: list[int]) -> bool:
+        """
+        Removes delivered outbox entries.
+
+        Args:
+            ids (list[int]): Outbox entry IDs.
+
+        Returns:
+            bool: True if the entries were removed.
+        """
+        raise NotImplementedError
+
+    # --- Broadcasts ---
+    @abstractmethod
+    async def create_broadcast(
+        self, text: str, report_chat_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Records a new broadcast to all active customers.
+
+        Args:
+            text (str): The message to send.
+            report_chat_id (Optional[int]): Where to report progress.
+
+        Returns:
+            Optional[int]: The broadcast ID, or None on failure.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_running_broadcasts(self) -> list[dict[str, Any]]:
+        """
+        Retrieves broadcasts that have not finished, oldest first.
+
+        Returns:
+            list[dict[str, Any]]: Broadcast rows (id, text, last_user_id, sent,
+                                  failed, blocked, report_chat_id).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_broadcast_recipients(
+        self, after_user_id: int, limit: int
+    ) -> list[int]:
+        """
+        Retrieves the next page of active users (other than the owner) by ID.
+
+        Args:
+            after_user_id (int): Only users with a greater ID are returned.
+            limit (int): Page size.
+
+        Returns:
+            list[int]: User IDs in ascending order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def save_broadcast_progress(
+        self,
+        broadcast_id: int,
+        last_user_id: int,
+        sent: int,
+        failed: int,
+        blocked_user_ids: list[int],
+        finished: bool = False,
+    ) -> bool:
+        """
+        Records a finished page of a broadcast and deactivates blocked users.
+
+        Args:
+            broadcast_id (int): The broadcast.
+            last_user_id (int): The last recipient of the page.
+            sent (int): Messages delivered in the page.
+            failed (int): Messages that failed for other reasons.
+            blocked_user_ids (list[int]): Recipients who blocked the bot.
+            finished (bool): Whether this was the last page.
+
+        Returns:
+            bool: True if the progress was saved.
+        """
+        raise NotImplementedError
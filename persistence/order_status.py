@@ -0,0 +1,41 @@
+"""
+Order fulfilment states and the transitions allowed between them.
+
+    pending -> preparing -> ready -> delivered
+       \\__________\\__________\\____-> cancelled
+
+Orders placed before the workflow existed keep the legacy 'completed' status,
+which is terminal.
+"""
+
+PENDING = "pending"
+PREPARING = "preparing"
+READY = "ready"
+DELIVERED = "delivered"
+CANCELLED = "cancelled"
+LEGACY_COMPLETED = "completed"
+
+# Statuses the owner works through, in queue order
+QUEUE_STATUSES = (PENDING, PREPARING, READY)
+ALL_STATUSES = (PENDING, PREPARING, READY, DELIVERED, CANCELLED)
+
+ORDER_STATUS_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    PENDING: (PREPARING, CANCELLED),
+    PREPARING: (READY, CANCELLED),
+    READY: (DELIVERED, CANCELLED),
+}
+
+
+def next_status(status: str) -> str | None:
+    """Returns the forward (non-cancel) successor of `status`, if any."""
+    successors = ORDER_STATUS_TRANSITIONS.get(status, ())
+    return successors[0] if successors else None
+
+
+def allowed_previous_statuses(new_status: str) -> tuple[str, ...]:
+    """Returns every status from which an order may move to `new_status`."""
+    return tuple(
+        status
+        for status, successors in ORDER_STATUS_TRANSITIONS.items()
+        if new_status in successors
+    )
@@ -7,10 +7,13 @@ It handles raw SQL execution, connection management, and data transformation.
 
 import sqlite3
 import logging
+import time
 import uuid
-from typing import Any, Optional, List
+from pathlib import Path
+from typing import Any, Iterator, Optional, List
 
 from .abstract_persistence import AbstractPantryPersistence
+from .order_status import PENDING, allowed_previous_statuses
 
 logger = logging.getLogger(__name__)
 
@@ -23,14 +26,21 @@ class SQLitePersistence(AbstractPantryPersistence):
         db_path (str): The file path to the SQLite database.
     """
 
-    def __init__(self, db_path: str = "pals_pantry.db"):
+    def __init__(
+        self, db_path: str = "pals_pantry.db", shared_catalog_version: bool = False
+    ):
         """
         Initializes the persistence layer and ensures the database schema exists.
 
         Args:
             db_path (str): Path to the .db file. Defaults to "pals_pantry.db".
+            shared_catalog_version (bool): Keep the catalog version in the
+                database instead of in memory, for when several processes
+                share it (multi-process worker mode).
         """
         self.db_path = db_path
+        self.shared_catalog_version = shared_catalog_version
+        self._catalog_version = 0
         self._init_db()
         logger.info(f"SQLitePersistence initialized with DB: {self.db_path}")
 
@@ -47,6 +57,30 @@ class SQLitePersistence(AbstractPantryPersistence):
         conn.row_factory = sqlite3.Row
         return conn
 
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """
+        Creates a read-only connection for long-running scans (e.g. exports).
+
+        The database runs in WAL mode, so a reader on this connection sees a
+        consistent snapshot and never blocks writers such as `create_order`.
+
+        Returns:
+            sqlite3.Connection: Read-only connection with row_factory set.
+        """
+        uri = f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _bump_catalog_version(self) -> None:
+        """Marks cached catalog renders (menus, product captions) as stale."""
+        self._catalog_version += 1
+        if self.shared_catalog_version:
+            self._execute_write("""
+                INSERT INTO system_config (key, value) VALUES ('catalog_version', 1)
+                ON CONFLICT (key) DO UPDATE SET value = value + 1
+                """)
+
     def _row_to_product(self, row: sqlite3.Row) -> dict[str, Any]:
         """
         Helper to transform a raw DB row into an app-friendly product dict.
@@ -84,6 +118,28 @@ class SQLitePersistence(AbstractPantryPersistence):
         finally:
             conn.close()
 
+    def _execute_write_many(self, query: str, params_seq: List[tuple]) -> bool:
+        """
+        Helper for batched INSERT/UPDATE/DELETE queries in one transaction.
+
+        Args:
+            query (str): The SQL query string.
+            params_seq (List[tuple]): One parameter tuple per row.
+
+        Returns:
+            bool: True if the operation succeeded, False otherwise.
+        """
+        conn = self._get_connection()
+        try:
+            with conn:
+                conn.executemany(query, params_seq)
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"DB Write Error: {e} | Query: {query}")
+            return False
+        finally:
+            conn.close()
+
     def _execute_read_one(
         self, query: str, params: tuple = ()
     ) -> Optional[sqlite3.Row]:
@@ -131,6 +187,14 @@ class SQLitePersistence(AbstractPantryPersistence):
         """
         conn = self._get_connection()
         try:
+            # WAL lets readers (exports, reports) run alongside checkouts
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Summaries written before cancellations were subtracted still
+            # count cancelled orders; they are rebuilt once below
+            summaries_count_cancelled = not conn.execute(
+                "SELECT 1 FROM sqlite_master "
+                "WHERE type = 'trigger' AND name = 'trg_orders_cancel_sales'"
+            ).fetchone()
             with conn:
                 conn.executescript("""
                     CREATE TABLE IF NOT EXISTS system_config (
@@ -142,7 +206,9 @@ class SQLitePersistence(AbstractPantryPersistence):
                         id INTEGER PRIMARY KEY,
                         username TEXT,
                         first_name TEXT,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        is_active INTEGER NOT NULL DEFAULT 1,
+                        last_seen REAL
                     );
 
                     CREATE TABLE IF NOT EXISTS products (
@@ -169,7 +235,10 @@ class SQLitePersistence(AbstractPantryPersistence):
                         user_id INTEGER,
                         total_amount REAL,
                         status TEXT DEFAULT 'completed',
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                        -- Insertion sequence (order_seq). Stored, unlike the
+                        -- rowid of a TEXT-keyed table, which VACUUM may renumber
+                        seq INTEGER
                     );
 
                     CREATE TABLE IF NOT EXISTS order_items (
@@ -180,10 +249,303 @@ class SQLitePersistence(AbstractPantryPersistence):
                         FOREIGN KEY(order_id) REFERENCES orders(id),
                         FOREIGN KEY(product_id) REFERENCES products(id)
                     );
+
+                    CREATE INDEX IF NOT EXISTS idx_order_items_order_id
+                        ON order_items (order_id);
+
+                    CREATE TABLE IF NOT EXISTS sales_daily (
+                        day TEXT PRIMARY KEY,
+                        order_count INTEGER NOT NULL DEFAULT 0,
+                        units INTEGER NOT NULL DEFAULT 0,
+                        revenue_cents INTEGER NOT NULL DEFAULT 0
+                    );
+
+                    CREATE TABLE IF NOT EXISTS sales_daily_product (
+                        day TEXT,
+                        product_id TEXT,
+                        order_count INTEGER NOT NULL DEFAULT 0,
+                        units INTEGER NOT NULL DEFAULT 0,
+                        revenue_cents INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (day, product_id)
+                    );
+
+                    CREATE TABLE IF NOT EXISTS order_status_counts (
+                        status TEXT PRIMARY KEY,
+                        count INTEGER NOT NULL DEFAULT 0
+                    );
+
+                    -- Status counts are kept exact by triggers, so the owner's
+                    -- queue never needs COUNT(*) over orders.
+                    CREATE TRIGGER IF NOT EXISTS trg_orders_status_insert
+                    AFTER INSERT ON orders
+                    BEGIN
+                        INSERT INTO order_status_counts (status, count)
+                        VALUES (NEW.status, 1)
+                        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+                    END;
+
+                    CREATE TRIGGER IF NOT EXISTS trg_orders_status_update
+                    AFTER UPDATE OF status ON orders
+                    WHEN OLD.status IS NOT NEW.status
+                    BEGIN
+                        UPDATE order_status_counts SET count = count - 1
+                        WHERE status = OLD.status;
+                        INSERT INTO order_status_counts (status, count)
+                        VALUES (NEW.status, 1)
+                        ON CONFLICT (status) DO UPDATE SET count = count + 1;
+                    END;
+
+                    -- A cancelled order no longer counts as a sale: take it
+                    -- back out of the summaries `create_order` added it to.
+                    CREATE TRIGGER IF NOT EXISTS trg_orders_cancel_sales
+                    AFTER UPDATE OF status ON orders
+                    WHEN NEW.status = 'cancelled'
+                        AND OLD.status IS NOT 'cancelled'
+                    BEGIN
+                        UPDATE sales_daily SET
+                            order_count = order_count - 1,
+                            units = units - (
+                                SELECT COALESCE(SUM(quantity), 0)
+                                FROM order_items WHERE order_id = NEW.id
+                            ),
+                            revenue_cents = revenue_cents - (
+                                SELECT COALESCE(SUM(quantity * CAST(
+                                    ROUND(unit_price * 100) AS INTEGER)), 0)
+                                FROM order_items WHERE order_id = NEW.id
+                            )
+                        WHERE day = date(NEW.created_at);
+                        UPDATE sales_daily_product SET
+                            order_count = order_count - 1,
+                            units = units - (
+                                SELECT SUM(oi.quantity) FROM order_items oi
+                                WHERE oi.order_id = NEW.id
+                                    AND oi.product_id = sales_daily_product.product_id
+                            ),
+                            revenue_cents = revenue_cents - (
+                                SELECT SUM(oi.quantity * CAST(
+                                    ROUND(oi.unit_price * 100) AS INTEGER))
+                                FROM order_items oi
+                                WHERE oi.order_id = NEW.id
+                                    AND oi.product_id = sales_daily_product.product_id
+                            )
+                        WHERE day = date(NEW.created_at)
+                            AND product_id IN (
+                                SELECT product_id FROM order_items
+                                WHERE order_id = NEW.id
+                            );
+                    END;
+
+                    -- Messages waiting for scheduled deletion, so cleanup
+                    -- survives a restart. due_at is a Unix timestamp.
+                    CREATE TABLE IF NOT EXISTS pending_deletions (
+                        chat_id INTEGER NOT NULL,
+                        message_id INTEGER NOT NULL,
+                        due_at REAL NOT NULL,
+                        PRIMARY KEY (chat_id, message_id)
+                    ) WITHOUT ROWID;
+
+                    CREATE INDEX IF NOT EXISTS idx_pending_deletions_due
+                        ON pending_deletions (due_at);
+
+                    -- New-order notifications for the owner, written with the
+                    -- order and removed once delivered. next_attempt_at is a
+                    -- Unix timestamp.
+                    CREATE TABLE IF NOT EXISTS notification_outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        order_id TEXT NOT NULL,
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        FOREIGN KEY(order_id) REFERENCES orders(id)
+                    );
+
+                    CREATE INDEX IF NOT EXISTS idx_notification_outbox_due
+                        ON notification_outbox (next_attempt_at);
+
+                    -- Announcements to all customers. Recipients are walked in
+                    -- user id order; last_user_id is the last one done.
+                    CREATE TABLE IF NOT EXISTS broadcasts (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        text TEXT NOT NULL,
+                        status TEXT NOT NULL DEFAULT 'running',
+                        last_user_id INTEGER NOT NULL DEFAULT 0,
+                        sent INTEGER NOT NULL DEFAULT 0,
+                        failed INTEGER NOT NULL DEFAULT 0,
+                        blocked INTEGER NOT NULL DEFAULT 0,
+                        report_chat_id INTEGER,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    );
                 """)
+                # Columns added after the first release
+                self._ensure_column(
+                    conn, "users", "is_active", "INTEGER NOT NULL DEFAULT 1"
+                )
+                self._ensure_column(conn, "users", "last_seen", "REAL")
+                self._ensure_column(conn, "orders", "seq", "INTEGER")
+                self._backfill_order_seq(conn)
+                if (
+                    summaries_count_cancelled
+                    and conn.execute(
+                        "SELECT 1 FROM orders WHERE status = 'cancelled' LIMIT 1"
+                    ).fetchone()
+                ):
+                    conn.execute("DELETE FROM sales_daily")
+                    conn.execute("DELETE FROM sales_daily_product")
+                self._backfill_sales_summary(conn)
+                self._backfill_status_counts(conn)
         finally:
             conn.close()
 
+    @staticmethod
+    def _ensure_column(
+        conn: sqlite3.Connection, table: str, column: str, definition: str
+    ) -> None:
+        """Adds `column` to `table` in databases created before it existed."""
+        columns = {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            logger.info(f"Added column {table}.{column}.")
+
+    def _backfill_order_seq(self, conn: sqlite3.Connection) -> None:
+        """
+        Numbers orders created before `orders.seq` existed, and indexes it.
+
+        Those orders keep their insertion order: they are numbered by rowid,
+        which is still the insertion order until the table is vacuumed.
+        """
+        numbered = conn.execute("""
+            UPDATE orders
+            SET seq = rowid + (SELECT COALESCE(MAX(seq), 0) FROM orders)
+            WHERE seq IS NULL
+            """).rowcount
+        if numbered:
+            logger.info(f"Numbered {numbered} existing orders for order_seq.")
+        # Page boundaries are (created_at, seq), so seq ends each index
+        conn.executescript("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_seq ON orders (seq);
+
+            DROP INDEX IF EXISTS idx_orders_created_at;
+            DROP INDEX IF EXISTS idx_orders_user_created;
+            DROP INDEX IF EXISTS idx_orders_status_created;
+
+            CREATE INDEX IF NOT EXISTS idx_orders_created_seq
+                ON orders (created_at, seq);
+            CREATE INDEX IF NOT EXISTS idx_orders_user_created_seq
+                ON orders (user_id, created_at, seq);
+            CREATE INDEX IF NOT EXISTS idx_orders_status_created_seq
+                ON orders (status, created_at, seq);
+            """)
+
+    def _backfill_sales_summary(self, conn: sqlite3.Connection) -> None:
+        """
+        Populates the sales summary tables from existing orders.
+
+        Only runs when the summaries are empty but orders exist (i.e. the first
+        start after the summary tables were introduced). From then on
+        `create_order` keeps them up to date incrementally, and the
+        `trg_orders_cancel_sales` trigger takes cancelled orders back out.
+        Cancelled orders are left out here.
+
+        Args:
+            conn (sqlite3.Connection): Open connection inside a transaction.
+        """
+        if conn.execute("SELECT 1 FROM sales_daily LIMIT 1").fetchone():
+            return
+        if not conn.execute("SELECT 1 FROM orders LIMIT 1").fetchone():
+            return
+
+        logger.info("Backfilling sales summary tables from existing orders.")
+        conn.execute("""
+            INSERT INTO sales_daily (day, order_count, units, revenue_cents)
+            SELECT date(o.created_at), COUNT(DISTINCT o.id), SUM(oi.quantity),
+                   SUM(oi.quantity * CAST(ROUND(oi.unit_price * 100) AS INTEGER))
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.status != 'cancelled'
+            GROUP BY date(o.created_at)
+            """)
+        conn.execute("""
+            INSERT INTO sales_daily_product
+                (day, product_id, order_count, units, revenue_cents)
+            SELECT date(o.created_at), oi.product_id, COUNT(DISTINCT o.id),
+                   SUM(oi.quantity),
+                   SUM(oi.quantity * CAST(ROUND(oi.unit_price * 100) AS INTEGER))
+            FROM orders o
+            JOIN order_items oi ON oi.order_id = o.id
+            WHERE o.status != 'cancelled'
+            GROUP BY date(o.created_at), oi.product_id
+            """)
+
+    def _backfill_status_counts(self, conn: sqlite3.Connection) -> None:
+        """
+        Seeds `order_status_counts` from orders created before it existed.
+
+        Args:
+            conn (sqlite3.Connection): Open connection inside a transaction.
+        """
+        if conn.execute("SELECT 1 FROM order_status_counts LIMIT 1").fetchone():
+            return
+        conn.execute("""
+            INSERT INTO order_status_counts (status, count)
+            SELECT status, COUNT(*) FROM orders GROUP BY status
+            """)
+
+    def _record_sales(
+        self,
+        cursor: sqlite3.Cursor,
+        order_id: str,
+        cart_rows: List[sqlite3.Row],
+    ) -> None:
+        """
+        Folds a new order into the daily sales summaries.
+
+        Must be called inside the `create_order` transaction so the summaries
+        can never drift from the orders table.
+
+        Args:
+            cursor (sqlite3.Cursor): Cursor on the open order transaction.
+            order_id (str): The order that was just inserted.
+            cart_rows (List[sqlite3.Row]): The cart lines that made up the order.
+        """
+        # Use the order's own timestamp so summaries and orders agree on the day
+        cursor.execute(
+            "SELECT date(created_at) AS day FROM orders WHERE id = ?", (order_id,)
+        )
+        day = cursor.fetchone()["day"]
+
+        units = sum(row["quantity"] for row in cart_rows)
+        revenue_cents = sum(row["quantity"] * row["price_cents"] for row in cart_rows)
+        cursor.execute(
+            """
+            INSERT INTO sales_daily (day, order_count, units, revenue_cents)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT (day) DO UPDATE SET
+                order_count = order_count + 1,
+                units = units + excluded.units,
+                revenue_cents = revenue_cents + excluded.revenue_cents
+            """,
+            (day, units, revenue_cents),
+        )
+        cursor.executemany(
+            """
+            INSERT INTO sales_daily_product
+                (day, product_id, order_count, units, revenue_cents)
+            VALUES (?, ?, 1, ?, ?)
+            ON CONFLICT (day, product_id) DO UPDATE SET
+                order_count = order_count + 1,
+                units = units + excluded.units,
+                revenue_cents = revenue_cents + excluded.revenue_cents
+            """,
+            [
+                (
+                    day,
+                    row["product_id"],
+                    row["quantity"],
+                    row["quantity"] * row["price_cents"],
+                )
+                for row in cart_rows
+            ],
+        )
+
     # --- Owner Management ---
 
     async def get_bot_owner(self) -> Optional[int]:
@@ -227,6 +589,35 @@ class SQLitePersistence(AbstractPantryPersistence):
         finally:
             conn.close()
 
+    async def upsert_users(
+        self, users: List[tuple[int, Optional[str], Optional[str], float]]
+    ) -> bool:
+        """
+        Inserts or updates users in one batch.
+
+        A user who writes to the bot again is active again, even if a broadcast
+        found them blocked earlier.
+
+        Args:
+            users (List[tuple]): (user_id, username, first_name, last_seen) rows,
+                                 last_seen as a Unix timestamp.
+
+        Returns:
+            bool: True if the batch was written.
+        """
+        return self._execute_write_many(
+            """
+            INSERT INTO users (id, username, first_name, last_seen)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                username = excluded.username,
+                first_name = excluded.first_name,
+                last_seen = MAX(COALESCE(last_seen, 0), excluded.last_seen),
+                is_active = 1
+            """,
+            users,
+        )
+
     async def is_owner_set(self) -> bool:
         """
         Checks if a bot owner has been set.
@@ -283,7 +674,24 @@ class SQLitePersistence(AbstractPantryPersistence):
                 product_data.get("image_file_id"),
             ),
         )
-        return product_id if success else None
+        if not success:
+            return None
+        self._bump_catalog_version()
+        return product_id
+
+    def get_catalog_version(self) -> int:
+        """
+        Returns a counter that changes whenever products or stock change.
+
+        Returns:
+            int: The current catalog version.
+        """
+        if self.shared_catalog_version:
+            row = self._execute_read_one(
+                "SELECT value FROM system_config WHERE key = 'catalog_version'"
+            )
+            return int(row["value"]) if row else 0
+        return self._catalog_version
 
     async def get_product(self, product_id: str) -> Optional[dict[str, Any]]:
         """
@@ -366,9 +774,12 @@ class SQLitePersistence(AbstractPantryPersistence):
         Returns:
             bool: True if successful, False otherwise.
         """
-        return self._execute_write(
+        success = self._execute_write(
             "UPDATE products SET is_active = 0 WHERE id = ?", (product_id,)
         )
+        if success:
+            self._bump_catalog_version()
+        return success
 
     async def update_product_stock(
         self, product_id: str, quantity_change: int
@@ -403,8 +814,9 @@ class SQLitePersistence(AbstractPantryPersistence):
                     "UPDATE products SET quantity = ? WHERE id = ?",
                     (new_quantity, product_id),
                 )
-                # Transaction commits here automatically
-                return new_quantity
+            # Transaction committed
+            self._bump_catalog_version()
+            return new_quantity
         except sqlite3.Error as e:
             logger.error(f"Error updating stock: {e}")
             return None
@@ -471,6 +883,36 @@ class SQLitePersistence(AbstractPantryPersistence):
         )
         return {row["product_id"]: row["quantity"] for row in rows}
 
+    async def set_cart_quantity(
+        self, user_id: int, product_id: str, quantity: int
+    ) -> bool:
+        """
+        Sets the quantity of a product in the user's cart, removing the line
+        when `quantity` is zero or less.
+
+        Args:
+            user_id (int): The ID of the user.
+            product_id (str): The ID of the product.
+            quantity (int): The new quantity.
+
+        Returns:
+            bool: True if the cart was updated, False otherwise.
+        """
+        if quantity <= 0:
+            return self._execute_write(
+                "DELETE FROM cart_items WHERE user_id = ? AND product_id = ?",
+                (user_id, product_id),
+            )
+        return self._execute_write(
+            """
+            INSERT INTO cart_items (user_id, product_id, quantity)
+            VALUES (?, ?, ?)
+            ON CONFLICT (user_id, product_id) DO UPDATE SET
+                quantity = excluded.quantity
+            """,
+            (user_id, product_id, quantity),
+        )
+
     async def clear_cart(self, user_id: int) -> bool:
         """
         Clears all items from the user's cart.
@@ -485,6 +927,69 @@ class SQLitePersistence(AbstractPantryPersistence):
             "DELETE FROM cart_items WHERE user_id = ?", (user_id,)
         )
 
+    async def reorder(self, user_id: int, order_id: str) -> Optional[dict[str, Any]]:
+        """
+        Copies the items of one of the user's past orders into their cart.
+
+        The copy is a single INSERT ... SELECT ... ON CONFLICT: lines already
+        in the cart are topped up, the resulting quantities (including what
+        was already in the cart) are capped at the current stock, and
+        inactive or out-of-stock products are skipped.
+
+        Args:
+            user_id (int): The ID of the user (must own the order).
+            order_id (str): The ID of the order to repeat.
+
+        Returns:
+            Optional[dict[str, Any]]: {"added": number of cart lines added or
+                                       topped up, "skipped": names of the
+                                       products left out}, or None on failure.
+        """
+        conn = self._get_connection()
+        try:
+            with conn:
+                cursor = conn.cursor()
+                # WHERE before ON CONFLICT keeps the upsert unambiguous
+                cursor.execute(
+                    """
+                    INSERT INTO cart_items (user_id, product_id, quantity)
+                    SELECT o.user_id, oi.product_id, MIN(SUM(oi.quantity), p.quantity)
+                    FROM orders o
+                    JOIN order_items oi ON oi.order_id = o.id
+                    JOIN products p ON p.id = oi.product_id
+                    WHERE o.id = ? AND o.user_id = ?
+                        AND p.is_active = 1 AND p.quantity > 0
+                    GROUP BY oi.product_id
+                    ON CONFLICT (user_id, product_id) DO UPDATE SET
+                        quantity = MIN(
+                            cart_items.quantity + excluded.quantity,
+                            (SELECT quantity FROM products
+                             WHERE id = excluded.product_id)
+                        )
+                    """,
+                    (order_id, user_id),
+                )
+                added = cursor.rowcount
+                cursor.execute(
+                    """
+                    SELECT DISTINCT COALESCE(p.name, oi.product_id) AS name
+                    FROM orders o
+                    JOIN order_items oi ON oi.order_id = o.id
+                    LEFT JOIN products p ON p.id = oi.product_id
+                    WHERE o.id = ? AND o.user_id = ?
+                        AND (p.id IS NULL OR p.is_active = 0 OR p.quantity <= 0)
+                    ORDER BY name
+                    """,
+                    (order_id, user_id),
+                )
+                skipped = [row["name"] for row in cursor.fetchall()]
+            return {"added": added, "skipped": skipped}
+        except sqlite3.Error as e:
+            logger.error(f"Error reordering {order_id} for user {user_id}: {e}")
+            return None
+        finally:
+            conn.close()
+
     # --- Order Management ---
 
     async def create_order(self, user_id: int) -> Optional[str]:
@@ -503,7 +1008,8 @@ class SQLitePersistence(AbstractPantryPersistence):
             # Step A: Fetch Cart
             cursor.execute(
                 """
-                SELECT ci.product_id, ci.quantity, p.price_cents / 100.0 AS price
+                SELECT ci.product_id, ci.quantity, p.price_cents,
+                       p.price_cents / 100.0 AS price
                 FROM cart_items ci
                 JOIN products p ON ci.product_id = p.id
                 WHERE ci.user_id = ?
@@ -522,10 +1028,10 @@ class SQLitePersistence(AbstractPantryPersistence):
             order_id = str(uuid.uuid4())
             cursor.execute(
                 """
-                INSERT INTO orders (id, user_id, total_amount, status)
-                VALUES (?, ?, ?, 'completed')
+                INSERT INTO orders (id, user_id, total_amount, status, seq)
+                VALUES (?, ?, ?, ?, (SELECT COALESCE(MAX(seq), 0) + 1 FROM orders))
                 """,
-                (order_id, user_id, total_amount),
+                (order_id, user_id, total_amount, PENDING),
             )
 
             # Step D: Move Items
@@ -541,7 +1047,20 @@ class SQLitePersistence(AbstractPantryPersistence):
                 order_items_data,
             )
 
-            # Step E: Cleanup
+            # Step E: Update Sales Summaries
+            self._record_sales(cursor, order_id, cart_rows)
+
+            # Step F: Queue the owner's notification (if there is an owner)
+            cursor.execute(
+                """
+                INSERT INTO notification_outbox (order_id, next_attempt_at)
+                SELECT ?, ?
+                WHERE EXISTS (SELECT 1 FROM system_config WHERE key = 'owner_id')
+                """,
+                (order_id, time.time()),
+            )
+
+            # Step G: Cleanup
             cursor.execute("DELETE FROM cart_items WHERE user_id = ?", (user_id,))
 
         return order_id
@@ -558,7 +1077,11 @@ class SQLitePersistence(AbstractPantryPersistence):
         """
         # Get order header
         order_row = self._execute_read_one(
-            "SELECT id, total_amount FROM orders WHERE id = ?", (order_id,)
+            """
+            SELECT id, user_id, total_amount, status, created_at
+            FROM orders WHERE id = ?
+            """,
+            (order_id,),
         )
         if not order_row:
             return None
@@ -584,4 +1107,610 @@ class SQLitePersistence(AbstractPantryPersistence):
             for row in items_rows
         ]
 
-        return {"total_amount": order_row["total_amount"], "items": items}
+        return {**dict(order_row), "items": items}
+
+    async def update_order_status(
+        self,
+        order_id: str,
+        new_status: str,
+        expected_status: Optional[str] = None,
+    ) -> bool:
+        """
+        Moves an order to `new_status` if the fulfilment workflow allows it.
+
+        The check and the write are a single conditional UPDATE, so two owners'
+        taps (or a double tap) can never both apply. Status counts follow via
+        the `trg_orders_status_update` trigger in the same statement, and a
+        cancelled order leaves the sales summaries via `trg_orders_cancel_sales`.
+
+        Args:
+            order_id (str): The ID of the order.
+            new_status (str): The status to move to.
+            expected_status (Optional[str]): If given, only update when the
+                                             order is currently in this status.
+
+        Returns:
+            bool: True if the order was updated, False if the transition is not
+                  allowed, the status changed meanwhile, or the order is missing.
+        """
+        allowed_from = allowed_previous_statuses(new_status)
+        if expected_status is not None:
+            allowed_from = tuple(s for s in allowed_from if s == expected_status)
+        if not allowed_from:
+            return False
+
+        placeholders = ", ".join("?" for _ in allowed_from)
+        conn = self._get_connection()
+        try:
+            with conn:
+                cursor = conn.execute(
+                    f"""
+                    UPDATE orders SET status = ?
+                    WHERE id = ? AND status IN ({placeholders})
+                    """,
+                    (new_status, order_id, *allowed_from),
+                )
+            return cursor.rowcount == 1
+        except sqlite3.Error as e:
+            logger.error(f"Error updating order status: {e}")
+            return False
+        finally:
+            conn.close()
+
+    async def get_order_status_counts(self) -> dict[str, int]:
+        """
+        Retrieves the number of orders in each status.
+
+        Reads the trigger-maintained `order_status_counts` table, so the cost is
+        independent of the number of orders.
+
+        Returns:
+            dict[str, int]: Mapping of status to order count.
+        """
+        rows = self._execute_read_all("SELECT status, count FROM order_status_counts")
+        return {row["status"]: row["count"] for row in rows}
+
+    def _get_orders_page(
+        self,
+        filter_column: Optional[str],
+        filter_value: Any,
+        limit: int,
+        before_seq: Optional[int],
+    ) -> List[dict[str, Any]]:
+        """
+        Fetches one page of order summaries using keyset pagination.
+
+        The page boundary is the (created_at, seq) of the `before_seq` order,
+        so each page is a bounded range scan on an index ending in
+        (created_at, seq) with no OFFSET to skip.
+
+        Args:
+            filter_column (Optional[str]): 'user_id', 'status' or None for all.
+            filter_value (Any): Value the filter column must equal.
+            limit (int): Maximum number of orders to return.
+            before_seq (Optional[int]): seq of the last order on the previous page.
+
+        Returns:
+            List[dict[str, Any]]: Order summaries, newest first.
+        """
+        conditions = []
+        params: list[Any] = []
+        if filter_column:
+            conditions.append(f"o.{filter_column} = ?")
+            params.append(filter_value)
+        if before_seq is not None:
+            conditions.append(
+                "(o.created_at, o.seq) < "
+                "(SELECT created_at, seq FROM orders WHERE seq = ?)"
+            )
+            params.append(before_seq)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+
+        rows = self._execute_read_all(
+            f"""
+            SELECT o.seq AS order_seq, o.id AS id, o.user_id AS user_id,
+                   o.total_amount AS total_amount, o.status AS status,
+                   o.created_at AS created_at,
+                   (SELECT COALESCE(SUM(oi.quantity), 0) FROM order_items oi
+                    WHERE oi.order_id = o.id) AS item_count
+            FROM orders o
+            {where}
+            ORDER BY o.created_at DESC, o.seq DESC
+            LIMIT ?
+            """,
+            tuple(params),
+        )
+        return [dict(row) for row in rows]
+
+    async def get_user_orders(
+        self, user_id: int, limit: int = 10, before_seq: Optional[int] = None
+    ) -> List[dict[str, Any]]:
+        """
+        Retrieves one page of a user's orders, newest first.
+
+        Args:
+            user_id (int): The ID of the user.
+            limit (int): Maximum number of orders to return.
+            before_seq (Optional[int]): order_seq of the last order already shown.
+
+        Returns:
+            List[dict[str, Any]]: Order summaries.
+        """
+        return self._get_orders_page("user_id", user_id, limit, before_seq)
+
+    async def get_all_orders_for_owner(
+        self,
+        status: Optional[str] = None,
+        limit: int = 10,
+        before_seq: Optional[int] = None,
+    ) -> List[dict[str, Any]]:
+        """
+        Retrieves one page of all orders, optionally filtered by status.
+
+        Args:
+            status (Optional[str]): Only return orders with this status.
+            limit (int): Maximum number of orders to return.
+            before_seq (Optional[int]): order_seq of the last order already shown.
+
+        Returns:
+            List[dict[str, Any]]: Order summaries.
+        """
+        return self._get_orders_page(
+            "status" if status else None, status, limit, before_seq
+        )
+
+    def iter_order_export_rows(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        batch_size: int = 1000,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Streams order line items (orders joined with order_items) in date order.
+
+        Rows are fetched in batches of `batch_size` from a dedicated read-only
+        connection, so memory stays bounded regardless of table size. This is
+        a blocking generator; consume it from a worker thread.
+
+        Args:
+            start (Optional[str]): Inclusive lower bound on `created_at`.
+            end (Optional[str]): Exclusive upper bound on `created_at`.
+            batch_size (int): Number of rows fetched per round trip.
+
+        Yields:
+            dict[str, Any]: One export row per order line item.
+        """
+        conditions = []
+        params: list[str] = []
+        if start:
+            conditions.append("o.created_at >= ?")
+            params.append(start)
+        if end:
+            conditions.append("o.created_at < ?")
+            params.append(end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        conn = self._get_read_connection()
+        try:
+            cursor = conn.execute(
+                f"""
+                SELECT o.id AS order_id, o.created_at AS created_at,
+                       o.user_id AS user_id, o.status AS status,
+                       o.total_amount AS total_amount, oi.product_id AS product_id,
+                       p.name AS product_name, oi.quantity AS quantity,
+                       oi.unit_price AS unit_price
+                FROM orders o
+                JOIN order_items oi ON oi.order_id = o.id
+                LEFT JOIN products p ON p.id = oi.product_id
+                {where}
+                ORDER BY o.created_at, o.id
+                """,
+                params,
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    def iter_order_lines(
+        self, after_seq: int = 0, batch_size: int = 1000
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Streams order line items for analytics, in insertion order, leaving
+        out cancelled orders.
+
+        Orders are keyed by their stored sequence number (`orders.seq`, exposed
+        as `order_seq`), which only grows and survives VACUUM, so a caller can
+        resume from the last sequence it has seen instead of
+        rescanning the whole table. This is a blocking generator; consume it
+        from a worker thread.
+
+        Args:
+            after_seq (int): Only return lines for orders with a greater seq.
+            batch_size (int): Number of rows fetched per round trip.
+
+        Yields:
+            dict[str, Any]: Rows with order_seq, order_id, created_at, product_id,
+                            category, quantity and unit_price.
+        """
+        conn = self._get_read_connection()
+        try:
+            cursor = conn.execute(
+                """
+                SELECT o.seq AS order_seq, o.id AS order_id,
+                       o.created_at AS created_at, oi.product_id AS product_id,
+                       p.category AS category, oi.quantity AS quantity,
+                       oi.unit_price AS unit_price
+                FROM orders o
+                JOIN order_items oi ON oi.order_id = o.id
+                LEFT JOIN products p ON p.id = oi.product_id
+                WHERE o.seq > ? AND o.status != 'cancelled'
+                ORDER BY o.seq
+                """,
+                (after_seq,),
+            )
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            conn.close()
+
+    # --- Sales Summaries ---
+
+    async def get_daily_sales(self, days: int) -> List[dict[str, Any]]:
+        """
+        Retrieves the per-day sales summary for the last `days` days.
+
+        Reads only the materialized `sales_daily` rows, so the cost depends on
+        the number of days, not the number of orders.
+
+        Args:
+            days (int): Number of days to include, counting today.
+
+        Returns:
+            List[dict[str, Any]]: Rows with day, order_count, units, revenue_cents
+                                  and revenue (float), newest first. Days with
+                                  no sales are omitted.
+        """
+        rows = self._execute_read_all(
+            """
+            SELECT day, order_count, units, revenue_cents
+            FROM sales_daily
+            WHERE day >= date('now', ?) AND order_count > 0
+            ORDER BY day DESC
+            """,
+            (f"-{days - 1} days",),
+        )
+        return [{**dict(row), "revenue": row["revenue_cents"] / 100.0} for row in rows]
+
+    async def get_top_products(self, days: int, limit: int) -> List[dict[str, Any]]:
+        """
+        Retrieves the best-selling products over the last `days` days.
+
+        Args:
+            days (int): Number of days to include, counting today.
+            limit (int): Maximum number of products to return.
+
+        Returns:
+            List[dict[str, Any]]: Rows with product_id, name, units, order_count,
+                                  revenue_cents and revenue (float), by units sold.
+        """
+        rows = self._execute_read_all(
+            """
+            SELECT s.product_id AS product_id, p.name AS name,
+                   SUM(s.units) AS units, SUM(s.order_count) AS order_count,
+                   SUM(s.revenue_cents) AS revenue_cents
+            FROM sales_daily_product s
+            LEFT JOIN products p ON p.id = s.product_id
+            WHERE s.day >= date('now', ?)
+            GROUP BY s.product_id
+            HAVING SUM(s.order_count) > 0
+            ORDER BY units DESC, revenue_cents DESC
+            LIMIT ?
+            """,
+            (f"-{days - 1} days", limit),
+        )
+        return [{**dict(row), "revenue": row["revenue_cents"] / 100.0} for row in rows]
+
+    # --- Pending Deletion Ledger ---
+
+    async def add_pending_deletions(
+        self, entries: List[tuple[int, int, float]]
+    ) -> bool:
+        """
+        Records messages scheduled for deletion, in a single transaction.
+
+        Args:
+            entries (List[tuple[int, int, float]]): (chat_id, message_id, due_at)
+                                                    tuples; due_at is a Unix time.
+
+        Returns:
+            bool: True if the entries were written.
+        """
+        return self._execute_write_many(
+            """
+            INSERT INTO pending_deletions (chat_id, message_id, due_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT (chat_id, message_id) DO UPDATE SET due_at = excluded.due_at
+            """,
+            entries,
+        )
+
+    async def get_pending_deletions(self, since: float) -> List[tuple[int, int, float]]:
+        """
+        Retrieves recorded deletions due at or after `since`, soonest first.
+
+        Args:
+            since (float): Unix time; older entries are ignored.
+
+        Returns:
+            List[tuple[int, int, float]]: (chat_id, message_id, due_at) tuples.
+        """
+        rows = self._execute_read_all(
+            """
+            SELECT chat_id, message_id, due_at
+            FROM pending_deletions
+            WHERE due_at >= ?
+            ORDER BY due_at
+            """,
+            (since,),
+        )
+        return [tuple(row) for row in rows]
+
+    async def remove_pending_deletions(self, entries: List[tuple[int, int]]) -> bool:
+        """
+        Removes executed deletions from the ledger, in a single transaction.
+
+        Args:
+            entries (List[tuple[int, int]]): (chat_id, message_id) tuples.
+
+        Returns:
+            bool: True if the entries were removed.
+        """
+        return self._execute_write_many(
+            "DELETE FROM pending_deletions WHERE chat_id = ? AND message_id = ?",
+            entries,
+        )
+
+    async def purge_pending_deletions(self, before: float) -> bool:
+        """
+        Drops ledger entries due before `before` (e.g. too old to delete).
+
+        Args:
+            before (float): Unix time.
+
+        Returns:
+            bool: True if the purge succeeded.
+        """
+        return self._execute_write(
+            "DELETE FROM pending_deletions WHERE due_at < ?", (before,)
+        )
+
+    # --- Notification Outbox ---
+
+    async def get_due_notifications(
+        self, now: float, limit: int
+    ) -> List[dict[str, Any]]:
+        """
+        Retrieves outbox entries due by `now`, with their orders, oldest first.
+
+        Args:
+            now (float): Unix time.
+            limit (int): Maximum number of entries.
+
+        Returns:
+            List[dict[str, Any]]: Entries with id, attempts and order (as
+                                  returned by `get_order`).
+        """
+        rows = self._execute_read_all(
+            """
+            SELECT n.id AS outbox_id, n.attempts, o.id, o.user_id,
+                   o.total_amount, o.status, o.created_at
+            FROM notification_outbox n
+            JOIN orders o ON n.order_id = o.id
+            WHERE n.next_attempt_at <= ?
+            ORDER BY n.next_attempt_at, n.id
+            LIMIT ?
+            """,
+            (now, limit),
+        )
+        if not rows:
+            return []
+
+        # One query for the items of the whole batch
+        order_ids = [row["id"] for row in rows]
+        placeholders = ", ".join("?" * len(order_ids))
+        items: dict[str, list[dict[str, Any]]] = {}
+        for item in self._execute_read_all(
+            f"""
+            SELECT oi.order_id, oi.quantity, oi.unit_price, p.name
+            FROM order_items oi
+            JOIN products p ON oi.product_id = p.id
+            WHERE oi.order_id IN ({placeholders})
+            """,
+            tuple(order_ids),
+        ):
+            items.setdefault(item["order_id"], []).append(
+                {
+                    "name": item["name"],
+                    "quantity": item["quantity"],
+                    "unit_price": item["unit_price"],
+                }
+            )
+
+        notifications = []
+        for row in rows:
+            order = dict(row)
+            outbox_id = order.pop("outbox_id")
+            attempts = order.pop("attempts")
+            order["items"] = items.get(order["id"], [])
+            notifications.append(
+                {"id": outbox_id, "attempts": attempts, "order": order}
+            )
+        return notifications
+
+    async def reschedule_notifications(self, entries: List[tuple[int, float]]) -> bool:
+        """
+        Records a failed delivery attempt for outbox entries, in one transaction.
+
+        Args:
+            entries (List[tuple[int, float]]): (id, next_attempt_at) tuples.
+
+        Returns:
+            bool: True if the entries were updated.
+        """
+        return self._execute_write_many(
+            """
+            UPDATE notification_outbox
+            SET attempts = attempts + 1, next_attempt_at = ?
+            WHERE id = ?
+            """,
+            [(next_attempt_at, outbox_id) for outbox_id, next_attempt_at in entries],
+        )
+
+    async def remove_notifications(self, ids: List[int]) -> bool:
+        """
+        Removes delivered outbox entries, in a single transaction.
+
+        Args:
+            ids (List[int]): Outbox entry IDs.
+
+        Returns:
+            bool: True if the entries were removed.
+        """
+        return self._execute_write_many(
+            "DELETE FROM notification_outbox WHERE id = ?",
+            [(outbox_id,) for outbox_id in ids],
+        )
+
+    # --- Broadcasts ---
+
+    async def create_broadcast(
+        self, text: str, report_chat_id: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Records a new broadcast to all active customers.
+
+        Args:
+            text (str): The message to send.
+            report_chat_id (Optional[int]): Where to report progress.
+
+        Returns:
+            Optional[int]: The broadcast ID, or None on failure.
+        """
+        try:
+            with self._get_connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO broadcasts (text, report_chat_id) VALUES (?, ?)",
+                    (text, report_chat_id),
+                )
+                return cursor.lastrowid
+        except sqlite3.Error as e:
+            logger.error(f"Error creating broadcast: {e}")
+            return None
+
+    async def get_running_broadcasts(self) -> List[dict[str, Any]]:
+        """
+        Retrieves broadcasts that have not finished, oldest first.
+
+        Returns:
+            List[dict[str, Any]]: Broadcast rows (id, text, last_user_id, sent,
+                                  failed, blocked, report_chat_id).
+        """
+        rows = self._execute_read_all("""
+            SELECT id, text, last_user_id, sent, failed, blocked, report_chat_id
+            FROM broadcasts
+            WHERE status = 'running'
+            ORDER BY id
+            """)
+        return [dict(row) for row in rows]
+
+    async def get_broadcast_recipients(
+        self, after_user_id: int, limit: int
+    ) -> List[int]:
+        """
+        Retrieves the next page of active users, by user ID (keyset pagination).
+
+        The bot owner is not a recipient.
+
+        Args:
+            after_user_id (int): Only users with a greater ID are returned.
+            limit (int): Page size.
+
+        Returns:
+            List[int]: User IDs in ascending order.
+        """
+        rows = self._execute_read_all(
+            """
+            SELECT id FROM users
+            WHERE id > ? AND is_active = 1
+              AND id IS NOT (
+                  SELECT CAST(value AS INTEGER) FROM system_config
+                  WHERE key = 'owner_id'
+              )
+            ORDER BY id
+            LIMIT ?
+            """,
+            (after_user_id, limit),
+        )
+        return [row["id"] for row in rows]
+
+    async def save_broadcast_progress(
+        self,
+        broadcast_id: int,
+        last_user_id: int,
+        sent: int,
+        failed: int,
+        blocked_user_ids: List[int],
+        finished: bool = False,
+    ) -> bool:
+        """
+        Records a finished page of a broadcast, in a single transaction.
+
+        Users who blocked the bot are marked inactive in the same transaction.
+
+        Args:
+            broadcast_id (int): The broadcast.
+            last_user_id (int): The last recipient of the page.
+            sent (int): Messages delivered in the page.
+            failed (int): Messages that failed for other reasons.
+            blocked_user_ids (List[int]): Recipients who blocked the bot.
+            finished (bool): Whether this was the last page.
+
+        Returns:
+            bool: True if the progress was saved.
+        """
+        try:
+            with self._get_connection() as conn:
+                conn.execute(
+                    """
+                    UPDATE broadcasts
+                    SET last_user_id = ?, sent = sent + ?, failed = failed + ?,
+                        blocked = blocked + ?, status = ?
+                    WHERE id = ?
+                    """,
+                    (
+                        last_user_id,
+                        sent,
+                        failed,
+                        len(blocked_user_ids),
+                        "done" if finished else "running",
+                        broadcast_id,
+                    ),
+                )
+                conn.executemany(
+                    "UPDATE users SET is_active = 0 WHERE id = ?",
+                    [(user_id,) for user_id in blocked_user_ids],
+                )
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error saving broadcast {broadcast_id} progress: {e}")
+            return False
@@ -1,3 +1,6 @@
+import html
+
+
 class Strings:
     class General:
         @staticmethod
@@ -19,6 +22,7 @@ class Strings:
 🛒 <b>Shopping</b>
 /shop - Browse our inventory
 /cart - View your shopping cart
+/orders - View your past orders
 /checkout - Place your order
 
 ⚙️ <b>General</b>
@@ -27,9 +31,16 @@ class Strings:
 
 🔑 <b>Owner Only</b>
 /addproduct - Add a new item to the shop
+/sales - Sales summary for today and the last 7 days
+/report - Revenue by hour, basket size and category mix
+/exportorders [from] [to] - Export orders as CSV (dates as YYYY-MM-DD)
+/broadcast &lt;text&gt; - Send an announcement to all customers
 /set_owner - Claim bot ownership
 """
 
+    class Flood:
+        SLOW_DOWN = "Whoa, that's a lot of taps! Please slow down a little."
+
     class Error:
         UNKNOWN_COMMAND = "Sorry, I didn't understand that. Please use /start to begin or /shop to browse the menu."
 
@@ -138,6 +149,8 @@ class Strings:
         EMPTY = "Your cart is empty."
         CLEAR_BTN = "Clear Cart"
         CLEARED = "Cart cleared."
+        INC_BTN = "➕"
+        DEC_BTN = "➖"
         CHECKOUT_ERROR_EMPTY = "Cannot place order. Is your cart empty?"
         RECEIPT_HEADER = "✅ Order Placed Successfully!"
         RECEIPT_FOOTER = "Thank you!"
@@ -150,6 +163,10 @@ class Strings:
         def total_line(total: float) -> str:
             return f"Total: ${total:.2f}"
 
+        @staticmethod
+        def remove_btn(name: str) -> str:
+            return f"🗑 {name}"
+
         @staticmethod
         def receipt_item(name: str, qty: int, price: float) -> str:
             return f"- {name} x {qty} @ ${price:.2f}"
@@ -159,6 +176,70 @@ class Strings:
             return f"<b>Total: ${total:.2f}</b>"
 
     class Order:
+        HISTORY_HEADER = "📜 <b>Your Orders</b>"
+        OWNER_HEADER = "📋 <b>All Orders</b>"
+        NO_ORDERS = "You haven't placed any orders yet."
+        OWNER_NO_ORDERS = "No orders found."
+        NEXT_PAGE_BTN = "Older ▶️"
+        FIRST_PAGE_BTN = "⏮ Newest"
+        CANCEL_ORDER_BTN = "✖ Cancel"
+        STATUS_UPDATE_FAILED = "That order has already moved on. Refreshing the queue."
+        REORDER_NOTHING = "None of those products are available right now."
+        REORDER_ERROR = "❌ Could not reorder. Please try again."
+
+        @staticmethod
+        def status_tab(status: str, count: int) -> str:
+            return f"{status.title()} ({count})"
+
+        @staticmethod
+        def advance_btn(order_id: str, new_status: str) -> str:
+            return f"#{order_id[:8]} → {new_status.title()}"
+
+        @staticmethod
+        def reorder_btn(order_id: str) -> str:
+            return f"🔁 Reorder #{order_id[:8]}"
+
+        @staticmethod
+        def reorder_done(added: int, skipped: list[str]) -> str:
+            text = f"Added {added} products to your cart."
+            if skipped:
+                text += f"\nUnavailable: {', '.join(skipped)}"
+            # Alerts are cut off at 200 characters
+            return text if len(text) <= 200 else text[:199] + "…"
+
+        @staticmethod
+        def status_updated(order_id: str, new_status: str) -> str:
+            return f"Order #{order_id[:8]} is now {new_status}."
+
+        @staticmethod
+        def owner_status_header(status: str) -> str:
+            return f"📋 <b>Orders: {status.title()}</b>"
+
+        @staticmethod
+        def order_line(
+            order_id: str, created_at: str, item_count: int, total: float, status: str
+        ) -> str:
+            return (
+                f"<code>#{order_id[:8]}</code> • {created_at[:16]} • "
+                f"{item_count} items • ${total:.2f} • {status}"
+            )
+
+        @staticmethod
+        def notification_digest(
+            count: int, total: float, since: str, items: list[tuple[str, int]]
+        ) -> str:
+            # Keeps a busy promotion's digest well inside a message
+            shown = items[:15]
+            lines = [
+                f"🔔 {count} New Order{'' if count == 1 else 's'} since {since}",
+                f"Total: ${total:.2f}",
+                "Items:",
+                *(f"- {name} x {quantity}" for name, quantity in shown),
+            ]
+            if len(items) > len(shown):
+                lines.append(f"…and {len(items) - len(shown)} more products")
+            return "\n".join(lines)
+
         @staticmethod
         def notification_new(
             user_id: int, order_id: str, items_summary: str, total: float
@@ -170,3 +251,80 @@ class Strings:
                 f"{items_summary}\n"
                 f"Total: ${total:.2f}"
             )
+
+    class Export:
+        INVALID_DATES = (
+            "Usage: /exportorders [from] [to]\n"
+            "Dates must be YYYY-MM-DD, and 'from' must not be after 'to'."
+        )
+        NO_ORDERS = "No orders found for that period."
+        FAILED = "❌ Could not build the export. Please try again."
+
+        @staticmethod
+        def caption(row_count: int) -> str:
+            return f"📦 Order export: {row_count} line items."
+
+    class Sales:
+        HEADER = "📊 <b>Sales Summary</b>"
+        TOP_HEADER = "🏆 <b>Top Sellers (7 days)</b>"
+        NO_TOP_SELLERS = "No sales yet."
+        UNKNOWN_PRODUCT = "Unknown product"
+
+        @staticmethod
+        def period_line(label: str, orders: int, units: int, revenue: float) -> str:
+            return f"<b>{label}:</b> {orders} orders, {units} units, ${revenue:.2f}"
+
+        @staticmethod
+        def top_seller_line(rank: int, name: str, units: int, revenue: float) -> str:
+            # Sent as HTML; product names are owner-entered text
+            return f"{rank}. {html.escape(name)} — {units} units (${revenue:.2f})"
+
+    class Broadcast:
+        USAGE = "Usage: /broadcast <text>\nSends the text to every customer."
+        FAILED = "Could not start the broadcast. Please try again later."
+
+        @staticmethod
+        def started(broadcast_id: int) -> str:
+            return (
+                f"📣 Broadcast #{broadcast_id} started. "
+                "I will report here when it is done."
+            )
+
+        @staticmethod
+        def finished(
+            broadcast_id: int,
+            sent: int,
+            failed: int,
+            blocked: int,
+            elapsed: float,
+            rate: float,
+        ) -> str:
+            return (
+                f"📣 Broadcast #{broadcast_id} finished.\n"
+                f"Delivered: {sent}\n"
+                f"Failed: {failed}\n"
+                f"Blocked the bot: {blocked}\n"
+                f"Took {elapsed:.0f}s ({rate:.1f} messages/s)"
+            )
+
+    class Report:
+        HEADER = "📈 <b>Sales Report</b>"
+        NO_DATA = "No orders yet, so there is nothing to report."
+        HOURS_HEADER = "<b>Revenue by hour (UTC):</b>"
+        CATEGORIES_HEADER = "<b>Category mix:</b>"
+
+        @staticmethod
+        def basket_line(orders: int, units: float, revenue: float) -> str:
+            return (
+                f"<b>Orders:</b> {orders}\n"
+                f"<b>Average basket:</b> {units:.1f} units, ${revenue:.2f}"
+            )
+
+        @staticmethod
+        def hour_line(hour: int, revenue: float) -> str:
+            return f"{hour:02d}:00 — ${revenue:.2f}"
+
+        @staticmethod
+        def category_line(name: str, revenue: float, share: float) -> str:
+            # Sent as HTML; category names are owner-entered text
+            return f"{html.escape(name)}: ${revenue:.2f} ({share:.0%})"
@@ -0,0 +1,22 @@
+from .broadcast import BroadcastService
+from .deletion import DeletionService
+from .notifier import OwnerNotifier
+from .outbound import OutboundScheduler, Priority
+from .rate_limit import TokenBucket
+from .sharding import ShardedDispatcher
+from .timing_wheel import TimingWheel
+from .update_processor import ChatOrderedUpdateProcessor
+from .user_activity import UserActivityTracker
+
+__all__ = [
+    "BroadcastService",
+    "ChatOrderedUpdateProcessor",
+    "DeletionService",
+    "OutboundScheduler",
+    "OwnerNotifier",
+    "Priority",
+    "ShardedDispatcher",
+    "TimingWheel",
+    "TokenBucket",
+    "UserActivityTracker",
+]
@@ -0,0 +1,55 @@
+"""
+Start/stop bookkeeping for a service's long-running background coroutine.
+"""
+
+import asyncio
+import logging
+from typing import Any, Callable, Coroutine, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundTask:
+    """
+    Runs `factory()` as a task on the event loop until stopped.
+
+    Starting is idempotent; stopping cancels the task and waits for it, so a
+    service can release resources right after `await stop()`. A task that
+    dies with an exception is logged when it dies, not when it is stopped.
+    """
+
+    def __init__(self, factory: Callable[[], Coroutine[Any, Any, None]]):
+        self._factory = factory
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> bool:
+        """
+        Starts the task on the running event loop, unless it is running.
+
+        Returns:
+            bool: Whether the task was started by this call.
+        """
+        if self._task is not None:
+            return False
+        self._task = asyncio.get_running_loop().create_task(self._factory())
+        self._task.add_done_callback(self._done)
+        return True
+
+    @staticmethod
+    def _done(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(
+                f"Background task {task.get_name()} died", exc_info=task.exception()
+            )
+
+    async def stop(self) -> None:
+        """Cancels the task and waits until it has finished."""
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        await asyncio.wait([task])
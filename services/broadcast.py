@@ -0,0 +1,219 @@
+"""
+Owner announcements to every customer, paced and resumable.
+
+A broadcast walks the users table in pages ordered by user id. Each page is
+fanned out to a small pool of worker coroutines that send at background
+priority, so `OutboundScheduler` keeps them within the global and per-chat
+limits and behind anything a customer is waiting for. After each page:
+
+* the cursor (the page's last user id) and the page's counters are saved in
+  one transaction, so a restart resumes after the last finished page. A page
+  cut short by a restart is sent again from its start (at-least-once);
+* recipients who blocked the bot (`Forbidden`) are marked inactive in the
+  same transaction, so later broadcasts skip them.
+
+When the last page is done the owner gets a report with the counts and the
+delivery rate.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from telegram import Bot
+from telegram.error import Forbidden, TelegramError
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+from .outbound import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+WORKERS = 8
+PAGE_SIZE = 100
+
+
+@dataclass
+class PageResult:
+    """Outcome of sending one page of a broadcast."""
+
+    sent: int = 0
+    failed: int = 0
+    blocked: list[int] = field(default_factory=list)
+
+
+@dataclass
+class BroadcastStats:
+    """Counters across all broadcasts run by this process."""
+
+    sent: int = 0
+    failed: int = 0
+    blocked: int = 0
+    pages: int = 0
+    finished: int = 0
+
+
+class BroadcastService:
+    """
+    Runs broadcasts in the background, one task per broadcast.
+
+    Attributes:
+        bot (Bot): Bot used for the API calls.
+        persistence (AbstractPantryPersistence): Broadcast and user storage.
+        stats (BroadcastStats): Running counters.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        persistence: AbstractPantryPersistence,
+        workers: int = WORKERS,
+        page_size: int = PAGE_SIZE,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.bot = bot
+        self.persistence = persistence
+        self.workers = workers
+        self.page_size = page_size
+        self.stats = BroadcastStats()
+        self._clock = clock
+        self._tasks: dict[int, asyncio.Task] = {}
+
+    async def start(self, text: str, report_chat_id: int) -> Optional[int]:
+        """
+        Records a broadcast of `text` and starts sending it.
+
+        Returns:
+            Optional[int]: The broadcast ID, or None if it could not be recorded.
+        """
+        broadcast_id = await self.persistence.create_broadcast(text, report_chat_id)
+        if broadcast_id is None:
+            return None
+        self._launch(
+            {
+                "id": broadcast_id,
+                "text": text,
+                "last_user_id": 0,
+                "sent": 0,
+                "failed": 0,
+                "blocked": 0,
+                "report_chat_id": report_chat_id,
+            }
+        )
+        return broadcast_id
+
+    async def resume(self) -> int:
+        """
+        Restarts the broadcasts interrupted by a shutdown.
+
+        Returns:
+            int: The number of broadcasts resumed.
+        """
+        resumed = 0
+        for broadcast in await self.persistence.get_running_broadcasts():
+            if broadcast["id"] not in self._tasks:
+                logger.info(
+                    f"Resuming broadcast {broadcast['id']} after user "
+                    f"{broadcast['last_user_id']}."
+                )
+                self._launch(broadcast)
+                resumed += 1
+        return resumed
+
+    def _launch(self, broadcast: dict[str, Any]) -> None:
+        task = asyncio.get_running_loop().create_task(self._run(broadcast))
+        self._tasks[broadcast["id"]] = task
+        task.add_done_callback(lambda _: self._tasks.pop(broadcast["id"], None))
+
+    async def stop(self) -> None:
+        """Stops the running broadcasts; they resume from their last saved page."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, broadcast: dict[str, Any]) -> None:
+        broadcast_id = broadcast["id"]
+        cursor = broadcast["last_user_id"]
+        totals = {key: broadcast[key] for key in ("sent", "failed", "blocked")}
+        started = self._clock()
+        delivered = 0
+        try:
+            with priority(Priority.BACKGROUND):
+                while True:
+                    page = await self.persistence.get_broadcast_recipients(
+                        cursor, self.page_size
+                    )
+                    result = await self._send_page(broadcast["text"], page)
+                    if page:
+                        cursor = page[-1]
+                    finished = len(page) < self.page_size
+                    await self.persistence.save_broadcast_progress(
+                        broadcast_id,
+                        cursor,
+                        result.sent,
+                        result.failed,
+                        result.blocked,
+                        finished=finished,
+                    )
+                    totals["sent"] += result.sent
+                    totals["failed"] += result.failed
+                    totals["blocked"] += len(result.blocked)
+                    delivered += result.sent
+                    self.stats.pages += 1
+                    if finished:
+                        break
+
+                elapsed = self._clock() - started
+                rate = delivered / elapsed if elapsed > 0 else 0.0
+                self.stats.finished += 1
+                logger.info(
+                    f"Broadcast {broadcast_id} finished: {totals['sent']} sent, "
+                    f"{totals['failed']} failed, {totals['blocked']} blocked, "
+                    f"{rate:.1f} msg/s."
+                )
+                if broadcast["report_chat_id"] is not None:
+                    await self.bot.send_message(
+                        chat_id=broadcast["report_chat_id"],
+                        text=Strings.Broadcast.finished(
+                            broadcast_id,
+                            totals["sent"],
+                            totals["failed"],
+                            totals["blocked"],
+                            elapsed,
+                            rate,
+                        ),
+                    )
+        except Exception:
+            # Left as running; the next start resumes it
+            logger.exception(f"Broadcast {broadcast_id} stopped unexpectedly.")
+
+    async def _send_page(self, text: str, user_ids: list[int]) -> PageResult:
+        """Sends `text` to `user_ids` from a pool of worker coroutines."""
+        result = PageResult()
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for user_id in user_ids:
+            queue.put_nowait(user_id)
+
+        async def worker() -> None:
+            while not queue.empty():
+                user_id = queue.get_nowait()
+                try:
+                    await self.bot.send_message(chat_id=user_id, text=text)
+                except Forbidden:
+                    result.blocked.append(user_id)
+                except TelegramError as e:
+                    logger.warning(f"Broadcast to user {user_id} failed: {e}")
+                    result.failed += 1
+                else:
+                    result.sent += 1
+
+        await asyncio.gather(
+            *(worker() for _ in range(min(self.workers, len(user_ids))))
+        )
+        self.stats.sent += result.sent
+        self.stats.failed += result.failed
+        self.stats.blocked += len(result.blocked)
+        return result
@@ -0,0 +1,165 @@
+"""
+Coalescing message-deletion service.
+
+Handlers schedule a lot of short-lived messages for cleanup (prompts, menus,
+user commands). Scheduling each one as its own JobQueue job costs a scheduler
+job plus a `delete_message` call per message. `DeletionService` instead puts
+each deletion on the shared `TimingWheel`. Messages that come due are
+buffered per chat, and the next tick deletes a chat's whole batch with one
+`delete_messages` call (up to `MAX_IDS_PER_CALL` IDs each).
+
+With a persistence layer attached, pending deletions are also written to a
+ledger so a restart does not strand them. New entries are saved in one batch
+per tick and executed ones are removed in one batch per flush. On startup
+`restore` reads the ledger back and re-schedules what is left.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from telegram import Bot
+from telegram.error import TelegramError
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from .outbound import Priority, priority
+from .timing_wheel import TimingWheel
+
+logger = logging.getLogger(__name__)
+
+# Bot API limit for deleteMessages
+MAX_IDS_PER_CALL = 100
+# Bots cannot delete messages older than 48 hours, so older entries are dropped
+MAX_DELETABLE_AGE = 48 * 60 * 60
+
+
+@dataclass
+class DeletionStats:
+    """Counters describing what the service saved compared to one job per message."""
+
+    scheduled: int = 0
+    deleted: int = 0
+    api_calls: int = 0
+    flushes: int = 0
+    restored: int = 0
+
+    @property
+    def api_calls_avoided(self) -> int:
+        """`delete_message` calls that were folded into bulk calls."""
+        return self.deleted - self.api_calls
+
+    @property
+    def jobs_avoided(self) -> int:
+        """Scheduler jobs that `run_once` would have created; the wheel uses none."""
+        return self.scheduled
+
+
+class DeletionService:
+    """
+    Buffers due deletions per chat and flushes them in bulk.
+
+    Attributes:
+        bot (Bot): Bot used for the API calls.
+        wheel (TimingWheel): Timer source for the delays.
+        persistence (Optional[AbstractPantryPersistence]): Ledger storage, if any.
+        stats (DeletionStats): Running counters.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        wheel: TimingWheel,
+        persistence: Optional[AbstractPantryPersistence] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bot = bot
+        self.wheel = wheel
+        self.persistence = persistence
+        self.stats = DeletionStats()
+        self._clock = clock
+        self._due: dict[int, list[int]] = defaultdict(list)
+        self._unsaved: list[tuple[int, int, float]] = []
+
+    def schedule(self, chat_id: int, message_id: int, delay: float) -> None:
+        """Queues `message_id` in `chat_id` for deletion after `delay` seconds."""
+        self.wheel.schedule_soon(self._mark_due, delay, chat_id, message_id)
+        self.stats.scheduled += 1
+        if self.persistence is not None:
+            if not self._unsaved:
+                self.wheel.schedule_soon(self._save, 0)
+            self._unsaved.append((chat_id, message_id, self._clock() + delay))
+
+    async def _save(self) -> None:
+        entries, self._unsaved = self._unsaved, []
+        await self.persistence.add_pending_deletions(entries)
+
+    async def restore(self) -> int:
+        """
+        Re-schedules deletions recorded in the ledger before a restart.
+
+        Entries that are already due run on the next tick; entries too old for
+        the Bot API to delete are purged.
+
+        Returns:
+            int: The number of deletions restored.
+        """
+        if self.persistence is None:
+            return 0
+        now = self._clock()
+        oldest = now - MAX_DELETABLE_AGE
+        await self.persistence.purge_pending_deletions(before=oldest)
+        entries = await self.persistence.get_pending_deletions(since=oldest)
+        for chat_id, message_id, due_at in entries:
+            self.wheel.schedule_soon(
+                self._mark_due, max(0.0, due_at - now), chat_id, message_id
+            )
+        self.stats.restored += len(entries)
+        if entries:
+            logger.info(f"Restored {len(entries)} pending message deletions.")
+        return len(entries)
+
+    def _mark_due(self, chat_id: int, message_id: int) -> None:
+        if not self._due:
+            # First message of a new batch: flush on the next tick, so every
+            # deletion that expires in this tick joins the same call
+            self.wheel.schedule_soon(self.flush, 0)
+        self._due[chat_id].append(message_id)
+
+    async def flush(self) -> int:
+        """
+        Deletes every due message, one bulk call per chat and 100 IDs.
+
+        Returns:
+            int: The number of messages whose deletion was attempted.
+        """
+        due, self._due = self._due, defaultdict(list)
+        self.stats.flushes += 1
+        count = 0
+        for chat_id, message_ids in due.items():
+            for start in range(0, len(message_ids), MAX_IDS_PER_CALL):
+                chunk = message_ids[start : start + MAX_IDS_PER_CALL]
+                self.stats.api_calls += 1
+                self.stats.deleted += len(chunk)
+                count += len(chunk)
+                try:
+                    # Cleanup can wait for every message users are waiting on
+                    with priority(Priority.BACKGROUND):
+                        await self.bot.delete_messages(
+                            chat_id=chat_id, message_ids=chunk
+                        )
+                except TelegramError as e:
+                    # Messages the user already removed are skipped by Telegram;
+                    # anything else (e.g. a blocked bot) is not worth retrying
+                    logger.debug(f"Bulk delete in chat {chat_id} failed: {e}")
+
+        if self.persistence is not None and count:
+            await self.persistence.remove_pending_deletions(
+                [
+                    (chat_id, message_id)
+                    for chat_id, message_ids in due.items()
+                    for message_id in message_ids
+                ]
+            )
+        return count
@@ -0,0 +1,266 @@
+"""
+Background delivery of the owner's new-order notifications.
+
+Checkout used to send the owner's notification inline, which put an extra
+Bot API round trip on the customer's checkout path and lost the message if
+the call failed or the process died. Now `create_order` writes a row to the
+notification outbox in the same transaction as the order, and
+`OwnerNotifier` delivers the outbox in the background:
+
+* It reads due entries in batches (one query for the entries and their
+  orders, one for their items), sends them at background priority and
+  removes the delivered ones in one write.
+* A failed send is retried later with exponential backoff, capped at
+  `MAX_BACKOFF`. Entries are only removed once delivered.
+* It polls every `interval` seconds. `wake()` makes it check right away,
+  so a checkout does not wait for the next poll. Entries left over from
+  before a restart go out on the first poll, and a database error only
+  skips the current poll.
+
+During a burst one message per order spends rate-limit budget and buries
+the owner's chat. Once `digest_threshold` orders were notified within
+`digest_window` seconds, further orders go into a single digest message
+(order count, total and an item roll-up) that is edited in place as more
+orders arrive. When the window closes, the next order starts a new
+digest, or goes out on its own again if the burst is over.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Optional
+
+from telegram import Bot
+from telegram.error import TelegramError
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+from .background import BackgroundTask
+from .outbound import Priority, priority
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 5.0
+BATCH_SIZE = 20
+BACKOFF_BASE = 5.0
+MAX_BACKOFF = 15 * 60.0
+DIGEST_THRESHOLD = 5
+DIGEST_WINDOW = 120.0
+
+
+def format_new_order(order: dict[str, Any]) -> str:
+    """The owner's notification text for `order` (as returned by `get_order`)."""
+    item_lines = ["Items:"]
+    for item in order["items"]:
+        item_lines.append(f"- {item['name']} x {item['quantity']}")
+    return Strings.Order.notification_new(
+        order["user_id"], order["id"], "\n".join(item_lines), order["total_amount"]
+    )
+
+
+def backoff(attempts: int) -> float:
+    """Seconds to wait before retrying an entry that failed `attempts` + 1 times."""
+    return min(BACKOFF_BASE * 2**attempts, MAX_BACKOFF)
+
+
+@dataclass
+class Digest:
+    """Orders merged into one owner message during a burst."""
+
+    started_at: float
+    message_id: Optional[int] = None
+    count: int = 0
+    total: float = 0.0
+    items: Counter = field(default_factory=Counter)
+
+    def with_orders(self, orders: list[dict[str, Any]]) -> "Digest":
+        """A copy of the digest with `orders` added."""
+        items = Counter(self.items)
+        for order in orders:
+            for item in order["items"]:
+                items[item["name"]] += item["quantity"]
+        return replace(
+            self,
+            count=self.count + len(orders),
+            total=self.total + sum(order["total_amount"] for order in orders),
+            items=items,
+        )
+
+    def text(self) -> str:
+        since = time.strftime("%H:%M", time.localtime(self.started_at))
+        return Strings.Order.notification_digest(
+            self.count, self.total, since, self.items.most_common()
+        )
+
+
+@dataclass
+class NotifierStats:
+    """Counters for the outbox worker."""
+
+    delivered: int = 0
+    failed: int = 0
+    batches: int = 0
+    digested: int = 0
+    digest_messages: int = 0
+    digest_edits: int = 0
+
+
+class OwnerNotifier:
+    """
+    Delivers the notification outbox to the owner in the background.
+
+    Attributes:
+        bot (Bot): Bot used for the API calls.
+        persistence (AbstractPantryPersistence): Outbox storage.
+        stats (NotifierStats): Running counters.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        persistence: AbstractPantryPersistence,
+        interval: float = POLL_INTERVAL,
+        batch_size: int = BATCH_SIZE,
+        digest_threshold: int = DIGEST_THRESHOLD,
+        digest_window: float = DIGEST_WINDOW,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.bot = bot
+        self.persistence = persistence
+        self.interval = interval
+        self.batch_size = batch_size
+        self.digest_threshold = digest_threshold
+        self.digest_window = digest_window
+        self.stats = NotifierStats()
+        self._clock = clock
+        self._digest: Optional[Digest] = None
+        # When each recently notified order went out, individually or digested
+        self._notified: deque[float] = deque()
+        self._wake = asyncio.Event()
+        self._runner = BackgroundTask(self._run)
+
+    def wake(self) -> None:
+        """Makes the worker look at the outbox now instead of at the next poll."""
+        self._wake.set()
+
+    async def deliver_due(self) -> int:
+        """
+        Sends one batch of due notifications.
+
+        Returns:
+            int: The number of entries delivered.
+        """
+        owner_id = await self.persistence.get_bot_owner()
+        if owner_id is None:
+            return 0
+        now = self._clock()
+        due = await self.persistence.get_due_notifications(now, self.batch_size)
+        if not due:
+            return 0
+        self.stats.batches += 1
+
+        while self._notified and self._notified[0] <= now - self.digest_window:
+            self._notified.popleft()
+        if self._digest is not None and now >= (
+            self._digest.started_at + self.digest_window
+        ):
+            self._digest = None
+        # Below the threshold orders go out one by one; the rest are digested
+        if self._digest is not None:
+            single = 0
+        else:
+            single = max(0, self.digest_threshold - len(self._notified))
+        singles, digested = due[:single], due[single:]
+
+        delivered, failed = [], []
+        for entry in singles:
+            try:
+                with priority(Priority.BACKGROUND):
+                    await self.bot.send_message(
+                        chat_id=owner_id, text=format_new_order(entry["order"])
+                    )
+            except TelegramError as e:
+                logger.warning(
+                    f"Owner notification for order {entry['order']['id']} failed "
+                    f"(attempt {entry['attempts'] + 1}): {e}"
+                )
+                failed.append((entry["id"], now + backoff(entry["attempts"])))
+                # The rest of the batch goes to the same chat; try it later
+                break
+            delivered.append(entry["id"])
+        if digested and not failed:
+            if await self._send_digest(owner_id, digested, now):
+                delivered.extend(entry["id"] for entry in digested)
+            else:
+                failed.extend(
+                    (entry["id"], now + backoff(entry["attempts"]))
+                    for entry in digested
+                )
+        self._notified.extend([now] * len(delivered))
+
+        if delivered:
+            await self.persistence.remove_notifications(delivered)
+        if failed:
+            await self.persistence.reschedule_notifications(failed)
+        self.stats.delivered += len(delivered)
+        self.stats.failed += len(failed)
+        return len(delivered)
+
+    async def _send_digest(
+        self, owner_id: int, entries: list[dict[str, Any]], now: float
+    ) -> bool:
+        """Adds `entries` to the open digest (or starts one) and shows it."""
+        current = self._digest or Digest(started_at=now)
+        digest = current.with_orders([entry["order"] for entry in entries])
+        try:
+            with priority(Priority.BACKGROUND):
+                if digest.message_id is None:
+                    message = await self.bot.send_message(
+                        chat_id=owner_id, text=digest.text()
+                    )
+                    digest.message_id = message.message_id
+                    self.stats.digest_messages += 1
+                else:
+                    await self.bot.edit_message_text(
+                        chat_id=owner_id,
+                        message_id=digest.message_id,
+                        text=digest.text(),
+                    )
+                    self.stats.digest_edits += 1
+        except TelegramError as e:
+            logger.warning(f"Owner digest of {len(entries)} orders failed: {e}")
+            # The message may be gone; the retry starts a fresh digest
+            self._digest = None
+            return False
+        self._digest = digest
+        self.stats.digested += len(entries)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            # Send failures are rescheduled inside; keep going while full
+            # batches go out (e.g. after a restart)
+            try:
+                while await self.deliver_due() == self.batch_size:
+                    pass
+            except sqlite3.Error as e:
+                # E.g. "database is locked": the outbox is read again next poll
+                logger.error(f"Reading the owner notification outbox failed: {e}")
+
+    def start(self) -> None:
+        """Starts the worker on the running event loop. Idempotent."""
+        if self._runner.start():
+            # Deliver whatever is left over from before a restart
+            self.wake()
+
+    async def stop(self) -> None:
+        """Stops the worker; undelivered entries stay in the outbox."""
+        await self._runner.stop()
@@ -0,0 +1,291 @@
+"""
+Priority-aware outbound scheduler honouring Telegram's rate limits.
+
+Telegram lets a bot send about 30 messages per second overall, one per
+second to a private chat and 20 per minute to a group. Going over gets a 429
+(`RetryAfter`) that stalls the bot. `OutboundScheduler` is installed as the
+application's rate limiter, so every Bot API call passes through it:
+
+* Sends, copies and forwards to a chat first wait for that chat's token
+  bucket, and so do edits below `Priority.INTERACTIVE`. An interactive edit
+  (the screen changing under a button press) does not, so a user pressing
+  buttons quickly is not queued behind their own previous press. Every call
+  then waits for the global bucket.
+* Waiting calls are released most urgent first: `Priority.INTERACTIVE`
+  (replies to what a user just did, the default), then `Priority.RECEIPT`,
+  then `Priority.BACKGROUND` (owner notifications, message cleanup). Calls of
+  the same class keep their order.
+* A `RetryAfter` pauses all calls for as long as Telegram asks, then the call
+  is retried, up to `max_retries` times.
+
+With `global_rate=None` there is no global bucket, only the per-chat ones and
+the `RetryAfter` pause. Sharded workers use that: the front process paces
+every worker's calls against the single global limit (see `services.sharding`).
+
+A caller picks the class of the calls it makes with `with priority(...)`,
+which also covers shortcuts like `query.edit_message_text`, or per call with
+`rate_limit_args=Priority.X`. `depths()` reports how many calls wait in
+each class.
+"""
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import logging
+import warnings
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import timedelta
+from enum import IntEnum
+from typing import Any, Callable, Coroutine, Iterator, Optional, Union
+
+from telegram.error import RetryAfter
+from telegram.warnings import PTBDeprecationWarning
+from telegram.ext import BaseRateLimiter
+
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Bot API limits (https://core.telegram.org/bots/faq#my-bot-is-hitting-limits-how-do-i-avoid-this)
+GLOBAL_RATE = 30.0
+CHAT_RATE = 1.0
+GROUP_RATE = 20 / 60
+# Messages a chat may get back to back (e.g. a photo and its menu)
+CHAT_BURST = 3
+# Upper bound on idle per-chat buckets kept around
+MAX_TRACKED_CHATS = 10_000
+# Calls that count against a chat's limit; deletions and answers do not
+CHAT_LIMITED_PREFIXES = ("send", "copy", "forward")
+# Edits count too, unless they answer a user's button press
+EDIT_PREFIX = "edit"
+
+
+class Priority(IntEnum):
+    """Outbound call classes, most urgent first."""
+
+    INTERACTIVE = 0
+    RECEIPT = 1
+    BACKGROUND = 2
+
+
+_current_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "outbound_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """Makes the Bot API calls in this block (and tasks it starts) use `level`."""
+    token = _current_priority.set(level)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """The class of Bot API calls made here, unless a call overrides it."""
+    return _current_priority.get()
+
+
+def retry_after_seconds(error: RetryAfter) -> float:
+    """How long Telegram asked to wait, in seconds."""
+    with warnings.catch_warnings():
+        # PTB warns that `retry_after` will become a timedelta; accept both
+        warnings.simplefilter("ignore", PTBDeprecationWarning)
+        value = error.retry_after
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return float(value)
+
+
+@dataclass
+class OutboundStats:
+    """Counters for the scheduler, with live and peak queue depth per class."""
+
+    calls: int = 0
+    delayed: int = 0
+    retries: int = 0
+    waiting: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(Priority.__members__, 0)
+    )
+    peak: dict[str, int] = field(
+        default_factory=lambda: dict.fromkeys(Priority.__members__, 0)
+    )
+
+    def queued(self, level: int) -> None:
+        name = Priority(level).name
+        self.waiting[name] += 1
+        self.peak[name] = max(self.peak[name], self.waiting[name])
+
+    def dequeued(self, level: int) -> None:
+        self.waiting[Priority(level).name] -= 1
+
+
+class _PriorityGate:
+    """
+    Hands out a token bucket's tokens to waiting calls, most urgent first.
+
+    Without a bucket, calls only wait out a pause.
+    """
+
+    def __init__(self, bucket: Optional[TokenBucket], stats: OutboundStats):
+        self.bucket = bucket
+        self.paused_until = 0.0
+        self._stats = stats
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._pump: Optional[asyncio.Task] = None
+
+    @property
+    def idle(self) -> bool:
+        return not self._waiters and (self.bucket is None or self.bucket.full)
+
+    def _pause_left(self) -> float:
+        return max(0.0, self.paused_until - asyncio.get_running_loop().time())
+
+    async def acquire(self, level: int, seq: int) -> bool:
+        """
+        Waits for a token.
+
+        Returns:
+            bool: Whether the call had to wait.
+        """
+        if not self._waiters and not self._pause_left():
+            if self.bucket is None or not self.bucket.try_acquire():
+                return False
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (level, seq, future))
+        self._stats.queued(level)
+        if self._pump is None:
+            self._pump = asyncio.create_task(self._run())
+        await future
+        return True
+
+    async def _run(self) -> None:
+        try:
+            while self._waiters:
+                wait = self._pause_left()
+                if self.bucket is not None:
+                    wait = max(wait, self.bucket.delay())
+                if wait:
+                    await asyncio.sleep(wait)
+                    continue
+                level, _, future = heapq.heappop(self._waiters)
+                self._stats.dequeued(level)
+                if future.done():  # Cancelled while waiting
+                    continue
+                if self.bucket is not None:
+                    self.bucket.try_acquire()
+                future.set_result(None)
+        finally:
+            self._pump = None
+
+    def close(self) -> None:
+        if self._pump is not None:
+            self._pump.cancel()
+        for level, _, future in self._waiters:
+            self._stats.dequeued(level)
+            future.cancel()
+        self._waiters.clear()
+
+
+class OutboundScheduler(BaseRateLimiter[int]):
+    """
+    Rate limiter with per-chat and global token buckets and priority classes.
+
+    Attributes:
+        max_retries (int): Retries of a call that got `RetryAfter`.
+        stats (OutboundStats): Running counters.
+    """
+
+    def __init__(
+        self,
+        global_rate: Optional[float] = GLOBAL_RATE,
+        chat_rate: float = CHAT_RATE,
+        group_rate: float = GROUP_RATE,
+        chat_burst: int = CHAT_BURST,
+        max_retries: int = 2,
+    ):
+        self.chat_rate = chat_rate
+        self.group_rate = group_rate
+        self.chat_burst = chat_burst
+        self.max_retries = max_retries
+        self.stats = OutboundStats()
+        self._global = _PriorityGate(
+            TokenBucket(global_rate) if global_rate else None, self.stats
+        )
+        self._chats: dict[Union[int, str], _PriorityGate] = {}
+        self._seq = itertools.count()
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        for gate in (self._global, *self._chats.values()):
+            gate.close()
+        self._chats.clear()
+
+    def depths(self) -> dict[str, int]:
+        """Calls currently waiting, per priority class."""
+        return dict(self.stats.waiting)
+
+    def _chat_gate(self, chat_id: Union[int, str]) -> _PriorityGate:
+        gate = self._chats.get(chat_id)
+        if gate is None:
+            if len(self._chats) >= MAX_TRACKED_CHATS:
+                self._chats = {
+                    key: kept for key, kept in self._chats.items() if not kept.idle
+                }
+            # Groups, supergroups and channels have negative (or @name) ids
+            group = isinstance(chat_id, str) or chat_id < 0
+            rate = self.group_rate if group else self.chat_rate
+            gate = _PriorityGate(
+                TokenBucket(rate, capacity=self.chat_burst), self.stats
+            )
+            self._chats[chat_id] = gate
+        return gate
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: dict[str, Any],
+        endpoint: str,
+        data: dict[str, Any],
+        rate_limit_args: Optional[int],
+    ) -> Any:
+        level = current_priority() if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        if isinstance(chat_id, str) and chat_id.lstrip("-").isdigit():
+            chat_id = int(chat_id)
+        chat_limited = chat_id is not None and (
+            endpoint.startswith(CHAT_LIMITED_PREFIXES)
+            or (endpoint.startswith(EDIT_PREFIX) and level != Priority.INTERACTIVE)
+        )
+        self.stats.calls += 1
+
+        for attempt in itertools.count(1):
+            seq = next(self._seq)
+            waited = False
+            if chat_limited:
+                waited = await self._chat_gate(chat_id).acquire(level, seq)
+            waited = await self._global.acquire(level, seq) or waited
+            if waited:
+                self.stats.delayed += 1
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt > self.max_retries:
+                    raise
+                delay = retry_after_seconds(e) + 0.1
+                logger.warning(
+                    f"Flood limit on {endpoint}: pausing outbound calls for "
+                    f"{delay:.1f}s (retry {attempt}/{self.max_retries})."
+                )
+                self.stats.retries += 1
+                loop = asyncio.get_running_loop()
+                self._global.paused_until = max(
+                    self._global.paused_until, loop.time() + delay
+                )
@@ -0,0 +1,72 @@
+"""
+Token bucket for pacing Bot API calls.
+
+A bucket holds up to `capacity` tokens and refills at `rate` tokens per second.
+Each call takes one token, so sustained throughput is `rate` while short
+bursts up to `capacity` pass without waiting.
+"""
+
+import asyncio
+import time
+from typing import Callable, Optional
+
+
+class TokenBucket:
+    """
+    Allows `rate` acquisitions per second, with bursts of up to `capacity`.
+
+    Attributes:
+        rate (float): Tokens added per second.
+        capacity (float): Maximum number of stored tokens.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def delay(self) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    @property
+    def full(self) -> bool:
+        """Whether the bucket has refilled to capacity (nothing to remember)."""
+        self._refill()
+        return self._tokens >= self.capacity
+
+    def try_acquire(self) -> float:
+        """
+        Takes a token if one is available.
+
+        Returns:
+            float: 0 if a token was taken, otherwise the seconds to wait.
+        """
+        wait = self.delay()
+        if not wait:
+            self._tokens -= 1
+        return wait
+
+    async def acquire(self) -> None:
+        """Waits for a token and takes it."""
+        while wait := self.try_acquire():
+            await asyncio.sleep(wait)
@@ -0,0 +1,280 @@
+"""
+Multi-process worker mode: updates sharded by chat across worker processes.
+
+One Python process running every handler tops out at one CPU core. In
+sharded mode a front process only receives updates (polling or webhook) and
+hands each one to one of N worker processes, chosen by its chat id, so a
+chat always lands on the same worker. Each worker runs the full handler
+stack against the shared WAL-mode SQLite database, and keeps per-chat
+in-memory state (screens, debounced cart writes) to itself.
+
+Workers do not talk to the Bot API directly. Their bot uses `RelayRequest`,
+which sends every call back to the front process over a shared outbound
+queue. There, `OutboundRelay` executes the calls with one HTTP client and
+paces them against the global rate limit, so all workers together stay
+within it. Per-chat limits and priorities stay in each worker's
+`OutboundScheduler`; sharding by chat keeps all of a chat's calls in one
+worker.
+
+    Telegram -> front (Updater) -> inbox[shard] -> worker (handlers)
+    Telegram <- front (OutboundRelay) <- outbound queue <- worker (RelayRequest)
+
+Updates without a chat are sharded by user; a user's updates from different
+chats may be handled by different workers.
+"""
+
+import asyncio
+import itertools
+import logging
+import multiprocessing
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+from telegram import Update
+from telegram.error import NetworkError
+from telegram.ext import Application, ContextTypes
+from telegram.request import BaseRequest, RequestData
+
+from .outbound import GLOBAL_RATE
+from .rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+def shard_for(update: Update, shards: int) -> int:
+    """The worker that handles `update`: its chat, else its user, modulo `shards`."""
+    if update.effective_chat:
+        key = update.effective_chat.id
+    elif update.effective_user:
+        key = update.effective_user.id
+    else:
+        key = update.update_id
+    return key % shards
+
+
+@dataclass
+class WorkerChannel:
+    """The queues connecting one worker process to the front process."""
+
+    index: int
+    inbox: Any  # multiprocessing.Queue of update dicts (None stops the worker)
+    responses: Any  # multiprocessing.Queue of (request_id, status, payload)
+    outbound: Any  # multiprocessing.Queue shared by all workers
+
+
+@dataclass
+class _RelayedData:
+    """The parts of `RequestData` an HTTP request needs, rebuilt in the front."""
+
+    json_parameters: Optional[dict[str, str]]
+    multipart_data: Optional[dict[str, Any]]
+
+
+class RelayRequest(BaseRequest):
+    """Worker-side request class that executes Bot API calls via the front."""
+
+    def __init__(self, channel: WorkerChannel):
+        self._channel = channel
+        self._ids = itertools.count()
+        self._pending: dict[int, asyncio.Future] = {}
+        self._reader: Optional[asyncio.Task] = None
+
+    @property
+    def read_timeout(self) -> Optional[float]:
+        return None
+
+    async def initialize(self) -> None:
+        if self._reader is None:
+            self._reader = asyncio.create_task(self._read_responses())
+
+    async def shutdown(self) -> None:
+        if self._reader is not None:
+            self._channel.responses.put(None)
+            await self._reader
+            self._reader = None
+
+    async def _read_responses(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._channel.responses.get)
+            if item is None:
+                return
+            request_id, status, payload = item
+            future = self._pending.pop(request_id, None)
+            if future is None or future.done():
+                continue
+            if status is None:
+                future.set_exception(NetworkError(payload))
+            else:
+                future.set_result((status, payload))
+
+    async def do_request(
+        self,
+        url: str,
+        method: str,
+        request_data: Optional[RequestData] = None,
+        read_timeout=BaseRequest.DEFAULT_NONE,
+        write_timeout=BaseRequest.DEFAULT_NONE,
+        connect_timeout=BaseRequest.DEFAULT_NONE,
+        pool_timeout=BaseRequest.DEFAULT_NONE,
+    ) -> tuple[int, bytes]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._channel.outbound.put(
+            (
+                self._channel.index,
+                request_id,
+                url,
+                method,
+                request_data.json_parameters if request_data else None,
+                request_data.multipart_data if request_data else None,
+            )
+        )
+        return await future
+
+
+class OutboundRelay:
+    """
+    Front-side executor for the workers' Bot API calls.
+
+    Attributes:
+        relayed (int): Calls executed so far.
+    """
+
+    def __init__(
+        self,
+        request: BaseRequest,
+        outbound,
+        responses: list,
+        rate: Optional[float] = GLOBAL_RATE,
+    ):
+        self._request = request
+        self._outbound = outbound
+        self._responses = responses
+        self.bucket = TokenBucket(rate) if rate else None
+        self.relayed = 0
+        self._task: Optional[asyncio.Task] = None
+        self._calls: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        await self._request.initialize()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Executes the calls already queued, then stops."""
+        if self._task is None:
+            return
+        self._outbound.put(None)
+        await self._task
+        self._task = None
+        await self._request.shutdown()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._outbound.get)
+            if item is None:
+                break
+            task = asyncio.create_task(self._execute(*item))
+            self._calls.add(task)
+            task.add_done_callback(self._calls.discard)
+        if self._calls:
+            await asyncio.gather(*self._calls)
+
+    async def _execute(
+        self, worker, request_id, url, method, json_parameters, multipart_data
+    ) -> None:
+        if self.bucket is not None:
+            await self.bucket.acquire()
+        status, payload = None, "The front process could not make the call"
+        try:
+            status, payload = await self._request.do_request(
+                url,
+                method,
+                request_data=_RelayedData(json_parameters, multipart_data),
+            )
+        except NetworkError as e:
+            # Connection errors and timeouts; the worker's bot raises them again
+            payload = str(e)
+        finally:
+            # Answer even when a bug escapes, so the worker's call cannot hang
+            self.relayed += 1
+            self._responses[worker].put((request_id, status, payload))
+
+
+class ShardedDispatcher:
+    """
+    Front-side owner of the worker processes and the outbound relay.
+
+    `target(channel)` is the worker entry point. It runs in a freshly spawned
+    process, so it must be a module-level function (or a partial of one).
+
+    Attributes:
+        dispatched (list[int]): Updates handed to each worker.
+    """
+
+    def __init__(
+        self,
+        target: Callable[[WorkerChannel], None],
+        workers: int,
+        request: BaseRequest,
+        rate: Optional[float] = GLOBAL_RATE,
+    ):
+        context = multiprocessing.get_context("spawn")
+        outbound = context.Queue()
+        self.channels = [
+            WorkerChannel(index, context.Queue(), context.Queue(), outbound)
+            for index in range(workers)
+        ]
+        self.processes = [
+            context.Process(
+                target=target, args=(channel,), name=f"worker-{channel.index}"
+            )
+            for channel in self.channels
+        ]
+        self.relay = OutboundRelay(
+            request, outbound, [channel.responses for channel in self.channels], rate
+        )
+        self.dispatched = [0] * workers
+
+    async def start(self) -> None:
+        await self.relay.start()
+        for process in self.processes:
+            process.start()
+        logger.info(f"Started {len(self.processes)} worker processes.")
+
+    def dispatch(self, update: Update) -> None:
+        """Queues `update` for the worker that owns its chat."""
+        index = shard_for(update, len(self.channels))
+        self.channels[index].inbox.put(update.to_dict())
+        self.dispatched[index] += 1
+
+    async def forward(self, update: Update, _context: ContextTypes.DEFAULT_TYPE):
+        """Front-process handler: every update goes to a worker."""
+        self.dispatch(update)
+
+    async def stop(self) -> None:
+        """Lets the workers finish their queued updates, then stops the relay."""
+        loop = asyncio.get_running_loop()
+        for channel in self.channels:
+            channel.inbox.put(None)
+        for process in self.processes:
+            await loop.run_in_executor(None, process.join)
+        await self.relay.stop()
+        logger.info(
+            f"Workers stopped: {self.dispatched} updates dispatched, "
+            f"{self.relay.relayed} Bot API calls relayed."
+        )
+
+
+async def feed_worker(application: Application, channel: WorkerChannel) -> None:
+    """Worker-side loop: queues updates from the front until told to stop."""
+    loop = asyncio.get_running_loop()
+    while True:
+        data = await loop.run_in_executor(None, channel.inbox.get)
+        if data is None:
+            break
+        await application.update_queue.put(Update.de_json(data, application.bot))
+    # Let the updates already queued finish before the worker shuts down
+    await application.update_queue.join()
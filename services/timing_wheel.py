@@ -0,0 +1,172 @@
+"""
+Hashed timing wheel for short-lived delayed callbacks.
+
+Most delays in this bot are a few seconds (auto-deleting prompts and menus).
+Running each one as an APScheduler job means a job object, trigger
+computation and heap maintenance per call. The wheel is a ring of slots
+advanced by one asyncio task every `tick` seconds. A timer is hashed into the
+slot it expires in, with a round counter for delays longer than one turn of
+the wheel. Scheduling and cancelling are O(1); each tick only touches one slot.
+
+Timers fire on a tick boundary, so a callback can run up to one tick late.
+That is fine for cleanup work but not for anything that needs precise timing.
+Expired callbacks are handed to the event loop (`call_soon`, or a task for
+coroutine functions), so a failing callback is reported by the loop's
+exception handler and cannot stop the wheel.
+"""
+
+import asyncio
+import inspect
+import logging
+import math
+from typing import Any, Callable, Optional
+
+from .background import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TICK = 0.1
+DEFAULT_SLOTS = 512
+
+
+class TimerHandle:
+    """A scheduled callback. Call `cancel()` to stop it from firing."""
+
+    __slots__ = ("callback", "args", "rounds", "slot", "wheel")
+
+    def __init__(self, wheel, slot: int, rounds: int, callback, args):
+        # The wheel the timer is queued on; None once it fired or was cancelled
+        self.wheel: Optional["TimingWheel"] = wheel
+        self.slot = slot
+        self.rounds = rounds
+        self.callback = callback
+        self.args = args
+
+    @property
+    def active(self) -> bool:
+        return self.wheel is not None
+
+    def cancel(self) -> bool:
+        """
+        Cancels the timer.
+
+        Returns:
+            bool: False if it already fired or was already cancelled.
+        """
+        if self.wheel is None:
+            return False
+        self.wheel.cancel(self)
+        return True
+
+
+class TimingWheel:
+    """
+    Ring of `slots` buckets advanced every `tick` seconds on the event loop.
+
+    Attributes:
+        tick (float): Seconds per slot.
+        fired (int): Callbacks run so far.
+    """
+
+    def __init__(self, tick: float = DEFAULT_TICK, slots: int = DEFAULT_SLOTS):
+        self.tick = tick
+        self.fired = 0
+        self._cursor = 0
+        self._count = 0
+        # dicts keep insertion order and give O(1) removal on cancel
+        self._slots: list[dict[TimerHandle, None]] = [{} for _ in range(slots)]
+        self._runner = BackgroundTask(self._run)
+        self._callback_tasks: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def schedule_soon(
+        self, callback: Callable[..., Any], delay: float, *args: Any
+    ) -> TimerHandle:
+        """
+        Runs `callback(*args)` after roughly `delay` seconds.
+
+        Coroutine functions are run as tasks, other callbacks with the event
+        loop's `call_soon`. The callback fires on the first tick at or after
+        the delay (never on the current one).
+
+        Returns:
+            TimerHandle: Handle that can cancel the timer.
+        """
+        ticks = max(1, math.ceil(delay / self.tick))
+        size = len(self._slots)
+        slot = (self._cursor + ticks) % size
+        handle = TimerHandle(self, slot, (ticks - 1) // size, callback, args)
+        self._slots[slot][handle] = None
+        self._count += 1
+        return handle
+
+    def cancel(self, handle: TimerHandle) -> None:
+        """Removes a timer queued on this wheel (see `TimerHandle.cancel`)."""
+        del self._slots[handle.slot][handle]
+        handle.wheel = None
+        self._count -= 1
+
+    def advance(self, ticks: int = 1) -> int:
+        """
+        Moves the wheel forward, firing every timer that expires.
+
+        Returns:
+            int: The number of callbacks fired.
+        """
+        fired = 0
+        size = len(self._slots)
+        for _ in range(ticks):
+            self._cursor = (self._cursor + 1) % size
+            bucket = self._slots[self._cursor]
+            expired = []
+            for handle in bucket:
+                if handle.rounds:
+                    handle.rounds -= 1
+                else:
+                    expired.append(handle)
+            for handle in expired:
+                self.cancel(handle)
+                self._fire(handle)
+            fired += len(expired)
+        self.fired += fired
+        return fired
+
+    def _fire(self, handle: TimerHandle) -> None:
+        loop = asyncio.get_running_loop()
+        if not inspect.iscoroutinefunction(handle.callback):
+            # The loop reports a failing callback and carries on
+            loop.call_soon(handle.callback, *handle.args)
+            return
+        task = loop.create_task(handle.callback(*handle.args))
+        self._callback_tasks.add(task)
+        task.add_done_callback(self._callback_done)
+
+    def _callback_done(self, task: asyncio.Task) -> None:
+        self._callback_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Timer callback task failed", exc_info=task.exception())
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        done = 0
+        while True:
+            await asyncio.sleep(self.tick)
+            # Catch up on every tick that elapsed, so a slow loop does not drift
+            due = int((loop.time() - started) / self.tick)
+            if due > done:
+                self.advance(due - done)
+                done = due
+
+    def start(self) -> None:
+        """Starts advancing the wheel. Must be called from the running loop."""
+        if self._runner.start():
+            logger.info(
+                f"Timing wheel started ({len(self._slots)} slots x {self.tick}s)."
+            )
+
+    async def stop(self) -> None:
+        """Stops the wheel. Pending timers stay queued but no longer fire."""
+        await self._runner.stop()
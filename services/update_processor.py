@@ -0,0 +1,115 @@
+"""
+Concurrent update processing that keeps each chat's and user's updates in order.
+
+With PTB's default processor one slow checkout or photo upload holds up every
+other customer. `ChatOrderedUpdateProcessor` lets up to `max_concurrent_updates`
+updates run at once, but an update only starts after every earlier update of
+the same chat *and* of the same user has finished, so ConversationHandler
+state and cart mutations never interleave.
+
+Ordering is kept with one FIFO queue of tickets per key, in
+`do_process_update`, so PTB's `process_update` still applies the
+`max_concurrent_updates` semaphore. An update enqueues its ticket on all of
+its keys in one synchronous step once it holds a slot, and runs once it is
+at the head of each of them. Every update ahead of it in a queue already
+holds a slot, so waiting cannot deadlock; a waiting update does keep its
+slot, though, so one very busy chat can tie up several of them.
+Updates with neither a chat nor a user (e.g. poll answers) are not ordered.
+"""
+
+import asyncio
+import logging
+from collections import deque
+from typing import Awaitable, Hashable, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class _Ticket:
+    __slots__ = ("keys", "blocked_on", "turn")
+
+    def __init__(self, keys: tuple[Hashable, ...]):
+        self.keys = keys
+        self.blocked_on = 0
+        self.turn: Optional[asyncio.Future] = None
+
+
+class ChatOrderedUpdateProcessor(BaseUpdateProcessor):
+    """
+    Runs updates concurrently, strictly ordered per chat and per user.
+
+    Attributes:
+        waiting (int): Updates currently waiting for an earlier update of the
+                       same chat or user.
+    """
+
+    def __init__(self, max_concurrent_updates: int):
+        super().__init__(max_concurrent_updates)
+        self.waiting = 0
+        self._queues: dict[Hashable, deque[_Ticket]] = {}
+
+    @staticmethod
+    def ordering_keys(update: object) -> tuple[Hashable, ...]:
+        """The chat and user an update must be ordered with."""
+        if not isinstance(update, Update):
+            return ()
+        keys = []
+        if update.effective_chat:
+            keys.append(("chat", update.effective_chat.id))
+        if update.effective_user:
+            keys.append(("user", update.effective_user.id))
+        return tuple(keys)
+
+    async def do_process_update(
+        self, update: object, coroutine: Awaitable[object]
+    ) -> None:
+        # Runs inside the base class's concurrency semaphore
+        ticket = self._enqueue(self.ordering_keys(update))
+        try:
+            if ticket.blocked_on:
+                ticket.turn = asyncio.get_running_loop().create_future()
+                self.waiting += 1
+                try:
+                    await ticket.turn
+                finally:
+                    self.waiting -= 1
+        except asyncio.CancelledError:
+            self._release(ticket)
+            coroutine.close()  # Never started
+            raise
+        try:
+            await coroutine
+        finally:
+            self._release(ticket)
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    def _enqueue(self, keys: tuple[Hashable, ...]) -> _Ticket:
+        ticket = _Ticket(keys)
+        for key in keys:
+            queue = self._queues.setdefault(key, deque())
+            if queue:
+                ticket.blocked_on += 1
+            queue.append(ticket)
+        return ticket
+
+    def _release(self, ticket: _Ticket) -> None:
+        for key in ticket.keys:
+            queue = self._queues[key]
+            was_head = queue[0] is ticket
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[key]
+            elif was_head:
+                following = queue[0]
+                following.blocked_on -= 1
+                if not following.blocked_on and following.turn is not None:
+                    if not following.turn.done():
+                        following.turn.set_result(None)
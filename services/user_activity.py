@@ -0,0 +1,141 @@
+"""
+Batched recording of who uses the bot and when they were last seen.
+
+Writing the user's row on every update would double the bot's write load.
+`UserActivityTracker` instead keeps the users seen since the last flush in
+memory, and writes them with one batched upsert every `interval` seconds:
+
+* A user is only queued again when their username or first name changed,
+  or their last-seen time moved by more than `granularity` seconds, so a
+  busy user costs one row per `granularity`, not one per update.
+* The users it already wrote are remembered in an LRU of `max_known`
+  entries; one that falls out of it is simply written again.
+* A failed flush puts its rows back for the next one. Rows queued at
+  shutdown are written by `stop()`.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from .background import BackgroundTask
+
+logger = logging.getLogger(__name__)
+
+FLUSH_INTERVAL = 5.0
+LAST_SEEN_GRANULARITY = 10 * 60.0
+MAX_KNOWN_USERS = 10_000
+
+# (user_id, username, first_name, last_seen), as `upsert_users` takes them
+UserRow = tuple[int, Optional[str], Optional[str], float]
+
+
+@dataclass
+class UserActivityStats:
+    """Counters for the tracker."""
+
+    seen: int = 0
+    queued: int = 0
+    rows: int = 0
+    flushes: int = 0
+    failed: int = 0
+
+
+class UserActivityTracker:
+    """
+    Collects users seen in updates and flushes them to persistence in batches.
+
+    Attributes:
+        persistence (AbstractPantryPersistence): User storage.
+        stats (UserActivityStats): Running counters.
+    """
+
+    def __init__(
+        self,
+        persistence: AbstractPantryPersistence,
+        interval: float = FLUSH_INTERVAL,
+        granularity: float = LAST_SEEN_GRANULARITY,
+        max_known: int = MAX_KNOWN_USERS,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.persistence = persistence
+        self.interval = interval
+        self.granularity = granularity
+        self.max_known = max_known
+        self.stats = UserActivityStats()
+        self._clock = clock
+        self._dirty: dict[int, UserRow] = {}
+        # Last row queued per user, least recently seen first
+        self._known: OrderedDict[int, UserRow] = OrderedDict()
+        self._runner = BackgroundTask(self._run)
+
+    def seen(
+        self, user_id: int, username: Optional[str], first_name: Optional[str]
+    ) -> bool:
+        """
+        Notes that the user sent an update now.
+
+        Returns:
+            bool: Whether the user was queued for the next flush.
+        """
+        self.stats.seen += 1
+        now = self._clock()
+        known = self._known.get(user_id)
+        if known is not None:
+            self._known.move_to_end(user_id)
+            if (
+                known[1] == username
+                and known[2] == first_name
+                and now - known[3] < self.granularity
+            ):
+                return False
+        row = (user_id, username, first_name, now)
+        self._known[user_id] = row
+        if len(self._known) > self.max_known:
+            self._known.popitem(last=False)
+        self._dirty[user_id] = row
+        self.stats.queued += 1
+        return True
+
+    @property
+    def pending(self) -> int:
+        """Users waiting for the next flush."""
+        return len(self._dirty)
+
+    async def flush(self) -> int:
+        """
+        Writes the queued users in one batch.
+
+        Returns:
+            int: The number of rows written.
+        """
+        if not self._dirty:
+            return 0
+        rows, self._dirty = self._dirty, {}
+        if not await self.persistence.upsert_users(list(rows.values())):
+            # Keep them for the next flush, behind anything queued since
+            self._dirty = {**rows, **self._dirty}
+            self.stats.failed += 1
+            return 0
+        self.stats.flushes += 1
+        self.stats.rows += len(rows)
+        return len(rows)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            # Persistence reports database errors as a failed flush
+            await self.flush()
+
+    def start(self) -> None:
+        """Starts flushing on the running event loop. Idempotent."""
+        self._runner.start()
+
+    async def stop(self) -> None:
+        """Stops the periodic flush and writes what is still queued."""
+        await self._runner.stop()
+        await self.flush()
@@ -0,0 +1,171 @@
+import pytest
+
+from analytics import engine
+from analytics.engine import SalesAnalytics
+
+
+def _line(seq, product_id, category, quantity, unit_price, hour=9):
+    return {
+        "order_seq": seq,
+        "order_id": f"order-{seq}",
+        "created_at": f"2026-01-05 {hour:02d}:15:00",
+        "product_id": product_id,
+        "category": category,
+        "quantity": quantity,
+        "unit_price": unit_price,
+    }
+
+
+SAMPLE_LINES = [
+    _line(1, "latte", "Drinks", 2, 4.50, hour=8),
+    _line(1, "bagel", "Bakery", 1, 2.25, hour=8),
+    _line(2, "latte", "Drinks", 1, 4.50, hour=13),
+    _line(3, "mystery", None, 3, 1.00, hour=13),
+]
+
+
+@pytest.fixture(params=["numpy", "stdlib"])
+def analytics(request, monkeypatch):
+    """Runs each test against both the NumPy and the pure-Python path."""
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(engine, "np", None)
+    return SalesAnalytics()
+
+
+def test_ingest_builds_columns(analytics):
+    assert analytics.ingest(SAMPLE_LINES) == 3
+    assert analytics.order_count == 3
+    assert analytics.last_seq == 3
+
+
+def test_revenue_by_hour(analytics):
+    analytics.ingest(SAMPLE_LINES)
+
+    by_hour = analytics.revenue_by_hour()
+
+    assert len(by_hour) == 24
+    assert by_hour[8] == 900 + 225
+    assert by_hour[13] == 450 + 300
+    assert sum(by_hour) == 1875
+
+
+def test_category_mix_and_products(analytics):
+    analytics.ingest(SAMPLE_LINES)
+
+    assert analytics.category_mix() == {
+        "Drinks": 1350,
+        "Bakery": 225,
+        engine.UNCATEGORIZED: 300,
+    }
+    assert analytics.product_revenue()["latte"] == 1350
+    assert analytics.group_sum("product", "units") == [3, 1, 3]
+
+
+def test_average_basket(analytics):
+    assert analytics.average_basket() is None
+
+    analytics.ingest(SAMPLE_LINES)
+
+    basket = analytics.average_basket()
+    assert basket["units"] == pytest.approx(7 / 3)
+    assert basket["revenue_cents"] == pytest.approx(1875 / 3)
+
+
+def test_ingest_skips_already_loaded_orders(analytics):
+    analytics.ingest(SAMPLE_LINES[:2])
+
+    assert analytics.ingest(SAMPLE_LINES) == 2
+    assert analytics.order_count == 3
+    assert sum(analytics.revenue_by_hour()) == 1875
+
+
+def test_group_sum_rejects_unknown_columns(analytics):
+    with pytest.raises(ValueError):
+        analytics.group_sum("weekday")
+
+
+@pytest.mark.asyncio
+async def test_refresh_is_incremental(sqlite_persistence_layer):
+    """Only orders placed after the previous refresh are loaded."""
+    persistence = sqlite_persistence_layer
+    product_id = await persistence.add_product(
+        {
+            "name": "Latte",
+            "price": 4.50,
+            "quantity": 10,
+            "category": "Drinks",
+            "description": "Latte",
+        }
+    )
+    analytics = SalesAnalytics()
+
+    await persistence.add_to_cart(1, product_id, 2)
+    await persistence.create_order(1)
+    assert analytics.refresh(persistence) == 1
+
+    await persistence.add_to_cart(2, product_id, 1)
+    await persistence.create_order(2)
+    assert analytics.refresh(persistence) == 1
+    assert analytics.refresh(persistence) == 0
+
+    assert analytics.order_count == 2
+    assert analytics.category_mix() == {"Drinks": 1350}
+
+
+@pytest.mark.asyncio
+async def test_refresh_cursor_survives_renumbered_rowids(sqlite_persistence_layer):
+    """VACUUM may renumber the rowids of a TEXT-keyed table; seq is stored."""
+    persistence = sqlite_persistence_layer
+    product_id = await persistence.add_product(
+        {
+            "name": "Latte",
+            "price": 4.50,
+            "quantity": 10,
+            "category": "Drinks",
+            "description": "Latte",
+        }
+    )
+    analytics = SalesAnalytics()
+    for user_id in (1, 2):
+        await persistence.add_to_cart(user_id, product_id, 1)
+        await persistence.create_order(user_id)
+    assert analytics.refresh(persistence) == 2
+
+    # What a VACUUM is allowed to do: new rowids, in a different order
+    with persistence._get_connection() as conn:
+        conn.execute("UPDATE orders SET rowid = 100 - rowid")
+    assert analytics.refresh(persistence) == 0
+
+    await persistence.add_to_cart(3, product_id, 1)
+    await persistence.create_order(3)
+    assert analytics.refresh(persistence) == 1
+    assert analytics.order_count == 3
+
+
+@pytest.mark.asyncio
+async def test_cancelled_orders_drop_out_on_refresh(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    product_id = await persistence.add_product(
+        {
+            "name": "Latte",
+            "price": 4.50,
+            "quantity": 10,
+            "category": "Drinks",
+            "description": "Latte",
+        }
+    )
+    analytics = SalesAnalytics()
+    order_ids = []
+    for user_id in (1, 2):
+        await persistence.add_to_cart(user_id, product_id, user_id)
+        order_ids.append(await persistence.create_order(user_id))
+    assert analytics.refresh(persistence) == 2
+
+    await persistence.update_order_status(order_ids[1], "cancelled")
+    assert analytics.refresh(persistence, cancelled=1) == 1
+    assert analytics.refresh(persistence, cancelled=1) == 0
+
+    assert analytics.order_count == 1
+    assert analytics.category_mix() == {"Drinks": 450}
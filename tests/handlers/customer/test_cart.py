@@ -5,9 +5,14 @@ from telegram import Update, User, InlineKeyboardMarkup
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
+from handlers import callbacks
 from handlers.customer import cart
 from persistence.abstract_persistence import AbstractPantryPersistence
 from resources.strings import Strings
+from services.outbound import Priority, current_priority
+
+PRODUCT_ID = "00000000-0000-4000-8000-000000000001"
+ORDER_ID = "00000000-0000-4000-8000-0000000000aa"
 
 
 @pytest.mark.asyncio
@@ -28,7 +33,7 @@ async def test_handle_cart_command_empty(
 
     # Assert
     mock_persistence_layer.get_cart_items.assert_called_once_with(user_id=98765)
-    call_args = mock_update_message.message.reply_text.call_args
+    call_args = mock_telegram_context.bot.send_message.call_args
     assert call_args.kwargs["text"] == Strings.Cart.EMPTY
     sent_markup = call_args.kwargs["reply_markup"]
     assert isinstance(sent_markup, InlineKeyboardMarkup)
@@ -36,7 +41,9 @@ async def test_handle_cart_command_empty(
     assert (
         sent_markup.inline_keyboard[0][0].text == Strings.General.CONTINUE_SHOPPING_BTN
     )
-    assert sent_markup.inline_keyboard[0][0].callback_data == "navigate_to_categories"
+    assert sent_markup.inline_keyboard[0][0].callback_data == callbacks.encode(
+        callbacks.CATEGORIES
+    )
 
 
 @pytest.mark.asyncio
@@ -50,7 +57,7 @@ async def test_handle_cart_command_with_items(
     # Arrange
     mock_update_message.effective_user = mocker.MagicMock(spec=User, id=98765)
     mock_update_message.callback_query = None  # Ensure it's treated as a command
-    mock_persistence_layer.get_cart_items.return_value = {"prod_1": 2}
+    mock_persistence_layer.get_cart_items.return_value = {PRODUCT_ID: 2}
     mock_persistence_layer.get_product.return_value = {"name": "Bread", "price": 3.00}
 
     # Act
@@ -58,15 +65,21 @@ async def test_handle_cart_command_with_items(
 
     # Assert
     mock_persistence_layer.get_cart_items.assert_called_once_with(user_id=98765)
-    mock_persistence_layer.get_product.assert_called_once_with("prod_1")
-    call_args = mock_update_message.message.reply_text.call_args
+    mock_persistence_layer.get_product.assert_called_once_with(PRODUCT_ID)
+    call_args = mock_telegram_context.bot.send_message.call_args
     message_text = call_args.kwargs["text"]
     assert Strings.Cart.item_line("Bread", 2, 3.00, 6.00) in message_text
     assert Strings.Cart.total_line(6.00) in message_text
     sent_markup = call_args.kwargs["reply_markup"]
     assert isinstance(sent_markup, InlineKeyboardMarkup)
-    assert len(sent_markup.inline_keyboard) == 1
-    buttons_row = sent_markup.inline_keyboard[0]
+    assert len(sent_markup.inline_keyboard) == 2
+    dec, inc, remove = sent_markup.inline_keyboard[0]
+    code = callbacks.uuid_to_int(PRODUCT_ID)
+    assert dec.callback_data == callbacks.encode(callbacks.CART_DEC, code)
+    assert inc.callback_data == callbacks.encode(callbacks.CART_INC, code)
+    assert remove.text == Strings.Cart.remove_btn("Bread")
+    assert remove.callback_data == callbacks.encode(callbacks.CART_REMOVE, code)
+    buttons_row = sent_markup.inline_keyboard[1]
     button_texts = [btn.text for btn in buttons_row]
     assert Strings.General.CHECKOUT_BTN in button_texts
     assert Strings.Cart.CLEAR_BTN in button_texts
@@ -75,7 +88,7 @@ async def test_handle_cart_command_with_items(
     continue_button = next(
         btn for btn in buttons_row if btn.text == Strings.General.CONTINUE_SHOPPING_BTN
     )
-    assert continue_button.callback_data == "navigate_to_categories"
+    assert continue_button.callback_data == callbacks.encode(callbacks.CATEGORIES)
 
 
 @pytest.mark.asyncio
@@ -87,7 +100,9 @@ async def test_handle_clear_cart_callback(
 ):
     """Test handle_clear_cart callback query."""
     # Arrange
-    mock_update_callback_query.callback_query.data = "clear_cart"
+    mock_update_callback_query.callback_query.data = callbacks.encode(
+        callbacks.CLEAR_CART
+    )
     mock_persistence_layer.clear_cart.return_value = True
 
     # Act
@@ -110,39 +125,63 @@ async def test_handle_checkout_success(
 ):
     """Test handle_checkout success."""
     # Arrange
-    mock_update_callback_query.callback_query.data = "cart_checkout"
-    mock_persistence_layer.create_order.return_value = "order-123"
+    mock_update_callback_query.callback_query.data = callbacks.encode(
+        callbacks.CHECKOUT
+    )
+    mock_persistence_layer.create_order.return_value = ORDER_ID
     mock_persistence_layer.get_order.return_value = {
-        "id": "order-123",
+        "id": ORDER_ID,
         "total_amount": 15.50,
         "items": [
             {"name": "Burger", "quantity": 1, "unit_price": 10.00},
             {"name": "Fries", "quantity": 1, "unit_price": 5.50},
         ],
     }
-    mock_persistence_layer.get_bot_owner.return_value = 12345
+    notifier = mocker.MagicMock()
+    mock_telegram_context.bot_data["notifier"] = notifier
 
     # Act
     await cart.handle_checkout(mock_update_callback_query, mock_telegram_context)
 
     # Assert
     mock_persistence_layer.create_order.assert_called_once_with(user_id=98765)
-    mock_persistence_layer.get_order.assert_called_once_with(order_id="order-123")
-    mock_persistence_layer.get_bot_owner.assert_called_once()
+    mock_persistence_layer.get_order.assert_called_once_with(order_id=ORDER_ID)
     call_args = mock_update_callback_query.callback_query.edit_message_text.call_args
     message_text = call_args.kwargs["text"]
     assert Strings.Cart.receipt_total(15.50) in message_text
-    mock_telegram_context.bot.send_message.assert_called_once_with(
-        chat_id=12345, text=mocker.ANY
+    (reorder,) = call_args.kwargs["reply_markup"].inline_keyboard[0]
+    assert reorder.callback_data == callbacks.encode(
+        callbacks.REORDER, callbacks.uuid_to_int(ORDER_ID)
     )
-    notification_text = mock_telegram_context.bot.send_message.call_args.kwargs["text"]
-    assert (
-        Strings.Order.notification_new(
-            98765, "order-123", "Items:\n- Burger x 1\n- Fries x 1", 15.50
-        )
-        in notification_text
+    # The owner's notification was queued with the order, not sent inline
+    mock_telegram_context.bot.send_message.assert_not_called()
+    notifier.wake.assert_called_once_with()
+
+
+@pytest.mark.asyncio
+async def test_handle_checkout_outbound_priorities(
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """The receipt goes out at receipt priority."""
+    mock_persistence_layer.create_order.return_value = ORDER_ID
+    mock_persistence_layer.get_order.return_value = {
+        "id": ORDER_ID,
+        "total_amount": 10.00,
+        "items": [{"name": "Burger", "quantity": 1, "unit_price": 10.00}],
+    }
+    seen = {}
+    query = mock_update_callback_query.callback_query
+    query.edit_message_text.side_effect = lambda **_: seen.setdefault(
+        "receipt", current_priority()
     )
 
+    await cart.handle_checkout(mock_update_callback_query, mock_telegram_context)
+
+    assert seen == {"receipt": Priority.RECEIPT}
+    assert current_priority() == Priority.INTERACTIVE
+
 
 @pytest.mark.asyncio
 async def test_handle_cart_cleanup(
@@ -157,7 +196,7 @@ async def test_handle_cart_cleanup(
     mock_update_message.callback_query = None  # Ensure it's treated as a command
     mock_update_message.message.message_id = 123
     mock_telegram_context.job_queue = mocker.Mock()
-    mock_persistence_layer.get_cart_items.return_value = {"item_1": 1}
+    mock_persistence_layer.get_cart_items.return_value = {PRODUCT_ID: 1}
     mock_persistence_layer.get_product.return_value = {"name": "Bread", "price": 3.00}
 
     # Act
@@ -176,8 +215,10 @@ async def test_handle_cart_via_callback(
 ):
     """Test handle_cart_command via callback query."""
     # Arrange
-    mock_update_callback_query.callback_query.data = "view_cart"
-    mock_persistence_layer.get_cart_items.return_value = {"item_1": 1}
+    mock_update_callback_query.callback_query.data = callbacks.encode(
+        callbacks.VIEW_CART
+    )
+    mock_persistence_layer.get_cart_items.return_value = {PRODUCT_ID: 1}
     mock_persistence_layer.get_product.return_value = {"name": "Bread", "price": 3.00}
 
     # Act
@@ -186,3 +227,171 @@ async def test_handle_cart_via_callback(
     # Assert
     mock_update_callback_query.callback_query.answer.assert_called_once()
     mock_update_callback_query.callback_query.edit_message_text.assert_called_once()
+
+
+async def _open_cart(update, context, persistence, items):
+    persistence.get_cart_items.return_value = items
+    persistence.get_product.return_value = {"name": "Bread", "price": 3.00}
+    await cart.handle_cart_command(update, context)
+    persistence.get_cart_items.reset_mock()
+    persistence.get_product.reset_mock()
+    update.callback_query.edit_message_text.reset_mock()
+
+
+@pytest.mark.asyncio
+async def test_cart_edits_render_from_cache_and_write_once(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """+/− presses redraw the cart in place; the line is written once settled."""
+    await _open_cart(
+        mock_update_callback_query,
+        mock_telegram_context,
+        mock_persistence_layer,
+        {PRODUCT_ID: 2},
+    )
+    mock_telegram_context.args = [callbacks.uuid_to_int(PRODUCT_ID)]
+
+    await cart.handle_cart_increase(mock_update_callback_query, mock_telegram_context)
+    await cart.handle_cart_increase(mock_update_callback_query, mock_telegram_context)
+    await cart.handle_cart_decrease(mock_update_callback_query, mock_telegram_context)
+
+    edit = mock_update_callback_query.callback_query.edit_message_text
+    assert edit.call_count == 3
+    assert (
+        Strings.Cart.item_line("Bread", 3, 3.00, 9.00) in edit.call_args.kwargs["text"]
+    )
+    mock_persistence_layer.get_cart_items.assert_not_called()
+    mock_persistence_layer.get_product.assert_not_called()
+    mock_persistence_layer.set_cart_quantity.assert_not_called()
+
+    await mock_telegram_context.bot_data["cart_edits"].settle(98765)
+    mock_persistence_layer.set_cart_quantity.assert_called_once_with(
+        98765, PRODUCT_ID, 3
+    )
+
+
+@pytest.mark.asyncio
+async def test_cart_remove_deletes_line(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """Removing the last line shows the empty cart; checkout settles the delete."""
+    await _open_cart(
+        mock_update_callback_query,
+        mock_telegram_context,
+        mock_persistence_layer,
+        {PRODUCT_ID: 2},
+    )
+    mock_telegram_context.args = [callbacks.uuid_to_int(PRODUCT_ID)]
+
+    await cart.handle_cart_remove(mock_update_callback_query, mock_telegram_context)
+
+    edit = mock_update_callback_query.callback_query.edit_message_text
+    assert edit.call_args.kwargs["text"] == Strings.Cart.EMPTY
+
+    mock_persistence_layer.create_order.return_value = None
+    await cart.handle_checkout(mock_update_callback_query, mock_telegram_context)
+    mock_persistence_layer.set_cart_quantity.assert_called_once_with(
+        98765, PRODUCT_ID, 0
+    )
+
+
+@pytest.mark.asyncio
+async def test_cart_edit_without_cached_cart_loads_it(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """A press on a cart shown before a restart reads the cart once."""
+    mock_persistence_layer.get_cart_items.return_value = {PRODUCT_ID: 1}
+    mock_persistence_layer.get_product.return_value = {"name": "Bread", "price": 3.00}
+    mock_telegram_context.args = [callbacks.uuid_to_int(PRODUCT_ID)]
+
+    await cart.handle_cart_increase(mock_update_callback_query, mock_telegram_context)
+
+    mock_persistence_layer.get_cart_items.assert_called_once_with(user_id=98765)
+    edit = mock_update_callback_query.callback_query.edit_message_text
+    assert (
+        Strings.Cart.item_line("Bread", 2, 3.00, 6.00) in edit.call_args.kwargs["text"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_reorder_reports_skipped_and_shows_cart(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """Reorder is one persistence call; skipped products are shown in an alert."""
+    mock_telegram_context.args = [callbacks.uuid_to_int(ORDER_ID)]
+    mock_persistence_layer.reorder.return_value = {"added": 1, "skipped": ["Cake"]}
+    mock_persistence_layer.get_cart_items.return_value = {PRODUCT_ID: 2}
+    mock_persistence_layer.get_product.return_value = {"name": "Bread", "price": 3.00}
+
+    await cart.handle_reorder(mock_update_callback_query, mock_telegram_context)
+
+    mock_persistence_layer.reorder.assert_called_once_with(
+        user_id=98765, order_id=ORDER_ID
+    )
+    mock_update_callback_query.callback_query.answer.assert_called_once_with(
+        Strings.Order.reorder_done(1, ["Cake"]), show_alert=True
+    )
+    # The button sits on a receipt (not the tracked screen): the cart is sent
+    # as a new screen and the receipt is left alone
+    mock_update_callback_query.callback_query.edit_message_text.assert_not_called()
+    text = mock_telegram_context.bot.send_message.call_args.kwargs["text"]
+    assert Strings.Cart.item_line("Bread", 2, 3.00, 6.00) in text
+    mock_telegram_context.bot.delete_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_receipt_is_not_replaced_by_the_next_screen(
+    mock_update_callback_query: Update,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """After checkout, /cart sends a new screen without deleting the receipt."""
+    mock_update_callback_query.effective_chat.id = 555
+    mock_update_callback_query.callback_query.message.message_id = 42
+    mock_persistence_layer.create_order.return_value = ORDER_ID
+    mock_persistence_layer.get_order.return_value = {
+        "id": ORDER_ID,
+        "total_amount": 10.00,
+        "items": [{"name": "Burger", "quantity": 1, "unit_price": 10.00}],
+    }
+    await cart.handle_checkout(mock_update_callback_query, mock_telegram_context)
+
+    mock_update_message.effective_chat.id = 555
+    mock_update_message.effective_user = mock_update_callback_query.effective_user
+    mock_update_message.callback_query = None
+    mock_persistence_layer.get_cart_items.return_value = {}
+    await cart.handle_cart_command(mock_update_message, mock_telegram_context)
+
+    mock_telegram_context.bot.send_message.assert_called_once()
+    mock_telegram_context.bot.delete_message.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_handle_reorder_nothing_available(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_telegram_context.args = [callbacks.uuid_to_int(ORDER_ID)]
+    mock_persistence_layer.reorder.return_value = {"added": 0, "skipped": ["Cake"]}
+
+    await cart.handle_reorder(mock_update_callback_query, mock_telegram_context)
+
+    mock_update_callback_query.callback_query.answer.assert_called_once_with(
+        Strings.Order.REORDER_NOTHING, show_alert=True
+    )
+    mock_update_callback_query.callback_query.edit_message_text.assert_not_called()
@@ -0,0 +1,146 @@
+import pytest
+from telegram import Update, User, InlineKeyboardMarkup
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from handlers import callbacks
+from handlers.customer import orders
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+
+def _order(seq):
+    return {
+        "order_seq": seq,
+        "id": f"{seq:08d}-0000-4000-8000-000000000000",
+        "user_id": 98765,
+        "total_amount": 5.0,
+        "status": "completed",
+        "created_at": "2026-01-05 10:00:00",
+        "item_count": 2,
+    }
+
+
+@pytest.mark.asyncio
+async def test_orders_command_first_page_with_more(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """A full page plus one extra row shows an 'Older' button with a cursor."""
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=98765)
+    mock_update_message.callback_query = None
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    page = [_order(seq) for seq in range(10, 4, -1)]
+    mock_persistence_layer.get_user_orders.return_value = page
+
+    await orders.orders_command(mock_update_message, mock_telegram_context)
+
+    mock_persistence_layer.get_user_orders.assert_called_once_with(
+        user_id=98765, limit=orders.ORDERS_PAGE_SIZE + 1, before_seq=None
+    )
+    call_kwargs = mock_telegram_context.bot.send_message.call_args.kwargs
+    assert call_kwargs["parse_mode"] == ParseMode.HTML
+    assert Strings.Order.HISTORY_HEADER in call_kwargs["text"]
+    assert "#00000010" in call_kwargs["text"]
+    assert "#00000005" not in call_kwargs["text"]
+    markup = call_kwargs["reply_markup"]
+    assert isinstance(markup, InlineKeyboardMarkup)
+    # One 'Reorder' row per order shown, then the navigation row
+    reorder_rows = markup.inline_keyboard[:-1]
+    assert [row[0].callback_data for row in reorder_rows] == [
+        callbacks.encode(callbacks.REORDER, callbacks.uuid_to_int(order["id"]))
+        for order in page[: orders.ORDERS_PAGE_SIZE]
+    ]
+    assert reorder_rows[0][0].text == Strings.Order.reorder_btn(page[0]["id"])
+    assert [b.callback_data for b in markup.inline_keyboard[-1]] == ["my_orders_6"]
+
+
+@pytest.mark.asyncio
+async def test_orders_command_empty(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=98765)
+    mock_update_message.callback_query = None
+    mock_persistence_layer.get_bot_owner.return_value = None
+    mock_persistence_layer.get_user_orders.return_value = []
+
+    await orders.orders_command(mock_update_message, mock_telegram_context)
+
+    call_kwargs = mock_telegram_context.bot.send_message.call_args.kwargs
+    assert Strings.Order.NO_ORDERS in call_kwargs["text"]
+    assert call_kwargs["reply_markup"].inline_keyboard == ()
+
+
+@pytest.mark.asyncio
+async def test_orders_command_routes_owner_to_all_orders(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_update_message.callback_query = None
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.get_all_orders_for_owner.return_value = [_order(1)]
+    mock_persistence_layer.get_order_status_counts.return_value = {}
+
+    await orders.orders_command(mock_update_message, mock_telegram_context)
+
+    mock_persistence_layer.get_user_orders.assert_not_called()
+    mock_persistence_layer.get_all_orders_for_owner.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_handle_orders_page_uses_cursor(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_match = mocker.MagicMock()
+    mock_match.group.return_value = "6"
+    mock_telegram_context.matches = [mock_match]
+    mock_persistence_layer.get_user_orders.return_value = [_order(5)]
+
+    await orders.handle_orders_page(mock_update_callback_query, mock_telegram_context)
+
+    mock_update_callback_query.callback_query.answer.assert_called_once()
+    mock_persistence_layer.get_user_orders.assert_called_once_with(
+        user_id=98765, limit=orders.ORDERS_PAGE_SIZE + 1, before_seq=6
+    )
+    markup = (
+        mock_update_callback_query.callback_query.edit_message_text.call_args.kwargs[
+            "reply_markup"
+        ]
+    )
+    assert [b.callback_data for b in markup.inline_keyboard[-1]] == ["my_orders"]
+
+
+@pytest.mark.asyncio
+async def test_orders_page_renders_through_the_screen_registry(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """Re-opening the page that is already on screen costs no API call."""
+    mock_match = mocker.MagicMock()
+    mock_match.group.return_value = None
+    mock_telegram_context.matches = [mock_match]
+    mock_update_callback_query.effective_chat.id = 98765
+    mock_update_callback_query.callback_query.message.message_id = 7
+    mock_persistence_layer.get_user_orders.return_value = [_order(1)]
+
+    for _ in range(2):
+        await orders.handle_orders_page(
+            mock_update_callback_query, mock_telegram_context
+        )
+
+    edit = mock_update_callback_query.callback_query.edit_message_text
+    edit.assert_called_once()
+    assert edit.call_args.kwargs["parse_mode"] == ParseMode.HTML
@@ -5,11 +5,24 @@ from telegram import Update, User, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
+from handlers import callbacks
 from handlers.customer import shop
 from handlers.general.start import get_home_menu
 from persistence.abstract_persistence import AbstractPantryPersistence
 from resources.strings import Strings
 
+PRODUCT_1 = "0b4f6a1e-3c1d-4f43-9a53-6f0e2d7c1a11"
+PRODUCT_2 = "9d2c7e55-8a4b-4f1e-b0c6-1e2f3a4b5c6d"
+CLOSE = callbacks.encode(callbacks.CLOSE_SHOP)
+
+
+def _category_data(name):
+    return callbacks.encode(callbacks.CATEGORY, callbacks.category_code(name))
+
+
+def _product_data(action, product_id):
+    return callbacks.encode(action, callbacks.uuid_to_int(product_id))
+
 
 @pytest.mark.asyncio
 async def test_shop_start_with_categories(
@@ -45,7 +58,7 @@ async def test_shop_start_with_categories(
     close_row = sent_markup.inline_keyboard[2]
     assert len(close_row) == 1
     assert close_row[0].text == "❌ Close"
-    assert close_row[0].callback_data == "close_shop"
+    assert close_row[0].callback_data == CLOSE
 
     assert mock_telegram_context.job_queue.run_once.call_count >= 1
 
@@ -68,7 +81,9 @@ async def test_shop_start_no_categories(
 
     # Assert
     mock_persistence_layer.get_all_categories.assert_called_once()
-    mock_update_message.message.reply_text.assert_called_once_with(Strings.Shop.EMPTY)
+    mock_telegram_context.bot.send_message.assert_called_once_with(
+        chat_id=mock_update_message.effective_chat.id, text=Strings.Shop.EMPTY
+    )
 
 
 @pytest.mark.asyncio
@@ -81,17 +96,14 @@ async def test_handle_category_selection_with_products(
     """Test category button click when products are found."""
     # Arrange
     category_name = "Bakery"
-    mock_update_callback_query.callback_query.data = f"category_{category_name}"
-
-    # Mock the context.matches to simulate regex capture
-    mock_match = mocker.MagicMock()
-    mock_match.group.return_value = category_name
-    mock_telegram_context.matches = [mock_match]
+    mock_update_callback_query.callback_query.data = _category_data(category_name)
+    mock_telegram_context.args = [callbacks.category_code(category_name)]
+    mock_persistence_layer.get_all_categories.return_value = [category_name]
 
     # Add IDs to our mock products
     mock_products = [
-        {"id": "prod_123", "name": "Croissant", "price": 2.50},
-        {"id": "prod_456", "name": "Baguette", "price": 3.00},
+        {"id": PRODUCT_1, "name": "Croissant", "price": 2.50},
+        {"id": PRODUCT_2, "name": "Baguette", "price": 3.00},
     ]
     mock_persistence_layer.get_products_by_category.return_value = mock_products
 
@@ -119,17 +131,21 @@ async def test_handle_category_selection_with_products(
     assert len(sent_markup.inline_keyboard) == 3
     # Check the first button
     assert sent_markup.inline_keyboard[0][0].text == "Croissant ($2.50)"
-    assert sent_markup.inline_keyboard[0][0].callback_data == "product_prod_123"
+    assert sent_markup.inline_keyboard[0][0].callback_data == _product_data(
+        callbacks.PRODUCT, PRODUCT_1
+    )
     # Check the second button
     assert sent_markup.inline_keyboard[1][0].text == "Baguette ($3.00)"
-    assert sent_markup.inline_keyboard[1][0].callback_data == "product_prod_456"
+    assert sent_markup.inline_keyboard[1][0].callback_data == _product_data(
+        callbacks.PRODUCT, PRODUCT_2
+    )
     # Check the navigation row
     nav_row = sent_markup.inline_keyboard[2]
     assert len(nav_row) == 2  # Expect two buttons in the navigation row
     assert nav_row[0].text == "<< Back to Categories"
-    assert nav_row[0].callback_data == "navigate_to_categories"
+    assert nav_row[0].callback_data == callbacks.encode(callbacks.CATEGORIES)
     assert nav_row[1].text == "❌ Close"
-    assert nav_row[1].callback_data == "close_shop"
+    assert nav_row[1].callback_data == CLOSE
 
 
 @pytest.mark.asyncio
@@ -142,11 +158,9 @@ async def test_handle_category_selection_no_products(
     """Test category button click when category is empty."""
     # Arrange
     category_name = "Empty Category"
-    mock_update_callback_query.callback_query.data = f"category_{category_name}"
-
-    mock_match = mocker.MagicMock()
-    mock_match.group.return_value = category_name
-    mock_telegram_context.matches = [mock_match]
+    mock_update_callback_query.callback_query.data = _category_data(category_name)
+    mock_telegram_context.args = [callbacks.category_code(category_name)]
+    mock_persistence_layer.get_all_categories.return_value = [category_name]
 
     mock_persistence_layer.get_products_by_category.return_value = []
 
@@ -163,7 +177,30 @@ async def test_handle_category_selection_no_products(
 
     expected_text = Strings.Shop.NO_PRODUCTS
     mock_update_callback_query.callback_query.edit_message_text.assert_called_once_with(
-        expected_text
+        text=expected_text
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_category_selection_unknown_code_is_not_cached(
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """A stale category code shows the empty screen without caching it."""
+    mock_telegram_context.args = [callbacks.category_code("Gone")]
+    mock_persistence_layer.get_catalog_version.return_value = 1
+    mock_persistence_layer.get_all_categories.return_value = ["Bakery"]
+
+    for _ in range(2):
+        await shop.handle_category_selection(
+            mock_update_callback_query, mock_telegram_context
+        )
+
+    assert mock_persistence_layer.get_all_categories.call_count == 2
+    mock_persistence_layer.get_products_by_category.assert_not_called()
+    mock_update_callback_query.callback_query.edit_message_text.assert_called_with(
+        text=Strings.Shop.NO_PRODUCTS
     )
 
 
@@ -176,14 +213,12 @@ async def test_handle_product_selection(
 ):
     """Test product button click shows product details and 'Add to Cart' button."""
     # Arrange
-    product_id = "prod_123"
+    product_id = PRODUCT_1
     category_name = "Bakery"  # Needed for the "Back" button
-    mock_update_callback_query.callback_query.data = f"product_{product_id}"
-
-    # Mock the context.matches to simulate regex capture
-    mock_match = mocker.MagicMock()
-    mock_match.group.return_value = product_id
-    mock_telegram_context.matches = [mock_match]
+    mock_update_callback_query.callback_query.data = _product_data(
+        callbacks.PRODUCT, product_id
+    )
+    mock_telegram_context.args = [callbacks.uuid_to_int(product_id)]
 
     mock_product = {
         "id": product_id,
@@ -223,17 +258,17 @@ async def test_handle_product_selection(
     assert isinstance(sent_markup, InlineKeyboardMarkup)
     assert len(sent_markup.inline_keyboard) == 2  # Expect Two row of buttons
     assert sent_markup.inline_keyboard[0][0].text == "🛒 Add to Cart"
-    assert (
-        sent_markup.inline_keyboard[0][0].callback_data == f"add_to_cart_{product_id}"
+    assert sent_markup.inline_keyboard[0][0].callback_data == _product_data(
+        callbacks.ADD_TO_CART, product_id
     )
 
     # Assert the navigation buttons are in the second row
     nav_row = sent_markup.inline_keyboard[1]
     assert len(nav_row) == 2
     assert nav_row[0].text == Strings.Shop.back_to_category_btn(category_name)
-    assert nav_row[0].callback_data == f"navigate_to_products_{category_name}"
+    assert nav_row[0].callback_data == _category_data(category_name)
     assert nav_row[1].text == Strings.Shop.CLOSE_BTN
-    assert nav_row[1].callback_data == "close_shop"
+    assert nav_row[1].callback_data == CLOSE
 
 
 @pytest.mark.asyncio
@@ -245,22 +280,23 @@ async def test_handle_add_to_cart_new_item(
 ):
     """Test 'Add to Cart' button for a new item."""
     # Arrange
-    product_id = "prod_123"
-    mock_update_callback_query.callback_query.data = f"add_to_cart_{product_id}"
-
-    # Mock the context.matches to simulate regex capture
-    mock_match = mocker.MagicMock()
-    mock_match.group.return_value = product_id
-    mock_telegram_context.matches = [mock_match]
+    product_id = PRODUCT_1
+    mock_update_callback_query.callback_query.data = _product_data(
+        callbacks.ADD_TO_CART, product_id
+    )
+    mock_telegram_context.args = [callbacks.uuid_to_int(product_id)]
 
     # Mock persistence to get the product name for the confirmation message
     mock_persistence_layer.get_product.return_value = {"name": "Croissant"}
+    mock_persistence_layer.get_cart_items.return_value = {}
     mock_persistence_layer.add_to_cart.return_value = 1
 
     # Act
     await shop.handle_add_to_cart(mock_update_callback_query, mock_telegram_context)
 
-    # Assert
+    # Assert: the tap is held until its debounce window closes
+    mock_persistence_layer.add_to_cart.assert_not_called()
+    await mock_telegram_context.bot_data["cart_taps"].settle(98765)
     mock_persistence_layer.add_to_cart.assert_called_once_with(
         user_id=98765, product_id=product_id, quantity=1
     )
@@ -280,20 +316,21 @@ async def test_handle_add_to_cart_existing_item(
 ):
     """Test 'Add to Cart' button for an item already in the cart."""
     # Arrange
-    product_id = "prod_123"
-    mock_update_callback_query.callback_query.data = f"add_to_cart_{product_id}"
-
-    mock_match = mocker.MagicMock()
-    mock_match.group.return_value = product_id
-    mock_telegram_context.matches = [mock_match]
+    product_id = PRODUCT_1
+    mock_update_callback_query.callback_query.data = _product_data(
+        callbacks.ADD_TO_CART, product_id
+    )
+    mock_telegram_context.args = [callbacks.uuid_to_int(product_id)]
 
     mock_persistence_layer.get_product.return_value = {"name": "Croissant"}
+    mock_persistence_layer.get_cart_items.return_value = {product_id: 1}
     mock_persistence_layer.add_to_cart.return_value = 2
 
     # Act
     await shop.handle_add_to_cart(mock_update_callback_query, mock_telegram_context)
 
     # Assert
+    await mock_telegram_context.bot_data["cart_taps"].settle(98765)
     mock_persistence_layer.add_to_cart.assert_called_once_with(
         user_id=98765, product_id=product_id, quantity=1
     )
@@ -303,6 +340,56 @@ async def test_handle_add_to_cart_existing_item(
     )
 
 
+@pytest.mark.asyncio
+async def test_handle_add_to_cart_burst_is_one_write(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """Repeated taps are answered with a running total and written once."""
+    product_id = PRODUCT_1
+    mock_telegram_context.args = [callbacks.uuid_to_int(product_id)]
+    mock_persistence_layer.get_product.return_value = {"name": "Croissant"}
+    mock_persistence_layer.get_cart_items.return_value = {product_id: 2}
+    mock_persistence_layer.add_to_cart.return_value = 5
+
+    for _ in range(3):
+        mock_telegram_context.query_answered = False  # A fresh update each tap
+        await shop.handle_add_to_cart(mock_update_callback_query, mock_telegram_context)
+
+    answers = mock_update_callback_query.callback_query.answer.call_args_list
+    assert [c.args[0] for c in answers] == [
+        Strings.Shop.added_to_cart("Croissant", n) for n in (3, 4, 5)
+    ]
+    mock_persistence_layer.get_product.assert_called_once_with(product_id)
+    mock_persistence_layer.add_to_cart.assert_not_called()
+
+    await mock_telegram_context.bot_data["cart_taps"].settle(98765)
+    mock_persistence_layer.add_to_cart.assert_called_once_with(
+        user_id=98765, product_id=product_id, quantity=3
+    )
+
+
+@pytest.mark.asyncio
+async def test_handle_add_to_cart_unavailable(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """A missing product is reported with an alert and nothing is buffered."""
+    mock_telegram_context.args = [callbacks.uuid_to_int(PRODUCT_1)]
+    mock_persistence_layer.get_product.return_value = None
+
+    await shop.handle_add_to_cart(mock_update_callback_query, mock_telegram_context)
+
+    mock_update_callback_query.callback_query.answer.assert_called_once_with(
+        Strings.Shop.PRODUCT_UNAVAILABLE, show_alert=True
+    )
+    mock_persistence_layer.get_cart_items.assert_not_called()
+
+
 @pytest.mark.asyncio
 async def test_handle_close_shop(
     mocker,
@@ -313,7 +400,7 @@ async def test_handle_close_shop(
     """Test that the 'close_shop' callback navigates back to the Home Dashboard"""
     # Arrange
     query = mock_update_callback_query.callback_query
-    query.data = "close_shop"
+    query.data = CLOSE
     mock_update_callback_query.effective_user.first_name = "TestUser"
     mock_telegram_context.bot_data["persistence"] = mock_persistence_layer
     mock_keyboard = InlineKeyboardMarkup(
@@ -345,7 +432,7 @@ async def test_handle_back_to_categories(
     """Test 'Back to Categories' callback displays the category list."""
     # Arrange
     query = mock_update_callback_query.callback_query
-    query.data = "navigate_to_categories"
+    query.data = callbacks.encode(callbacks.CATEGORIES)
 
     # Mock the persistence layer to return some categories
     mock_categories = ["Bakery", "Drinks"]
@@ -372,13 +459,13 @@ async def test_handle_back_to_categories(
     assert isinstance(sent_markup, InlineKeyboardMarkup)
     assert len(sent_markup.inline_keyboard) == 3  # 2 categories, 1 close button
     assert sent_markup.inline_keyboard[0][0].text == "Bakery"
-    assert sent_markup.inline_keyboard[0][0].callback_data == "category_Bakery"
+    assert sent_markup.inline_keyboard[0][0].callback_data == _category_data("Bakery")
     assert sent_markup.inline_keyboard[1][0].text == "Drinks"
-    assert sent_markup.inline_keyboard[1][0].callback_data == "category_Drinks"
+    assert sent_markup.inline_keyboard[1][0].callback_data == _category_data("Drinks")
     close_row = sent_markup.inline_keyboard[2]
     assert len(close_row) == 1
     assert close_row[0].text == "❌ Close"
-    assert close_row[0].callback_data == "close_shop"
+    assert close_row[0].callback_data == CLOSE
 
 
 @pytest.mark.asyncio
@@ -392,18 +479,14 @@ async def test_handle_back_to_products(
     # Arrange
     query = mock_update_callback_query.callback_query
     category_name = "Bakery"
-    # This callback will be handled by the same function as "category_Bakery"
-    query.data = f"navigate_to_products_{category_name}"
-
-    # We must simulate the regex match that the CallbackQueryHandler performs.
-    # The handler will find `Bakery` and store it in `context.matches`.
-    mock_match = mocker.MagicMock()
-    mock_match.group.return_value = category_name
-    mock_telegram_context.matches = [mock_match]
+    # The product screen's back button carries the same data as the category button
+    query.data = _category_data(category_name)
+    mock_telegram_context.args = [callbacks.category_code(category_name)]
+    mock_persistence_layer.get_all_categories.return_value = [category_name]
 
     # Mock the persistence layer to return products for this category
     mock_products = [
-        {"id": "prod_123", "name": "Croissant", "price": 2.50},
+        {"id": PRODUCT_1, "name": "Croissant", "price": 2.50},
     ]
     mock_persistence_layer.get_products_by_category.return_value = mock_products
 
@@ -424,3 +507,23 @@ async def test_handle_back_to_products(
     assert isinstance(sent_markup, InlineKeyboardMarkup)
     assert len(sent_markup.inline_keyboard) == 2  # 1 product, 1 nav row
     assert sent_markup.inline_keyboard[0][0].text == "Croissant ($2.50)"
+
+
+@pytest.mark.asyncio
+async def test_category_menu_is_rendered_once_per_catalog_version(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """Repeated navigation reuses the cached menu until the catalog changes."""
+    mock_persistence_layer.get_catalog_version.return_value = 1
+    mock_persistence_layer.get_all_categories.return_value = ["Bakery"]
+
+    await shop.shop_start(mock_update_callback_query, mock_telegram_context)
+    await shop.shop_start(mock_update_callback_query, mock_telegram_context)
+    assert mock_persistence_layer.get_all_categories.call_count == 1
+
+    mock_persistence_layer.get_catalog_version.return_value = 2
+    await shop.shop_start(mock_update_callback_query, mock_telegram_context)
+    assert mock_persistence_layer.get_all_categories.call_count == 2
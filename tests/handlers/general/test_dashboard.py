@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import AsyncMock
 
 from handlers.general.start import get_home_menu
+from handlers import callbacks
 
 
 @pytest.mark.asyncio
@@ -48,7 +49,7 @@ async def test_get_home_menu_active_cart(mock_persistence_layer):
         "Checkout" in button.text for row in keyboard.inline_keyboard for button in row
     )
     assert any(
-        button.callback_data == "view_cart"
+        button.callback_data == callbacks.encode(callbacks.VIEW_CART)
         for row in keyboard.inline_keyboard
         for button in row
     )
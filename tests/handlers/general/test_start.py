@@ -7,6 +7,7 @@ from telegram.constants import ParseMode
 from telegram.ext import ContextTypes
 
 from handlers.general.start import start_command
+from handlers import callbacks
 
 
 @pytest.mark.asyncio
@@ -26,9 +27,9 @@ async def test_start_command(
     await start_command(mock_update_message, mock_telegram_context)
 
     # Assert
-    mock_update_message.message.reply_text.assert_called_once()
-    call_args = mock_update_message.message.reply_text.call_args
-    reply_text = call_args.args[0] if call_args.args else call_args.kwargs.get("text")
+    mock_telegram_context.bot.send_message.assert_called_once()
+    call_args = mock_telegram_context.bot.send_message.call_args
+    reply_text = call_args.kwargs.get("text")
     assert reply_text == Strings.General.welcome_new_user("Alice")
 
     # Check reply_markup
@@ -42,7 +43,7 @@ async def test_start_command(
         for button in row:
             if (
                 button.text == Strings.General.SHOP_NOW_BTN
-                and button.callback_data == "shop_start"
+                and button.callback_data == callbacks.encode(callbacks.CATEGORIES)
             ):
                 shop_button_found = True
                 break
@@ -86,7 +87,7 @@ async def test_get_home_menu_empty_cart(
         for button in row:
             if (
                 button.text == Strings.General.SHOP_NOW_BTN
-                and button.callback_data == "shop_start"
+                and button.callback_data == callbacks.encode(callbacks.CATEGORIES)
             ):
                 shop_button_found = True
                 break
@@ -132,12 +133,12 @@ async def test_get_home_menu_active_cart(
         for button in row:
             if (
                 button.text == Strings.General.CONTINUE_SHOPPING_BTN
-                and button.callback_data == "shop_start"
+                and button.callback_data == callbacks.encode(callbacks.CATEGORIES)
             ):
                 continue_shopping_found = True
             if (
                 button.text == Strings.General.CHECKOUT_BTN
-                and button.callback_data == "view_cart"
+                and button.callback_data == callbacks.encode(callbacks.VIEW_CART)
             ):
                 checkout_found = True
 
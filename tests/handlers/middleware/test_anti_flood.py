@@ -0,0 +1,145 @@
+import pytest
+from telegram import User
+from telegram.ext import ApplicationHandlerStop
+
+from handlers.middleware import FloodGuard, anti_flood_middleware
+from handlers.middleware.anti_flood import FloodStats
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def persistence(mocker):
+    persistence = mocker.AsyncMock(spec=AbstractPantryPersistence)
+    persistence.get_bot_owner.return_value = 1
+    return persistence
+
+
+@pytest.fixture
+def guard(persistence, clock):
+    return FloodGuard(persistence, rate=1.0, burst=2, max_users=2, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_users_get_a_burst_then_the_rate(guard, persistence, clock):
+    assert [await guard.allow(7) for _ in range(3)] == [True, True, False]
+    clock.now += 1.0
+    assert await guard.allow(7)
+    assert not await guard.allow(7)
+    # Other users have their own bucket
+    assert await guard.allow(8)
+    persistence.get_bot_owner.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_owner_is_never_limited(guard, persistence):
+    assert all([await guard.allow(1) for _ in range(10)])
+    # The owner id is looked up once, and only when the limit was hit
+    persistence.get_bot_owner.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_missing_owner_is_looked_up_again_after_the_ttl(persistence, clock):
+    persistence.get_bot_owner.return_value = None
+    guard = FloodGuard(persistence, rate=1.0, burst=1, no_owner_ttl=60.0, clock=clock)
+    await guard.allow(7)
+
+    for _ in range(5):
+        assert not await guard.allow(7)
+    persistence.get_bot_owner.assert_called_once()
+
+    clock.now += 60.0
+    persistence.get_bot_owner.return_value = 7
+    await guard.allow(7)  # Takes the refilled token
+    assert await guard.allow(7)  # Over the limit, but now the owner
+    assert persistence.get_bot_owner.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_tracked_users_are_bounded(guard):
+    for user_id in (7, 8, 9):
+        await guard.allow(user_id)
+        await guard.allow(user_id)
+
+    assert guard.tracked == 2
+    # 7 was evicted, so it starts over with a full bucket
+    assert await guard.allow(7)
+    assert not await guard.allow(9)
+
+
+@pytest.mark.asyncio
+async def test_only_the_first_drop_of_a_flood_warns(guard, clock):
+    for _ in range(2):
+        await guard.allow(7)
+    await guard.allow(7)
+    assert guard.warn_once(7)
+    assert not guard.warn_once(7)
+
+    clock.now += 1.0
+    await guard.allow(7)  # Allowed again: the next flood warns again
+    await guard.allow(7)
+    assert guard.warn_once(7)
+    assert guard.stats.warned == 2
+
+
+@pytest.fixture
+def flood_context(mock_telegram_context, guard):
+    mock_telegram_context.bot_data["flood_guard"] = guard
+    return mock_telegram_context
+
+
+@pytest.mark.asyncio
+async def test_middleware_stops_excess_callbacks_with_one_toast(
+    mock_update_callback_query, flood_context, guard
+):
+    update = mock_update_callback_query
+    update.effective_user = User(7, "Ann", False)
+    for _ in range(2):
+        await anti_flood_middleware(update, flood_context)
+
+    for _ in range(2):
+        with pytest.raises(ApplicationHandlerStop):
+            await anti_flood_middleware(update, flood_context)
+
+    update.callback_query.answer.assert_called_once_with(Strings.Flood.SLOW_DOWN)
+    assert guard.stats.dropped == {"callback_query": 2}
+
+
+@pytest.mark.asyncio
+async def test_middleware_drops_excess_messages_silently(
+    mock_update_message, flood_context, guard
+):
+    update = mock_update_message
+    update.callback_query = None
+    update.effective_user = User(7, "Ann", False)
+    for _ in range(2):
+        await anti_flood_middleware(update, flood_context)
+
+    with pytest.raises(ApplicationHandlerStop):
+        await anti_flood_middleware(update, flood_context)
+
+    update.message.reply_text.assert_not_called()
+    assert guard.stats.total == 1
+
+
+def test_flood_stats_total():
+    stats = FloodStats()
+    stats.record("message")
+    stats.record("message")
+    stats.record("callback_query")
+
+    assert stats.dropped == {"message": 2, "callback_query": 1}
+    assert stats.total == 3
@@ -0,0 +1,135 @@
+import pytest
+from telegram.error import BadRequest
+from telegram.ext import CallbackQueryHandler
+
+from handlers import callbacks
+from handlers.callbacks import CallbackRouter
+from handlers.middleware import fast_ack as fast_ack_module
+from handlers.middleware import answer_query, answers_query, fast_ack_middleware
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    fast_ack_module.answer_stats.reset()
+    yield
+    fast_ack_module.answer_stats.reset()
+
+
+async def _plain(update, context):
+    pass
+
+
+@answers_query
+async def _alerting(update, context):
+    pass
+
+
+@pytest.fixture
+def app_context(mocker, mock_telegram_context):
+    """Context whose application records background tasks instead of running them."""
+    tasks = []
+    application = mocker.Mock()
+    application.handlers = {}
+    application.create_task.side_effect = lambda coro, update=None: tasks.append(coro)
+    mock_telegram_context.application = application
+    mock_telegram_context.tasks = tasks
+    return mock_telegram_context
+
+
+def _register(context, handler, group=0):
+    context.application.handlers.setdefault(group, []).append(handler)
+
+
+@pytest.mark.asyncio
+async def test_plain_handler_is_answered_up_front(
+    mock_update_callback_query, app_context
+):
+    mock_update_callback_query.callback_query.data = "plain"
+    _register(app_context, CallbackQueryHandler(_plain, pattern="^plain$"))
+
+    await fast_ack_middleware(mock_update_callback_query, app_context)
+    mock_update_callback_query.callback_query.answer.assert_not_called()
+    await app_context.tasks[0]
+
+    mock_update_callback_query.callback_query.answer.assert_awaited_once_with()
+    assert fast_ack_module.answer_stats.counts == {fast_ack_module.FAST: 1}
+
+    # The handler's own answer is now a no-op
+    await answer_query(mock_update_callback_query, app_context)
+    assert mock_update_callback_query.callback_query.answer.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_handler_that_needs_an_alert_is_left_alone(
+    mock_update_callback_query, app_context
+):
+    mock_update_callback_query.callback_query.data = "alert"
+    _register(app_context, CallbackQueryHandler(_plain, pattern="^plain$"))
+    _register(app_context, CallbackQueryHandler(_alerting, pattern="^alert$"))
+
+    await fast_ack_middleware(mock_update_callback_query, app_context)
+
+    assert app_context.tasks == []
+    await answer_query(mock_update_callback_query, app_context, "Oops", show_alert=True)
+    mock_update_callback_query.callback_query.answer.assert_awaited_once_with(
+        "Oops", show_alert=True
+    )
+    assert fast_ack_module.answer_stats.counts == {fast_ack_module.HANDLER: 1}
+
+
+@pytest.mark.asyncio
+async def test_router_routes_declare_their_own_flag(
+    mock_update_callback_query, app_context
+):
+    router = CallbackRouter()
+    router.add(callbacks.ADD_TO_CART, _alerting)
+    router.add(callbacks.CATEGORIES, _plain)
+    _register(app_context, router.handler())
+
+    mock_update_callback_query.callback_query.data = callbacks.encode(
+        callbacks.ADD_TO_CART, 1
+    )
+    await fast_ack_middleware(mock_update_callback_query, app_context)
+    assert app_context.tasks == []
+
+    mock_update_callback_query.callback_query.data = callbacks.encode(
+        callbacks.CATEGORIES
+    )
+    await fast_ack_middleware(mock_update_callback_query, app_context)
+    assert len(app_context.tasks) == 1
+    app_context.tasks[0].close()
+
+
+@pytest.mark.asyncio
+async def test_other_updates_are_ignored(mock_update_message, app_context):
+    mock_update_message.callback_query = None
+
+    await fast_ack_middleware(mock_update_message, app_context)
+
+    assert app_context.tasks == []
+
+
+@pytest.mark.asyncio
+async def test_failed_fast_answer_is_not_recorded(
+    mock_update_callback_query, app_context
+):
+    mock_update_callback_query.callback_query.data = "plain"
+    mock_update_callback_query.callback_query.answer.side_effect = BadRequest(
+        "Query is too old"
+    )
+    _register(app_context, CallbackQueryHandler(_plain, pattern="^plain$"))
+
+    await fast_ack_middleware(mock_update_callback_query, app_context)
+    await app_context.tasks[0]
+
+    assert fast_ack_module.answer_stats.counts == {}
+
+
+def test_latency_percentiles():
+    stats = fast_ack_module.AnswerLatencyStats()
+    for ms in range(1, 101):
+        stats.record("fast", ms / 1000)
+
+    assert stats.percentile("fast", 0.5) == pytest.approx(0.051)
+    assert stats.percentile("fast", 0.99) == pytest.approx(0.1)
+    assert stats.percentile("handler", 0.5) is None
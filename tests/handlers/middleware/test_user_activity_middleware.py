@@ -0,0 +1,55 @@
+import pytest
+from telegram import User
+from telegram.constants import ChatMemberStatus
+
+from handlers.middleware import user_activity_middleware
+
+
+@pytest.mark.asyncio
+async def test_middleware_records_the_sender(
+    mocker, mock_update_message, mock_telegram_context
+):
+    tracker = mocker.Mock()
+    mock_telegram_context.bot_data["user_activity"] = tracker
+    mock_update_message.effective_user = User(7, "Ann", False, username="ann")
+
+    await user_activity_middleware(mock_update_message, mock_telegram_context)
+
+    tracker.seen.assert_called_once_with(7, "ann", "Ann")
+
+
+@pytest.mark.asyncio
+async def test_middleware_skips_updates_without_a_person(
+    mocker, mock_update_message, mock_telegram_context
+):
+    tracker = mocker.Mock()
+    mock_telegram_context.bot_data["user_activity"] = tracker
+
+    mock_update_message.effective_user = None
+    await user_activity_middleware(mock_update_message, mock_telegram_context)
+    mock_update_message.effective_user = User(8, "Bot", True)
+    await user_activity_middleware(mock_update_message, mock_telegram_context)
+
+    tracker.seen.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "status, recorded",
+    [
+        (ChatMemberStatus.BANNED, False),
+        (ChatMemberStatus.LEFT, False),
+        (ChatMemberStatus.MEMBER, True),
+    ],
+)
+async def test_blocking_the_bot_does_not_count_as_activity(
+    mocker, mock_update_message, mock_telegram_context, status, recorded
+):
+    tracker = mocker.Mock()
+    mock_telegram_context.bot_data["user_activity"] = tracker
+    mock_update_message.effective_user = User(7, "Ann", False, username="ann")
+    mock_update_message.my_chat_member.new_chat_member.status = status
+
+    await user_activity_middleware(mock_update_message, mock_telegram_context)
+
+    assert tracker.seen.called is recorded
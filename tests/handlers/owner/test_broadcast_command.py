@@ -0,0 +1,69 @@
+import pytest
+from telegram import Update, User
+from telegram.ext import ContextTypes
+
+from handlers.owner import broadcast
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+from services import BroadcastService
+
+
+@pytest.fixture
+def owner_update(
+    mocker,
+    mock_update_message: Update,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_update_message.effective_chat.id = 12345
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    return mock_update_message
+
+
+@pytest.fixture
+def broadcasts(mocker, mock_telegram_context: ContextTypes.DEFAULT_TYPE):
+    service = mocker.AsyncMock(spec=BroadcastService)
+    mock_telegram_context.bot_data["broadcasts"] = service
+    return service
+
+
+@pytest.mark.asyncio
+async def test_broadcast_starts_with_the_text_after_the_command(
+    owner_update, mock_telegram_context, broadcasts
+):
+    owner_update.message.text = "/broadcast New menu!\nCome and see."
+    broadcasts.start.return_value = 3
+
+    await broadcast.broadcast_command(owner_update, mock_telegram_context)
+
+    broadcasts.start.assert_called_once_with(
+        "New menu!\nCome and see.", report_chat_id=12345
+    )
+    owner_update.message.reply_text.assert_called_once_with(
+        Strings.Broadcast.started(3)
+    )
+
+
+@pytest.mark.asyncio
+async def test_broadcast_without_text_shows_usage(
+    owner_update, mock_telegram_context, broadcasts
+):
+    owner_update.message.text = "/broadcast   "
+
+    await broadcast.broadcast_command(owner_update, mock_telegram_context)
+
+    broadcasts.start.assert_not_called()
+    owner_update.message.reply_text.assert_called_once_with(Strings.Broadcast.USAGE)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_is_owner_only(
+    mocker, owner_update, mock_telegram_context, broadcasts
+):
+    owner_update.effective_user = mocker.MagicMock(spec=User, id=1)
+    owner_update.message.text = "/broadcast Hi"
+
+    await broadcast.broadcast_command(owner_update, mock_telegram_context)
+
+    broadcasts.start.assert_not_called()
+    owner_update.message.reply_text.assert_called_once_with(Strings.Owner.NOT_OWNER)
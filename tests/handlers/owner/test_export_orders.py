@@ -0,0 +1,172 @@
+import csv
+import gzip
+import io
+import sqlite3
+
+import pytest
+from telegram import Update, User
+from telegram.error import BadRequest
+from telegram.ext import ContextTypes
+
+from handlers.owner import export_orders
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+
+def _sample_row(order_id="order-1", quantity=2):
+    return {
+        "order_id": order_id,
+        "created_at": "2026-01-05 10:00:00",
+        "user_id": 555,
+        "status": "completed",
+        "total_amount": 9.0,
+        "product_id": "prod-1",
+        "product_name": "Latte",
+        "quantity": quantity,
+        "unit_price": 4.5,
+    }
+
+
+def test_parse_date_range_makes_end_inclusive():
+    """The 'to' date should include the whole day."""
+    assert export_orders.parse_date_range([]) == (None, None)
+    assert export_orders.parse_date_range(["2026-01-01"]) == ("2026-01-01", None)
+    assert export_orders.parse_date_range(["2026-01-01", "2026-01-31"]) == (
+        "2026-01-01",
+        "2026-02-01",
+    )
+
+
+@pytest.mark.parametrize(
+    "args", [["yesterday"], ["2026-02-01", "2026-01-01"], ["a", "b", "c"]]
+)
+def test_parse_date_range_rejects_bad_input(args):
+    with pytest.raises(ValueError):
+        export_orders.parse_date_range(args)
+
+
+def test_write_orders_csv_streams_compressed_rows():
+    """Rows from a generator are written as gzip CSV with a header."""
+    buffer = io.BytesIO()
+    rows = (_sample_row(order_id=f"order-{i}") for i in range(3))
+
+    count = export_orders.write_orders_csv(rows, buffer)
+
+    assert count == 3
+    assert not buffer.closed
+    text = gzip.decompress(buffer.getvalue()).decode("utf-8")
+    parsed = list(csv.DictReader(io.StringIO(text)))
+    assert [row["order_id"] for row in parsed] == ["order-0", "order-1", "order-2"]
+    assert parsed[0]["product_name"] == "Latte"
+
+
+@pytest.mark.asyncio
+async def test_export_orders_sends_document(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """The owner receives a compressed CSV document."""
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.iter_order_export_rows = mocker.Mock(
+        return_value=iter([_sample_row()])
+    )
+    mock_telegram_context.args = ["2026-01-01", "2026-01-31"]
+
+    await export_orders.export_orders(mock_update_message, mock_telegram_context)
+
+    mock_persistence_layer.iter_order_export_rows.assert_called_once_with(
+        "2026-01-01", "2026-02-01"
+    )
+    call_kwargs = mock_update_message.message.reply_document.call_args.kwargs
+    assert call_kwargs["filename"] == "orders_2026-01-01_2026-01-31.csv.gz"
+    assert call_kwargs["caption"] == Strings.Export.caption(1)
+
+
+@pytest.mark.asyncio
+async def test_export_orders_no_rows(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.iter_order_export_rows = mocker.Mock(return_value=iter([]))
+    mock_telegram_context.args = []
+
+    await export_orders.export_orders(mock_update_message, mock_telegram_context)
+
+    mock_update_message.message.reply_text.assert_called_once_with(
+        Strings.Export.NO_ORDERS
+    )
+    mock_update_message.message.reply_document.assert_not_called()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "error", [sqlite3.OperationalError("database is locked"), OSError("disk full")]
+)
+async def test_export_orders_reports_failures(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+    error,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.iter_order_export_rows = mocker.Mock(side_effect=error)
+    mock_telegram_context.args = []
+
+    await export_orders.export_orders(mock_update_message, mock_telegram_context)
+
+    mock_update_message.message.reply_text.assert_called_once_with(
+        Strings.Export.FAILED
+    )
+    mock_update_message.message.reply_document.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_export_orders_reports_a_failed_upload(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.iter_order_export_rows = mocker.Mock(
+        return_value=iter([_sample_row()])
+    )
+    mock_update_message.message.reply_document.side_effect = BadRequest(
+        "Request entity too large"
+    )
+    mock_telegram_context.args = []
+
+    await export_orders.export_orders(mock_update_message, mock_telegram_context)
+
+    mock_update_message.message.reply_text.assert_called_once_with(
+        Strings.Export.FAILED
+    )
+
+
+@pytest.mark.asyncio
+async def test_export_orders_rejects_non_owner(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=999)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_telegram_context.args = []
+
+    await export_orders.export_orders(mock_update_message, mock_telegram_context)
+
+    mock_update_message.message.reply_text.assert_called_once_with(
+        Strings.Owner.NOT_OWNER
+    )
+    mock_update_message.message.reply_document.assert_not_called()
@@ -0,0 +1,162 @@
+import pytest
+from telegram import Update
+from telegram.ext import ContextTypes
+
+from handlers.owner import orders
+from persistence.order_status import PENDING, PREPARING
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+
+@pytest.mark.asyncio
+async def test_handle_owner_orders_page_filters_status(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_persistence_layer.get_bot_owner.return_value = 98765
+    mock_match = mocker.MagicMock()
+    mock_match.group.side_effect = lambda i: {1: "pending", 2: "42"}[i]
+    mock_telegram_context.matches = [mock_match]
+    mock_persistence_layer.get_all_orders_for_owner.return_value = []
+    mock_persistence_layer.get_order_status_counts.return_value = {"pending": 4}
+
+    await orders.handle_owner_orders_page(
+        mock_update_callback_query, mock_telegram_context
+    )
+
+    mock_persistence_layer.get_all_orders_for_owner.assert_called_once_with(
+        status="pending", limit=orders.OWNER_ORDERS_PAGE_SIZE + 1, before_seq=42
+    )
+    text = mock_update_callback_query.callback_query.edit_message_text.call_args.kwargs[
+        "text"
+    ]
+    assert Strings.Order.owner_status_header("pending") in text
+    assert Strings.Order.OWNER_NO_ORDERS in text
+    markup = (
+        mock_update_callback_query.callback_query.edit_message_text.call_args.kwargs[
+            "reply_markup"
+        ]
+    )
+    tab_labels = [b.text for row in markup.inline_keyboard for b in row]
+    assert Strings.Order.status_tab("pending", 4) in tab_labels
+    assert Strings.Order.status_tab("ready", 0) in tab_labels
+
+
+@pytest.mark.asyncio
+async def test_handle_owner_orders_page_rejects_non_owner(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_update_callback_query.message = None
+
+    await orders.handle_owner_orders_page(
+        mock_update_callback_query, mock_telegram_context
+    )
+
+    mock_persistence_layer.get_all_orders_for_owner.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_queue_shows_advance_and_cancel_buttons(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    order_id = "0a1b2c3d-0000-0000-0000-000000000000"
+    mock_persistence_layer.get_all_orders_for_owner.return_value = [
+        {
+            "order_seq": 1,
+            "id": order_id,
+            "user_id": 1,
+            "total_amount": 2.0,
+            "status": PENDING,
+            "created_at": "2026-01-05 10:00:00",
+            "item_count": 1,
+        }
+    ]
+    mock_persistence_layer.get_order_status_counts.return_value = {PENDING: 1}
+
+    await orders.show_owner_orders(mock_update_callback_query, mock_telegram_context)
+
+    markup = (
+        mock_update_callback_query.callback_query.edit_message_text.call_args.kwargs[
+            "reply_markup"
+        ]
+    )
+    action_row = markup.inline_keyboard[0]
+    assert action_row[0].callback_data == f"ord_{order_id}_pending_preparing"
+    assert action_row[1].callback_data == f"ord_{order_id}_pending_cancelled"
+    assert all(len(b.callback_data.encode()) <= 64 for b in action_row)
+
+
+@pytest.mark.asyncio
+async def test_handle_order_status_change(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_persistence_layer.get_bot_owner.return_value = 98765
+    mock_match = mocker.MagicMock()
+    mock_match.groups.return_value = ("order-1", PENDING, PREPARING)
+    mock_telegram_context.matches = [mock_match]
+    mock_persistence_layer.update_order_status.return_value = True
+    mock_persistence_layer.get_all_orders_for_owner.return_value = []
+    mock_persistence_layer.get_order_status_counts.return_value = {}
+
+    await orders.handle_order_status_change(
+        mock_update_callback_query, mock_telegram_context
+    )
+
+    mock_persistence_layer.update_order_status.assert_called_once_with(
+        "order-1", PREPARING, expected_status=PENDING
+    )
+    mock_update_callback_query.callback_query.answer.assert_called_once_with(
+        Strings.Order.status_updated("order-1", PREPARING)
+    )
+    mock_persistence_layer.get_all_orders_for_owner.assert_called_once_with(
+        status=PENDING, limit=orders.OWNER_ORDERS_PAGE_SIZE + 1, before_seq=None
+    )
+
+
+@pytest.mark.asyncio
+async def test_all_tab_lists_every_status(
+    mocker,
+    mock_update_callback_query: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    """Legacy 'completed' orders are only reachable through the All tab."""
+    mock_persistence_layer.get_bot_owner.return_value = 98765
+    mock_persistence_layer.get_all_orders_for_owner.return_value = []
+    mock_persistence_layer.get_order_status_counts.return_value = {
+        PENDING: 2,
+        "completed": 5,
+    }
+
+    await orders.show_owner_orders(mock_update_callback_query, mock_telegram_context)
+    markup = (
+        mock_update_callback_query.callback_query.edit_message_text.call_args.kwargs[
+            "reply_markup"
+        ]
+    )
+    all_tab = markup.inline_keyboard[-1][-1]
+    assert all_tab.text == Strings.Order.status_tab(orders.ALL_ORDERS, 7)
+
+    mock_match = mocker.MagicMock()
+    mock_match.group.side_effect = lambda i: {1: orders.ALL_ORDERS, 2: None}[i]
+    mock_telegram_context.matches = [mock_match]
+    assert all_tab.callback_data == "owner_orders_all"
+    await orders.handle_owner_orders_page(
+        mock_update_callback_query, mock_telegram_context
+    )
+
+    mock_persistence_layer.get_all_orders_for_owner.assert_called_with(
+        status=None, limit=orders.OWNER_ORDERS_PAGE_SIZE + 1, before_seq=None
+    )
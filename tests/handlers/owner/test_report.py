@@ -0,0 +1,57 @@
+import pytest
+from telegram import Update, User
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from analytics import SalesAnalytics
+from handlers.owner import report
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+
+def test_build_report_without_orders():
+    assert report.build_report(SalesAnalytics()) == Strings.Report.NO_DATA
+
+
+def test_build_report_sections():
+    analytics = SalesAnalytics()
+    analytics.ingest(
+        [
+            {
+                "order_seq": 1,
+                "order_id": "order-1",
+                "created_at": "2026-01-05 08:00:00",
+                "product_id": "latte",
+                "category": "Drinks",
+                "quantity": 2,
+                "unit_price": 4.50,
+            }
+        ]
+    )
+
+    text = report.build_report(analytics)
+
+    assert Strings.Report.basket_line(1, 2.0, 9.0) in text
+    assert Strings.Report.hour_line(8, 9.0) in text
+    assert Strings.Report.category_line("Drinks", 9.0, 1.0) in text
+
+
+@pytest.mark.asyncio
+async def test_report_command_refreshes_shared_engine(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.iter_order_lines = mocker.Mock(return_value=iter([]))
+    mock_persistence_layer.get_order_status_counts.return_value = {}
+
+    await report.report_command(mock_update_message, mock_telegram_context)
+
+    assert isinstance(mock_telegram_context.bot_data["analytics"], SalesAnalytics)
+    mock_persistence_layer.iter_order_lines.assert_called_once_with(after_seq=0)
+    mock_update_message.message.reply_text.assert_called_once_with(
+        Strings.Report.NO_DATA, parse_mode=ParseMode.HTML
+    )
@@ -0,0 +1,62 @@
+from datetime import datetime, timezone
+
+import pytest
+from telegram import Update, User
+from telegram.constants import ParseMode
+from telegram.ext import ContextTypes
+
+from handlers.owner import sales
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+
+
+def _today():
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+def test_format_sales_summary():
+    daily = [
+        {"day": _today(), "order_count": 2, "units": 3, "revenue": 10.0},
+        {"day": "2000-01-01", "order_count": 1, "units": 1, "revenue": 5.0},
+    ]
+    top = [
+        {"name": "Latte", "units": 3, "revenue": 13.5},
+        {"name": None, "units": 1, "revenue": 1.0},
+    ]
+
+    text = sales.format_sales_summary(daily, top)
+
+    assert Strings.Sales.period_line("Today", 2, 3, 10.0) in text
+    assert Strings.Sales.period_line("Last 7 days", 3, 4, 15.0) in text
+    assert Strings.Sales.top_seller_line(1, "Latte", 3, 13.5) in text
+    assert (
+        Strings.Sales.top_seller_line(2, Strings.Sales.UNKNOWN_PRODUCT, 1, 1.0) in text
+    )
+
+
+def test_format_sales_summary_no_sales():
+    text = sales.format_sales_summary([], [])
+
+    assert Strings.Sales.period_line("Today", 0, 0, 0.0) in text
+    assert Strings.Sales.NO_TOP_SELLERS in text
+
+
+@pytest.mark.asyncio
+async def test_sales_command_reads_summaries(
+    mocker,
+    mock_update_message: Update,
+    mock_telegram_context: ContextTypes.DEFAULT_TYPE,
+    mock_persistence_layer: AbstractPantryPersistence,
+):
+    mock_update_message.effective_user = mocker.MagicMock(spec=User, id=12345)
+    mock_persistence_layer.get_bot_owner.return_value = 12345
+    mock_persistence_layer.get_daily_sales.return_value = []
+    mock_persistence_layer.get_top_products.return_value = []
+
+    await sales.sales_command(mock_update_message, mock_telegram_context)
+
+    mock_persistence_layer.get_daily_sales.assert_called_once_with(days=7)
+    mock_persistence_layer.get_top_products.assert_called_once_with(days=7, limit=5)
+    mock_update_message.message.reply_text.assert_called_once_with(
+        sales.format_sales_summary([], []), parse_mode=ParseMode.HTML
+    )
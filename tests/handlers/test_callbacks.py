@@ -0,0 +1,118 @@
+import uuid
+
+import pytest
+
+from handlers import callbacks
+from handlers.callbacks import CallbackRouter
+
+
+@pytest.mark.parametrize("value", [0, 1, 61, 62, 2**32 - 1, 2**128 - 1])
+def test_int_round_trip(value):
+    assert callbacks.decode_int(callbacks.encode_int(value)) == value
+
+
+@pytest.mark.parametrize("text", ["", "a-b", callbacks.SEP])
+def test_decode_int_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        callbacks.decode_int(text)
+
+
+def test_product_callback_fits_telegram_limit():
+    product_id = str(uuid.UUID(int=2**128 - 1))
+    data = callbacks.encode(callbacks.ADD_TO_CART, callbacks.uuid_to_int(product_id))
+
+    assert len(data.encode("utf-8")) <= 64
+    action, (value,) = callbacks.decode(data)
+    assert action == callbacks.ADD_TO_CART
+    assert callbacks.int_to_uuid(value) == product_id
+
+
+def test_long_category_names_stay_short():
+    name = "Artisanal Sourdough & Naturally Leavened Breads From Local Bakers" * 2
+    data = callbacks.encode(callbacks.CATEGORY, callbacks.category_code(name))
+
+    assert len(data) <= 8
+    (code,) = callbacks.decode(data)[1]
+    assert callbacks.find_category(["Drinks", name], code) == name
+    assert callbacks.find_category(["Drinks"], code) is None
+
+
+@pytest.mark.parametrize(
+    "data, expected",
+    [
+        ("c", True),
+        ("g|1a", True),
+        ("z|1", False),  # Unknown action
+        ("my_orders", False),  # Legacy free-text data
+        ("cat", False),
+        ("", False),
+        (None, False),
+    ],
+)
+def test_router_matches(data, expected):
+    router = CallbackRouter()
+    router.add(callbacks.CATEGORIES, None)
+    router.add(callbacks.CATEGORY, None)
+
+    assert router.matches(data) is expected
+
+
+def test_router_rejects_duplicate_actions():
+    router = CallbackRouter()
+    router.add(callbacks.CATEGORIES, None)
+
+    with pytest.raises(ValueError):
+        router.add(callbacks.CATEGORIES, None)
+
+
+@pytest.mark.asyncio
+async def test_router_dispatches_with_decoded_args(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    handler = mocker.AsyncMock()
+    router = CallbackRouter()
+    router.add(callbacks.PRODUCT, handler)
+    mock_update_callback_query.callback_query.data = callbacks.encode(
+        callbacks.PRODUCT, 12345
+    )
+
+    await router.dispatch(mock_update_callback_query, mock_telegram_context)
+
+    handler.assert_awaited_once_with(mock_update_callback_query, mock_telegram_context)
+    assert mock_telegram_context.args == [12345]
+
+
+@pytest.mark.asyncio
+async def test_router_answers_malformed_data(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    handler = mocker.AsyncMock()
+    router = CallbackRouter()
+    router.add(callbacks.PRODUCT, handler)
+    mock_update_callback_query.callback_query.data = "p|!!"
+
+    await router.dispatch(mock_update_callback_query, mock_telegram_context)
+
+    handler.assert_not_awaited()
+    mock_update_callback_query.callback_query.answer.assert_awaited_once()
+
+
+def test_customer_router_covers_every_action():
+    from handlers.customer import build_router
+
+    router = build_router()
+    for action in (
+        callbacks.CATEGORIES,
+        callbacks.CATEGORY,
+        callbacks.PRODUCT,
+        callbacks.ADD_TO_CART,
+        callbacks.CLOSE_SHOP,
+        callbacks.VIEW_CART,
+        callbacks.CLEAR_CART,
+        callbacks.CHECKOUT,
+        callbacks.CART_INC,
+        callbacks.CART_DEC,
+        callbacks.CART_REMOVE,
+        callbacks.REORDER,
+    ):
+        assert router.matches(action)
@@ -0,0 +1,165 @@
+import asyncio
+
+import pytest
+
+from handlers.cart_buffer import (
+    CartLine,
+    CartTapBuffer,
+    get_cart_editor,
+    get_cart_taps,
+    settle_cart,
+)
+from services.timing_wheel import TimingWheel
+
+USER = 98765
+PRODUCT = "prod-1"
+
+
+@pytest.fixture
+def wheel():
+    return TimingWheel(tick=1.0, slots=8)
+
+
+@pytest.fixture
+def context(mock_telegram_context, mock_persistence_layer, wheel):
+    mock_persistence_layer.get_product.return_value = {"name": "Croissant"}
+    mock_persistence_layer.get_cart_items.return_value = {}
+    mock_persistence_layer.add_to_cart.return_value = 1
+    mock_telegram_context.bot_data["wheel"] = wheel
+    return mock_telegram_context
+
+
+async def _advance(wheel, ticks=1):
+    for _ in range(ticks):
+        wheel.advance()
+        await asyncio.sleep(0)  # Let the write task run
+
+
+@pytest.mark.asyncio
+async def test_window_close_writes_taps_once(context, mock_persistence_layer, wheel):
+    buffer = get_cart_taps(context)
+    for _ in range(4):
+        entry = await buffer.tap(context, USER, PRODUCT)
+    assert entry.total == 4
+
+    await _advance(wheel, 2)  # The 1.5 s window rounds up to two ticks
+
+    mock_persistence_layer.add_to_cart.assert_called_once_with(
+        user_id=USER, product_id=PRODUCT, quantity=4
+    )
+    assert (buffer.taps, buffer.writes) == (4, 1)
+
+
+@pytest.mark.asyncio
+async def test_settle_writes_early_and_timer_is_ignored(
+    context, mock_persistence_layer, wheel
+):
+    buffer = get_cart_taps(context)
+    await buffer.tap(context, USER, PRODUCT)
+    await buffer.tap(context, USER + 1, PRODUCT)
+
+    await settle_cart(context, USER)
+    mock_persistence_layer.add_to_cart.assert_called_once_with(
+        user_id=USER, product_id=PRODUCT, quantity=1
+    )
+
+    await _advance(wheel, 2)  # Only the other user's window is still open
+    assert mock_persistence_layer.add_to_cart.call_count == 2
+    assert buffer.writes == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_write_is_retried_once(context, mock_persistence_layer, wheel):
+    mock_persistence_layer.add_to_cart.side_effect = [None, 3]
+    buffer = get_cart_taps(context)
+    for _ in range(3):
+        await buffer.tap(context, USER, PRODUCT)
+
+    await _advance(wheel, 2)
+    entry = await buffer.tap(context, USER, PRODUCT)  # Joins the pending retry
+    assert entry.total == 4
+    await _advance(wheel, 2)
+
+    assert mock_persistence_layer.add_to_cart.call_args_list[-1].kwargs == {
+        "user_id": USER,
+        "product_id": PRODUCT,
+        "quantity": 4,
+    }
+    assert buffer.writes == 2
+    await settle_cart(context, USER)
+    assert mock_persistence_layer.add_to_cart.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_taps_are_dropped_after_a_failed_retry(
+    context, mock_persistence_layer, wheel
+):
+    mock_persistence_layer.add_to_cart.return_value = None
+    buffer = get_cart_taps(context)
+    await buffer.tap(context, USER, PRODUCT)
+
+    await _advance(wheel, 4)
+    await settle_cart(context, USER)
+
+    assert mock_persistence_layer.add_to_cart.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_new_window_starts_from_persisted_quantity(
+    context, mock_persistence_layer, wheel
+):
+    buffer = get_cart_taps(context)
+    await buffer.tap(context, USER, PRODUCT)
+    await _advance(wheel, 2)
+
+    mock_persistence_layer.get_cart_items.return_value = {PRODUCT: 1}
+    entry = await buffer.tap(context, USER, PRODUCT)
+
+    assert entry.total == 2
+    assert mock_persistence_layer.get_product.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_without_scheduler_taps_write_through(
+    mock_telegram_context, mock_persistence_layer
+):
+    mock_telegram_context.job_queue = None
+    mock_persistence_layer.get_product.return_value = {"name": "Croissant"}
+    mock_persistence_layer.get_cart_items.return_value = {}
+    buffer = CartTapBuffer(mock_persistence_layer)
+
+    entry = await buffer.tap(mock_telegram_context, USER, PRODUCT)
+
+    assert entry.total == 1
+    mock_persistence_layer.add_to_cart.assert_called_once_with(
+        user_id=USER, product_id=PRODUCT, quantity=1
+    )
+
+
+@pytest.mark.asyncio
+async def test_settle_cart_without_buffer_is_noop(mock_telegram_context):
+    await settle_cart(mock_telegram_context, USER)
+    assert "cart_taps" not in mock_telegram_context.bot_data
+
+
+@pytest.mark.asyncio
+async def test_editor_writes_each_changed_line_once_per_window(
+    context, mock_persistence_layer, wheel
+):
+    editor = get_cart_editor(context)
+    await editor.open(
+        USER,
+        {PRODUCT: CartLine("Croissant", 2.0, 1), "prod-2": CartLine("Tea", 1.0, 4)},
+    )
+    for delta in (1, 1, -1):
+        await editor.adjust(context, USER, PRODUCT, delta)
+    await editor.adjust(context, USER, "prod-2", None)
+
+    mock_persistence_layer.set_cart_quantity.assert_not_called()
+    await _advance(wheel, 2)
+
+    assert sorted(mock_persistence_layer.set_cart_quantity.call_args_list) == sorted(
+        [((USER, PRODUCT, 2),), ((USER, "prod-2", 0),)]
+    )
+    assert list(editor.lines(USER)) == [PRODUCT]
+    assert (editor.presses, editor.writes) == (4, 2)
@@ -0,0 +1,59 @@
+import pytest
+
+from handlers.render_cache import RenderCache
+from handlers.views import View
+
+
+def _renderer(calls, view):
+    async def render():
+        calls.append(1)
+        return view
+
+    return render
+
+
+@pytest.mark.asyncio
+async def test_hit_skips_render():
+    cache = RenderCache()
+    calls = []
+    view = View("Menu")
+
+    assert await cache.get("menu", 1, _renderer(calls, view)) is view
+    assert await cache.get("menu", 1, _renderer(calls, View("Other"))) is view
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_new_catalog_version_drops_everything():
+    cache = RenderCache()
+    calls = []
+    await cache.get("a", 1, _renderer(calls, View("a")))
+    await cache.get("b", 1, _renderer(calls, View("b")))
+
+    fresh = View("a2")
+    assert await cache.get("a", 2, _renderer(calls, fresh)) is fresh
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_none_is_not_cached():
+    cache = RenderCache()
+    calls = []
+
+    await cache.get("missing", 1, _renderer(calls, None))
+    await cache.get("missing", 1, _renderer(calls, None))
+
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_is_bounded():
+    cache = RenderCache(max_size=2)
+    for key in ("a", "b", "c"):
+        await cache.get(key, 1, _renderer([], View(key)))
+
+    assert len(cache) == 2
+    calls = []
+    await cache.get("a", 1, _renderer(calls, View("a")))
+    assert calls == [1]
@@ -1,11 +1,12 @@
 import pytest
 from unittest.mock import Mock
-from handlers.utils import schedule_deletion
+from handlers.utils import schedule_deletion, schedule_soon
 
 
 def test_schedule_deletion():
     # 1. Mocks `context` and `context.job_queue`.
     context = Mock()
+    context.bot_data = {}
     context.job_queue = Mock()
 
     # 2. Calls `schedule_deletion(context, chat_id=123, message_id=456, delay=3.0)`
@@ -23,3 +24,40 @@ def test_schedule_deletion():
 
     # 6. Asserts that the `data` keyword argument is `(123, 456)`.
     assert call_args[1]["data"] == (123, 456)
+
+
+def test_schedule_deletion_uses_deletion_service():
+    context = Mock()
+    context.bot_data = {"deletions": Mock()}
+    context.job_queue = Mock()
+
+    schedule_deletion(context, chat_id=123, message_id=456, delay=3.0)
+
+    context.bot_data["deletions"].schedule.assert_called_once_with(123, 456, 3.0)
+    context.job_queue.run_once.assert_not_called()
+
+
+def test_schedule_soon_prefers_timing_wheel():
+    context = Mock()
+    context.bot_data = {"wheel": Mock()}
+    callback = Mock()
+
+    schedule_soon(context, callback, 2.0, "a")
+
+    context.bot_data["wheel"].schedule_soon.assert_called_once_with(callback, 2.0, "a")
+    context.job_queue.run_once.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_schedule_soon_falls_back_to_job_queue():
+    context = Mock()
+    context.bot_data = {}
+    callback = Mock()
+
+    schedule_soon(context, callback, 2.0, "a")
+
+    job_callback, delay = context.job_queue.run_once.call_args.args
+    assert delay == 2.0
+    context.job = Mock(data=context.job_queue.run_once.call_args.kwargs["data"])
+    await job_callback(context)
+    callback.assert_called_once_with("a")
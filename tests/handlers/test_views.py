@@ -0,0 +1,252 @@
+import pytest
+from telegram import InlineKeyboardMarkup, InlineKeyboardButton, InputMediaPhoto
+from telegram.constants import ParseMode
+from telegram.error import BadRequest
+
+from handlers import views
+from handlers.views import ScreenRegistry, View, show_view
+
+MARKUP = InlineKeyboardMarkup([[InlineKeyboardButton("Back", callback_data="back")]])
+
+
+def _sent(mocker, message_id):
+    return mocker.Mock(message_id=message_id)
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    views.view_stats.reset()
+    yield
+    views.view_stats.reset()
+
+
+@pytest.mark.asyncio
+async def test_command_sends_new_message(mock_update_message, mock_telegram_context):
+    mock_update_message.callback_query = None
+
+    await show_view(mock_update_message, mock_telegram_context, View("Hi", MARKUP))
+
+    mock_telegram_context.bot.send_message.assert_called_once_with(
+        chat_id=mock_update_message.effective_chat.id, text="Hi", reply_markup=MARKUP
+    )
+    assert views.view_stats.transitions == {views.SEND: 1}
+
+
+@pytest.mark.asyncio
+async def test_text_to_text_edits_in_place(
+    mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+
+    await show_view(
+        mock_update_callback_query,
+        mock_telegram_context,
+        View("List", MARKUP, parse_mode=ParseMode.HTML),
+    )
+
+    query.edit_message_text.assert_called_once_with(
+        text="List", reply_markup=MARKUP, parse_mode=ParseMode.HTML
+    )
+    query.message.delete.assert_not_called()
+    assert views.view_stats.api_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_photo_to_photo_uses_edit_message_media(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+    query.message.photo = [mocker.Mock()]
+
+    await show_view(
+        mock_update_callback_query,
+        mock_telegram_context,
+        View("Caption", MARKUP, photo="file-2", parse_mode=ParseMode.HTML),
+    )
+
+    query.edit_message_media.assert_called_once()
+    media = query.edit_message_media.call_args.kwargs["media"]
+    assert isinstance(media, InputMediaPhoto)
+    assert media.media == "file-2"
+    assert media.caption == "Caption"
+    assert query.edit_message_media.call_args.kwargs["reply_markup"] == MARKUP
+    query.message.delete.assert_not_called()
+    mock_telegram_context.bot.send_photo.assert_not_called()
+    assert views.view_stats.transitions == {views.EDIT_MEDIA: 1}
+
+
+@pytest.mark.asyncio
+async def test_text_to_photo_is_one_media_edit(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+    query.message.photo = ()
+
+    await show_view(
+        mock_update_callback_query,
+        mock_telegram_context,
+        View("Caption", MARKUP, photo="file-1"),
+    )
+
+    media = query.edit_message_media.call_args.kwargs["media"]
+    assert media.media == "file-1"
+    assert media.caption == "Caption"
+    mock_telegram_context.bot.send_photo.assert_not_called()
+    mock_telegram_context.bot.delete_message.assert_not_called()
+    assert views.view_stats.transitions == {views.EDIT_MEDIA: 1}
+    assert views.view_stats.api_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_photo_to_text_sends_then_deletes(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+    query.message.message_id = 10
+    query.message.photo = [mocker.Mock()]
+    calls = []
+
+    def fake_send(**_):
+        calls.append("send")
+        return _sent(mocker, 11)
+
+    mock_telegram_context.bot.send_message.side_effect = fake_send
+    mock_telegram_context.bot.delete_message.side_effect = lambda **kw: calls.append(
+        ("delete", kw["message_id"])
+    )
+
+    await show_view(
+        mock_update_callback_query, mock_telegram_context, View("List", MARKUP)
+    )
+
+    assert calls == ["send", ("delete", 10)]
+    assert (
+        mock_telegram_context.bot_data["screens"]
+        .get(mock_update_callback_query.effective_chat.id)
+        .message_id
+        == 11
+    )
+    assert views.view_stats.transitions == {views.REPLACE: 1}
+    assert views.view_stats.calls_per_navigation == 2
+
+
+@pytest.mark.asyncio
+async def test_photo_to_text_tolerates_missing_message(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+    query.message.photo = [mocker.Mock()]
+    mock_telegram_context.bot.delete_message.side_effect = BadRequest(
+        "Message to delete not found"
+    )
+
+    await show_view(mock_update_callback_query, mock_telegram_context, View("Menu"))
+
+    mock_telegram_context.bot.send_message.assert_called_once_with(
+        chat_id=mock_update_callback_query.effective_chat.id, text="Menu"
+    )
+
+
+async def _show_twice(update, context, first, second):
+    update.callback_query.message.message_id = 10
+    await show_view(update, context, first)
+    views.view_stats.reset()
+    await show_view(update, context, second)
+
+
+@pytest.mark.asyncio
+async def test_identical_view_skips_the_api(
+    mock_update_callback_query, mock_telegram_context
+):
+    view = View("List", MARKUP)
+
+    await _show_twice(mock_update_callback_query, mock_telegram_context, view, view)
+
+    assert mock_update_callback_query.callback_query.edit_message_text.call_count == 1
+    assert views.view_stats.transitions == {views.NOOP: 1}
+    assert views.view_stats.api_calls == 0
+
+
+@pytest.mark.asyncio
+async def test_markup_only_change_edits_reply_markup(
+    mock_update_callback_query, mock_telegram_context
+):
+    other = InlineKeyboardMarkup([[InlineKeyboardButton("Next", callback_data="n")]])
+
+    await _show_twice(
+        mock_update_callback_query,
+        mock_telegram_context,
+        View("List", MARKUP),
+        View("List", other),
+    )
+
+    query = mock_update_callback_query.callback_query
+    query.edit_message_reply_markup.assert_called_once_with(reply_markup=other)
+    assert query.edit_message_text.call_count == 1
+    assert views.view_stats.transitions == {views.EDIT_MARKUP: 1}
+
+
+@pytest.mark.asyncio
+async def test_same_photo_new_caption_edits_caption(
+    mocker, mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+    query.message.photo = [mocker.Mock()]
+
+    await _show_twice(
+        mock_update_callback_query,
+        mock_telegram_context,
+        View("Stock: 5", MARKUP, photo="file-1"),
+        View("Stock: 4", MARKUP, photo="file-1"),
+    )
+
+    query.edit_message_caption.assert_called_once_with(
+        caption="Stock: 4", reply_markup=MARKUP
+    )
+    assert query.edit_message_media.call_count == 1
+    assert views.view_stats.transitions == {views.EDIT_CAPTION: 1}
+
+
+@pytest.mark.asyncio
+async def test_not_modified_error_is_treated_as_noop(
+    mock_update_callback_query, mock_telegram_context
+):
+    query = mock_update_callback_query.callback_query
+    query.edit_message_text.side_effect = BadRequest(
+        "Message is not modified: specified new message content and reply markup "
+        "are exactly the same"
+    )
+
+    await show_view(mock_update_callback_query, mock_telegram_context, View("List"))
+
+    assert views.view_stats.transitions == {views.NOOP: 1}
+
+
+@pytest.mark.asyncio
+async def test_command_replaces_previous_screen(
+    mocker, mock_update_message, mock_telegram_context
+):
+    mock_update_message.callback_query = None
+    mock_telegram_context.bot.send_message.side_effect = [
+        _sent(mocker, 1),
+        _sent(mocker, 2),
+    ]
+
+    await show_view(mock_update_message, mock_telegram_context, View("Home"))
+    await show_view(mock_update_message, mock_telegram_context, View("Home"))
+
+    mock_telegram_context.bot.delete_message.assert_called_once_with(
+        chat_id=mock_update_message.effective_chat.id, message_id=1
+    )
+    assert views.view_stats.transitions == {views.SEND: 1, views.REPLACE: 1}
+
+
+def test_screen_registry_is_bounded():
+    registry = ScreenRegistry(max_size=2)
+    view = View("x")
+    for chat_id in (1, 2, 3):
+        registry.set(chat_id, views.Screen.of(chat_id, view))
+
+    assert len(registry) == 2
+    assert registry.get(1) is None
+    assert registry.get(3).message_id == 3
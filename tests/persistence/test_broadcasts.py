@@ -0,0 +1,63 @@
+import sqlite3
+
+import pytest
+
+from persistence.sqlite_persistence import SQLitePersistence
+
+
+def _add_users(persistence, *user_ids):
+    with persistence._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO users (id) VALUES (?)", [(user_id,) for user_id in user_ids]
+        )
+
+
+@pytest.mark.asyncio
+async def test_recipients_are_paged_by_id_without_the_owner(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    _add_users(persistence, 30, 10, 20, 40)
+    await persistence.set_bot_owner(20)
+
+    assert await persistence.get_broadcast_recipients(0, 2) == [10, 30]
+    assert await persistence.get_broadcast_recipients(30, 2) == [40]
+    assert await persistence.get_broadcast_recipients(40, 2) == []
+
+
+@pytest.mark.asyncio
+async def test_progress_accumulates_and_deactivates_blocked_users(
+    sqlite_persistence_layer,
+):
+    persistence = sqlite_persistence_layer
+    _add_users(persistence, 1, 2, 3, 4)
+    broadcast_id = await persistence.create_broadcast("Hello", report_chat_id=99)
+
+    assert await persistence.save_broadcast_progress(broadcast_id, 2, 1, 0, [2])
+    (running,) = await persistence.get_running_broadcasts()
+    assert running == {
+        "id": broadcast_id,
+        "text": "Hello",
+        "last_user_id": 2,
+        "sent": 1,
+        "failed": 0,
+        "blocked": 1,
+        "report_chat_id": 99,
+    }
+    # Blocked users are skipped by this and later broadcasts
+    assert await persistence.get_broadcast_recipients(0, 10) == [1, 3, 4]
+
+    await persistence.save_broadcast_progress(broadcast_id, 4, 1, 1, [], finished=True)
+    assert await persistence.get_running_broadcasts() == []
+
+
+@pytest.mark.asyncio
+async def test_is_active_is_added_to_an_existing_users_table(tmp_path):
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT)")
+    conn.execute("INSERT INTO users (id) VALUES (5)")
+    conn.commit()
+    conn.close()
+
+    persistence = SQLitePersistence(db_path)
+
+    assert await persistence.get_broadcast_recipients(0, 10) == [5]
@@ -106,3 +106,20 @@ async def test_clear_cart(sqlite_persistence_layer):
     # Verify cart is empty
     cart_items = await persistence.get_cart_items(user_id)
     assert cart_items == {}
+
+
+@pytest.mark.asyncio
+async def test_set_cart_quantity_upserts_and_deletes(sqlite_persistence_layer):
+    """set_cart_quantity overwrites the quantity and removes the line at zero."""
+    persistence = sqlite_persistence_layer
+    product_id = await persistence.add_product(_create_sample_product_data())
+    user_id = 123
+
+    assert await persistence.set_cart_quantity(user_id, product_id, 3)
+    assert await persistence.get_cart_items(user_id) == {product_id: 3}
+
+    assert await persistence.set_cart_quantity(user_id, product_id, 1)
+    assert await persistence.get_cart_items(user_id) == {product_id: 1}
+
+    assert await persistence.set_cart_quantity(user_id, product_id, 0)
+    assert await persistence.get_cart_items(user_id) == {}
@@ -0,0 +1,55 @@
+import sqlite3
+
+import pytest
+
+
+@pytest.mark.asyncio
+async def test_ledger_round_trip(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    assert await persistence.add_pending_deletions(
+        [(1, 10, 105.0), (1, 11, 101.0), (2, 20, 103.0)]
+    )
+
+    assert await persistence.get_pending_deletions(since=0) == [
+        (1, 11, 101.0),
+        (2, 20, 103.0),
+        (1, 10, 105.0),
+    ]
+
+    assert await persistence.remove_pending_deletions([(1, 11), (2, 20)])
+    assert await persistence.get_pending_deletions(since=0) == [(1, 10, 105.0)]
+
+
+@pytest.mark.asyncio
+async def test_rescheduling_a_message_updates_its_due_time(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    await persistence.add_pending_deletions([(1, 10, 100.0)])
+    await persistence.add_pending_deletions([(1, 10, 200.0)])
+
+    assert await persistence.get_pending_deletions(since=0) == [(1, 10, 200.0)]
+
+
+@pytest.mark.asyncio
+async def test_range_query_and_purge(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    await persistence.add_pending_deletions([(1, 10, 50.0), (1, 11, 150.0)])
+
+    assert await persistence.get_pending_deletions(since=100.0) == [(1, 11, 150.0)]
+
+    await persistence.purge_pending_deletions(before=100.0)
+    assert await persistence.get_pending_deletions(since=0) == [(1, 11, 150.0)]
+
+
+def test_ledger_is_read_through_the_due_index(sqlite_persistence_layer):
+    conn = sqlite3.connect(sqlite_persistence_layer.db_path)
+    try:
+        plan = conn.execute(
+            "EXPLAIN QUERY PLAN SELECT chat_id, message_id, due_at "
+            "FROM pending_deletions WHERE due_at >= ? ORDER BY due_at",
+            (0,),
+        ).fetchall()
+    finally:
+        conn.close()
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_pending_deletions_due" in details
+    assert "TEMP B-TREE" not in details
@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+
+async def _order(persistence, user_id=7, quantities=((("Tea", 2.0), 2),)):
+    for (name, price), quantity in quantities:
+        product_id = await persistence.add_product(
+            {
+                "name": name,
+                "description": name,
+                "price": price,
+                "quantity": 10,
+                "category": "Drinks",
+            }
+        )
+        await persistence.add_to_cart(user_id, product_id, quantity)
+    return await persistence.create_order(user_id)
+
+
+@pytest.mark.asyncio
+async def test_no_notification_is_queued_without_an_owner(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    assert await _order(persistence) is not None
+
+    assert await persistence.get_due_notifications(time.time(), 10) == []
+
+
+@pytest.mark.asyncio
+async def test_order_queues_its_notification_with_items(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    await persistence.set_bot_owner(1)
+    first = await _order(persistence, quantities=((("Tea", 2.0), 2),))
+    second = await _order(
+        persistence, user_id=8, quantities=((("Cake", 3.5), 1), (("Jam", 4.0), 1))
+    )
+
+    due = await persistence.get_due_notifications(time.time(), 10)
+
+    assert [entry["order"]["id"] for entry in due] == [first, second]
+    assert due[0]["attempts"] == 0
+    assert due[0]["order"]["user_id"] == 7
+    assert due[0]["order"]["total_amount"] == pytest.approx(4.0)
+    assert due[0]["order"]["items"] == [
+        {"name": "Tea", "quantity": 2, "unit_price": 2.0}
+    ]
+    assert {item["name"] for item in due[1]["order"]["items"]} == {"Cake", "Jam"}
+    assert len(await persistence.get_due_notifications(time.time(), 1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_rescheduled_notifications_wait_and_count_attempts(
+    sqlite_persistence_layer,
+):
+    persistence = sqlite_persistence_layer
+    await persistence.set_bot_owner(1)
+    await _order(persistence)
+    now = time.time()
+    (entry,) = await persistence.get_due_notifications(now, 10)
+
+    assert await persistence.reschedule_notifications([(entry["id"], now + 60)])
+
+    assert await persistence.get_due_notifications(now, 10) == []
+    (retried,) = await persistence.get_due_notifications(now + 60, 10)
+    assert retried["attempts"] == 1
+
+    assert await persistence.remove_notifications([entry["id"]])
+    assert await persistence.get_due_notifications(now + 60, 10) == []
@@ -1,6 +1,10 @@
+import sqlite3
+
 import pytest
 from typing import Any  # For type hinting
 
+from persistence.sqlite_persistence import SQLitePersistence
+
 
 @pytest.mark.asyncio
 async def test_create_order_success(sqlite_persistence_layer):
@@ -76,3 +80,207 @@ async def test_get_order_details(sqlite_persistence_layer):
     item = items[0]
     assert item["name"] == "Latte"
     assert item["quantity"] == 2
+
+
+@pytest.mark.asyncio
+async def test_iter_order_export_rows_filters_by_date(sqlite_persistence_layer):
+    """Export rows are streamed per line item and respect the date bounds."""
+    persistence = sqlite_persistence_layer
+
+    product_id = await persistence.add_product(
+        {
+            "name": "Latte",
+            "price": 4.50,
+            "quantity": 10,
+            "category": "Beverage",
+            "description": "Delicious latte",
+        }
+    )
+    await persistence.add_to_cart(123, product_id, 2)
+    old_order = await persistence.create_order(123)
+    await persistence.add_to_cart(123, product_id, 1)
+    new_order = await persistence.create_order(123)
+
+    # Backdate the first order so it falls outside the range
+    conn = persistence._get_connection()
+    with conn:
+        conn.execute(
+            "UPDATE orders SET created_at = '2020-01-01 09:00:00' WHERE id = ?",
+            (old_order,),
+        )
+    conn.close()
+
+    all_rows = list(persistence.iter_order_export_rows(batch_size=1))
+    assert [row["order_id"] for row in all_rows] == [old_order, new_order]
+    assert all_rows[0]["product_name"] == "Latte"
+    assert all_rows[0]["quantity"] == 2
+
+    recent_rows = list(persistence.iter_order_export_rows(start="2021-01-01"))
+    assert [row["order_id"] for row in recent_rows] == [new_order]
+
+    old_rows = list(
+        persistence.iter_order_export_rows(start="2020-01-01", end="2020-01-02")
+    )
+    assert [row["order_id"] for row in old_rows] == [old_order]
+
+
+async def _place_orders(persistence, user_id, count):
+    product_id = await persistence.add_product(
+        {
+            "name": "Tea",
+            "price": 1.00,
+            "quantity": 100,
+            "category": "Beverage",
+            "description": "Tea",
+        }
+    )
+    order_ids = []
+    for _ in range(count):
+        await persistence.add_to_cart(user_id, product_id, 1)
+        order_ids.append(await persistence.create_order(user_id))
+    return order_ids
+
+
+@pytest.mark.asyncio
+async def test_get_user_orders_keyset_pagination(sqlite_persistence_layer):
+    """Pages are newest first and never overlap, even with equal timestamps."""
+    persistence = sqlite_persistence_layer
+    order_ids = await _place_orders(persistence, 123, 5)
+    await _place_orders(persistence, 999, 2)
+
+    first_page = await persistence.get_user_orders(123, limit=2)
+    second_page = await persistence.get_user_orders(
+        123, limit=2, before_seq=first_page[-1]["order_seq"]
+    )
+    third_page = await persistence.get_user_orders(
+        123, limit=2, before_seq=second_page[-1]["order_seq"]
+    )
+
+    seen = [o["id"] for o in first_page + second_page + third_page]
+    assert seen == list(reversed(order_ids))
+    assert first_page[0]["item_count"] == 1
+    assert first_page[0]["user_id"] == 123
+
+
+@pytest.mark.asyncio
+async def test_get_all_orders_for_owner_filters_by_status(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    order_ids = await _place_orders(persistence, 123, 3)
+    assert await persistence.update_order_status(order_ids[0], "cancelled") is True
+    assert await persistence.update_order_status("missing", "cancelled") is False
+
+    all_orders = await persistence.get_all_orders_for_owner(limit=10)
+    cancelled = await persistence.get_all_orders_for_owner(status="cancelled")
+
+    assert len(all_orders) == 3
+    assert [o["id"] for o in cancelled] == [order_ids[0]]
+    assert (await persistence.get_order(order_ids[0]))["status"] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_reorder_copies_available_items_in_one_statement(
+    sqlite_persistence_layer,
+):
+    """Reorder tops up the cart, caps at stock and reports skipped products."""
+    persistence = sqlite_persistence_layer
+
+    def product(name, quantity):
+        return {
+            "name": name,
+            "price": 2.00,
+            "quantity": quantity,
+            "category": "Bakery",
+            "description": name,
+        }
+
+    bread = await persistence.add_product(product("Bread", 10))
+    rolls = await persistence.add_product(product("Rolls", 10))
+    cake = await persistence.add_product(product("Cake", 10))
+    pie = await persistence.add_product(product("Pie", 10))
+
+    user_id = 123
+    await persistence.add_to_cart(user_id, bread, 2)
+    await persistence.add_to_cart(user_id, rolls, 6)
+    await persistence.add_to_cart(user_id, cake, 1)
+    await persistence.add_to_cart(user_id, pie, 1)
+    order_id = await persistence.create_order(user_id)
+
+    await persistence.delete_product(cake)  # Inactive now
+    await persistence.update_product_stock(pie, -10)  # Out of stock
+    await persistence.update_product_stock(rolls, -6)  # Less than ordered
+    await persistence.add_to_cart(user_id, bread, 1)  # Already in the cart
+
+    result = await persistence.reorder(user_id, order_id)
+
+    assert result == {"added": 2, "skipped": ["Cake", "Pie"]}
+    assert await persistence.get_cart_items(user_id) == {bread: 3, rolls: 4}
+
+
+@pytest.mark.asyncio
+async def test_reorder_caps_a_line_already_in_the_cart_at_stock(
+    sqlite_persistence_layer,
+):
+    persistence = sqlite_persistence_layer
+    bread = await persistence.add_product(
+        {
+            "name": "Bread",
+            "price": 2.00,
+            "quantity": 10,
+            "category": "Bakery",
+            "description": "Bread",
+        }
+    )
+    user_id = 123
+    await persistence.add_to_cart(user_id, bread, 3)
+    order_id = await persistence.create_order(user_id)
+    await persistence.update_product_stock(bread, -3)  # 7 left
+    await persistence.add_to_cart(user_id, bread, 6)
+
+    result = await persistence.reorder(user_id, order_id)
+
+    assert result == {"added": 1, "skipped": []}
+    assert await persistence.get_cart_items(user_id) == {bread: 7}
+
+
+@pytest.mark.asyncio
+async def test_reorder_ignores_other_users_orders(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    product_id = await persistence.add_product(
+        {
+            "name": "Bread",
+            "price": 2.00,
+            "quantity": 10,
+            "category": "Bakery",
+            "description": "Bread",
+        }
+    )
+    await persistence.add_to_cart(123, product_id, 1)
+    order_id = await persistence.create_order(123)
+
+    result = await persistence.reorder(456, order_id)
+
+    assert result == {"added": 0, "skipped": []}
+    assert await persistence.get_cart_items(456) == {}
+
+
+@pytest.mark.asyncio
+async def test_existing_orders_are_numbered_in_insertion_order(tmp_path):
+    """Databases from before orders.seq get it backfilled from the rowid."""
+    db_path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE orders (id TEXT PRIMARY KEY, user_id INTEGER, "
+        "total_amount REAL, status TEXT, created_at TIMESTAMP)"
+    )
+    conn.executemany(
+        "INSERT INTO orders VALUES (?, 1, 1.0, 'pending', '2026-01-01 10:00:00')",
+        [("b",), ("a",)],
+    )
+    conn.commit()
+    conn.close()
+
+    persistence = SQLitePersistence(db_path)
+    orders = await persistence.get_user_orders(1)
+
+    # Same created_at: newest (last inserted) first
+    assert [(o["id"], o["order_seq"]) for o in orders] == [("a", 2), ("b", 1)]
@@ -0,0 +1,104 @@
+import pytest
+
+from persistence.order_status import (
+    CANCELLED,
+    DELIVERED,
+    PENDING,
+    PREPARING,
+    READY,
+    allowed_previous_statuses,
+    next_status,
+)
+from persistence.sqlite_persistence import SQLitePersistence
+
+
+async def _create_order(persistence, user_id=123):
+    product_id = await persistence.add_product(
+        {
+            "name": "Tea",
+            "price": 1.00,
+            "quantity": 100,
+            "category": "Beverage",
+            "description": "Tea",
+        }
+    )
+    await persistence.add_to_cart(user_id, product_id, 1)
+    return await persistence.create_order(user_id)
+
+
+def test_transition_helpers():
+    assert next_status(PENDING) == PREPARING
+    assert next_status(READY) == DELIVERED
+    assert next_status(DELIVERED) is None
+    assert set(allowed_previous_statuses(CANCELLED)) == {PENDING, PREPARING, READY}
+    assert allowed_previous_statuses(PENDING) == ()
+
+
+@pytest.mark.asyncio
+async def test_orders_follow_the_state_machine(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    order_id = await _create_order(persistence)
+    assert (await persistence.get_order(order_id))["status"] == PENDING
+
+    # Skipping a step or going backwards is rejected
+    assert await persistence.update_order_status(order_id, READY) is False
+    assert await persistence.update_order_status(order_id, PENDING) is False
+
+    assert await persistence.update_order_status(order_id, PREPARING) is True
+    assert await persistence.update_order_status(order_id, READY) is True
+    assert await persistence.update_order_status(order_id, DELIVERED) is True
+
+    # Terminal states cannot be left
+    assert await persistence.update_order_status(order_id, CANCELLED) is False
+    assert (await persistence.get_order(order_id))["status"] == DELIVERED
+
+
+@pytest.mark.asyncio
+async def test_expected_status_guards_against_stale_taps(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    order_id = await _create_order(persistence)
+
+    assert await persistence.update_order_status(
+        order_id, PREPARING, expected_status=PENDING
+    )
+    # A second tap on the same (now stale) button does nothing
+    assert not await persistence.update_order_status(
+        order_id, PREPARING, expected_status=PENDING
+    )
+    assert not await persistence.update_order_status(
+        order_id, CANCELLED, expected_status=PENDING
+    )
+
+
+@pytest.mark.asyncio
+async def test_status_counts_are_maintained_incrementally(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    first = await _create_order(persistence, user_id=1)
+    second = await _create_order(persistence, user_id=2)
+    await _create_order(persistence, user_id=3)
+
+    assert await persistence.get_order_status_counts() == {PENDING: 3}
+
+    await persistence.update_order_status(first, PREPARING)
+    await persistence.update_order_status(second, CANCELLED)
+    await persistence.update_order_status(second, PREPARING)  # rejected
+
+    counts = await persistence.get_order_status_counts()
+    assert counts[PENDING] == 1
+    assert counts[PREPARING] == 1
+    assert counts[CANCELLED] == 1
+
+
+@pytest.mark.asyncio
+async def test_status_counts_backfilled_for_existing_orders(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    await _create_order(persistence)
+    conn = persistence._get_connection()
+    with conn:
+        conn.execute("UPDATE orders SET status = 'completed'")
+        conn.execute("DELETE FROM order_status_counts")
+    conn.close()
+
+    reopened = SQLitePersistence(db_path=persistence.db_path)
+
+    assert await reopened.get_order_status_counts() == {"completed": 1}
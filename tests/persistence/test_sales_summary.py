@@ -0,0 +1,124 @@
+import pytest
+
+from persistence.sqlite_persistence import SQLitePersistence
+
+
+async def _place_order(persistence, user_id, items):
+    for product_id, quantity in items:
+        await persistence.add_to_cart(user_id, product_id, quantity)
+    return await persistence.create_order(user_id)
+
+
+async def _add_product(persistence, name, price):
+    return await persistence.add_product(
+        {
+            "name": name,
+            "price": price,
+            "quantity": 100,
+            "category": "Test",
+            "description": name,
+        }
+    )
+
+
+@pytest.mark.asyncio
+async def test_create_order_updates_daily_summaries(sqlite_persistence_layer):
+    """Each order is folded into the per-day and per-product summaries."""
+    persistence = sqlite_persistence_layer
+    latte = await _add_product(persistence, "Latte", 4.50)
+    bagel = await _add_product(persistence, "Bagel", 2.25)
+
+    await _place_order(persistence, 1, [(latte, 2), (bagel, 1)])
+    await _place_order(persistence, 2, [(latte, 1)])
+
+    daily = await persistence.get_daily_sales(days=7)
+    assert len(daily) == 1
+    assert daily[0]["order_count"] == 2
+    assert daily[0]["units"] == 4
+    assert daily[0]["revenue_cents"] == 2 * 450 + 225 + 450
+    assert daily[0]["revenue"] == 15.75
+
+    top = await persistence.get_top_products(days=7, limit=5)
+    assert [row["name"] for row in top] == ["Latte", "Bagel"]
+    assert top[0]["units"] == 3
+    assert top[0]["order_count"] == 2
+    assert top[0]["revenue_cents"] == 1350
+
+    assert len(await persistence.get_top_products(days=7, limit=1)) == 1
+
+
+@pytest.mark.asyncio
+async def test_get_daily_sales_excludes_old_days(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    conn = persistence._get_connection()
+    with conn:
+        conn.execute(
+            "INSERT INTO sales_daily (day, order_count, units, revenue_cents) "
+            "VALUES ('2000-01-01', 1, 1, 100)"
+        )
+    conn.close()
+
+    assert await persistence.get_daily_sales(days=7) == []
+
+
+@pytest.mark.asyncio
+async def test_summaries_are_backfilled_from_existing_orders(sqlite_persistence_layer):
+    """Databases created before the summary tables get them populated on start."""
+    persistence = sqlite_persistence_layer
+    latte = await _add_product(persistence, "Latte", 4.50)
+    await _place_order(persistence, 1, [(latte, 2)])
+
+    conn = persistence._get_connection()
+    with conn:
+        conn.execute("DELETE FROM sales_daily")
+        conn.execute("DELETE FROM sales_daily_product")
+    conn.close()
+
+    reopened = SQLitePersistence(db_path=persistence.db_path)
+
+    daily = await reopened.get_daily_sales(days=1)
+    assert daily[0]["order_count"] == 1
+    assert daily[0]["revenue_cents"] == 900
+    top = await reopened.get_top_products(days=1, limit=5)
+    assert top[0]["units"] == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_orders_leave_the_summaries(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    latte = await _add_product(persistence, "Latte", 4.50)
+    bagel = await _add_product(persistence, "Bagel", 2.25)
+    await _place_order(persistence, 1, [(latte, 1)])
+    cancelled = await _place_order(persistence, 2, [(latte, 2), (bagel, 1)])
+
+    assert await persistence.update_order_status(cancelled, "cancelled")
+
+    daily = await persistence.get_daily_sales(days=1)
+    assert (daily[0]["order_count"], daily[0]["units"]) == (1, 1)
+    assert daily[0]["revenue_cents"] == 450
+    top = await persistence.get_top_products(days=1, limit=5)
+    assert [(row["name"], row["units"]) for row in top] == [("Latte", 1)]
+
+
+@pytest.mark.asyncio
+async def test_summaries_that_counted_cancelled_orders_are_rebuilt(
+    sqlite_persistence_layer,
+):
+    """Databases from before the cancel trigger drop their cancelled sales."""
+    persistence = sqlite_persistence_layer
+    latte = await _add_product(persistence, "Latte", 4.50)
+    await _place_order(persistence, 1, [(latte, 1)])
+    cancelled = await _place_order(persistence, 2, [(latte, 3)])
+
+    conn = persistence._get_connection()
+    with conn:
+        conn.execute("DROP TRIGGER trg_orders_cancel_sales")
+        conn.execute(
+            "UPDATE orders SET status = 'cancelled' WHERE id = ?", (cancelled,)
+        )
+    conn.close()
+
+    reopened = SQLitePersistence(db_path=persistence.db_path)
+
+    daily = await reopened.get_daily_sales(days=1)
+    assert (daily[0]["order_count"], daily[0]["units"]) == (1, 1)
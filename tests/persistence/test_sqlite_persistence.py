@@ -1,5 +1,6 @@
 from typing import Any  # For type hinting
 import pytest
+from persistence.sqlite_persistence import SQLitePersistence
 
 
 @pytest.mark.asyncio
@@ -172,3 +173,55 @@ async def test_get_all_products_with_items(sqlite_persistence_layer):
     product_ids = {p["id"] for p in all_products}
     assert id1 in product_ids
     assert id2 in product_ids
+
+
+@pytest.mark.asyncio
+async def test_catalog_version_moves_on_product_mutations(sqlite_persistence_layer):
+    persistence = sqlite_persistence_layer
+    version = persistence.get_catalog_version()
+
+    product_id = await persistence.add_product(
+        {
+            "name": "Tea",
+            "price": 1.00,
+            "quantity": 10,
+            "category": "Beverage",
+            "description": "Tea",
+        }
+    )
+    assert persistence.get_catalog_version() > version
+
+    version = persistence.get_catalog_version()
+    await persistence.update_product_stock(product_id, -1)
+    assert persistence.get_catalog_version() > version
+
+    version = persistence.get_catalog_version()
+    await persistence.update_product_stock(product_id, -100)  # Rejected
+    await persistence.get_product(product_id)
+    assert persistence.get_catalog_version() == version
+
+    await persistence.delete_product(product_id)
+    assert persistence.get_catalog_version() > version
+
+
+@pytest.mark.asyncio
+async def test_shared_catalog_version_is_seen_by_other_instances(
+    sqlite_persistence_layer,
+):
+    """Worker processes share the catalog version through the database."""
+    path = sqlite_persistence_layer.db_path
+    editor = SQLitePersistence(db_path=path, shared_catalog_version=True)
+    reader = SQLitePersistence(db_path=path, shared_catalog_version=True)
+    version = reader.get_catalog_version()
+
+    await editor.add_product(
+        {
+            "name": "Tea",
+            "price": 1.00,
+            "quantity": 10,
+            "category": "Beverage",
+            "description": "Tea",
+        }
+    )
+
+    assert reader.get_catalog_version() == version + 1
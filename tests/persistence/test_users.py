@@ -0,0 +1,46 @@
+import pytest
+
+
+def _users(persistence):
+    with persistence._get_connection() as conn:
+        rows = conn.execute(
+            "SELECT id, username, first_name, last_seen, is_active FROM users "
+            "ORDER BY id"
+        ).fetchall()
+    return [tuple(row) for row in rows]
+
+
+@pytest.mark.asyncio
+async def test_upsert_users_inserts_and_updates_in_one_batch(
+    sqlite_persistence_layer,
+):
+    persistence = sqlite_persistence_layer
+    await persistence.set_bot_owner(1)
+
+    assert await persistence.upsert_users(
+        [(1, "owner", "Pal", 100.0), (2, None, "Ann", 100.0)]
+    )
+    assert _users(persistence) == [
+        (1, "owner", "Pal", 100.0, 1),
+        (2, None, "Ann", 100.0, 1),
+    ]
+
+    assert await persistence.upsert_users([(2, "ann", "Ann", 200.0)])
+    assert _users(persistence)[1] == (2, "ann", "Ann", 200.0, 1)
+
+
+@pytest.mark.asyncio
+async def test_upsert_keeps_the_latest_last_seen_and_reactivates(
+    sqlite_persistence_layer,
+):
+    persistence = sqlite_persistence_layer
+    await persistence.upsert_users([(2, None, "Ann", 200.0)])
+    broadcast_id = await persistence.create_broadcast("Hi")
+    await persistence.save_broadcast_progress(broadcast_id, 2, 0, 0, [2])
+    assert await persistence.get_broadcast_recipients(0, 10) == []
+
+    # A stale row from another worker does not move last_seen back
+    await persistence.upsert_users([(2, None, "Ann", 150.0)])
+
+    assert _users(persistence) == [(2, None, "Ann", 200.0, 1)]
+    assert await persistence.get_broadcast_recipients(0, 10) == [2]
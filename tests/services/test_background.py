@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from services.background import BackgroundTask
+
+
+@pytest.mark.asyncio
+async def test_start_is_idempotent_and_stop_waits_for_the_task():
+    started = []
+    finished = asyncio.Event()
+
+    async def run():
+        started.append(True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            finished.set()
+
+    task = BackgroundTask(run)
+    assert task.start() is True
+    assert task.start() is False
+    await asyncio.sleep(0)
+
+    await task.stop()
+
+    assert started == [True]
+    assert finished.is_set()
+    assert not task.running
+    await task.stop()  # Stopping again is a no-op
+    assert task.start() is True
+    await task.stop()
+
+
+@pytest.mark.asyncio
+async def test_a_crashed_task_is_logged_and_stops_cleanly(caplog):
+    async def run():
+        raise RuntimeError("boom")
+
+    task = BackgroundTask(run)
+    task.start()
+    for _ in range(2):  # The task runs, then its done callback
+        await asyncio.sleep(0)
+
+    assert "died" in caplog.text
+    await task.stop()
+    assert not task.running
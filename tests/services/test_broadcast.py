@@ -0,0 +1,111 @@
+import pytest
+from telegram.error import BadRequest, Forbidden
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+from services.broadcast import BroadcastService
+from services.outbound import Priority, current_priority
+
+BROADCAST = {
+    "id": 7,
+    "text": "Hello",
+    "last_user_id": 0,
+    "sent": 0,
+    "failed": 0,
+    "blocked": 0,
+    "report_chat_id": 99,
+}
+
+
+@pytest.fixture
+def persistence(mocker):
+    return mocker.AsyncMock(spec=AbstractPantryPersistence)
+
+
+@pytest.fixture
+def service(mocker, persistence):
+    ticks = iter([0.0, 4.0])
+    return BroadcastService(
+        mocker.AsyncMock(),
+        persistence,
+        workers=2,
+        page_size=3,
+        clock=lambda: next(ticks),
+    )
+
+
+def _pages(persistence, users):
+    """Serves `users` page by page after the requested cursor."""
+
+    async def recipients(after_user_id, limit):
+        return [user for user in users if user > after_user_id][:limit]
+
+    persistence.get_broadcast_recipients.side_effect = recipients
+
+
+@pytest.mark.asyncio
+async def test_broadcast_pages_through_users_and_reports(service, persistence):
+    _pages(persistence, [1, 2, 3, 4, 5])
+    sent = []
+
+    async def send_message(chat_id, text):
+        sent.append((chat_id, current_priority()))
+        if chat_id == 2:
+            raise Forbidden("blocked")
+        if chat_id == 5 and text == "Hello":
+            raise BadRequest("chat not found")
+
+    service.bot.send_message.side_effect = send_message
+
+    await service._run(dict(BROADCAST))
+
+    assert sorted(chat_id for chat_id, _ in sent[:-1]) == [1, 2, 3, 4, 5]
+    assert {level for _, level in sent} == {Priority.BACKGROUND}
+    calls = persistence.save_broadcast_progress.call_args_list
+    assert [call.args for call in calls] == [(7, 3, 2, 0, [2]), (7, 5, 1, 1, [])]
+    assert [call.kwargs["finished"] for call in calls] == [False, True]
+    # 3 delivered over 4 seconds
+    service.bot.send_message.assert_called_with(
+        chat_id=99, text=Strings.Broadcast.finished(7, 3, 1, 1, 4.0, 0.75)
+    )
+    assert (service.stats.sent, service.stats.failed, service.stats.blocked) == (
+        3,
+        1,
+        1,
+    )
+
+
+@pytest.mark.asyncio
+async def test_resumed_broadcast_continues_after_its_cursor(service, persistence):
+    _pages(persistence, [1, 2, 3, 4])
+    persistence.get_running_broadcasts.return_value = [
+        dict(BROADCAST, last_user_id=3, sent=3)
+    ]
+
+    assert await service.resume() == 1
+    await service._tasks[7]
+
+    recipients = [
+        call.kwargs["chat_id"] for call in service.bot.send_message.call_args_list
+    ]
+    assert recipients == [4, 99]
+    persistence.save_broadcast_progress.assert_called_once_with(
+        7, 4, 1, 0, [], finished=True
+    )
+    service.bot.send_message.assert_called_with(
+        chat_id=99, text=Strings.Broadcast.finished(7, 4, 0, 0, 4.0, 0.25)
+    )
+
+
+@pytest.mark.asyncio
+async def test_start_records_the_broadcast_first(service, persistence):
+    persistence.create_broadcast.return_value = None
+
+    assert await service.start("Hello", report_chat_id=99) is None
+    assert service._tasks == {}
+
+    persistence.create_broadcast.return_value = 8
+    _pages(persistence, [])
+    assert await service.start("Hello", report_chat_id=99) == 8
+    await service.stop()
+    persistence.create_broadcast.assert_called_with("Hello", 99)
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+from telegram.error import BadRequest
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from services.deletion import MAX_DELETABLE_AGE, MAX_IDS_PER_CALL, DeletionService
+from services.timing_wheel import TimingWheel
+
+
+@pytest.fixture
+def wheel():
+    return TimingWheel(tick=1.0, slots=8)
+
+
+@pytest.fixture
+def service(mocker, wheel):
+    return DeletionService(mocker.AsyncMock(), wheel)
+
+
+async def _advance(wheel, ticks=1):
+    for _ in range(ticks):
+        wheel.advance()
+        await asyncio.sleep(0)  # Let the fired callbacks and tasks run
+
+
+@pytest.mark.asyncio
+async def test_only_due_messages_are_deleted(service, wheel):
+    service.schedule(1, 10, delay=3.0)
+    service.schedule(1, 11, delay=5.0)
+
+    await _advance(wheel, 4)  # Due on tick 3, flushed on tick 4
+
+    service.bot.delete_messages.assert_called_once_with(chat_id=1, message_ids=[10])
+    assert len(wheel) == 1
+
+
+@pytest.mark.asyncio
+async def test_deletions_are_coalesced_per_chat(service, wheel):
+    for message_id in (10, 11, 12):
+        service.schedule(1, message_id, delay=3.0)
+    service.schedule(2, 20, delay=3.0)
+
+    await _advance(wheel, 4)
+
+    calls = {
+        c.kwargs["chat_id"]: c.kwargs["message_ids"]
+        for c in service.bot.delete_messages.call_args_list
+    }
+    assert calls == {1: [10, 11, 12], 2: [20]}
+    assert service.stats.api_calls == 2
+    assert service.stats.api_calls_avoided == 2
+    assert service.stats.jobs_avoided == 4
+
+
+@pytest.mark.asyncio
+async def test_flush_splits_at_api_limit(service, wheel):
+    for message_id in range(MAX_IDS_PER_CALL + 5):
+        service.schedule(1, message_id, delay=1.0)
+
+    await _advance(wheel, 2)
+
+    sizes = [
+        len(c.kwargs["message_ids"]) for c in service.bot.delete_messages.call_args_list
+    ]
+    assert sizes == [MAX_IDS_PER_CALL, 5]
+
+
+@pytest.mark.asyncio
+async def test_flush_survives_api_errors(service, wheel):
+    service.bot.delete_messages.side_effect = BadRequest("Message can't be deleted")
+    service.schedule(1, 10, delay=1.0)
+    service.schedule(2, 20, delay=1.0)
+
+    await _advance(wheel)
+    assert await service.flush() == 2
+    assert service.bot.delete_messages.call_count == 2
+
+
+@pytest.fixture
+def ledger(mocker):
+    return mocker.AsyncMock(spec=AbstractPantryPersistence)
+
+
+@pytest.mark.asyncio
+async def test_new_deletions_are_saved_in_one_batch(mocker, wheel, ledger):
+    service = DeletionService(mocker.AsyncMock(), wheel, ledger, clock=lambda: 100.0)
+    service.schedule(1, 10, delay=3.0)
+    service.schedule(2, 20, delay=5.0)
+
+    await _advance(wheel)
+
+    ledger.add_pending_deletions.assert_called_once_with(
+        [(1, 10, 103.0), (2, 20, 105.0)]
+    )
+
+
+@pytest.mark.asyncio
+async def test_executed_deletions_leave_the_ledger(mocker, wheel, ledger):
+    service = DeletionService(mocker.AsyncMock(), wheel, ledger, clock=lambda: 100.0)
+    service.schedule(1, 10, delay=1.0)
+    service.schedule(1, 11, delay=1.0)
+
+    await _advance(wheel, 2)
+
+    ledger.remove_pending_deletions.assert_called_once_with([(1, 10), (1, 11)])
+
+
+@pytest.mark.asyncio
+async def test_restore_reschedules_recorded_deletions(mocker, wheel, ledger):
+    service = DeletionService(mocker.AsyncMock(), wheel, ledger, clock=lambda: 100.0)
+    ledger.get_pending_deletions.return_value = [(1, 10, 90.0), (1, 11, 103.0)]
+
+    assert await service.restore() == 2
+
+    ledger.purge_pending_deletions.assert_called_once_with(
+        before=100.0 - MAX_DELETABLE_AGE
+    )
+    await _advance(wheel, 2)  # Overdue entry: due next tick, flushed after
+    service.bot.delete_messages.assert_called_once_with(chat_id=1, message_ids=[10])
+    await _advance(wheel, 3)
+    assert service.bot.delete_messages.call_count == 2
+    ledger.add_pending_deletions.assert_not_called()
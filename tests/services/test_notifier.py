@@ -0,0 +1,247 @@
+import asyncio
+import sqlite3
+
+import pytest
+from telegram.error import BadRequest, Forbidden
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from resources.strings import Strings
+from services.notifier import MAX_BACKOFF, OwnerNotifier, backoff, format_new_order
+from services.outbound import Priority, current_priority
+
+ORDER = {
+    "id": "00000000-0000-4000-8000-0000000000aa",
+    "user_id": 98765,
+    "total_amount": 15.50,
+    "items": [
+        {"name": "Burger", "quantity": 1, "unit_price": 10.00},
+        {"name": "Fries", "quantity": 1, "unit_price": 5.50},
+    ],
+}
+
+
+def _entry(outbox_id, attempts=0):
+    return {"id": outbox_id, "attempts": attempts, "order": ORDER}
+
+
+@pytest.fixture
+def persistence(mocker):
+    persistence = mocker.AsyncMock(spec=AbstractPantryPersistence)
+    persistence.get_bot_owner.return_value = 12345
+    return persistence
+
+
+@pytest.fixture
+def notifier(mocker, persistence):
+    return OwnerNotifier(
+        mocker.AsyncMock(), persistence, batch_size=3, clock=lambda: 1000.0
+    )
+
+
+def test_format_new_order():
+    assert format_new_order(ORDER) == Strings.Order.notification_new(
+        98765, ORDER["id"], "Items:\n- Burger x 1\n- Fries x 1", 15.50
+    )
+
+
+def test_backoff_doubles_up_to_a_cap():
+    assert [backoff(n) for n in range(3)] == [5.0, 10.0, 20.0]
+    assert backoff(50) == MAX_BACKOFF
+
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_in_the_background_and_removed(notifier, persistence):
+    persistence.get_due_notifications.return_value = [_entry(1), _entry(2)]
+    priorities = []
+    notifier.bot.send_message.side_effect = lambda **_: priorities.append(
+        current_priority()
+    )
+
+    assert await notifier.deliver_due() == 2
+
+    persistence.get_due_notifications.assert_called_once_with(1000.0, 3)
+    assert notifier.bot.send_message.call_count == 2
+    notifier.bot.send_message.assert_called_with(
+        chat_id=12345, text=format_new_order(ORDER)
+    )
+    assert priorities == [Priority.BACKGROUND, Priority.BACKGROUND]
+    persistence.remove_notifications.assert_called_once_with([1, 2])
+    persistence.reschedule_notifications.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_send_is_retried_later(notifier, persistence):
+    persistence.get_due_notifications.return_value = [
+        _entry(1),
+        _entry(2, attempts=2),
+        _entry(3),
+    ]
+    notifier.bot.send_message.side_effect = [None, Forbidden("blocked"), None]
+
+    assert await notifier.deliver_due() == 1
+
+    # The rest of the batch stays due instead of hammering the same chat
+    assert notifier.bot.send_message.call_count == 2
+    persistence.remove_notifications.assert_called_once_with([1])
+    persistence.reschedule_notifications.assert_called_once_with(
+        [(2, 1000.0 + backoff(2))]
+    )
+    assert (notifier.stats.delivered, notifier.stats.failed) == (1, 1)
+
+
+@pytest.mark.asyncio
+async def test_nothing_is_sent_without_an_owner(notifier, persistence):
+    persistence.get_bot_owner.return_value = None
+
+    assert await notifier.deliver_due() == 0
+    persistence.get_due_notifications.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_worker_drains_the_outbox_on_start_and_on_wake(notifier, persistence):
+    persistence.get_due_notifications.side_effect = [
+        [_entry(1), _entry(2), _entry(3)],  # A full batch: look again
+        [_entry(4)],
+        [_entry(5)],
+    ]
+    notifier.interval = 60
+
+    notifier.start()
+    await asyncio.sleep(0.01)
+    assert notifier.stats.delivered == 4
+
+    notifier.wake()
+    await asyncio.sleep(0.01)
+    assert notifier.stats.delivered == 5
+    await notifier.stop()
+
+
+@pytest.mark.asyncio
+async def test_worker_survives_a_database_error(notifier, persistence):
+    persistence.get_due_notifications.side_effect = [
+        sqlite3.OperationalError("database is locked"),
+        [_entry(1)],
+    ]
+    notifier.interval = 60
+
+    notifier.start()
+    await asyncio.sleep(0.01)
+    assert notifier.stats.delivered == 0
+
+    notifier.wake()
+    await asyncio.sleep(0.01)
+    assert notifier.stats.delivered == 1
+    await notifier.stop()
+
+
+class _Clock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _order(order_id, total, *items):
+    return {
+        "id": order_id,
+        "user_id": 1,
+        "total_amount": total,
+        "items": [
+            {"name": name, "quantity": quantity, "unit_price": 1.0}
+            for name, quantity in items
+        ],
+    }
+
+
+@pytest.fixture
+def burst(mocker, persistence):
+    clock = _Clock()
+    notifier = OwnerNotifier(
+        mocker.AsyncMock(),
+        persistence,
+        batch_size=10,
+        digest_threshold=2,
+        digest_window=60,
+        clock=clock,
+    )
+    notifier.bot.send_message.return_value = mocker.MagicMock(message_id=77)
+    return notifier, clock
+
+
+@pytest.mark.asyncio
+async def test_burst_is_merged_into_one_digest_edited_in_place(burst, persistence):
+    notifier, clock = burst
+    persistence.get_due_notifications.return_value = [
+        {"id": i, "attempts": 0, "order": _order(f"o{i}", 10.0, ("Tea", 1))}
+        for i in range(1, 5)
+    ]
+
+    assert await notifier.deliver_due() == 4
+
+    # Two orders on their own, then one digest for the rest
+    texts = [c.kwargs["text"] for c in notifier.bot.send_message.call_args_list]
+    assert texts[:2] == [
+        format_new_order(_order(f"o{i}", 10.0, ("Tea", 1))) for i in (1, 2)
+    ]
+    assert texts[2].startswith("🔔 2 New Orders since ")
+    persistence.remove_notifications.assert_called_once_with([1, 2, 3, 4])
+
+    clock.now += 30
+    persistence.get_due_notifications.return_value = [
+        {"id": 5, "attempts": 0, "order": _order("o5", 5.5, ("Cake", 2))}
+    ]
+    assert await notifier.deliver_due() == 1
+
+    assert notifier.bot.send_message.call_count == 3
+    edit = notifier.bot.edit_message_text.call_args.kwargs
+    assert edit["chat_id"] == 12345 and edit["message_id"] == 77
+    assert "3 New Orders" in edit["text"]
+    assert "Total: $25.50\nItems:\n- Tea x 2\n- Cake x 2" in edit["text"]
+    assert (notifier.stats.digested, notifier.stats.digest_edits) == (3, 1)
+
+
+@pytest.mark.asyncio
+async def test_quiet_period_goes_back_to_single_messages(burst, persistence):
+    notifier, clock = burst
+    persistence.get_due_notifications.return_value = [
+        {"id": i, "attempts": 0, "order": _order(f"o{i}", 1.0)} for i in range(3)
+    ]
+    await notifier.deliver_due()
+    assert notifier.stats.digest_messages == 1
+
+    clock.now += 61
+    persistence.get_due_notifications.return_value = [
+        {"id": 9, "attempts": 0, "order": _order("o9", 1.0)}
+    ]
+    await notifier.deliver_due()
+
+    notifier.bot.send_message.assert_called_with(
+        chat_id=12345, text=format_new_order(_order("o9", 1.0))
+    )
+    notifier.bot.edit_message_text.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_failed_digest_edit_is_retried_as_a_new_digest(burst, persistence):
+    notifier, clock = burst
+    persistence.get_due_notifications.return_value = [
+        {"id": i, "attempts": 0, "order": _order(f"o{i}", 1.0)} for i in range(3)
+    ]
+    await notifier.deliver_due()
+    notifier.bot.edit_message_text.side_effect = BadRequest("Message to edit not found")
+
+    clock.now += 1
+    persistence.get_due_notifications.return_value = [
+        {"id": 5, "attempts": 0, "order": _order("o5", 1.0)}
+    ]
+    assert await notifier.deliver_due() == 0
+    persistence.reschedule_notifications.assert_called_once_with(
+        [(5, clock.now + backoff(0))]
+    )
+
+    assert await notifier.deliver_due() == 1
+    assert notifier.stats.digest_messages == 2
+    assert notifier.bot.send_message.call_args.kwargs["text"].startswith(
+        "🔔 1 New Order since "
+    )
@@ -0,0 +1,234 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from telegram.error import RetryAfter
+from telegram.ext import ExtBot
+from telegram.request import BaseRequest
+
+from services.outbound import (
+    OutboundScheduler,
+    Priority,
+    priority,
+    retry_after_seconds,
+)
+
+
+class _Api:
+    """Records the order in which calls reach the Bot API."""
+
+    def __init__(self, failures=0):
+        self.calls = []
+        self.failures = failures
+
+    async def call(self, name):
+        if self.failures:
+            self.failures -= 1
+            raise RetryAfter(timedelta(milliseconds=50))
+        self.calls.append(name)
+        return True
+
+
+def _request(scheduler, api, name, endpoint="sendMessage", chat_id=None, args=None):
+    data = {} if chat_id is None else {"chat_id": chat_id}
+    return asyncio.ensure_future(
+        scheduler.process_request(
+            api.call, (name,), {}, endpoint, data, rate_limit_args=args
+        )
+    )
+
+
+@pytest.mark.asyncio
+async def test_waiting_calls_go_out_most_urgent_first():
+    scheduler = OutboundScheduler(global_rate=100)
+    scheduler._global.bucket._tokens = 0  # Saturated: everything queues
+    api = _Api()
+
+    with priority(Priority.BACKGROUND):
+        background = _request(scheduler, api, "notify owner")
+    with priority(Priority.RECEIPT):
+        receipt = _request(scheduler, api, "receipt")
+    first = _request(scheduler, api, "menu 1")
+    second = _request(scheduler, api, "menu 2")
+    await asyncio.sleep(0)
+
+    assert scheduler.depths() == {"INTERACTIVE": 2, "RECEIPT": 1, "BACKGROUND": 1}
+    await asyncio.gather(background, receipt, first, second)
+    assert api.calls == ["menu 1", "menu 2", "receipt", "notify owner"]
+    assert scheduler.depths() == {"INTERACTIVE": 0, "RECEIPT": 0, "BACKGROUND": 0}
+    assert scheduler.stats.peak["INTERACTIVE"] == 2
+    assert scheduler.stats.delayed == 4
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_args_override_the_block_priority():
+    scheduler = OutboundScheduler(global_rate=100)
+    scheduler._global.bucket._tokens = 0
+    api = _Api()
+
+    with priority(Priority.BACKGROUND):
+        late = _request(scheduler, api, "late")
+        urgent = _request(scheduler, api, "urgent", args=Priority.INTERACTIVE)
+    await asyncio.gather(late, urgent)
+
+    assert api.calls == ["urgent", "late"]
+
+
+@pytest.mark.asyncio
+async def test_a_busy_chat_does_not_hold_up_other_chats():
+    scheduler = OutboundScheduler(chat_rate=20, chat_burst=1)
+    api = _Api()
+
+    tasks = [_request(scheduler, api, f"a{i}", chat_id=1) for i in range(3)]
+    tasks.append(_request(scheduler, api, "b", chat_id=2))
+    await asyncio.gather(*tasks)
+
+    # Chat 1 gets one message per 50 ms; chat 2 does not wait behind it
+    assert api.calls == ["a0", "b", "a1", "a2"]
+
+
+@pytest.mark.asyncio
+async def test_groups_use_the_group_rate_and_deletions_skip_chat_limits():
+    scheduler = OutboundScheduler(chat_burst=1)
+    api = _Api()
+
+    await _request(scheduler, api, "group message", chat_id=-100123)
+    assert scheduler._chats[-100123].bucket.rate == scheduler.group_rate
+    # The group's bucket is empty now, but cleanup is not a message
+    await asyncio.wait_for(
+        _request(scheduler, api, "cleanup", "deleteMessages", chat_id=-100123),
+        timeout=0.5,
+    )
+    assert api.calls == ["group message", "cleanup"]
+
+
+@pytest.mark.asyncio
+async def test_interactive_edits_skip_the_chat_limit():
+    scheduler = OutboundScheduler(chat_rate=0.1, chat_burst=1)
+    api = _Api()
+
+    await _request(scheduler, api, "menu", chat_id=1)
+    # The chat's bucket is empty, but button-press edits go straight out
+    await asyncio.wait_for(
+        asyncio.gather(
+            *(
+                _request(scheduler, api, f"edit{i}", "editMessageText", chat_id=1)
+                for i in range(3)
+            )
+        ),
+        timeout=0.5,
+    )
+    assert api.calls == ["menu", "edit0", "edit1", "edit2"]
+
+    # Background edits (e.g. a digest update) still count against the chat
+    background = _request(
+        scheduler, api, "digest", "editMessageText", 1, Priority.BACKGROUND
+    )
+    await asyncio.sleep(0.05)
+    assert not background.done()
+    background.cancel()
+    await scheduler.shutdown()
+
+
+def test_retry_after_seconds_accepts_timedelta_and_int():
+    assert retry_after_seconds(RetryAfter(timedelta(seconds=3))) == 3.0
+    assert retry_after_seconds(RetryAfter(2)) == 2.0
+
+
+@pytest.mark.asyncio
+async def test_retry_after_pauses_all_calls_then_retries():
+    scheduler = OutboundScheduler()
+    api = _Api(failures=1)
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+
+    flooded = _request(scheduler, api, "flooded")
+    await asyncio.sleep(0.01)
+    other = _request(scheduler, api, "other")
+    assert await flooded is True
+    await other
+
+    assert api.calls == ["flooded", "other"]
+    assert loop.time() - started >= 0.05
+    assert scheduler.stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_without_a_global_rate_only_chats_and_pauses_gate_calls():
+    """Sharded workers leave the global limit to the front process."""
+    scheduler = OutboundScheduler(global_rate=None, chat_rate=1, chat_burst=1)
+    api = _Api()
+    loop = asyncio.get_running_loop()
+
+    unlimited = [
+        _request(scheduler, api, f"delete {n}", "deleteMessage", 5) for n in range(50)
+    ]
+    await asyncio.gather(*unlimited)
+    assert scheduler.stats.delayed == 0
+
+    api.failures = 1
+    started = loop.time()
+    flooded = _request(scheduler, api, "flooded", "deleteMessage", 6)
+    await asyncio.sleep(0.01)
+    other = _request(scheduler, api, "other", "deleteMessage", 7)
+    await asyncio.gather(flooded, other)
+    assert loop.time() - started >= 0.05  # The RetryAfter pause still holds
+    assert api.calls[-2:] == ["flooded", "other"]
+
+
+@pytest.mark.asyncio
+async def test_retry_after_is_raised_once_retries_run_out():
+    scheduler = OutboundScheduler(max_retries=1)
+    api = _Api(failures=2)
+
+    with pytest.raises(RetryAfter):
+        await _request(scheduler, api, "flooded")
+    assert scheduler.stats.retries == 1
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_is_skipped():
+    scheduler = OutboundScheduler(global_rate=100)
+    scheduler._global.bucket._tokens = 0
+    api = _Api()
+
+    gone = _request(scheduler, api, "gone")
+    kept = _request(scheduler, api, "kept")
+    await asyncio.sleep(0)
+    gone.cancel()
+    await kept
+
+    assert api.calls == ["kept"]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_paces_a_real_bot(mocker):
+    class _Request(BaseRequest):
+        read_timeout = None
+
+        async def initialize(self):
+            pass
+
+        async def shutdown(self):
+            pass
+
+        async def do_request(self, url, method, request_data=None, **_timeouts):
+            message = {
+                "message_id": 1,
+                "date": 0,
+                "chat": {"id": 5, "type": "private"},
+                "text": "hi",
+            }
+            return 200, json.dumps({"ok": True, "result": message}).encode()
+
+    scheduler = OutboundScheduler()
+    process = mocker.spy(scheduler, "process_request")
+    bot = ExtBot("123:fake", request=_Request(), rate_limiter=scheduler)
+
+    message = await bot.send_message(5, "hi", rate_limit_args=Priority.BACKGROUND)
+
+    assert message.text == "hi"
+    assert process.call_args.kwargs["endpoint"] == "sendMessage"
+    assert process.call_args.kwargs["rate_limit_args"] == Priority.BACKGROUND
+    assert 5 in scheduler._chats
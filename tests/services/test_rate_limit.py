@@ -0,0 +1,46 @@
+import pytest
+
+from services.rate_limit import TokenBucket
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_bucket_allows_a_burst_then_paces_at_rate():
+    clock = _Clock()
+    bucket = TokenBucket(2, capacity=3, clock=clock)
+
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_acquire() == pytest.approx(0.5)
+
+    clock.now = 0.5
+    assert bucket.try_acquire() == 0
+    assert bucket.delay() == pytest.approx(0.5)
+
+
+def test_bucket_refill_is_capped_at_capacity():
+    clock = _Clock()
+    bucket = TokenBucket(1, capacity=2, clock=clock)
+    bucket.try_acquire()
+    bucket.try_acquire()
+
+    clock.now = 60
+    assert [bucket.try_acquire() for _ in range(3)] == [0, 0, pytest.approx(1.0)]
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+@pytest.mark.asyncio
+async def test_acquire_waits_for_a_token():
+    bucket = TokenBucket(200, capacity=1)
+    await bucket.acquire()
+    assert bucket.delay() > 0
+    await bucket.acquire()  # Sleeps ~5 ms instead of failing
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import queue
+from contextlib import asynccontextmanager
+from datetime import datetime
+
+import pytest
+from telegram import Chat, Message, Update, User
+from telegram.error import NetworkError
+from telegram.ext import ApplicationBuilder, ExtBot, TypeHandler
+from telegram.request import BaseRequest, RequestData
+from telegram.request._requestparameter import RequestParameter
+
+from services.sharding import (
+    OutboundRelay,
+    RelayRequest,
+    WorkerChannel,
+    feed_worker,
+    shard_for,
+)
+
+
+def _update(update_id, chat_id=None, user_id=None) -> Update:
+    if chat_id is None:
+        return Update(update_id=update_id)
+    message = Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=chat_id, type=Chat.PRIVATE),
+        from_user=User(id=user_id or chat_id, is_bot=False, first_name="Test"),
+        text="hi",
+    )
+    return Update(update_id=update_id, message=message)
+
+
+def test_shard_for_keeps_a_chat_on_one_worker():
+    shards = {shard_for(_update(i, chat_id=1234), 4) for i in range(10)}
+    assert shards == {1234 % 4}
+    assert {shard_for(_update(1, chat_id=c), 4) for c in range(8)} == {0, 1, 2, 3}
+    assert shard_for(_update(7), 4) == 7 % 4  # No chat or user: by update id
+
+
+class _FakeApi(BaseRequest):
+    def __init__(self, fail=False):
+        self.calls = []
+        self.fail = fail
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    async def do_request(self, url, method, request_data=None, **_timeouts):
+        if self.fail:
+            raise NetworkError("connection reset")
+        self.calls.append((url, request_data.json_parameters))
+        return 200, json.dumps({"ok": True, "result": True}).encode()
+
+
+@asynccontextmanager
+async def _relay_pair(api, rate=None):
+    outbound = queue.Queue()
+    channel = WorkerChannel(0, queue.Queue(), queue.Queue(), outbound)
+    relay = OutboundRelay(api, outbound, [channel.responses], rate=rate)
+    request = RelayRequest(channel)
+    await relay.start()
+    await request.initialize()
+    try:
+        yield relay, request
+    finally:
+        # Unblocks the reader threads even when the test fails
+        await request.shutdown()
+        await relay.stop()
+
+
+@pytest.mark.asyncio
+async def test_relay_executes_worker_calls_in_the_front():
+    api = _FakeApi()
+    data = RequestData(
+        [
+            RequestParameter.from_input(key, value)
+            for key, value in (("chat_id", 5), ("text", "hi"))
+        ]
+    )
+
+    async with _relay_pair(api) as (relay, request):
+        status, payload = await request.do_request(
+            "https://api/bot1:x/sendMessage", "POST", data
+        )
+
+    assert status == 200
+    assert json.loads(payload)["ok"] is True
+    assert api.calls == [
+        ("https://api/bot1:x/sendMessage", {"chat_id": "5", "text": "hi"})
+    ]
+    assert relay.relayed == 1
+
+
+@pytest.mark.asyncio
+async def test_relay_reports_front_errors_to_the_worker():
+    async with _relay_pair(_FakeApi(fail=True)) as (_relay, request):
+        with pytest.raises(NetworkError, match="connection reset"):
+            await request.do_request("https://api/bot1:x/getMe", "POST")
+
+
+@pytest.mark.asyncio
+async def test_relay_answers_the_worker_when_a_bug_escapes(mocker):
+    api = _FakeApi()
+    api.do_request = mocker.AsyncMock(side_effect=KeyError("bug"))
+    outbound = queue.Queue()
+    channel = WorkerChannel(0, queue.Queue(), queue.Queue(), outbound)
+    relay = OutboundRelay(api, outbound, [channel.responses], rate=None)
+
+    with pytest.raises(KeyError):
+        await relay._execute(0, 1, "https://api/bot1:x/getMe", "POST", None, None)
+
+    request_id, status, _payload = channel.responses.get_nowait()
+    assert (request_id, status) == (1, None)
+
+
+@pytest.mark.asyncio
+async def test_relay_paces_calls_with_the_global_bucket():
+    api = _FakeApi()
+    async with _relay_pair(api, rate=1000) as (relay, request):
+        relay.bucket.capacity = relay.bucket._tokens = 2  # Then 1 ms apart
+        started = asyncio.get_running_loop().time()
+        await asyncio.gather(
+            *(request.do_request("https://api/bot1:x/getMe", "POST") for _ in range(6))
+        )
+        elapsed = asyncio.get_running_loop().time() - started
+
+    assert elapsed >= 0.003
+    assert len(api.calls) == 6
+
+
+@pytest.mark.asyncio
+async def test_feed_worker_processes_updates_until_stopped(mocker):
+    mocker.patch.object(ExtBot, "initialize", mocker.AsyncMock())
+    mocker.patch.object(ExtBot, "shutdown", mocker.AsyncMock())
+    application = ApplicationBuilder().token("123:fake").updater(None).build()
+    application.bot._bot_user = User(id=123, is_bot=True, first_name="Shop")
+    seen = []
+
+    async def record(update, _context):
+        await asyncio.sleep(0.01)
+        seen.append(update.update_id)
+
+    application.add_handler(TypeHandler(Update, record))
+    channel = WorkerChannel(0, queue.Queue(), queue.Queue(), queue.Queue())
+    for update_id in (1, 2, 3):
+        channel.inbox.put(_update(update_id, chat_id=9).to_dict())
+    channel.inbox.put(None)
+
+    async with application:
+        await application.start()
+        await feed_worker(application, channel)
+        await application.stop()
+
+    assert seen == [1, 2, 3]
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from services.timing_wheel import TimingWheel
+
+
+@pytest.fixture
+def wheel():
+    return TimingWheel(tick=1.0, slots=4)
+
+
+async def _run_fired():
+    await asyncio.sleep(0)  # Fired callbacks run on the event loop
+
+
+@pytest.mark.asyncio
+async def test_callback_fires_on_its_tick(wheel):
+    fired = []
+    wheel.schedule_soon(fired.append, 2.0, "a")
+
+    assert wheel.advance() == 0
+    assert wheel.advance() == 1
+    await _run_fired()
+    assert fired == ["a"]
+    assert len(wheel) == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_delay_waits_for_next_tick(wheel):
+    fired = []
+    wheel.schedule_soon(fired.append, 0, "a")
+
+    await _run_fired()
+    assert fired == []
+    wheel.advance()
+    await _run_fired()
+    assert fired == ["a"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("delay", [4.0, 5.0, 9.0])
+async def test_delays_longer_than_one_turn_use_rounds(wheel, delay):
+    fired = []
+    wheel.schedule_soon(fired.append, delay, "a")
+
+    wheel.advance(int(delay) - 1)
+    await _run_fired()
+    assert fired == []
+    wheel.advance()
+    await _run_fired()
+    assert fired == ["a"]
+
+
+def test_cancel(wheel):
+    fired = []
+    handle = wheel.schedule_soon(fired.append, 1.0, "a")
+
+    assert handle.cancel() is True
+    assert handle.cancel() is False
+    wheel.advance(8)
+    assert fired == []
+    assert len(wheel) == 0
+
+
+@pytest.mark.asyncio
+async def test_failing_callback_does_not_stop_the_tick(wheel):
+    fired = []
+    errors = []
+    loop = asyncio.get_running_loop()
+    loop.set_exception_handler(lambda _loop, context: errors.append(context))
+    wheel.schedule_soon(lambda: 1 / 0, 1.0)
+    wheel.schedule_soon(fired.append, 1.0, "b")
+
+    try:
+        wheel.advance()
+        await _run_fired()
+    finally:
+        loop.set_exception_handler(None)
+    assert fired == ["b"]
+    # Reported by the event loop rather than swallowed
+    assert isinstance(errors[0]["exception"], ZeroDivisionError)
+
+
+@pytest.mark.asyncio
+async def test_coroutine_callbacks_run_as_tasks(wheel):
+    fired = []
+
+    async def callback(value):
+        fired.append(value)
+
+    wheel.schedule_soon(callback, 1.0, "a")
+    wheel.advance()
+    await asyncio.sleep(0)
+
+    assert fired == ["a"]
+
+
+@pytest.mark.asyncio
+async def test_start_advances_in_real_time():
+    wheel = TimingWheel(tick=0.01, slots=8)
+    fired = asyncio.Event()
+    wheel.schedule_soon(fired.set, 0.02)
+
+    wheel.start()
+    try:
+        await asyncio.wait_for(fired.wait(), timeout=1.0)
+    finally:
+        await wheel.stop()
@@ -0,0 +1,201 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from telegram import Chat, Message, Update, User
+
+from services.update_processor import ChatOrderedUpdateProcessor
+
+
+def _update(update_id: int, chat_id: int, user_id: int) -> Update:
+    message = Message(
+        message_id=update_id,
+        date=datetime.now(),
+        chat=Chat(id=chat_id, type=Chat.PRIVATE),
+        from_user=User(id=user_id, is_bot=False, first_name="Test"),
+        text="hi",
+    )
+    return Update(update_id=update_id, message=message)
+
+
+class _Recorder:
+    def __init__(self):
+        self.events = []
+        self.gates: dict[int, asyncio.Event] = {}
+
+    async def run(self, update_id: int, hold: bool = False):
+        self.events.append(("start", update_id))
+        if hold:
+            self.gates[update_id] = asyncio.Event()
+            await self.gates[update_id].wait()
+        else:
+            await asyncio.sleep(0)
+        self.events.append(("end", update_id))
+
+
+def _start(processor, recorder, update, hold=False):
+    return asyncio.ensure_future(
+        processor.process_update(update, recorder.run(update.update_id, hold))
+    )
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_different_chats_run_concurrently():
+    processor = ChatOrderedUpdateProcessor(4)
+    recorder = _Recorder()
+
+    first = _start(processor, recorder, _update(1, chat_id=10, user_id=10), hold=True)
+    second = _start(processor, recorder, _update(2, chat_id=20, user_id=20))
+    await _settle()
+
+    # The second chat finished while the first is still running
+    assert recorder.events == [("start", 1), ("start", 2), ("end", 2)]
+    recorder.gates[1].set()
+    await asyncio.gather(first, second)
+
+
+@pytest.mark.asyncio
+async def test_same_chat_is_strictly_ordered():
+    processor = ChatOrderedUpdateProcessor(4)
+    recorder = _Recorder()
+
+    tasks = [
+        _start(processor, recorder, _update(1, chat_id=10, user_id=10), hold=True),
+        _start(processor, recorder, _update(2, chat_id=10, user_id=10)),
+        _start(processor, recorder, _update(3, chat_id=10, user_id=10)),
+    ]
+    await _settle()
+    assert recorder.events == [("start", 1)]
+    assert processor.waiting == 2
+
+    recorder.gates[1].set()
+    await asyncio.gather(*tasks)
+
+    assert recorder.events == [
+        ("start", 1),
+        ("end", 1),
+        ("start", 2),
+        ("end", 2),
+        ("start", 3),
+        ("end", 3),
+    ]
+    assert processor._queues == {}
+
+
+@pytest.mark.asyncio
+async def test_same_user_is_ordered_across_chats():
+    """An update waiting on its user does not let a later one of its chat overtake."""
+    processor = ChatOrderedUpdateProcessor(4)
+    recorder = _Recorder()
+
+    tasks = [
+        _start(processor, recorder, _update(1, chat_id=-100, user_id=7), hold=True),
+        _start(processor, recorder, _update(2, chat_id=7, user_id=7)),
+        _start(processor, recorder, _update(3, chat_id=7, user_id=8)),
+    ]
+    await _settle()
+    assert recorder.events == [("start", 1)]
+
+    recorder.gates[1].set()
+    await asyncio.gather(*tasks)
+    starts = [update_id for kind, update_id in recorder.events if kind == "start"]
+    assert starts == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_max_concurrent_updates_is_respected():
+    processor = ChatOrderedUpdateProcessor(2)
+    recorder = _Recorder()
+
+    tasks = [
+        _start(processor, recorder, _update(i, chat_id=i, user_id=i), hold=True)
+        for i in range(1, 5)
+    ]
+    await _settle()
+
+    # Different chats, but only two slots
+    assert recorder.events == [("start", 1), ("start", 2)]
+    assert processor.current_concurrent_updates == 2
+    recorder.gates[1].set()
+    await _settle()
+    assert ("start", 3) in recorder.events
+    assert ("start", 4) not in recorder.events
+    for update_id in (2, 3):
+        recorder.gates[update_id].set()
+    await _settle()
+    recorder.gates[4].set()
+    await asyncio.gather(*tasks)
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_a_busy_chat_does_not_deadlock():
+    processor = ChatOrderedUpdateProcessor(2)
+    recorder = _Recorder()
+
+    tasks = [
+        _start(processor, recorder, _update(1, chat_id=10, user_id=10), hold=True),
+        *(
+            _start(processor, recorder, _update(i, chat_id=10, user_id=10))
+            for i in range(2, 5)
+        ),
+        _start(processor, recorder, _update(5, chat_id=20, user_id=20)),
+    ]
+    await _settle()
+
+    # Update 2 waits in the second slot, so the other chat waits for a slot
+    assert processor.waiting == 1
+    assert ("start", 5) not in recorder.events
+    recorder.gates[1].set()
+    await asyncio.gather(*tasks)
+
+    starts = [update_id for kind, update_id in recorder.events if kind == "start"]
+    assert [i for i in starts if i != 5] == [1, 2, 3, 4]
+    assert processor._queues == {}
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_releases_its_place():
+    processor = ChatOrderedUpdateProcessor(4)
+    recorder = _Recorder()
+
+    first = _start(processor, recorder, _update(1, chat_id=10, user_id=10), hold=True)
+    second = _start(processor, recorder, _update(2, chat_id=10, user_id=10))
+    third = _start(processor, recorder, _update(3, chat_id=10, user_id=10))
+    await _settle()
+
+    second.cancel()
+    await asyncio.gather(second, return_exceptions=True)
+    recorder.gates[1].set()
+    await asyncio.gather(first, third)
+
+    assert ("start", 2) not in recorder.events
+    assert recorder.events[-1] == ("end", 3)
+    assert processor._queues == {}
+
+
+@pytest.mark.asyncio
+async def test_updates_without_chat_or_user_are_not_ordered():
+    processor = ChatOrderedUpdateProcessor(4)
+    assert processor.ordering_keys(Update(update_id=1)) == ()
+    assert processor.ordering_keys(object()) == ()
+    assert processor.ordering_keys(_update(1, chat_id=5, user_id=6)) == (
+        ("chat", 5),
+        ("user", 6),
+    )
+
+
+def test_application_uses_processor():
+    from telegram.ext import ApplicationBuilder
+
+    processor = ChatOrderedUpdateProcessor(8)
+    application = (
+        ApplicationBuilder().token("123:fake").concurrent_updates(processor).build()
+    )
+
+    assert application.update_processor is processor
+    assert application.concurrent_updates == 8
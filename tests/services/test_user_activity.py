@@ -0,0 +1,90 @@
+import pytest
+
+from persistence.abstract_persistence import AbstractPantryPersistence
+from services.user_activity import UserActivityTracker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def persistence(mocker):
+    persistence = mocker.AsyncMock(spec=AbstractPantryPersistence)
+    persistence.upsert_users.return_value = True
+    return persistence
+
+
+@pytest.fixture
+def clock():
+    return _Clock()
+
+
+@pytest.fixture
+def tracker(persistence, clock):
+    return UserActivityTracker(persistence, granularity=60, max_known=2, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_users_are_flushed_in_one_batch(tracker, persistence):
+    tracker.seen(1, "a", "Ann")
+    tracker.seen(2, None, "Bob")
+    tracker.seen(1, "a", "Ann")
+
+    assert await tracker.flush() == 2
+    persistence.upsert_users.assert_called_once_with(
+        [(1, "a", "Ann", 1000.0), (2, None, "Bob", 1000.0)]
+    )
+    assert await tracker.flush() == 0
+    assert persistence.upsert_users.call_count == 1
+
+
+def test_last_seen_is_only_refreshed_past_the_granularity(tracker, clock):
+    assert tracker.seen(1, "a", "Ann")
+    clock.now += 59
+    assert not tracker.seen(1, "a", "Ann")
+    # A changed name is written right away
+    assert tracker.seen(1, "ann", "Ann")
+    clock.now += 60
+    assert tracker.seen(1, "ann", "Ann")
+    assert tracker.stats.seen == 4
+    assert tracker.stats.queued == 3
+    assert tracker.pending == 1
+
+
+def test_known_users_are_bounded(tracker):
+    for user_id in (1, 2, 1, 3):
+        tracker.seen(user_id, None, "U")
+
+    # 2 was least recently seen, so it is queued again
+    assert not tracker.seen(1, None, "U")
+    assert tracker.seen(2, None, "U")
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_rows_for_the_next(tracker, persistence, clock):
+    tracker.seen(1, "a", "Ann")
+    persistence.upsert_users.return_value = False
+
+    assert await tracker.flush() == 0
+    clock.now += 120
+    tracker.seen(1, "a", "Ann")
+    persistence.upsert_users.return_value = True
+
+    assert await tracker.flush() == 1
+    persistence.upsert_users.assert_called_with([(1, "a", "Ann", 1120.0)])
+    assert tracker.stats.failed == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_writes_what_is_queued(tracker, persistence):
+    tracker.start()
+    tracker.seen(1, "a", "Ann")
+
+    await tracker.stop()
+
+    persistence.upsert_users.assert_called_once_with([(1, "a", "Ann", 1000.0)])
@@ -1,6 +1,10 @@
+import asyncio
+import socket
+
+import httpx
 import pytest
 from telegram import Bot
-from telegram.ext import ApplicationBuilder
+from telegram.ext import ApplicationBuilder, ExtBot
 
 
 @pytest.mark.asyncio
@@ -15,3 +19,125 @@ async def test_bot_initializes_application_object(mocker):
     assert application.bot is not None
     assert isinstance(application.bot, Bot)
     assert application.bot.token == test_token
+
+
+def test_webhook_options_come_from_config(mocker):
+    """run_webhook gets the listen address, secret and connection limit from config."""
+    import bot_main
+
+    mocker.patch.multiple(
+        "config",
+        WEBHOOK_LISTEN="127.0.0.1",
+        WEBHOOK_PORT=8080,
+        WEBHOOK_PATH="hook",
+        WEBHOOK_URL="https://shop.example.com/hook",
+        WEBHOOK_SECRET_TOKEN="s3cret",
+        WEBHOOK_MAX_CONNECTIONS=80,
+    )
+
+    assert bot_main.webhook_options() == {
+        "listen": "127.0.0.1",
+        "port": 8080,
+        "url_path": "hook",
+        "webhook_url": "https://shop.example.com/hook",
+        "secret_token": "s3cret",
+        "max_connections": 80,
+    }
+
+
+@pytest.mark.parametrize(
+    "mode, used, unused",
+    [
+        ("polling", "run_polling", "run_webhook"),
+        ("webhook", "run_webhook", "run_polling"),
+    ],
+)
+def test_run_uses_configured_update_mode(mocker, mode, used, unused):
+    import bot_main
+
+    mocker.patch("config.UPDATE_MODE", mode)
+    application = mocker.Mock()
+
+    bot_main.run(application)
+
+    getattr(application, used).assert_called_once()
+    getattr(application, unused).assert_not_called()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+RECORDED_UPDATES = [
+    {
+        "update_id": 1001,
+        "message": {
+            "message_id": 1,
+            "date": 1767225600,
+            "chat": {"id": 98765, "type": "private"},
+            "from": {"id": 98765, "is_bot": False, "first_name": "Ann"},
+            "text": "/start",
+            "entities": [{"type": "bot_command", "offset": 0, "length": 6}],
+        },
+    },
+    {
+        "update_id": 1002,
+        "callback_query": {
+            "id": "42",
+            "chat_instance": "1",
+            "from": {"id": 98765, "is_bot": False, "first_name": "Ann"},
+            "data": "c",
+        },
+    },
+]
+
+
+@pytest.mark.asyncio
+async def test_webhook_server_accepts_recorded_updates(mocker):
+    """POSTing recorded updates to the webhook queues them; a wrong secret is refused."""
+    mocker.patch.object(ExtBot, "initialize", mocker.AsyncMock())
+    mocker.patch.object(ExtBot, "shutdown", mocker.AsyncMock())
+    set_webhook = mocker.patch.object(ExtBot, "set_webhook", mocker.AsyncMock())
+    mocker.patch.object(ExtBot, "delete_webhook", mocker.AsyncMock())
+    application = ApplicationBuilder().token("123:fake").build()
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/telegram"
+
+    async with application.updater as updater:
+        await updater.start_webhook(
+            listen="127.0.0.1",
+            port=port,
+            url_path="telegram",
+            webhook_url="https://shop.example.com/telegram",
+            secret_token="s3cret",
+            max_connections=80,
+        )
+        try:
+            async with httpx.AsyncClient() as client:
+                refused = await client.post(
+                    url,
+                    json=RECORDED_UPDATES[0],
+                    headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+                )
+                for recorded in RECORDED_UPDATES:
+                    response = await client.post(
+                        url,
+                        json=recorded,
+                        headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"},
+                    )
+                    assert response.status_code == 200
+            received = [
+                await asyncio.wait_for(updater.update_queue.get(), timeout=2)
+                for _ in RECORDED_UPDATES
+            ]
+        finally:
+            await updater.stop()
+
+    assert refused.status_code == 403
+    assert [u.update_id for u in received] == [1001, 1002]
+    assert received[0].message.text == "/start"
+    assert received[1].callback_query.data == "c"
+    assert set_webhook.call_args.kwargs["max_connections"] == 80
+    assert set_webhook.call_args.kwargs["secret_token"] == "s3cret"
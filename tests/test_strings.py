@@ -21,6 +21,20 @@ def test_cart_strings():
     assert Strings.Cart.total_line(15.75) == "Total: $15.75"
     assert Strings.Cart.receipt_item("Banana", 3, 0.80) == "- Banana x 3 @ $0.80"
     assert Strings.Cart.receipt_total(12.50) == "<b>Total: $12.50</b>"
+    assert Strings.Cart.remove_btn("Apple") == "🗑 Apple"
+    assert Strings.Order.reorder_btn("abcdef123456") == "🔁 Reorder #abcdef12"
+    assert Strings.Order.reorder_done(2, []) == "Added 2 products to your cart."
+    assert Strings.Order.reorder_done(1, ["Cake", "Pie"]) == (
+        "Added 1 products to your cart.\nUnavailable: Cake, Pie"
+    )
+    assert len(Strings.Order.reorder_done(1, ["x" * 50] * 10)) == 200
+    assert Strings.Order.notification_digest(
+        3, 42.5, "14:05", [("Tea", 4), ("Cake", 1)]
+    ) == ("🔔 3 New Orders since 14:05\nTotal: $42.50\nItems:\n- Tea x 4\n- Cake x 1")
+    long_digest = Strings.Order.notification_digest(
+        20, 1.0, "14:05", [(f"P{i}", 1) for i in range(20)]
+    )
+    assert long_digest.endswith("- P14 x 1\n…and 5 more products")
 
 
 def test_general_strings():
@@ -48,6 +62,7 @@ def test_help_strings():
     assert "/shop" in help_message
     assert "/help" in help_message
     assert "/start" in help_message
+    assert "/broadcast" in help_message
 
 
 def test_error_strings():
@@ -156,3 +171,24 @@ def test_product_strings():
         "Save this product?"
     )
     assert summary == expected_summary
+
+
+def test_broadcast_strings():
+    assert "#4" in Strings.Broadcast.started(4)
+    report = Strings.Broadcast.finished(4, 120, 2, 3, 10.4, 11.5)
+    assert "Delivered: 120" in report
+    assert "Failed: 2" in report
+    assert "Blocked the bot: 3" in report
+    assert "Took 10s (11.5 messages/s)" in report
+
+
+def test_top_seller_line_escapes_the_product_name():
+    assert Strings.Sales.top_seller_line(1, "Salt & <3", 2, 4.0) == (
+        "1. Salt &amp; &lt;3 — 2 units ($4.00)"
+    )
+
+
+def test_report_category_line_escapes_the_name():
+    assert Strings.Report.category_line("Bread & <Cakes>", 9.0, 0.5) == (
+        "Bread &amp; &lt;Cakes&gt;: $9.00 (50%)"
+    )